@@ -0,0 +1,208 @@
+# batched_ocr.py
+
+"""
+OCR em lote para várias imagens do mesmo quadro (variantes de pré-processamento e rotações).
+
+Cada readtext executa o detector CRAFT em uma única imagem e o reconhecedor em uma linha
+de texto por vez (na CPU o EasyOCR não agrupa as linhas, porque o preenchimento até a
+linha mais larga desperdiçaria processamento). Aqui:
+
+- as imagens de mesmo tamanho são empilhadas em um único lote para o detector;
+- as linhas recortadas de todas as imagens são agrupadas por largura semelhante (pouco
+  preenchimento) e cada grupo passa pelo reconhecedor em uma única chamada.
+
+Lotes maiores aproveitam melhor o BLAS na CPU. O resultado de cada imagem tem o mesmo
+formato do readtext(detail=1): [(bbox, texto, confiança), ...]. Se o leitor não expuser
+as etapas internas esperadas (ou o lote falhar), as imagens são processadas uma a uma
+com readtext.
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Configurações via variáveis de ambiente
+OCR_BATCH_ENABLED = os.getenv('OCR_BATCH_ENABLED', 'true').lower() == 'true'
+# Linhas de texto por chamada do reconhecedor
+OCR_RECOGNIZER_BATCH_SIZE = int(os.getenv('OCR_RECOGNIZER_BATCH_SIZE', '32'))
+# Razão máxima entre a linha mais larga e a mais estreita de um mesmo lote do reconhecedor
+OCR_BATCH_WIDTH_RATIO = float(os.getenv('OCR_BATCH_WIDTH_RATIO', '1.5'))
+
+# Parâmetros do readtext que afetam só o reconhecimento (e por isso separam os lotes)
+RECOGNITION_KWARGS = ('contrast_ths', 'adjust_contrast')
+
+# Altura das linhas de texto esperada pelos reconhecedores do EasyOCR (easyocr.config.imgH)
+DEFAULT_MODEL_HEIGHT = 64
+
+
+def group_by_shape(images: Sequence[np.ndarray]) -> Dict[tuple, List[int]]:
+    """
+    Agrupa os índices das imagens pelo tamanho (altura, largura).
+
+    Returns:
+        Dicionário (altura, largura) -> índices, na ordem original.
+    """
+    groups: Dict[tuple, List[int]] = {}
+    for index, image in enumerate(images):
+        groups.setdefault(tuple(image.shape[:2]), []).append(index)
+    return groups
+
+
+def width_buckets(widths: Sequence[int], max_ratio: float = OCR_BATCH_WIDTH_RATIO,
+                  max_size: int = OCR_RECOGNIZER_BATCH_SIZE) -> List[List[int]]:
+    """
+    Agrupa as linhas de texto por largura semelhante para limitar o preenchimento no lote.
+
+    Args:
+        widths: Largura de cada linha (já redimensionada para a altura do modelo).
+        max_ratio: Razão máxima entre a maior e a menor largura de um grupo.
+        max_size: Número máximo de linhas por grupo.
+
+    Returns:
+        Lista de grupos de índices.
+    """
+    buckets = []
+    current: List[int] = []
+    for index in sorted(range(len(widths)), key=lambda i: widths[i]):
+        if current and (len(current) >= max_size or widths[index] > max(widths[current[0]], 1) * max_ratio):
+            buckets.append(current)
+            current = []
+        current.append(index)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def _recognition_key(kwargs: Dict[str, Any]) -> tuple:
+    return tuple(kwargs.get(name) for name in RECOGNITION_KWARGS)
+
+
+def _batched_easyocr(reader, images: Sequence[np.ndarray], kwargs_list: List[Dict[str, Any]], stats: Dict[str, int],
+                     lock: threading.Lock) -> List[list]:
+    """Detector em lote por tamanho e reconhecedor em lote por largura (internos do easyocr 1.7)."""
+    from easyocr import config as easyocr_config
+    from easyocr.recognition import get_text
+    from easyocr.utils import get_image_list, reformat_input
+
+    model_height = getattr(easyocr_config, 'imgH', DEFAULT_MODEL_HEIGHT)
+    ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+
+    # 1. Detector: um lote por tamanho de imagem
+    prepared = [reformat_input(image) for image in images]
+    boxes: List[Optional[tuple]] = [None] * len(images)
+    for _, indices in group_by_shape([rgb for rgb, _ in prepared]).items():
+        batch = np.stack([prepared[i][0] for i in indices])
+        horizontal_lists, free_lists = reader.detect(batch, reformat=False)
+        for i, horizontal, free in zip(indices, horizontal_lists, free_lists):
+            boxes[i] = (horizontal, free)
+        with lock:
+            stats['detector_batches'] += 1
+
+    # 2. Recorta as linhas de texto de todas as imagens
+    lines = []  # (índice da imagem, caixa, recorte)
+    for i, (horizontal, free) in enumerate(boxes):
+        if not horizontal and not free:
+            continue
+        image_list, _ = get_image_list(horizontal, free, prepared[i][1], model_height=model_height)
+        lines.extend((i, box, crop) for box, crop in image_list)
+
+    # 3. Reconhecedor: um lote por grupo de largura semelhante e mesmos parâmetros de contraste
+    results: List[list] = [[] for _ in images]
+    by_params: Dict[tuple, List[int]] = {}
+    for line_index, (image_index, _, _) in enumerate(lines):
+        by_params.setdefault(_recognition_key(kwargs_list[image_index]), []).append(line_index)
+
+    recognized = {}
+    for (contrast_ths, adjust_contrast), line_indices in by_params.items():
+        widths = [lines[j][2].shape[1] for j in line_indices]
+        for bucket in width_buckets(widths):
+            members = [line_indices[k] for k in bucket]
+            max_width = max(lines[j][2].shape[1] for j in members)
+            output = get_text(reader.character, model_height, int(max_width), reader.recognizer, reader.converter,
+                              [(lines[j][1], lines[j][2]) for j in members], ignore_char, 'greedy', 5, len(members),
+                              0.1 if contrast_ths is None else contrast_ths,
+                              0.5 if adjust_contrast is None else adjust_contrast,
+                              0.003, 0, reader.device)
+            for j, item in zip(members, output):
+                recognized[j] = item
+            with lock:
+                stats['recognizer_batches'] += 1
+
+    # Mantém a ordem das linhas de cada imagem (a mesma do readtext)
+    for j, (image_index, _, _) in enumerate(lines):
+        if j in recognized:
+            box, text, confidence = recognized[j]
+            results[image_index].append((box, text, confidence))
+    with lock:
+        stats['text_lines'] += len(lines)
+    return results
+
+
+class BatchedOCR:
+    """
+    Ponto de entrada do OCR em lote, com contadores para monitoramento.
+    """
+
+    def __init__(self, enabled: bool = OCR_BATCH_ENABLED):
+        """
+        Inicializa o OCR em lote.
+
+        Args:
+            enabled: Se False, as imagens são sempre processadas uma a uma com readtext.
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.stats = {'batches': 0, 'images': 0, 'detector_batches': 0, 'recognizer_batches': 0,
+                      'text_lines': 0, 'fallbacks': 0}
+
+    def readtext(self, reader, images: Sequence[np.ndarray], kwargs_list: List[Dict[str, Any]] = None,
+                 raise_errors: bool = False) -> List[list]:
+        """
+        Executa o OCR de várias imagens com o detector e o reconhecedor em lote.
+
+        Args:
+            reader: Leitor EasyOCR.
+            images: Imagens (BGR ou escala de cinza) do mesmo quadro.
+            kwargs_list: Parâmetros do readtext de cada imagem (ex: contrast_ths das variantes binarizadas).
+            raise_errors: Se True, o erro do readtext de uma imagem é propagado em vez de virar
+                uma lista vazia (usado pelos micro-lotes, que repassam o erro às requisições).
+
+        Returns:
+            Lista, na ordem das imagens, de detecções no formato do readtext(detail=1).
+        """
+        kwargs_list = kwargs_list or [{} for _ in images]
+        with self._lock:
+            self.stats['batches'] += 1
+            self.stats['images'] += len(images)
+
+        if self.enabled and len(images) > 1:
+            try:
+                return _batched_easyocr(reader, images, kwargs_list, self.stats, self._lock)
+            except Exception as e:
+                with self._lock:
+                    self.stats['fallbacks'] += 1
+                print(f"OCR em Lote: Lote indisponível ({type(e).__name__}: {e}). Processando imagem por imagem.")
+
+        results = []
+        for image, kwargs in zip(images, kwargs_list):
+            kwargs = dict(kwargs)
+            kwargs['detail'] = 1
+            try:
+                results.append(reader.readtext(image, **kwargs))
+            except Exception as e:
+                if raise_errors:
+                    raise
+                print(f"OCR em Lote: Erro no readtext de uma imagem do lote: {e}")
+                results.append([])
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do OCR em lote."""
+        with self._lock:
+            return {'enabled': self.enabled, **self.stats}
+
+
+# Instância global do OCR em lote
+batched_ocr = BatchedOCR()
@@ -0,0 +1,81 @@
+# benchmark_game_terms.py
+
+"""
+Compara a tradução de termos de jogos antiga (ordenação do dicionário e um re.sub por
+termo a cada chamada) com o motor compilado do game_terms.
+
+Uso:
+    python benchmark_game_terms.py [repetições]
+
+Traduz um conjunto de textos típicos de telas de jogos nos dois métodos, confere que as
+saídas são idênticas e mede o tempo médio por texto.
+"""
+
+import os
+import re
+import sys
+import time
+
+os.environ.setdefault('translators_default_region', 'EN')
+
+from game_terms import GameTermEngine
+from translation_module import GAME_TERMS_DICT
+
+TEXTS = [
+    "PRESS START BUTTON",
+    "GAME OVER",
+    "PLAYER 1 HIGH SCORE: 12500",
+    "INSERT COIN TO CONTINUE",
+    "MISSION COMPLETE! CONGRATULATIONS",
+    "HP: 100 MP: 50 LEVEL 3",
+    "DO YOU WANT TO SAVE THE GAME? YES NO",
+    "Welcome to the castle, brave knight.",
+]
+
+
+def legacy_translate(text, game_terms):
+    """Tradução termo a termo da versão antiga (referência para comparação)."""
+    translated = text
+    sorted_terms = sorted(game_terms.items(), key=lambda x: len(x[0]), reverse=True)
+    for term, translation in sorted_terms:
+        if len(term.split()) > 1:
+            pattern = r'\b' + re.escape(term) + r'\b'
+            translated = re.sub(pattern, translation, translated, flags=re.IGNORECASE)
+    for term, translation in sorted_terms:
+        if len(term.split()) == 1:
+            pattern = r'\b' + re.escape(term) + r'\b'
+            translated = re.sub(pattern, translation, translated, flags=re.IGNORECASE)
+    return translated
+
+
+def measure(func, repetitions):
+    """Tempo médio (µs) por texto."""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for text in TEXTS:
+            func(text)
+    return (time.perf_counter() - start) / (repetitions * len(TEXTS)) * 1e6
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    game_terms = GAME_TERMS_DICT['en']
+
+    print(f"\n===== BENCHMARK DOS TERMOS DE JOGOS ({len(game_terms)} termos, {repetitions} repetições) =====\n")
+    start = time.perf_counter()
+    engine = GameTermEngine(game_terms, terms_file='')
+    print(f"Compilação: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for text in TEXTS:
+        assert engine.translate(text) == legacy_translate(text, game_terms), text
+
+    legacy_us = measure(lambda text: legacy_translate(text, game_terms), repetitions)
+    engine_us = measure(engine.translate, repetitions)
+    print(f"Termo a termo: {legacy_us:>8.1f} µs por texto")
+    print(f"Compilado:     {engine_us:>8.1f} µs por texto")
+    print(f"Ganho: {legacy_us / engine_us:.2f}x" if engine_us else "Ganho: -")
+    print(f"Estatísticas: {engine.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmark_grouping.py
+
+"""
+Compara o agrupamento de detecções antigo (laços em Python, comparação com a última caixa
+do grupo) com o agrupamento vetorizado do detection_grouping.
+
+Uso:
+    python benchmark_grouping.py [caixas por tela] [telas]
+
+Gera telas sintéticas com quatro janelas de diálogo cheias de linhas de texto fragmentadas
+em palavras (padrão: 500 caixas) e mede o tempo de formar os grupos nos dois algoritmos.
+O agrupamento vetorizado deve encontrar uma janela por grupo; o antigo, por comparar cada
+caixa só com a última do grupo, fragmenta as janelas conforme a ordem vertical das caixas.
+"""
+
+import random
+import sys
+import time
+
+from detection_grouping import box_geometry, group_boxes
+
+
+# Janelas de diálogo de uma tela 1920x1080 (x1, y1, x2, y2), separadas por mais que as distâncias máximas
+WINDOWS = [(0, 0, 800, 340), (1120, 0, 1920, 340), (0, 710, 800, 1050), (1120, 710, 1920, 1050)]
+
+
+def create_screen(box_count, seed):
+    """Gera uma tela com quatro janelas de diálogo preenchidas por linhas de texto fragmentadas em palavras."""
+    rng = random.Random(seed)
+    detections = []
+    while len(detections) < box_count:
+        x1, y1, x2, y2 = WINDOWS[len(detections) % len(WINDOWS)]
+        x = rng.randrange(x1, x2 - 200)
+        y = rng.randrange(y1, y2 - 18)
+        for _ in range(rng.randint(1, 6)):
+            width = rng.randint(20, 90)
+            if x + width > x2:
+                break
+            detections.append({
+                'text': f"w{len(detections)}",
+                'bbox': [[x, y], [x + width, y], [x + width, y + 18], [x, y + 18]],
+                'confidence': 0.9
+            })
+            x += width + rng.randint(4, 20)
+    return detections[:box_count]
+
+
+def legacy_groups(detections, max_distance_ratio=0.15, max_vertical_distance_ratio=0.1):
+    """Fase de agrupamento do algoritmo antigo (referência para comparação)."""
+    sorted_detections = sorted(detections, key=lambda d: min(point[1] for point in d['bbox']))
+    all_x_coords = [point[0] for d in detections for point in d['bbox']]
+    all_y_coords = [point[1] for d in detections for point in d['bbox']]
+    max_horizontal_distance = max_distance_ratio * (max(all_x_coords) - min(all_x_coords))
+    max_vertical_distance = max_vertical_distance_ratio * (max(all_y_coords) - min(all_y_coords))
+
+    groups = []
+    current_group = [sorted_detections[0]]
+    for current in sorted_detections[1:]:
+        last = current_group[-1]
+        vertical_distance = abs(sum(p[1] for p in current['bbox']) / 4 - sum(p[1] for p in last['bbox']) / 4)
+        current_x_min = min(p[0] for p in current['bbox'])
+        current_x_max = max(p[0] for p in current['bbox'])
+        last_x_min = min(p[0] for p in last['bbox'])
+        last_x_max = max(p[0] for p in last['bbox'])
+        if vertical_distance <= max_vertical_distance:
+            overlap = current_x_min <= last_x_max and current_x_max >= last_x_min
+            distance = min(abs(current_x_min - last_x_max), abs(last_x_min - current_x_max))
+            if overlap or distance <= max_horizontal_distance:
+                current_group.append(current)
+                continue
+        elif vertical_distance <= max_vertical_distance * 3:
+            overlap_width = min(current_x_max, last_x_max) - max(current_x_min, last_x_min)
+            if overlap_width > 0 and overlap_width >= min(current_x_max - current_x_min, last_x_max - last_x_min) * 0.3:
+                current_group.append(current)
+                continue
+        groups.append(current_group)
+        current_group = [current]
+    groups.append(current_group)
+    return groups
+
+
+def vectorized_groups(detections):
+    """Fase de agrupamento do algoritmo vetorizado."""
+    groups, _, _ = group_boxes(*box_geometry(detections))
+    return groups
+
+
+def measure(func, screens):
+    """Tempo médio (ms) e número médio de grupos por tela."""
+    start = time.perf_counter()
+    group_counts = [len(func(screen)) for screen in screens]
+    elapsed = time.perf_counter() - start
+    return elapsed / len(screens) * 1000, sum(group_counts) / len(group_counts)
+
+
+def main():
+    box_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    screen_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print(f"\n===== BENCHMARK DO AGRUPAMENTO ({screen_count} telas de {box_count} caixas) =====\n")
+    screens = [create_screen(box_count, seed) for seed in range(screen_count)]
+
+    legacy_ms, legacy_count = measure(legacy_groups, screens)
+    vectorized_ms, vectorized_count = measure(vectorized_groups, screens)
+    print(f"Antigo:     {legacy_ms:>8.2f} ms por tela, {legacy_count:>6.1f} grupos")
+    print(f"Vetorizado: {vectorized_ms:>8.2f} ms por tela, {vectorized_count:>6.1f} grupos")
+    print(f"Ganho: {legacy_ms / vectorized_ms:.2f}x" if vectorized_ms else "Ganho: -")
+
+
+if __name__ == "__main__":
+    main()
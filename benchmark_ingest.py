@@ -0,0 +1,90 @@
+# benchmark_ingest.py
+
+"""
+Mede as alocações de memória por requisição no caminho de ingestão da imagem.
+
+Uso:
+    python benchmark_ingest.py [largura] [altura] [repetições]
+
+Compara o caminho antigo (tentar body.decode('utf-8'), converter o binário para base64,
+decodificar o base64 de volta, decodificar a imagem duas vezes e gerar o base64 da
+coluna image_base64) com o caminho atual (identificação pelos primeiros bytes e um
+único cv2.imdecode). As alocações são medidas com tracemalloc.
+"""
+
+import base64
+import json
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from ingest import decode_image, parse_request_body, request_image_bytes
+
+
+def create_screenshot(width, height):
+    """Gera um PNG com ruído, de tamanho próximo ao de uma captura real."""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    _, encoded = cv2.imencode('.png', image)
+    return encoded.tobytes()
+
+
+def legacy_ingest(body):
+    """Reproduz o caminho de ingestão anterior."""
+    try:
+        body_text = body.decode('utf-8')
+        json.loads(body_text)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        image_b64 = base64.b64encode(body).decode('utf-8')
+    image_bytes = base64.b64decode(image_b64)
+    img_cv = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    img_ocr = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    stored_b64 = base64.b64encode(image_bytes).decode('utf-8')
+    return img_cv, img_ocr, stored_b64
+
+
+def current_ingest(body):
+    """Caminho atual: sem base64 e com uma única decodificação."""
+    request = parse_request_body(body, 'en', 'pt')
+    return decode_image(request_image_bytes(request))
+
+
+def measure(func, body, repeats):
+    """
+    Mede o pico de memória alocada e o tempo médio de uma função de ingestão.
+
+    Returns:
+        Tupla (pico em MB, tempo médio em ms).
+    """
+    func(body)  # aquecimento
+    peak = 0
+    elapsed = 0.0
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(body)
+        elapsed += time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak / (1024 * 1024), elapsed / repeats * 1000
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 1920
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 1080
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    print("\n===== BENCHMARK DE INGESTÃO DA IMAGEM =====\n")
+    body = create_screenshot(width, height)
+    print(f"Captura {width}x{height}: {len(body) / (1024 * 1024):.2f} MB em PNG\n")
+
+    for name, func in (('anterior', legacy_ingest), ('atual', current_ingest)):
+        peak_mb, avg_ms = measure(func, body, repeats)
+        print(f"{name:>10}: pico de {peak_mb:7.2f} MB alocados por requisição, {avg_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
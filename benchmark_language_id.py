@@ -0,0 +1,95 @@
+# benchmark_language_id.py
+
+"""
+Compara a vazão da detecção de português antiga (busca de substring de cada palavra em uma
+lista de palavras) com o identificador de idioma do language_id.
+
+Uso:
+    python benchmark_language_id.py [textos]
+
+Gera textos de telas de jogos em vários idiomas e mede quantos textos por segundo cada
+método verifica: o identificador sem cache (textos todos diferentes) e com cache (os
+mesmos textos de telas estáticas repetidos).
+"""
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('translators_default_region', 'EN')
+
+from language_id import LanguageIdentifier
+from translation_module import GAME_TERMS_DICT
+
+PORTUGUESE_WORDS = [
+    'jogador', 'jogadores', 'crédito', 'créditos', 'entrar', 'pressione', 'iniciar', 'continuar',
+    'pontuação', 'recorde', 'nível', 'fase', 'vidas', 'tempo', 'bônus', 'fim', 'jogo', 'insira',
+    'moeda', 'livre', 'qualquer', 'botão', 'sim', 'não', 'sair', 'tentar', 'novamente', 'reiniciar',
+    'um', 'dois', 'melhor', 'mundo', 'rodada', 'área', 'zona', 'missão', 'vida', 'restante',
+    'temporizador', 'extra', 'poder', 'especial', 'energia', 'saúde', 'experiência', 'ataque',
+    'defesa', 'magia', 'velocidade', 'força', 'agilidade', 'inteligência', 'sabedoria', 'sorte',
+    'opções', 'configurações', 'configuração', 'som', 'música', 'volume', 'controles', 'botão',
+    'dificuldade', 'fácil', 'normal', 'difícil', 'especialista', 'idioma', 'salvar', 'carregar',
+    'salvando', 'carregando', 'excluir', 'cancelar', 'confirmar', 'selecionar', 'voltar', 'retornar',
+    'vitória', 'derrota', 'parabéns', 'obrigado', 'por', 'pausa', 'pausado', 'pronto', 'vai', 'lutar',
+    'batalha', 'perfeito', 'ótimo', 'bom', 'ruim', 'errou', 'falhou', 'concluído', 'completa',
+    'cumprida', 'completo', 'aviso', 'perigo', 'erro', 'depuração'
+]
+
+SAMPLE_WORDS = {
+    'en': list(GAME_TERMS_DICT['en']),
+    'pt': list(GAME_TERMS_DICT['en'].values()),
+    'es': ["Pulsa", "cualquier", "botón", "para", "continuar", "nivel", "vidas", "puntos"],
+    'fr': ["Appuyez", "sur", "une", "touche", "pour", "continuer", "niveau", "vies"],
+}
+
+
+def legacy_is_mostly_portuguese(text):
+    """Detecção da versão antiga (referência para comparação)."""
+    words = text.lower().split()
+    portuguese_count = sum(1 for word in words if any(pt_word in word for pt_word in PORTUGUESE_WORDS))
+    return portuguese_count > len(words) * 0.3
+
+
+def create_texts(count, seed=0):
+    """Textos de telas de jogos com 2 a 8 palavras, em idiomas variados."""
+    rng = random.Random(seed)
+    texts = []
+    for index in range(count):
+        words = SAMPLE_WORDS[rng.choice(list(SAMPLE_WORDS))]
+        texts.append(' '.join(rng.choice(words) for _ in range(rng.randint(2, 8))) + f" {index}")
+    return texts
+
+
+def measure(func, texts):
+    """Textos verificados por segundo."""
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    texts = create_texts(count)
+    # Telas estáticas: 50 textos distintos repetidos
+    repeated = [texts[index % 50] for index in range(count)]
+
+    print(f"\n===== BENCHMARK DA IDENTIFICAÇÃO DE IDIOMA ({count} textos) =====\n")
+    identifier = LanguageIdentifier({'en': GAME_TERMS_DICT['en'].keys(), 'pt': GAME_TERMS_DICT['en'].values()})
+
+    legacy_rate = measure(legacy_is_mostly_portuguese, texts)
+    cold_rate = measure(lambda text: identifier.is_language(text, 'pt'), texts)
+    warm_rate = measure(lambda text: identifier.is_language(text, 'pt'), repeated)
+    print(f"Substring (antigo):       {legacy_rate:>10.0f} textos/s")
+    print(f"Identificador sem cache:  {cold_rate:>10.0f} textos/s")
+    print(f"Identificador com cache:  {warm_rate:>10.0f} textos/s")
+
+    disagreements = sum(legacy_is_mostly_portuguese(text) != identifier.is_language(text, 'pt') for text in texts)
+    print(f"Textos com resultado diferente do antigo: {disagreements} de {count}")
+    print(f"Estatísticas: {identifier.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
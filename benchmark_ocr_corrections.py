@@ -0,0 +1,88 @@
+# benchmark_ocr_corrections.py
+
+"""
+Compara a correção de OCR antiga (um re.sub por entrada de OCR_CORRECTIONS e expressões de
+PUSH SPACE KEY compiladas a cada chamada) com o motor compilado do ocr_corrections.
+
+Uso:
+    python benchmark_ocr_corrections.py [repetições]
+
+Corrige um conjunto de textos típicos de telas de jogos nos dois métodos, confere que as
+saídas são idênticas e mede o tempo médio por texto, também com a correção aproximada
+(árvore BK sobre o vocabulário dos termos de jogos) ativada.
+"""
+
+import os
+import re
+import sys
+import time
+
+os.environ.setdefault('translators_default_region', 'EN')
+
+from ocr_corrections import OCRCorrectionEngine
+from translation_module import GAME_TERMS_DICT, OCR_CORRECTIONS
+
+TEXTS = [
+    "PLAVER 1 PRESS STAKT",
+    "GANE OVEK",
+    "INSERT COIN",
+    "HIGH SCOHE 12000",
+    "PUSHGPACBKEY",
+    "CONGRATUIATIONS! MISSICN COMPLETE",
+    "Welcome to the castle, brave knight.",
+    "SELEGT YOUR CHARACTFR",
+]
+
+
+def legacy_correct(text):
+    """Correção da versão antiga (referência para comparação)."""
+    if not text:
+        return text
+    if re.match(r'^\s*(?:KEY\s+)?PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*(?:PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*)*$', text, re.IGNORECASE):
+        return 'PUSH SPACE KEY'
+    if re.search(r'PUSH\s*SPACE\s*KEY', text, re.IGNORECASE) or \
+       re.search(r'PUSH[G]?[E]?PAC[B]?KEY', text, re.IGNORECASE) or \
+       re.search(r'KEY\s+PUSH\s+SPACE', text, re.IGNORECASE):
+        text = re.sub(r'PUSH[G]?[E]?PAC[B]?KEY', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
+        text = re.sub(r'PUSH\s+SPACE\s+KEY', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
+        text = re.sub(r'KEY\s+PUSH\s+SPACE', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
+    for error, correction in OCR_CORRECTIONS.items():
+        text = re.sub(r'\b' + re.escape(error) + r'\b', correction, text, flags=re.IGNORECASE)
+    return text
+
+
+def measure(func, repetitions):
+    """Tempo médio (µs) por texto."""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for text in TEXTS:
+            func(text)
+    return (time.perf_counter() - start) / (repetitions * len(TEXTS)) * 1e6
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    vocabulary = GAME_TERMS_DICT['en']
+
+    print(f"\n===== BENCHMARK DAS CORREÇÕES DE OCR ({len(OCR_CORRECTIONS)} correções, {repetitions} repetições) =====\n")
+    start = time.perf_counter()
+    engine = OCRCorrectionEngine(OCR_CORRECTIONS, vocabulary, fuzzy_enabled=False)
+    print(f"Compilação: {(time.perf_counter() - start) * 1000:.1f} ms")
+    fuzzy_engine = OCRCorrectionEngine(OCR_CORRECTIONS, vocabulary, fuzzy_enabled=True)
+
+    for text in TEXTS:
+        assert engine.correct(text) == legacy_correct(text), text
+
+    legacy_us = measure(legacy_correct, repetitions)
+    engine_us = measure(engine.correct, repetitions)
+    fuzzy_us = measure(fuzzy_engine.correct, repetitions)
+    print(f"Entrada a entrada: {legacy_us:>8.1f} µs por texto")
+    print(f"Compilado:         {engine_us:>8.1f} µs por texto")
+    print(f"Com aproximação:   {fuzzy_us:>8.1f} µs por texto")
+    print(f"Ganho: {legacy_us / engine_us:.2f}x" if engine_us else "Ganho: -")
+    for text in TEXTS:
+        print(f"  {text!r} -> {fuzzy_engine.correct(text)!r}")
+
+
+if __name__ == "__main__":
+    main()
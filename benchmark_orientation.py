@@ -0,0 +1,93 @@
+# benchmark_orientation.py
+
+"""
+Compara a latência de ponta a ponta do OCR com cada estratégia de detecção de orientação.
+
+Uso:
+    python benchmark_orientation.py [idioma] [repetições]
+
+Para cada modo ('full', 'detector', 'projection', 'off') o script mede o tempo de
+detectar a orientação + executar o readtext final na imagem corrigida, usando as imagens
+sintéticas de create_test_image.py, na vertical e rotacionadas.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+from create_test_image import create_test_image
+from inference_executor import inference_executor
+from orientation import OrientationDetector, ORIENTATION_MODES, rotate_image
+
+
+def load_test_images():
+    """Gera as imagens de teste na vertical e rotacionadas em 90° e 180°."""
+    path = os.path.join(tempfile.gettempdir(), "benchmark_orientation.png")
+    create_test_image(path)
+    upright = cv2.imread(path)
+    return {
+        'vertical_0': upright,
+        'rotacionada_90': rotate_image(upright, 270),
+        'rotacionada_180': rotate_image(upright, 180)
+    }
+
+
+def benchmark_mode(mode, reader, images, repeats):
+    """
+    Mede a latência média de um modo de orientação.
+
+    Args:
+        mode: Estratégia de orientação.
+        reader: Leitor EasyOCR já carregado.
+        images: Dicionário nome -> imagem.
+        repeats: Número de repetições por imagem.
+
+    Returns:
+        Dicionário nome da imagem -> (latência média em ms, ângulo detectado).
+    """
+    # Sem memória por sessão: mede o custo da sondagem em todos os quadros
+    detector = OrientationDetector(mode=mode, remember=False)
+    results = {}
+    for name, image in images.items():
+        elapsed = 0.0
+        angle = 0
+        for _ in range(repeats):
+            start = time.perf_counter()
+            angle = detector.detect(image, reader)
+            reader.readtext(rotate_image(image, angle), detail=1)
+            elapsed += time.perf_counter() - start
+        results[name] = (elapsed / repeats * 1000, angle)
+    return results
+
+
+def main():
+    lang = sys.argv[1] if len(sys.argv) > 1 else 'en'
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print("\n===== BENCHMARK DE DETECÇÃO DE ORIENTAÇÃO =====\n")
+    reader = inference_executor.get_reader(lang)
+    images = load_test_images()
+
+    # Aquecimento para que a primeira medição não inclua a inicialização do modelo
+    reader.readtext(images['vertical_0'], detail=1)
+
+    summary = {}
+    for mode in ORIENTATION_MODES:
+        summary[mode] = benchmark_mode(mode, reader, images, repeats)
+
+    print(f"\n{'Modo':<12}" + "".join(f"{name:>22}" for name in images))
+    for mode, results in summary.items():
+        row = "".join(f"{results[name][0]:>14.1f} ms ({results[name][1]:>3}°)" for name in images)
+        print(f"{mode:<12}{row}")
+
+    baseline = summary['full']['vertical_0'][0]
+    for mode, results in summary.items():
+        speedup = baseline / results['vertical_0'][0] if results['vertical_0'][0] else 0
+        print(f"Ganho de '{mode}' sobre 'full' na imagem vertical: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
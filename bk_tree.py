@@ -0,0 +1,94 @@
+# bk_tree.py
+
+"""
+Árvore BK (Burkhard-Keller) para buscas por vizinhos em espaços métricos.
+
+Usada pelo cache de OCR por hash perceptual (distância de Hamming entre hashes) e pela
+correção aproximada de OCR (distância de edição entre palavras).
+"""
+
+from typing import Any, Callable, List, Tuple
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Retorna a distância de Levenshtein (inserções, remoções e substituições) entre dois textos."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """
+    Árvore BK para busca por vizinhos dentro de uma distância máxima em um espaço métrico.
+    """
+
+    def __init__(self, distance_func: Callable[[Any, Any], int]):
+        """
+        Inicializa a árvore.
+
+        Args:
+            distance_func: Função de distância (métrica) entre duas chaves.
+        """
+        self.distance_func = distance_func
+        self._root = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key, item=None) -> None:
+        """
+        Adiciona uma chave (e um item associado) à árvore.
+
+        Args:
+            key: Chave usada no cálculo da distância.
+            item: Valor associado à chave (chaves repetidas acumulam itens).
+        """
+        self._size += 1
+        if self._root is None:
+            self._root = [key, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = self.distance_func(key, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [item], {}]
+                return
+            node = child
+
+    def search(self, key, max_distance: int) -> List[Tuple[int, Any, Any]]:
+        """
+        Busca todas as chaves a no máximo max_distance da chave informada.
+
+        Args:
+            key: Chave de consulta.
+            max_distance: Distância máxima aceita.
+
+        Returns:
+            Lista de tuplas (distancia, chave, item) ordenada pela distância.
+        """
+        results = []
+        if self._root is None:
+            return results
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = self.distance_func(key, node[0])
+            if distance <= max_distance:
+                results.extend((distance, node[0], item) for item in node[1])
+            # Desigualdade triangular: só os filhos nesta faixa podem conter resultados
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        results.sort(key=lambda r: r[0])
+        return results
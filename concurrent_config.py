@@ -27,6 +27,12 @@ class ConcurrentTranslationConfig:
     max_concurrent_requests: int = 3
     translation_timeout: int = 8
     
+    # Modo das requisições: 'all' aguarda todos os tradutores, 'hedged' retorna a primeira
+    # tradução aceitável e só aciona os tradutores reserva depois de um atraso (p95 do principal)
+    request_mode: str = 'all'
+    hedge_percentile: float = 95.0
+    hedge_default_delay: float = 0.5  # Atraso (s) enquanto não há histórico de latência
+    
     # Configurações de confiança
     min_confidence_score: float = 0.6
     confidence_weights: List[float] = None
@@ -60,6 +66,9 @@ class ConcurrentTranslationConfig:
             translators=os.getenv('CONCURRENT_TRANSLATORS', 'deep_google,deep_microsoft,google').split(','),
             max_concurrent_requests=int(os.getenv('MAX_CONCURRENT_REQUESTS', '3')),
             translation_timeout=int(os.getenv('TRANSLATION_TIMEOUT', '8')),
+            request_mode=os.getenv('TRANSLATION_REQUEST_MODE', 'all').lower(),
+            hedge_percentile=float(os.getenv('TRANSLATION_HEDGE_PERCENTILE', '95')),
+            hedge_default_delay=float(os.getenv('TRANSLATION_HEDGE_DEFAULT_DELAY', '0.5')),
             min_confidence_score=float(os.getenv('MIN_CONFIDENCE_SCORE', '0.6')),
             confidence_weights=list(map(float, os.getenv('CONFIDENCE_WEIGHTS', '0.4,0.3,0.2,0.1').split(','))),
             enable_caching=os.getenv('ENABLE_TRANSLATION_CACHING', 'true').lower() == 'true',
@@ -101,6 +110,9 @@ class ConcurrentTranslationConfig:
             'translators': self.translators,
             'max_concurrent_requests': self.max_concurrent_requests,
             'translation_timeout': self.translation_timeout,
+            'request_mode': self.request_mode,
+            'hedge_percentile': self.hedge_percentile,
+            'hedge_default_delay': self.hedge_default_delay,
             'min_confidence_score': self.min_confidence_score,
             'confidence_weights': self.confidence_weights,
             'enable_caching': self.enable_caching,
@@ -148,6 +160,15 @@ class ConcurrentTranslationConfig:
         if self.translation_timeout < 1 or self.translation_timeout > 60:
             errors.append("translation_timeout deve estar entre 1 e 60 segundos")
         
+        if self.request_mode not in ('all', 'hedged'):
+            errors.append("request_mode deve ser 'all' ou 'hedged'")
+        
+        if self.hedge_percentile < 50.0 or self.hedge_percentile > 100.0:
+            errors.append("hedge_percentile deve estar entre 50 e 100")
+        
+        if self.hedge_default_delay < 0.0 or self.hedge_default_delay > self.translation_timeout:
+            errors.append("hedge_default_delay deve estar entre 0 e translation_timeout")
+        
         if self.min_confidence_score < 0.0 or self.min_confidence_score > 1.0:
             errors.append("min_confidence_score deve estar entre 0.0 e 1.0")
         
@@ -184,6 +205,11 @@ MAX_CONCURRENT_REQUESTS={self.max_concurrent_requests}
 # Timeout para tradução (segundos)
 TRANSLATION_TIMEOUT={self.translation_timeout}
 
+# Modo das requisições (all: aguarda todos; hedged: primeira tradução aceitável, reservas após o p95)
+TRANSLATION_REQUEST_MODE={self.request_mode}
+TRANSLATION_HEDGE_PERCENTILE={self.hedge_percentile}
+TRANSLATION_HEDGE_DEFAULT_DELAY={self.hedge_default_delay}
+
 # Score mínimo de confiança (0.0 a 1.0)
 MIN_CONFIDENCE_SCORE={self.min_confidence_score}
 
@@ -286,6 +312,7 @@ class ConfigManager:
             'max_concurrent': self._config.max_concurrent_requests,
             'timeout_per_translator': self._config.translation_timeout,
             'estimated_max_time': self._config.translation_timeout,  # Paralelo
+            'request_mode': self._config.request_mode,
             'confidence_threshold': self._config.min_confidence_score
         }
     
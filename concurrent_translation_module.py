@@ -13,7 +13,7 @@ Data: 2024
 """
 
 import asyncio
-import aiohttp
+import threading
 import time
 import os
 import re
@@ -22,6 +22,10 @@ from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
+from concurrent_config import ConcurrentTranslationConfig, get_current_config
+from http_translators import http_translators
+from provider_health import is_timeout_error, provider_health
+
 # Importar módulos existentes
 try:
     from deep_translator_integration import get_deep_translator_instance, get_enhanced_translator_list
@@ -292,28 +296,80 @@ class ConfidenceCalculator:
         
         return synonyms_map.get(term.lower(), [])
 
+class HedgedRequestStats:
+    """
+    Contadores do modo hedged. A ordem dos tradutores e o histórico de latência usados no
+    modo vêm do registro de saúde dos tradutores (provider_health).
+    """
+    
+    def __init__(self):
+        """Inicializa os contadores."""
+        self._lock = threading.Lock()
+        self.stats = {
+            'hedged_requests': 0,
+            'backups_launched': 0,
+            'early_returns': 0,
+            'cancelled': 0,
+            'wins': {},
+            'cancelled_by_provider': {}
+        }
+    
+    def count(self, name: str) -> None:
+        """Incrementa um contador do modo hedged."""
+        with self._lock:
+            self.stats[name] += 1
+    
+    def count_win(self, provider: str) -> None:
+        """Registra um tradutor cuja resposta foi usada no modo hedged."""
+        with self._lock:
+            self.stats['wins'][provider] = self.stats['wins'].get(provider, 0) + 1
+    
+    def count_cancelled(self, provider: str) -> None:
+        """
+        Registra uma chamada cancelada no modo hedged. O tempo parcial não entra no histórico
+        de latência: ele só limita a latência por baixo e puxaria o percentil para valores menores.
+        """
+        with self._lock:
+            self.stats['cancelled'] += 1
+            cancelled = self.stats['cancelled_by_provider']
+            cancelled[provider] = cancelled.get(provider, 0) + 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do modo hedged."""
+        with self._lock:
+            return {key: (dict(value) if isinstance(value, dict) else value) for key, value in self.stats.items()}
+
+# Contadores compartilhados por todos os gerenciadores (um gerenciador é criado por tradução)
+hedged_stats = HedgedRequestStats()
+
 class ConcurrentTranslationManager:
     """
     Gerenciador de tradução concorrente com métricas de confiança.
     """
     
-    def __init__(self):
+    def __init__(self, config: Optional[ConcurrentTranslationConfig] = None):
         """
         Inicializa o gerenciador de tradução concorrente.
+        
+        Args:
+            config: Configuração (modo das requisições e parâmetros do hedging); padrão: configuração atual
         """
+        self.config = config or get_current_config()
+        self.hedge_stats = hedged_stats
+        self.health = provider_health
+        self.http_translators = http_translators
         self.confidence_calculator = ConfidenceCalculator()
         self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
         self.session = None
         
     async def __aenter__(self):
-        """Context manager para sessão aiohttp."""
-        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=TRANSLATION_TIMEOUT))
+        """Context manager: usa a sessão aiohttp compartilhada dos tradutores HTTP."""
+        self.session = await self.http_translators.get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Cleanup da sessão aiohttp."""
-        if self.session:
-            await self.session.close()
+        """A sessão compartilhada continua aberta para as próximas traduções (keep-alive)."""
+        self.session = None
     
     async def translate_with_single_translator(self, text: str, translator_name: str, source_lang: str = 'auto', target_lang: str = 'pt') -> TranslationResult:
         """
@@ -328,11 +384,27 @@ class ConcurrentTranslationManager:
         Returns:
             TranslationResult com resultado da tradução
         """
+        if not self.health.allow(translator_name):
+            return TranslationResult(
+                translator=translator_name,
+                original_text=text,
+                translated_text="",
+                confidence_score=0.0,
+                execution_time=0.0,
+                error="Circuito aberto"
+            )
+        
         start_time = time.time()
         
         try:
+            if self.http_translators.supports(translator_name):
+                # Adaptador HTTP assíncrono: sem thread, na sessão compartilhada
+                translated_text = await asyncio.wait_for(
+                    self.http_translators.translate(text, translator_name, source_lang, target_lang),
+                    TRANSLATION_TIMEOUT
+                )
             # Executar tradução em thread separada para não bloquear
-            if translator_name.startswith('deep_'):
+            elif translator_name.startswith('deep_'):
                 # Usar deep-translator
                 loop = asyncio.get_event_loop()
                 translated_text = await loop.run_in_executor(
@@ -350,6 +422,11 @@ class ConcurrentTranslationManager:
                 )
             
             execution_time = time.time() - start_time
+            # Traduções vazias são falhas
+            if translated_text:
+                self.health.record_success(translator_name, execution_time)
+            else:
+                self.health.record_failure(translator_name, execution_time)
             
             # Calcular métricas de confiança
             confidence_score, metrics = self.confidence_calculator.calculate_overall_confidence(
@@ -367,6 +444,7 @@ class ConcurrentTranslationManager:
             
         except asyncio.TimeoutError:
             execution_time = time.time() - start_time
+            self.health.record_failure(translator_name, execution_time, timeout=True)
             return TranslationResult(
                 translator=translator_name,
                 original_text=text,
@@ -377,6 +455,7 @@ class ConcurrentTranslationManager:
             )
         except Exception as e:
             execution_time = time.time() - start_time
+            self.health.record_failure(translator_name, execution_time, timeout=is_timeout_error(e))
             logger.error(f"Erro na tradução com {translator_name}: {e}")
             return TranslationResult(
                 translator=translator_name,
@@ -429,8 +508,12 @@ class ConcurrentTranslationManager:
         if not translators:
             translators = CONCURRENT_TRANSLATORS
         
-        # Limitar número de tradutores concorrentes
-        translators = translators[:MAX_CONCURRENT_REQUESTS]
+        # Ordenar pela saúde atual (sem os tradutores com circuito aberto) e limitar o número
+        # de tradutores concorrentes
+        translators = self.health.order(translators)[:MAX_CONCURRENT_REQUESTS]
+        
+        if self.config.request_mode == 'hedged':
+            return await self.translate_hedged(text, source_lang, target_lang, translators)
         
         # Criar tasks para execução paralela
         tasks = [
@@ -452,6 +535,77 @@ class ConcurrentTranslationManager:
         
         return valid_results
     
+    async def translate_hedged(self, text: str, source_lang: str = 'auto', target_lang: str = 'pt', translators: List[str] = None) -> List[TranslationResult]:
+        """
+        Tradução com requisições de reserva (hedging): envia ao primeiro tradutor da lista (o
+        de menor custo esperado na saúde dos tradutores), aciona o próximo tradutor quando o
+        atraso (percentil configurado da latência do principal) passa sem resposta aceitável ou
+        quando um tradutor falha, e retorna assim que uma tradução atinge MIN_CONFIDENCE_SCORE,
+        cancelando as tarefas restantes.
+        
+        As chamadas canceladas continuam no pool de threads até terminar, mas seu resultado é
+        descartado e a requisição não espera por elas.
+        
+        Args:
+            text: Texto para traduzir
+            source_lang: Idioma de origem
+            target_lang: Idioma de destino
+            translators: Tradutores na ordem de tentativa (padrão: ordem da saúde dos tradutores)
+            
+        Returns:
+            Lista de TranslationResult ordenada por confidence_score
+        """
+        # A ordem vem da saúde dos tradutores (translate_concurrent já passa a lista ordenada)
+        order = list(translators) if translators else self.health.order(CONCURRENT_TRANSLATORS)[:MAX_CONCURRENT_REQUESTS]
+        if not order:
+            return []
+        delay = self.health.percentile(order[0], self.config.hedge_percentile)
+        if delay is None:
+            delay = self.config.hedge_default_delay
+        deadline = time.monotonic() + self.config.translation_timeout
+        self.hedge_stats.count('hedged_requests')
+        
+        pending: Dict[asyncio.Future, str] = {}
+        results = []
+        winner = None
+        
+        def launch(provider: str):
+            task = asyncio.ensure_future(self.translate_with_single_translator(text, provider, source_lang, target_lang))
+            pending[task] = provider
+        
+        launch(order[0])
+        backups = order[1:]
+        try:
+            while pending and winner is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                timeout = min(delay, remaining) if backups else remaining
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.pop(task)
+                    result = task.result()
+                    results.append(result)
+                    if winner is None and not result.error and result.confidence_score >= MIN_CONFIDENCE_SCORE:
+                        winner = result
+                # Atraso esgotado ou resposta inaceitável: aciona o próximo tradutor reserva
+                if winner is None and backups:
+                    launch(backups.pop(0))
+                    self.hedge_stats.count('backups_launched')
+        finally:
+            for task, provider in pending.items():
+                task.cancel()
+                self.hedge_stats.count_cancelled(provider)
+        
+        if winner is not None:
+            self.hedge_stats.count_win(winner.translator)
+            if pending:
+                self.hedge_stats.count('early_returns')
+        
+        valid_results = [result for result in results if not result.error]
+        valid_results.sort(key=lambda x: x.confidence_score, reverse=True)
+        return valid_results
+    
     def select_best_translation(self, results: List[TranslationResult]) -> Optional[TranslationResult]:
         """
         Seleciona a melhor tradução baseada nas métricas de confiança.
@@ -505,6 +659,7 @@ async def translate_text_concurrent(text: str, source_lang: str = 'auto', target
         if best_result:
             info = {
                 'method': 'concurrent',
+                'request_mode': manager.config.request_mode,
                 'translator': best_result.translator,
                 'confidence_score': best_result.confidence_score,
                 'execution_time': best_result.execution_time,
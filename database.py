@@ -1,13 +1,22 @@
 # database.py
 
+import asyncio
+import functools
 import pymysql
 import json
 import hashlib
+import os
+import threading
 import time
 import base64
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 
+from concurrent_config import get_current_config
+
 # Configuração do banco de dados MariaDB
 DB_CONFIG = {
     'host': 'localhost',  # Endereço do servidor MariaDB
@@ -20,264 +29,765 @@ DB_CONFIG = {
     'autocommit': True  # Habilita autocommit
 }
 
+# Configuração da camada de cache em memória (na frente do MariaDB)
+DB_MEMORY_CACHE_TRANSLATIONS = int(os.getenv('DB_MEMORY_CACHE_TRANSLATIONS', '5000'))
+DB_MEMORY_CACHE_OCR = int(os.getenv('DB_MEMORY_CACHE_OCR', '128'))
+# Atualizações de used_count/last_used são acumuladas e gravadas em lote
+DB_USAGE_FLUSH_BATCH = int(os.getenv('DB_USAGE_FLUSH_BATCH', '50'))
+DB_USAGE_FLUSH_INTERVAL = float(os.getenv('DB_USAGE_FLUSH_INTERVAL', '5'))
+# Grava também a coluna image_base64 (redundante com original_image) ao salvar resultados de OCR
+DB_STORE_IMAGE_BASE64 = os.getenv('DB_STORE_IMAGE_BASE64', 'false').lower() == 'true'
+
+
+class LRUTTLCache:
+    """
+    Mapa em memória limitado por tamanho (LRU) e por tempo de vida (TTL), seguro entre threads.
+    """
+    
+    def __init__(self, max_size: int, ttl: int, enabled: bool = True):
+        """
+        Inicializa o cache.
+        
+        Args:
+            max_size: Número máximo de entradas mantidas.
+            ttl: Tempo de vida de cada entrada em segundos.
+            enabled: Se False, o cache nunca armazena nem retorna entradas.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled and max_size > 0
+        self._entries: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _lookup(self, key) -> Optional[Tuple[Any, float]]:
+        """Entrada válida da chave, contando hit ou miss (com o lock adquirido)."""
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+    
+    def get(self, key) -> Optional[Any]:
+        """Retorna o valor da chave, ou None se ausente ou expirado."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._lookup(key)
+            return None if entry is None else entry[0]
+    
+    def get_and_increment(self, key, field: str, increment: int = 1) -> Optional[Dict[str, Any]]:
+        """
+        Retorna uma cópia do registro da chave e incrementa um campo do registro guardado.
+        
+        O registro guardado é substituído por uma cópia atualizada (sem alterar o dicionário
+        antigo), então as cópias já devolvidas a outras threads não mudam.
+        
+        Args:
+            key: Chave do registro (um dicionário).
+            field: Campo numérico a incrementar (ex: used_count).
+            increment: Valor somado ao campo (0 apenas lê).
+            
+        Returns:
+            Cópia do registro antes do incremento, ou None se ausente ou expirado.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                return None
+            record, stored_at = entry
+            if increment:
+                self._entries[key] = (dict(record, **{field: record.get(field, 0) + increment}), stored_at)
+            return dict(record)
+    
+    def set(self, key, value) -> None:
+        """Armazena o valor, descartando a entrada menos usada se o limite for atingido."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key) -> None:
+        """Remove uma entrada do cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna tamanho, hits e misses do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
+
+# Configuração do pool de conexões
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+# Conexões ociosas há mais tempo que isto são verificadas (ping) antes de serem reutilizadas
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30'))
+# Após uma falha de conexão, novas tentativas só são feitas depois deste intervalo
+DB_RECONNECT_BACKOFF = float(os.getenv('DB_RECONNECT_BACKOFF', '5'))
+
+
+class DatabaseUnavailableError(pymysql.err.OperationalError):
+    """Levantada quando o pool não consegue fornecer uma conexão."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexões seguro entre threads, com verificação de saúde das conexões ociosas.
+    
+    Cada operação retira uma conexão do pool e a devolve ao terminar, de modo que handlers
+    assíncronos e threads do executor nunca compartilham a mesma conexão ou cursor.
+    """
+    
+    def __init__(self, connection_factory, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 health_check_interval: float = DB_POOL_HEALTH_CHECK_INTERVAL,
+                 reconnect_backoff: float = DB_RECONNECT_BACKOFF):
+        """
+        Inicializa o pool (as conexões são criadas sob demanda).
+        
+        Args:
+            connection_factory: Função sem argumentos que abre uma nova conexão.
+            size: Número máximo de conexões abertas.
+            timeout: Tempo máximo de espera por uma conexão livre (segundos).
+            health_check_interval: Ociosidade a partir da qual a conexão é verificada com ping.
+            reconnect_backoff: Intervalo mínimo entre tentativas após uma falha de conexão.
+        """
+        self._factory = connection_factory
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.reconnect_backoff = reconnect_backoff
+        self._idle: List[Tuple[Any, float]] = []
+        self._open = 0
+        self._last_failure = 0.0
+        self._cond = threading.Condition()
+        self.available = False
+        self.stats = {'created': 0, 'checkouts': 0, 'waits': 0, 'health_checks': 0,
+                      'discarded': 0, 'connect_failures': 0}
+    
+    def _open_connection(self):
+        try:
+            connection = self._factory()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._last_failure = time.time()
+                self.stats['connect_failures'] += 1
+                self.available = False
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats['created'] += 1
+            self.available = True
+        return connection
+    
+    def _is_healthy(self, connection) -> bool:
+        self.stats['health_checks'] += 1
+        try:
+            connection.ping(reconnect=True)
+            return True
+        except Exception:
+            return False
+    
+    def acquire(self):
+        """
+        Retira uma conexão do pool, abrindo uma nova se houver espaço.
+        
+        Returns:
+            Conexão pronta para uso.
+        
+        Raises:
+            DatabaseUnavailableError: Se o banco estiver indisponível ou o pool esgotado.
+        """
+        deadline = time.time() + self.timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._idle:
+                        connection, idle_since = self._idle.pop()
+                        break
+                    if self._open < self.size:
+                        if time.time() - self._last_failure < self.reconnect_backoff:
+                            raise DatabaseUnavailableError(2003, "Banco de dados indisponível (aguardando nova tentativa)")
+                        self._open += 1
+                        connection, idle_since = None, None
+                        break
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise DatabaseUnavailableError(2013, f"Nenhuma conexão livre no pool após {self.timeout}s")
+                    self.stats['waits'] += 1
+                    self._cond.wait(remaining)
+                self.stats['checkouts'] += 1
+            
+            if connection is None:
+                return self._open_connection()
+            # Só verifica conexões que ficaram ociosas por muito tempo, em vez de um ping por chamada
+            if time.time() - idle_since < self.health_check_interval or self._is_healthy(connection):
+                return connection
+            self.release(connection, healthy=False)
+    
+    def release(self, connection, healthy: bool = True) -> None:
+        """Devolve a conexão ao pool, ou a descarta se ela apresentou erro."""
+        with self._cond:
+            if healthy:
+                self._idle.append((connection, time.time()))
+            else:
+                self._open -= 1
+                self.stats['discarded'] += 1
+            self._cond.notify()
+        if not healthy:
+            try:
+                connection.close()
+            except Exception:
+                pass
+    
+    @contextmanager
+    def connection(self):
+        """Context manager que retira uma conexão e a devolve ao final da operação."""
+        connection = self.acquire()
+        healthy = True
+        try:
+            yield connection
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            # Conexão perdida ou inutilizável: não volta para o pool
+            healthy = False
+            raise
+        except Exception:
+            try:
+                connection.rollback()
+            except Exception:
+                healthy = False
+            raise
+        finally:
+            self.release(connection, healthy)
+    
+    def close_all(self) -> None:
+        """Fecha todas as conexões ociosas do pool."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self.available = False
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except Exception:
+                pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna a ocupação e os contadores do pool."""
+        with self._cond:
+            return {
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                **self.stats
+            }
+
+
 # Classe para gerenciar a conexão e operações com o banco de dados
 class DatabaseManager:
-    def __init__(self, config: Dict[str, str] = None):
-        """Inicializa o gerenciador de banco de dados com a configuração fornecida."""
+    def __init__(self, config: Dict[str, str] = None, pool_size: int = DB_POOL_SIZE, connection_factory=None):
+        """Inicializa o gerenciador de banco de dados com a configuração fornecida.
+        
+        Args:
+            config (dict): Parâmetros de conexão do pymysql
+            pool_size (int): Número máximo de conexões simultâneas
+            connection_factory (callable, optional): Função que abre uma conexão compatível com
+                a DB-API (usada para testes com um banco substituto, como o SQLite)
+        """
         self.config = config or DB_CONFIG
-        self.connection = None
-        self.cursor = None
-        self.connected = False
+        self.pool = ConnectionPool(connection_factory or (lambda: pymysql.connect(**self.config)), size=pool_size)
+        
+        # Camada em memória na frente das tabelas de cache, controlada por enable_caching/cache_ttl
+        self.configure_memory_cache(get_current_config())
+        
+        # Contadores por camada (a camada em memória mantém os seus próprios)
+        self.db_tier_stats = {
+            'translations': {'hits': 0, 'misses': 0},
+            'ocr': {'hits': 0, 'misses': 0}
+        }
+        
+        # Atualizações de uso pendentes: {tabela: {id: incremento}} e hits para as estatísticas
+        # (o mesmo lock protege os contadores por camada)
+        self._usage_lock = threading.Lock()
+        self._pending_usage = {'translations': {}, 'ocr_results': {}}
+        self._pending_hits = {'ocr': 0, 'translation': 0}
+        self._last_usage_flush = time.time()
+    
+    def configure_memory_cache(self, cache_config) -> None:
+        """Cria as camadas em memória a partir de uma ConcurrentTranslationConfig."""
+        self.translation_cache = LRUTTLCache(DB_MEMORY_CACHE_TRANSLATIONS, cache_config.cache_ttl,
+                                             cache_config.enable_caching)
+        self.ocr_cache = LRUTTLCache(DB_MEMORY_CACHE_OCR, cache_config.cache_ttl, cache_config.enable_caching)
         
+    @property
+    def connected(self) -> bool:
+        """Indica se a última tentativa de abrir uma conexão teve sucesso."""
+        return self.pool.available
+    
+    @contextmanager
+    def _cursor(self):
+        """Retira uma conexão do pool para uma operação e retorna um cursor de dicionários."""
+        with self.pool.connection() as connection:
+            cursor = connection.cursor(pymysql.cursors.DictCursor)
+            try:
+                yield cursor
+                connection.commit()
+            finally:
+                cursor.close()
+    
     def connect(self) -> bool:
-        """Estabelece conexão com o banco de dados."""
+        """Estabelece a primeira conexão do pool para validar o acesso ao banco de dados."""
         try:
-            self.connection = pymysql.connect(**self.config)
-            self.cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-            self.connected = True
+            self.pool.release(self.pool.acquire())
             print("Conexão com o banco de dados estabelecida com sucesso.")
             return True
         except pymysql.Error as err:
             print(f"Erro ao conectar ao banco de dados: {err}")
-            self.connected = False
             return False
     
     def disconnect(self) -> None:
-        """Fecha a conexão com o banco de dados."""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
-        self.connected = False
+        """Grava as atualizações pendentes e fecha as conexões do pool."""
+        if self.connected:
+            self.flush_usage_updates()
+        self.pool.close_all()
         print("Conexão com o banco de dados fechada.")
     
     def ensure_connected(self) -> bool:
-        """Garante que há uma conexão ativa com o banco de dados."""
-        if not self.connected or not self.connection.open:
-            return self.connect()
-        return True
+        """Garante que o banco de dados está acessível (as conexões são verificadas pelo pool)."""
+        return self.connected or self.connect()
     
-    def create_tables(self) -> bool:
-        """Cria as tabelas necessárias no banco de dados se não existirem."""
-        if not self.ensure_connected():
+    def test_connection(self) -> bool:
+        """Executa uma consulta simples para verificar se o banco de dados responde."""
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            return True
+        except pymysql.Error as err:
+            print(f"Erro ao testar conexão com o banco de dados: {err}")
             return False
-        
+    
+    def _ensure_translation_unique_key(self, cursor) -> None:
+        """Cria a chave única das traduções em bancos antigos, removendo antes as linhas duplicadas."""
+        add_key = """
+        ALTER TABLE translations
+            ADD UNIQUE INDEX IF NOT EXISTS uniq_translation (source_text_hash, source_lang, target_lang)
+        """
         try:
-            # Tabela para armazenar traduções
-            self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS translations (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                source_text TEXT NOT NULL,
-                source_lang VARCHAR(10) NOT NULL,
-                target_lang VARCHAR(10) NOT NULL,
-                translated_text TEXT NOT NULL,
-                translator_used VARCHAR(50),
-                confidence FLOAT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                used_count INT DEFAULT 1,
-                source_text_hash VARCHAR(64) NOT NULL,
-                INDEX (source_text_hash, source_lang, target_lang)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
-            """)
-            
-            # Tabela para armazenar resultados de OCR
-            self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ocr_results (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                image_hash VARCHAR(64) NOT NULL,
-                source_lang VARCHAR(10) NOT NULL,
-                text_results JSON NOT NULL,
-                confidence FLOAT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                used_count INT DEFAULT 1,
-                original_image LONGBLOB,
-                image_base64 LONGTEXT,
-                image_metadata JSON,
-                INDEX (image_hash, source_lang)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
-            """)
-            
-            # Tabela para estatísticas
-            self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS statistics (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                date DATE NOT NULL,
-                total_requests INT DEFAULT 0,
-                ocr_cache_hits INT DEFAULT 0,
-                translation_cache_hits INT DEFAULT 0,
-                avg_processing_time FLOAT DEFAULT 0,
-                UNIQUE INDEX (date)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
-            """)
-            
-            # Tabelas para informações do sistema
-            self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_info_logs (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                
-                -- Informações do Processo
-                process_pid INT NOT NULL,
-                process_name VARCHAR(100) NOT NULL,
-                process_status VARCHAR(50) NOT NULL,
-                process_memory_mb DECIMAL(10,2) NOT NULL,
-                process_started_at DATETIME NOT NULL,
-                
-                -- Informações do Sistema
-                python_psutil_version VARCHAR(20) NOT NULL,
-                platform VARCHAR(50) NOT NULL,
-                
-                -- Índices para otimização
-                INDEX idx_timestamp (timestamp),
-                INDEX idx_process_pid (process_pid),
-                INDEX idx_process_started (process_started_at)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-            """)
-            
-            self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_network_info (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                system_info_id INT NOT NULL,
-                
-                -- Informações de Rede
-                hostname VARCHAR(255) NOT NULL,
-                local_ip VARCHAR(45) NOT NULL,
-                router_ip VARCHAR(45),
-                external_ip VARCHAR(45),
-                ipv6_address VARCHAR(128),
-                port INT NOT NULL,
-                service_url VARCHAR(500) NOT NULL,
-                mac_address VARCHAR(17) NOT NULL,
-                
-                -- Chave estrangeira
-                FOREIGN KEY (system_info_id) REFERENCES system_info_logs(id) ON DELETE CASCADE,
-                
-                -- Índices
-                INDEX idx_system_info_id (system_info_id),
-                INDEX idx_hostname (hostname),
-                INDEX idx_local_ip (local_ip)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-            """)
-            
-            self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_cpu_info (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                system_info_id INT NOT NULL,
-                
-                -- Informações da CPU
-                cpu_name TEXT,
-                physical_cores INT NOT NULL,
-                logical_cores INT NOT NULL,
-                current_frequency_mhz DECIMAL(10,2),
-                max_frequency_mhz DECIMAL(10,2),
-                cpu_usage_percent DECIMAL(5,2) NOT NULL,
-                
-                -- Chave estrangeira
-                FOREIGN KEY (system_info_id) REFERENCES system_info_logs(id) ON DELETE CASCADE,
-                
-                -- Índices
-                INDEX idx_system_info_id (system_info_id),
-                INDEX idx_cpu_usage (cpu_usage_percent)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-            """)
-            
-            self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_gpu_info (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                system_info_id INT NOT NULL,
-                
-                -- Informações da GPU
-                gpu_index INT NOT NULL, -- Para identificar GPU 1, GPU 2, etc.
-                gpu_name TEXT NOT NULL,
-                gpu_memory VARCHAR(50), -- Ex: "4.0 GB", "1.0 GB", "Não disponível"
-                
-                -- Chave estrangeira
-                FOREIGN KEY (system_info_id) REFERENCES system_info_logs(id) ON DELETE CASCADE,
-                
-                -- Índices
-                INDEX idx_system_info_id (system_info_id),
-                INDEX idx_gpu_index (gpu_index),
-                
-                -- Constraint para evitar duplicação de índice de GPU por sistema
-                UNIQUE KEY unique_gpu_per_system (system_info_id, gpu_index)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+            cursor.execute(add_key)
+            return
+        except pymysql.Error as err:
+            print(f"Aviso: traduções duplicadas impedem a chave única ({err}). Removendo duplicatas.")
+        try:
+            # Mantém, para cada texto e par de idiomas, a linha mais usada (a mais recente no empate)
+            cursor.execute("""
+            DELETE duplicate FROM translations AS duplicate
+            JOIN translations AS kept
+                ON kept.source_text_hash = duplicate.source_text_hash
+                AND kept.source_lang = duplicate.source_lang
+                AND kept.target_lang = duplicate.target_lang
+                AND (COALESCE(kept.used_count, 0) > COALESCE(duplicate.used_count, 0)
+                     OR (COALESCE(kept.used_count, 0) = COALESCE(duplicate.used_count, 0) AND kept.id > duplicate.id))
             """)
-            
-            self.connection.commit()
-            print("Tabelas criadas ou já existentes.")
-            return True
+            print(f"{cursor.rowcount} traduções duplicadas removidas.")
+            cursor.execute(add_key)
+        except pymysql.Error as err:
+            print(f"Aviso: não foi possível criar a chave única de traduções: {err}")
+    
+    def create_tables(self) -> bool:
+        """Cria as tabelas necessárias no banco de dados se não existirem."""
+        try:
+            with self._cursor() as cursor:
+                # Tabela para armazenar traduções
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    source_text TEXT NOT NULL,
+                    source_lang VARCHAR(10) NOT NULL,
+                    target_lang VARCHAR(10) NOT NULL,
+                    translated_text TEXT NOT NULL,
+                    translator_used VARCHAR(50),
+                    confidence FLOAT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    used_count INT DEFAULT 1,
+                    source_text_hash VARCHAR(64) NOT NULL,
+                    UNIQUE INDEX uniq_translation (source_text_hash, source_lang, target_lang)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+                """)
+                
+                # As gravações usam ON DUPLICATE KEY UPDATE, que depende da chave única
+                self._ensure_translation_unique_key(cursor)
+                
+                # Tabela para armazenar resultados de OCR
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ocr_results (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    image_hash VARCHAR(64) NOT NULL,
+                    source_lang VARCHAR(10) NOT NULL,
+                    text_results JSON NOT NULL,
+                    confidence FLOAT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    used_count INT DEFAULT 1,
+                    original_image LONGBLOB,
+                    image_base64 LONGTEXT,
+                    image_metadata JSON,
+                    perceptual_hash BIGINT UNSIGNED,
+                    INDEX (image_hash, source_lang),
+                    INDEX idx_perceptual_hash (source_lang, perceptual_hash)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+                """)
+                
+                # Bancos criados antes do cache perceptual não possuem a coluna do hash
+                cursor.execute("""
+                ALTER TABLE ocr_results
+                    ADD COLUMN IF NOT EXISTS perceptual_hash BIGINT UNSIGNED,
+                    ADD INDEX IF NOT EXISTS idx_perceptual_hash (source_lang, perceptual_hash)
+                """)
+                
+                # Tabela para estatísticas
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS statistics (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    date DATE NOT NULL,
+                    total_requests INT DEFAULT 0,
+                    ocr_cache_hits INT DEFAULT 0,
+                    translation_cache_hits INT DEFAULT 0,
+                    avg_processing_time FLOAT DEFAULT 0,
+                    UNIQUE INDEX (date)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+                """)
+                
+                # Tabelas para informações do sistema
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS system_info_logs (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    
+                    -- Informações do Processo
+                    process_pid INT NOT NULL,
+                    process_name VARCHAR(100) NOT NULL,
+                    process_status VARCHAR(50) NOT NULL,
+                    process_memory_mb DECIMAL(10,2) NOT NULL,
+                    process_started_at DATETIME NOT NULL,
+                    
+                    -- Informações do Sistema
+                    python_psutil_version VARCHAR(20) NOT NULL,
+                    platform VARCHAR(50) NOT NULL,
+                    
+                    -- Índices para otimização
+                    INDEX idx_timestamp (timestamp),
+                    INDEX idx_process_pid (process_pid),
+                    INDEX idx_process_started (process_started_at)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+                """)
+                
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS system_network_info (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    system_info_id INT NOT NULL,
+                    
+                    -- Informações de Rede
+                    hostname VARCHAR(255) NOT NULL,
+                    local_ip VARCHAR(45) NOT NULL,
+                    router_ip VARCHAR(45),
+                    external_ip VARCHAR(45),
+                    ipv6_address VARCHAR(128),
+                    port INT NOT NULL,
+                    service_url VARCHAR(500) NOT NULL,
+                    mac_address VARCHAR(17) NOT NULL,
+                    
+                    -- Chave estrangeira
+                    FOREIGN KEY (system_info_id) REFERENCES system_info_logs(id) ON DELETE CASCADE,
+                    
+                    -- Índices
+                    INDEX idx_system_info_id (system_info_id),
+                    INDEX idx_hostname (hostname),
+                    INDEX idx_local_ip (local_ip)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+                """)
+                
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS system_cpu_info (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    system_info_id INT NOT NULL,
+                    
+                    -- Informações da CPU
+                    cpu_name TEXT,
+                    physical_cores INT NOT NULL,
+                    logical_cores INT NOT NULL,
+                    current_frequency_mhz DECIMAL(10,2),
+                    max_frequency_mhz DECIMAL(10,2),
+                    cpu_usage_percent DECIMAL(5,2) NOT NULL,
+                    
+                    -- Chave estrangeira
+                    FOREIGN KEY (system_info_id) REFERENCES system_info_logs(id) ON DELETE CASCADE,
+                    
+                    -- Índices
+                    INDEX idx_system_info_id (system_info_id),
+                    INDEX idx_cpu_usage (cpu_usage_percent)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+                """)
+                
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS system_gpu_info (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    system_info_id INT NOT NULL,
+                    
+                    -- Informações da GPU
+                    gpu_index INT NOT NULL, -- Para identificar GPU 1, GPU 2, etc.
+                    gpu_name TEXT NOT NULL,
+                    gpu_memory VARCHAR(50), -- Ex: "4.0 GB", "1.0 GB", "Não disponível"
+                    
+                    -- Chave estrangeira
+                    FOREIGN KEY (system_info_id) REFERENCES system_info_logs(id) ON DELETE CASCADE,
+                    
+                    -- Índices
+                    INDEX idx_system_info_id (system_info_id),
+                    INDEX idx_gpu_index (gpu_index),
+                    
+                    -- Constraint para evitar duplicação de índice de GPU por sistema
+                    UNIQUE KEY unique_gpu_per_system (system_info_id, gpu_index)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+                """)
+                
+                print("Tabelas criadas ou já existentes.")
+                return True
         except pymysql.Error as err:
             print(f"Erro ao criar tabelas: {err}")
             return False
     
-    def get_translation(self, source_text: str, source_lang: str, target_lang: str) -> Optional[Dict[str, Any]]:
-        """Busca uma tradução existente no banco de dados."""
-        if not self.ensure_connected():
+    def _translation_from_memory(self, cache_key: tuple, flush: bool = True) -> Optional[Dict[str, Any]]:
+        """Busca uma tradução apenas na camada em memória."""
+        result = self.translation_cache.get_and_increment(cache_key, 'used_count')
+        if result is None:
             return None
-        
+        self._queue_usage_update('translations', result['id'], translation_hit=True, flush=flush)
+        return result
+    
+    def get_translation(self, source_text: str, source_lang: str, target_lang: str,
+                        use_memory: bool = True) -> Optional[Dict[str, Any]]:
+        """Busca uma tradução existente, primeiro na memória e depois no banco de dados."""
         # Cria um hash do texto fonte para indexação mais eficiente
         text_hash = hashlib.sha256(source_text.encode('utf-8')).hexdigest()
+        cache_key = (text_hash, source_lang, target_lang)
+        
+        if use_memory:
+            cached = self._translation_from_memory(cache_key)
+            if cached is not None:
+                return cached
         
         try:
-            query = """
-            SELECT * FROM translations 
-            WHERE source_text_hash = %s AND source_lang = %s AND target_lang = %s
-            """
-            self.cursor.execute(query, (text_hash, source_lang, target_lang))
-            result = self.cursor.fetchone()
-            
-            if result:
-                # Atualiza o contador de uso e a data de último uso
-                update_query = """
-                UPDATE translations 
-                SET used_count = used_count + 1, last_used = CURRENT_TIMESTAMP 
-                WHERE id = %s
+            with self._cursor() as cursor:
+                query = """
+                SELECT * FROM translations 
+                WHERE source_text_hash = %s AND source_lang = %s AND target_lang = %s
                 """
-                self.cursor.execute(update_query, (result['id'],))
-                self.connection.commit()
-                
-                # Atualiza estatísticas
-                self._update_statistics(translation_hit=True)
+                cursor.execute(query, (text_hash, source_lang, target_lang))
+                result = cursor.fetchone()
                 
-                print(f"Tradução encontrada no cache para: '{source_text[:30]}...'")
-                return result
-            return None
+                if result:
+                    self._count_tier('translations', 'hits')
+                    
+                    # O contador de uso e as estatísticas são atualizados em lote
+                    self._queue_usage_update('translations', result['id'], translation_hit=True)
+                    self.translation_cache.set(cache_key, dict(result, used_count=result['used_count'] + 1))
+                    
+                    print(f"Tradução encontrada no cache para: '{source_text[:30]}...'")
+                    return result
+                self._count_tier('translations', 'misses')
+                return None
         except pymysql.Error as err:
             print(f"Erro ao buscar tradução: {err}")
             return None
     
     def save_translation(self, source_text: str, source_lang: str, target_lang: str, 
                         translated_text: str, translator_used: str = None, confidence: float = None) -> bool:
-        """Salva uma nova tradução no banco de dados."""
-        if not self.ensure_connected():
-            return False
-        
+        """Salva uma tradução no banco de dados, atualizando a existente para o mesmo texto e idiomas."""
         # Cria um hash do texto fonte para indexação mais eficiente
         text_hash = hashlib.sha256(source_text.encode('utf-8')).hexdigest()
         
         try:
-            query = """
-            INSERT INTO translations 
-            (source_text, source_lang, target_lang, translated_text, translator_used, confidence, source_text_hash) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-            self.cursor.execute(query, (source_text, source_lang, target_lang, 
-                                       translated_text, translator_used, confidence, text_hash))
-            self.connection.commit()
-            print(f"Nova tradução salva no banco de dados: '{source_text[:30]}...'")
-            return True
+            with self._cursor() as cursor:
+                # Requisições simultâneas podem salvar o mesmo texto: a chave única evita a linha duplicada
+                query = """
+                INSERT INTO translations 
+                (source_text, source_lang, target_lang, translated_text, translator_used, confidence, source_text_hash) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    translated_text = VALUES(translated_text),
+                    translator_used = VALUES(translator_used),
+                    confidence = VALUES(confidence),
+                    last_used = CURRENT_TIMESTAMP
+                """
+                cursor.execute(query, (source_text, source_lang, target_lang, 
+                                      translated_text, translator_used, confidence, text_hash))
+                
+                # Deixa a tradução salva disponível na camada em memória (relida: a linha pode já existir)
+                row = self._select_translations(cursor, [text_hash], source_lang, target_lang).get(text_hash)
+                if row is not None:
+                    self.translation_cache.set((text_hash, source_lang, target_lang), row)
+                print(f"Nova tradução salva no banco de dados: '{source_text[:30]}...'")
+                return True
         except pymysql.Error as err:
             print(f"Erro ao salvar tradução: {err}")
             return False
+
+    def _select_translations(self, cursor, text_hashes: List[str], source_lang: str,
+                             target_lang: str) -> Dict[str, Dict[str, Any]]:
+        """Busca várias traduções por hash em uma única consulta WHERE ... IN (...)."""
+        placeholders = ', '.join(['%s'] * len(text_hashes))
+        query = f"""
+        SELECT * FROM translations
+        WHERE source_text_hash IN ({placeholders}) AND source_lang = %s AND target_lang = %s
+        """
+        cursor.execute(query, (*text_hashes, source_lang, target_lang))
+        return {row['source_text_hash']: row for row in cursor.fetchall()}
+
+    def get_translations_bulk(self, source_texts: List[str], source_lang: str, target_lang: str,
+                              use_memory: bool = True, flush: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Busca as traduções de todos os textos de uma captura com no máximo uma consulta ao banco.
+
+        Args:
+            source_texts: Textos de origem (repetições são consultadas uma única vez)
+            source_lang: Idioma de origem
+            target_lang: Idioma de destino
+            use_memory: Consulta primeiro a camada em memória
+            flush: Permite gravar o lote de atualizações de uso nesta chamada
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Traduções encontradas, indexadas pelo texto de origem
+        """
+        found = {}
+        missing = {}
+        for source_text in dict.fromkeys(source_texts):
+            text_hash = hashlib.sha256(source_text.encode('utf-8')).hexdigest()
+            cached = self._translation_from_memory((text_hash, source_lang, target_lang), flush=False) if use_memory else None
+            if cached is not None:
+                found[source_text] = cached
+            else:
+                missing[text_hash] = source_text
+
+        if missing:
+            try:
+                with self._cursor() as cursor:
+                    rows = self._select_translations(cursor, list(missing), source_lang, target_lang)
+            except pymysql.Error as err:
+                print(f"Erro ao buscar traduções em lote: {err}")
+                rows = {}
+
+            for text_hash, source_text in missing.items():
+                result = rows.get(text_hash)
+                if result is None:
+                    self._count_tier('translations', 'misses')
+                    continue
+                self._count_tier('translations', 'hits')
+                self._queue_usage_update('translations', result['id'], translation_hit=True, flush=False)
+                self.translation_cache.set((text_hash, source_lang, target_lang),
+                                           dict(result, used_count=result['used_count'] + 1))
+                found[source_text] = result
+            print(f"Traduções em lote: {len(rows)} de {len(missing)} textos encontrados no banco de dados.")
+
+        if flush and self.usage_flush_due():
+            self.flush_usage_updates()
+        return found
+
+    def save_translations_bulk(self, translations: List[Dict[str, Any]], source_lang: str, target_lang: str,
+                               translator_used: str = None) -> bool:
+        """Salva várias traduções com um único INSERT de múltiplas linhas.
+
+        Args:
+            translations: Itens com 'source_text', 'translated_text' e, opcionalmente, 'confidence'
+            source_lang: Idioma de origem
+            target_lang: Idioma de destino
+            translator_used: Tradutor que gerou as traduções
+
+        Returns:
+            bool: True se o lote foi salvo
+        """
+        # Um mesmo texto aparece apenas uma vez no lote (prevalece a última tradução)
+        entries = {}
+        for item in translations:
+            text_hash = hashlib.sha256(item['source_text'].encode('utf-8')).hexdigest()
+            entries[text_hash] = item
+        if not entries:
+            return True
+
+        try:
+            with self._cursor() as cursor:
+                placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(entries))
+                query = f"""
+                INSERT INTO translations
+                (source_text, source_lang, target_lang, translated_text, translator_used, confidence, source_text_hash)
+                VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE
+                    translated_text = VALUES(translated_text),
+                    translator_used = VALUES(translator_used),
+                    confidence = VALUES(confidence),
+                    last_used = CURRENT_TIMESTAMP
+                """
+                params = []
+                for text_hash, item in entries.items():
+                    params.extend((item['source_text'], source_lang, target_lang, item['translated_text'],
+                                   translator_used, item.get('confidence'), text_hash))
+                cursor.execute(query, params)
+
+                # Os IDs de um INSERT com múltiplas linhas não são garantidos; relê o lote na mesma conexão
+                rows = self._select_translations(cursor, list(entries), source_lang, target_lang)
+                for text_hash, row in rows.items():
+                    self.translation_cache.set((text_hash, source_lang, target_lang), row)
+                print(f"{len(entries)} traduções salvas em lote no banco de dados.")
+                return True
+        except pymysql.Error as err:
+            print(f"Erro ao salvar traduções em lote: {err}")
+            return False
+
+    def _ocr_result_from_memory(self, cache_key: tuple, count_usage: bool = True,
+                                flush: bool = True) -> Optional[Dict[str, Any]]:
+        """Busca um resultado de OCR apenas na camada em memória."""
+        result = self.ocr_cache.get_and_increment(cache_key, 'used_count', 1 if count_usage else 0)
+        if result is None:
+            return None
+        if count_usage:
+            self.mark_ocr_result_used(result['id'], flush=flush)
+        return result
     
-    def get_ocr_result(self, image_hash: str, source_lang: str) -> Optional[Dict[str, Any]]:
+    def get_ocr_result(self, image_hash: str, source_lang: str, count_usage: bool = True,
+                       use_memory: bool = True) -> Optional[Dict[str, Any]]:
         """Busca um resultado de OCR existente no banco de dados, incluindo a imagem original e metadados.
         
         Args:
             image_hash (str): Hash SHA-256 da imagem
             source_lang (str): Idioma de origem do texto na imagem
+            count_usage (bool): Se True, registra o uso do resultado e o hit nas estatísticas
+            use_memory (bool): Se False, ignora a camada em memória (já consultada pelo chamador)
             
         Returns:
             dict: Resultado de OCR contendo:
@@ -287,46 +797,158 @@ class DatabaseManager:
                 - image_metadata: Metadados da imagem em formato JSON (se disponível)
                 - Ou None se não encontrado
         """
-        if not self.ensure_connected():
-            return None
+        cache_key = (image_hash, source_lang)
+        if use_memory:
+            cached = self._ocr_result_from_memory(cache_key, count_usage)
+            if cached is not None:
+                return cached
         
         try:
-            query = """
-            SELECT * FROM ocr_results 
-            WHERE image_hash = %s AND source_lang = %s
-            """
-            self.cursor.execute(query, (image_hash, source_lang))
-            result = self.cursor.fetchone()
-            
-            if result:
-                # Atualiza o contador de uso e a data de último uso
-                update_query = """
-                UPDATE ocr_results 
-                SET used_count = used_count + 1, last_used = CURRENT_TIMESTAMP 
-                WHERE id = %s
+            with self._cursor() as cursor:
+                query = """
+                SELECT * FROM ocr_results 
+                WHERE image_hash = %s AND source_lang = %s
                 """
-                self.cursor.execute(update_query, (result['id'],))
-                self.connection.commit()
-                
-                # Atualiza estatísticas
-                self._update_statistics(ocr_hit=True)
+                cursor.execute(query, (image_hash, source_lang))
+                result = cursor.fetchone()
                 
-                # Converte o JSON armazenado de volta para um objeto Python
-                result['text_results'] = json.loads(result['text_results'])
-                
-                # Converte os metadados JSON para objeto Python, se existirem
-                if result['image_metadata']:
-                    result['image_metadata'] = json.loads(result['image_metadata'])
-                
-                print(f"Resultado de OCR encontrado no cache para imagem: {image_hash[:10]}...")
-                return result
-            return None
+                if result:
+                    self._count_tier('ocr', 'hits')
+                    if count_usage:
+                        self.mark_ocr_result_used(result['id'])
+                    
+                    # Converte o JSON armazenado de volta para um objeto Python
+                    result['text_results'] = json.loads(result['text_results'])
+                    
+                    # Converte os metadados JSON para objeto Python, se existirem
+                    if result['image_metadata']:
+                        result['image_metadata'] = json.loads(result['image_metadata'])
+                    
+                    self.ocr_cache.set(cache_key, dict(result, used_count=result['used_count'] + (1 if count_usage else 0)))
+                    
+                    print(f"Resultado de OCR encontrado no cache para imagem: {image_hash[:10]}...")
+                    return result
+                self._count_tier('ocr', 'misses')
+                return None
         except pymysql.Error as err:
             print(f"Erro ao buscar resultado de OCR: {err}")
             return None
     
+    def _count_tier(self, tier: str, outcome: str) -> None:
+        """Incrementa um contador de hits/misses da camada do banco de dados."""
+        with self._usage_lock:
+            self.db_tier_stats[tier][outcome] += 1
+    
+    def mark_ocr_result_used(self, result_id: int, flush: bool = True) -> None:
+        """Registra o uso de um resultado de OCR e o hit nas estatísticas (gravados em lote)."""
+        self._queue_usage_update('ocr_results', result_id, ocr_hit=True, flush=flush)
+    
+    def _queue_usage_update(self, table: str, row_id: int, ocr_hit: bool = False, translation_hit: bool = False,
+                            flush: bool = True) -> None:
+        """Acumula um incremento de used_count e grava o lote quando ele fica grande ou antigo."""
+        with self._usage_lock:
+            pending = self._pending_usage[table]
+            pending[row_id] = pending.get(row_id, 0) + 1
+            self._pending_hits['ocr'] += 1 if ocr_hit else 0
+            self._pending_hits['translation'] += 1 if translation_hit else 0
+        if flush and self.usage_flush_due():
+            self.flush_usage_updates()
+    
+    def usage_flush_due(self) -> bool:
+        """Indica se o lote de atualizações de uso já deve ser gravado."""
+        with self._usage_lock:
+            total_pending = sum(len(rows) for rows in self._pending_usage.values())
+            return total_pending > 0 and (total_pending >= DB_USAGE_FLUSH_BATCH or
+                                          time.time() - self._last_usage_flush >= DB_USAGE_FLUSH_INTERVAL)
+    
+    def flush_usage_updates(self) -> int:
+        """Grava no banco os incrementos de uso e os hits de cache acumulados.
+        
+        Returns:
+            int: Número de linhas atualizadas
+        """
+        with self._usage_lock:
+            pending_usage = self._pending_usage
+            pending_hits = self._pending_hits
+            self._pending_usage = {'translations': {}, 'ocr_results': {}}
+            self._pending_hits = {'ocr': 0, 'translation': 0}
+            self._last_usage_flush = time.time()
+        
+        if not any(pending_usage.values()) and not any(pending_hits.values()):
+            return 0
+        updated = 0
+        try:
+            with self._cursor() as cursor:
+                for table, rows in pending_usage.items():
+                    # Agrupa por incremento para usar um único UPDATE ... WHERE id IN (...) por valor
+                    by_increment: Dict[int, List[int]] = {}
+                    for row_id, increment in rows.items():
+                        by_increment.setdefault(increment, []).append(row_id)
+                    for increment, ids in by_increment.items():
+                        placeholders = ', '.join(['%s'] * len(ids))
+                        update_query = f"""
+                        UPDATE {table} 
+                        SET used_count = used_count + %s, last_used = CURRENT_TIMESTAMP 
+                        WHERE id IN ({placeholders})
+                        """
+                        cursor.execute(update_query, (increment, *ids))
+                        updated += len(ids)
+                
+                # Cada hit conta como uma requisição nas estatísticas, como nas atualizações individuais
+                total_hits = pending_hits['ocr'] + pending_hits['translation']
+                if total_hits:
+                    stats_query = """
+                    INSERT INTO statistics (date, total_requests, ocr_cache_hits, translation_cache_hits, avg_processing_time)
+                    VALUES (%s, %s, %s, %s, 0)
+                    ON DUPLICATE KEY UPDATE
+                        total_requests = total_requests + VALUES(total_requests),
+                        ocr_cache_hits = ocr_cache_hits + VALUES(ocr_cache_hits),
+                        translation_cache_hits = translation_cache_hits + VALUES(translation_cache_hits)
+                    """
+                    cursor.execute(stats_query, (datetime.now().date(), total_hits,
+                                                 pending_hits['ocr'], pending_hits['translation']))
+        except pymysql.Error as err:
+            print(f"Erro ao gravar atualizações de uso em lote: {err}")
+        return updated
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Retorna hits e misses de cada camada de cache (memória e banco de dados)."""
+        with self._usage_lock:
+            pending = sum(len(rows) for rows in self._pending_usage.values())
+            database_tier = {tier: dict(counts) for tier, counts in self.db_tier_stats.items()}
+        return {
+            'memory': {
+                'translations': self.translation_cache.get_stats(),
+                'ocr': self.ocr_cache.get_stats()
+            },
+            'database': database_tier,
+            'pending_usage_updates': pending
+        }
+    
+    def get_perceptual_hashes(self, source_lang: str) -> List[Dict[str, Any]]:
+        """Retorna os hashes perceptuais dos resultados de OCR de um idioma.
+        
+        Args:
+            source_lang (str): Idioma de origem do texto na imagem
+            
+        Returns:
+            list: Dicionários com image_hash e perceptual_hash
+        """
+        try:
+            with self._cursor() as cursor:
+                query = """
+                SELECT image_hash, perceptual_hash FROM ocr_results 
+                WHERE source_lang = %s AND perceptual_hash IS NOT NULL
+                """
+                cursor.execute(query, (source_lang,))
+                return cursor.fetchall()
+        except pymysql.Error as err:
+            print(f"Erro ao buscar hashes perceptuais: {err}")
+            return []
+    
     def save_ocr_result(self, image_hash: str, source_lang: str, text_results: List[Dict[str, Any]], 
-                       confidence: float = None, original_image: bytes = None, image_metadata: Dict[str, Any] = None) -> bool:
+                       confidence: float = None, original_image: bytes = None, image_metadata: Dict[str, Any] = None,
+                       perceptual_hash: int = None) -> bool:
         """Salva um novo resultado de OCR no banco de dados, incluindo a imagem original e metadados.
         
         Args:
@@ -336,60 +958,72 @@ class DatabaseManager:
             confidence (float): Confiança média dos resultados de OCR
             original_image (bytes, optional): Imagem original em formato binário
             image_metadata (dict, optional): Metadados da imagem (dimensões, idiomas, formato, etc)
+            perceptual_hash (int, optional): Hash perceptual da imagem (dHash/pHash de 64 bits)
             
         Returns:
             bool: True se salvo com sucesso, False caso contrário
         """
-        if not self.ensure_connected():
-            return False
-        
         try:
-            # Garante que todos os valores sejam tipos Python padrão antes da serialização
-            sanitized_results = []
-            for result in text_results:
-                sanitized_result = {
-                    'text': result.get('text', ''),
-                    'confidence': float(result.get('confidence', 0.0)),
-                    'is_grouped': bool(result.get('is_grouped', False)),
-                    'group_size': int(result.get('group_size', 1)) if 'group_size' in result else 1
-                }
+            with self._cursor() as cursor:
+                # Garante que todos os valores sejam tipos Python padrão antes da serialização
+                sanitized_results = []
+                for result in text_results:
+                    sanitized_result = {
+                        'text': result.get('text', ''),
+                        'confidence': float(result.get('confidence', 0.0)),
+                        'is_grouped': bool(result.get('is_grouped', False)),
+                        'group_size': int(result.get('group_size', 1)) if 'group_size' in result else 1
+                    }
+                    
+                    # Processa a bbox garantindo que todos os valores sejam inteiros
+                    if 'bbox' in result:
+                        sanitized_result['bbox'] = [
+                            [int(point[0]), int(point[1])] for point in result['bbox']
+                        ]
+                    
+                    # Adiciona outros campos que possam existir
+                    for key, value in result.items():
+                        if key not in sanitized_result and key != 'bbox':
+                            sanitized_result[key] = value
+                    
+                    sanitized_results.append(sanitized_result)
                 
-                # Processa a bbox garantindo que todos os valores sejam inteiros
-                if 'bbox' in result:
-                    sanitized_result['bbox'] = [
-                        [int(point[0]), int(point[1])] for point in result['bbox']
-                    ]
+                # Converte a lista de resultados sanitizados para JSON
+                text_results_json = json.dumps(sanitized_results)
                 
-                # Adiciona outros campos que possam existir
-                for key, value in result.items():
-                    if key not in sanitized_result and key != 'bbox':
-                        sanitized_result[key] = value
+                # A cópia em base64 duplica o BLOB original_image; só é gravada se configurado
+                image_base64 = None
+                if original_image and DB_STORE_IMAGE_BASE64:
+                    image_base64 = base64.b64encode(original_image).decode('utf-8')
                 
-                sanitized_results.append(sanitized_result)
-            
-            # Converte a lista de resultados sanitizados para JSON
-            text_results_json = json.dumps(sanitized_results)
-            
-            # Converte a imagem original para base64 se fornecida
-            image_base64 = None
-            if original_image:
-                image_base64 = base64.b64encode(original_image).decode('utf-8')
-            
-            # Converte os metadados para JSON se fornecidos
-            metadata_json = None
-            if image_metadata:
-                metadata_json = json.dumps(image_metadata)
-            
-            query = """
-            INSERT INTO ocr_results 
-            (image_hash, source_lang, text_results, confidence, original_image, image_base64, image_metadata) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-            self.cursor.execute(query, (image_hash, source_lang, text_results_json, confidence, 
-                                      original_image, image_base64, metadata_json))
-            self.connection.commit()
-            print(f"Novo resultado de OCR salvo no banco de dados para imagem: {image_hash[:10]}...")
-            return True
+                # Converte os metadados para JSON se fornecidos
+                metadata_json = None
+                if image_metadata:
+                    metadata_json = json.dumps(image_metadata)
+                
+                query = """
+                INSERT INTO ocr_results 
+                (image_hash, source_lang, text_results, confidence, original_image, image_base64, image_metadata, perceptual_hash) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """
+                cursor.execute(query, (image_hash, source_lang, text_results_json, confidence, 
+                                     original_image, image_base64, metadata_json, perceptual_hash))
+                
+                # Deixa o resultado recém-salvo disponível na camada em memória
+                self.ocr_cache.set((image_hash, source_lang), {
+                    'id': cursor.lastrowid,
+                    'image_hash': image_hash,
+                    'source_lang': source_lang,
+                    'text_results': sanitized_results,
+                    'confidence': confidence,
+                    'used_count': 1,
+                    'original_image': original_image,
+                    'image_base64': image_base64,
+                    'image_metadata': image_metadata,
+                    'perceptual_hash': perceptual_hash
+                })
+                print(f"Novo resultado de OCR salvo no banco de dados para imagem: {image_hash[:10]}...")
+                return True
         except pymysql.Error as err:
             print(f"Erro ao salvar resultado de OCR: {err}")
             return False
@@ -397,48 +1031,45 @@ class DatabaseManager:
     def _update_statistics(self, ocr_hit: bool = False, translation_hit: bool = False, 
                           processing_time: float = None) -> None:
         """Atualiza as estatísticas diárias."""
-        if not self.ensure_connected():
-            return
-        
         today = datetime.now().date()
         
         try:
-            # Verifica se já existe um registro para hoje
-            query = "SELECT * FROM statistics WHERE date = %s"
-            self.cursor.execute(query, (today,))
-            result = self.cursor.fetchone()
-            
-            if result:
-                # Atualiza o registro existente
-                update_query = """
-                UPDATE statistics 
-                SET total_requests = total_requests + 1,
-                    ocr_cache_hits = ocr_cache_hits + %s,
-                    translation_cache_hits = translation_cache_hits + %s
-                WHERE id = %s
-                """
-                self.cursor.execute(update_query, (1 if ocr_hit else 0, 1 if translation_hit else 0, result['id']))
+            with self._cursor() as cursor:
+                # Verifica se já existe um registro para hoje
+                query = "SELECT * FROM statistics WHERE date = %s"
+                cursor.execute(query, (today,))
+                result = cursor.fetchone()
                 
-                # Atualiza o tempo médio de processamento se fornecido
-                if processing_time is not None:
-                    avg_time_query = """
+                if result:
+                    # Atualiza o registro existente
+                    update_query = """
                     UPDATE statistics 
-                    SET avg_processing_time = ((avg_processing_time * total_requests) + %s) / (total_requests + 1)
+                    SET total_requests = total_requests + 1,
+                        ocr_cache_hits = ocr_cache_hits + %s,
+                        translation_cache_hits = translation_cache_hits + %s
                     WHERE id = %s
                     """
-                    self.cursor.execute(avg_time_query, (processing_time, result['id']))
-            else:
-                # Cria um novo registro para hoje
-                insert_query = """
-                INSERT INTO statistics 
-                (date, total_requests, ocr_cache_hits, translation_cache_hits, avg_processing_time) 
-                VALUES (%s, 1, %s, %s, %s)
-                """
-                self.cursor.execute(insert_query, (today, 1 if ocr_hit else 0, 
-                                                1 if translation_hit else 0, 
-                                                processing_time or 0))
-            
-            self.connection.commit()
+                    cursor.execute(update_query, (1 if ocr_hit else 0, 1 if translation_hit else 0, result['id']))
+                    
+                    # Atualiza o tempo médio de processamento se fornecido
+                    if processing_time is not None:
+                        avg_time_query = """
+                        UPDATE statistics 
+                        SET avg_processing_time = ((avg_processing_time * total_requests) + %s) / (total_requests + 1)
+                        WHERE id = %s
+                        """
+                        cursor.execute(avg_time_query, (processing_time, result['id']))
+                else:
+                    # Cria um novo registro para hoje
+                    insert_query = """
+                    INSERT INTO statistics 
+                    (date, total_requests, ocr_cache_hits, translation_cache_hits, avg_processing_time) 
+                    VALUES (%s, 1, %s, %s, %s)
+                    """
+                    cursor.execute(insert_query, (today, 1 if ocr_hit else 0, 
+                                               1 if translation_hit else 0, 
+                                               processing_time or 0))
+                
         except pymysql.Error as err:
             print(f"Erro ao atualizar estatísticas: {err}")
     
@@ -449,206 +1080,197 @@ class DatabaseManager:
     
     def get_statistics(self, days: int = 7) -> List[Dict[str, Any]]:
         """Obtém estatísticas dos últimos N dias."""
-        if not self.ensure_connected():
-            return []
-        
         try:
-            query = """
-            SELECT * FROM statistics 
-            ORDER BY date DESC 
-            LIMIT %s
-            """
-            self.cursor.execute(query, (days,))
-            return self.cursor.fetchall()
+            with self._cursor() as cursor:
+                query = """
+                SELECT * FROM statistics 
+                ORDER BY date DESC 
+                LIMIT %s
+                """
+                cursor.execute(query, (days,))
+                return cursor.fetchall()
         except pymysql.Error as err:
             print(f"Erro ao obter estatísticas: {err}")
             return []
     
     def save_system_info(self, system_info: dict) -> bool:
         """Salva as informações do sistema no banco de dados."""
-        if not self.ensure_connected():
-            return False
-        
         try:
-            # Inserir informações principais do sistema
-            self.cursor.execute("""
-                INSERT INTO system_info_logs (
-                    process_pid, process_name, process_status, process_memory_mb, 
-                    process_started_at, python_psutil_version, platform
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                system_info['process']['pid'],
-                system_info['process']['name'],
-                system_info['process']['status'],
-                system_info['process']['memory_mb'],
-                system_info['process']['started_at'],
-                system_info['process']['psutil_version'],
-                system_info['process']['platform']
-            ))
-            
-            # Obter o ID do registro principal inserido
-            system_info_id = self.cursor.lastrowid
-            
-            # Inserir informações de rede
-            self.cursor.execute("""
-                INSERT INTO system_network_info (
-                    system_info_id, hostname, local_ip, router_ip, external_ip, 
-                    ipv6_address, port, service_url, mac_address
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                system_info_id,
-                system_info['network']['hostname'],
-                system_info['network']['local_ip'],
-                system_info['network'].get('router_ip'),
-                system_info['network'].get('external_ip'),
-                system_info['network'].get('ipv6'),
-                system_info['network']['port'],
-                system_info['network']['url'],
-                system_info['network']['mac_address']
-            ))
-            
-            # Inserir informações de CPU
-            self.cursor.execute("""
-                INSERT INTO system_cpu_info (
-                    system_info_id, cpu_name, physical_cores, logical_cores, 
-                    current_frequency_mhz, max_frequency_mhz, cpu_usage_percent
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                system_info_id,
-                system_info['cpu'].get('name'),
-                system_info['cpu']['physical_cores'],
-                system_info['cpu']['logical_cores'],
-                system_info['cpu'].get('current_freq'),
-                system_info['cpu'].get('max_freq'),
-                system_info['cpu']['usage_percent']
-            ))
-            
-            # Inserir informações de GPU(s)
-            if 'gpu' in system_info and system_info['gpu']:
-                for idx, gpu in enumerate(system_info['gpu']):
-                    self.cursor.execute("""
-                        INSERT INTO system_gpu_info (
-                            system_info_id, gpu_index, gpu_name, gpu_memory
-                        ) VALUES (%s, %s, %s, %s)
-                    """, (
-                        system_info_id,
-                        idx + 1,  # GPU index começa em 1
-                        gpu['name'],
-                        gpu.get('memory', 'Não disponível')
-                    ))
-            
-            self.connection.commit()
-            print(f"Informações do sistema salvas com ID: {system_info_id}")
-            return True
-            
+            with self._cursor() as cursor:
+                # Inserir informações principais do sistema
+                cursor.execute("""
+                    INSERT INTO system_info_logs (
+                        process_pid, process_name, process_status, process_memory_mb, 
+                        process_started_at, python_psutil_version, platform
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, (
+                    system_info['process']['pid'],
+                    system_info['process']['name'],
+                    system_info['process']['status'],
+                    system_info['process']['memory_mb'],
+                    system_info['process']['started_at'],
+                    system_info['process']['psutil_version'],
+                    system_info['process']['platform']
+                ))
+                
+                # Obter o ID do registro principal inserido
+                system_info_id = cursor.lastrowid
+                
+                # Inserir informações de rede
+                cursor.execute("""
+                    INSERT INTO system_network_info (
+                        system_info_id, hostname, local_ip, router_ip, external_ip, 
+                        ipv6_address, port, service_url, mac_address
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, (
+                    system_info_id,
+                    system_info['network']['hostname'],
+                    system_info['network']['local_ip'],
+                    system_info['network'].get('router_ip'),
+                    system_info['network'].get('external_ip'),
+                    system_info['network'].get('ipv6'),
+                    system_info['network']['port'],
+                    system_info['network']['url'],
+                    system_info['network']['mac_address']
+                ))
+                
+                # Inserir informações de CPU
+                cursor.execute("""
+                    INSERT INTO system_cpu_info (
+                        system_info_id, cpu_name, physical_cores, logical_cores, 
+                        current_frequency_mhz, max_frequency_mhz, cpu_usage_percent
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, (
+                    system_info_id,
+                    system_info['cpu'].get('name'),
+                    system_info['cpu']['physical_cores'],
+                    system_info['cpu']['logical_cores'],
+                    system_info['cpu'].get('current_freq'),
+                    system_info['cpu'].get('max_freq'),
+                    system_info['cpu']['usage_percent']
+                ))
+                
+                # Inserir informações de GPU(s)
+                if 'gpu' in system_info and system_info['gpu']:
+                    for idx, gpu in enumerate(system_info['gpu']):
+                        cursor.execute("""
+                            INSERT INTO system_gpu_info (
+                                system_info_id, gpu_index, gpu_name, gpu_memory
+                            ) VALUES (%s, %s, %s, %s)
+                        """, (
+                            system_info_id,
+                            idx + 1,  # GPU index começa em 1
+                            gpu['name'],
+                            gpu.get('memory', 'Não disponível')
+                        ))
+                
+                print(f"Informações do sistema salvas com ID: {system_info_id}")
+                return True
+                
         except pymysql.Error as err:
             print(f"Erro ao salvar informações do sistema: {err}")
-            self.connection.rollback()
             return False
         except Exception as err:
             print(f"Erro inesperado ao salvar informações do sistema: {err}")
-            self.connection.rollback()
             return False
     
     def get_latest_system_info(self) -> dict:
         """Obtém as informações mais recentes do sistema."""
-        if not self.ensure_connected():
-            return {}
-        
         try:
-            # Buscar informações principais mais recentes
-            self.cursor.execute("""
-                SELECT id, timestamp, process_pid, process_name, process_status, 
-                       process_memory_mb, process_started_at, python_psutil_version, platform
-                FROM system_info_logs 
-                ORDER BY timestamp DESC 
-                LIMIT 1
-            """)
-            
-            main_info = self.cursor.fetchone()
-            if not main_info:
-                return {}
-            
-            system_info_id = main_info['id']
-            
-            # Buscar informações de rede
-            self.cursor.execute("""
-                SELECT hostname, local_ip, router_ip, external_ip, ipv6_address, 
-                       port, service_url, mac_address
-                FROM system_network_info 
-                WHERE system_info_id = %s
-            """, (system_info_id,))
-            
-            network_info = self.cursor.fetchone()
-            
-            # Buscar informações de CPU
-            self.cursor.execute("""
-                SELECT cpu_name, physical_cores, logical_cores, current_frequency_mhz, 
-                       max_frequency_mhz, cpu_usage_percent
-                FROM system_cpu_info 
-                WHERE system_info_id = %s
-            """, (system_info_id,))
-            
-            cpu_info = self.cursor.fetchone()
-            
-            # Buscar informações de GPU(s)
-            self.cursor.execute("""
-                SELECT gpu_index, gpu_name, gpu_memory
-                FROM system_gpu_info 
-                WHERE system_info_id = %s
-                ORDER BY gpu_index
-            """, (system_info_id,))
-            
-            gpu_info = self.cursor.fetchall()
-            
-            # Montar o dicionário de resposta
-            result = {
-                'id': main_info['id'],
-                'timestamp': main_info['timestamp'].isoformat() if main_info['timestamp'] else None,
-                'process': {
-                    'pid': main_info['process_pid'],
-                    'name': main_info['process_name'],
-                    'status': main_info['process_status'],
-                    'memory_mb': float(main_info['process_memory_mb']) if main_info['process_memory_mb'] else 0,
-                    'started_at': main_info['process_started_at'].isoformat() if main_info['process_started_at'] else None,
-                    'psutil_version': main_info['python_psutil_version'],
-                    'platform': main_info['platform']
-                }
-            }
-            
-            if network_info:
-                result['network'] = {
-                    'hostname': network_info['hostname'],
-                    'local_ip': network_info['local_ip'],
-                    'router_ip': network_info['router_ip'],
-                    'external_ip': network_info['external_ip'],
-                    'ipv6': network_info['ipv6_address'],
-                    'port': network_info['port'],
-                    'url': network_info['service_url'],
-                    'mac_address': network_info['mac_address']
-                }
-            
-            if cpu_info:
-                result['cpu'] = {
-                    'name': cpu_info['cpu_name'],
-                    'physical_cores': cpu_info['physical_cores'],
-                    'logical_cores': cpu_info['logical_cores'],
-                    'current_freq': float(cpu_info['current_frequency_mhz']) if cpu_info['current_frequency_mhz'] else None,
-                    'max_freq': float(cpu_info['max_frequency_mhz']) if cpu_info['max_frequency_mhz'] else None,
-                    'usage_percent': float(cpu_info['cpu_usage_percent']) if cpu_info['cpu_usage_percent'] else 0
+            with self._cursor() as cursor:
+                # Buscar informações principais mais recentes
+                cursor.execute("""
+                    SELECT id, timestamp, process_pid, process_name, process_status, 
+                           process_memory_mb, process_started_at, python_psutil_version, platform
+                    FROM system_info_logs 
+                    ORDER BY timestamp DESC 
+                    LIMIT 1
+                """)
+                
+                main_info = cursor.fetchone()
+                if not main_info:
+                    return {}
+                
+                system_info_id = main_info['id']
+                
+                # Buscar informações de rede
+                cursor.execute("""
+                    SELECT hostname, local_ip, router_ip, external_ip, ipv6_address, 
+                           port, service_url, mac_address
+                    FROM system_network_info 
+                    WHERE system_info_id = %s
+                """, (system_info_id,))
+                
+                network_info = cursor.fetchone()
+                
+                # Buscar informações de CPU
+                cursor.execute("""
+                    SELECT cpu_name, physical_cores, logical_cores, current_frequency_mhz, 
+                           max_frequency_mhz, cpu_usage_percent
+                    FROM system_cpu_info 
+                    WHERE system_info_id = %s
+                """, (system_info_id,))
+                
+                cpu_info = cursor.fetchone()
+                
+                # Buscar informações de GPU(s)
+                cursor.execute("""
+                    SELECT gpu_index, gpu_name, gpu_memory
+                    FROM system_gpu_info 
+                    WHERE system_info_id = %s
+                    ORDER BY gpu_index
+                """, (system_info_id,))
+                
+                gpu_info = cursor.fetchall()
+                
+                # Montar o dicionário de resposta
+                result = {
+                    'id': main_info['id'],
+                    'timestamp': main_info['timestamp'].isoformat() if main_info['timestamp'] else None,
+                    'process': {
+                        'pid': main_info['process_pid'],
+                        'name': main_info['process_name'],
+                        'status': main_info['process_status'],
+                        'memory_mb': float(main_info['process_memory_mb']) if main_info['process_memory_mb'] else 0,
+                        'started_at': main_info['process_started_at'].isoformat() if main_info['process_started_at'] else None,
+                        'psutil_version': main_info['python_psutil_version'],
+                        'platform': main_info['platform']
+                    }
                 }
-            
-            if gpu_info:
-                result['gpu'] = []
-                for gpu in gpu_info:
-                    result['gpu'].append({
-                        'index': gpu['gpu_index'],
-                        'name': gpu['gpu_name'],
-                        'memory': gpu['gpu_memory']
-                    })
-            
-            return result
-            
+                
+                if network_info:
+                    result['network'] = {
+                        'hostname': network_info['hostname'],
+                        'local_ip': network_info['local_ip'],
+                        'router_ip': network_info['router_ip'],
+                        'external_ip': network_info['external_ip'],
+                        'ipv6': network_info['ipv6_address'],
+                        'port': network_info['port'],
+                        'url': network_info['service_url'],
+                        'mac_address': network_info['mac_address']
+                    }
+                
+                if cpu_info:
+                    result['cpu'] = {
+                        'name': cpu_info['cpu_name'],
+                        'physical_cores': cpu_info['physical_cores'],
+                        'logical_cores': cpu_info['logical_cores'],
+                        'current_freq': float(cpu_info['current_frequency_mhz']) if cpu_info['current_frequency_mhz'] else None,
+                        'max_freq': float(cpu_info['max_frequency_mhz']) if cpu_info['max_frequency_mhz'] else None,
+                        'usage_percent': float(cpu_info['cpu_usage_percent']) if cpu_info['cpu_usage_percent'] else 0
+                    }
+                
+                if gpu_info:
+                    result['gpu'] = []
+                    for gpu in gpu_info:
+                        result['gpu'].append({
+                            'index': gpu['gpu_index'],
+                            'name': gpu['gpu_name'],
+                            'memory': gpu['gpu_memory']
+                        })
+                
+                return result
+                
         except pymysql.Error as err:
             print(f"Erro ao obter informações do sistema: {err}")
             return {}
@@ -658,18 +1280,15 @@ class DatabaseManager:
 
     def save_heartbeat(self, service_name: str, status: str, response_time_ms: int = None, error_message: str = None) -> bool:
         """Salva um registro de heartbeat na tabela service_heartbeat."""
-        if not self.ensure_connected():
-            return False
-        
         try:
-            self.cursor.execute("""
-                INSERT INTO service_heartbeat (service_name, status, response_time_ms, error_message)
-                VALUES (%s, %s, %s, %s)
-            """, (service_name, status, response_time_ms, error_message))
-            
-            self.connection.commit()
-            return True
-            
+            with self._cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO service_heartbeat (service_name, status, response_time_ms, error_message)
+                    VALUES (%s, %s, %s, %s)
+                """, (service_name, status, response_time_ms, error_message))
+                
+                return True
+                
         except pymysql.Error as err:
             print(f"Erro ao salvar heartbeat: {err}")
             return False
@@ -679,57 +1298,55 @@ class DatabaseManager:
     
     def get_latest_heartbeat(self, service_name: str = None) -> dict:
         """Obtém o último heartbeat registrado para um serviço específico ou todos os serviços."""
-        if not self.ensure_connected():
-            return {}
-        
         try:
-            if service_name:
-                self.cursor.execute("""
-                    SELECT id, service_name, status, response_time_ms, error_message, timestamp
-                    FROM service_heartbeat 
-                    WHERE service_name = %s
-                    ORDER BY timestamp DESC 
-                    LIMIT 1
-                """, (service_name,))
+            with self._cursor() as cursor:
+                if service_name:
+                    cursor.execute("""
+                        SELECT id, service_name, status, response_time_ms, error_message, timestamp
+                        FROM service_heartbeat 
+                        WHERE service_name = %s
+                        ORDER BY timestamp DESC 
+                        LIMIT 1
+                    """, (service_name,))
+                    
+                    result = cursor.fetchone()
+                    if result:
+                        return {
+                            'id': result['id'],
+                            'service_name': result['service_name'],
+                            'status': result['status'],
+                            'response_time_ms': result['response_time_ms'],
+                            'error_message': result['error_message'],
+                            'timestamp': result['timestamp'].isoformat() if result['timestamp'] else None
+                        }
+                else:
+                    # Retorna o último heartbeat de cada serviço
+                    cursor.execute("""
+                        SELECT h1.id, h1.service_name, h1.status, h1.response_time_ms, h1.error_message, h1.timestamp
+                        FROM service_heartbeat h1
+                        INNER JOIN (
+                            SELECT service_name, MAX(timestamp) as max_timestamp
+                            FROM service_heartbeat
+                            GROUP BY service_name
+                        ) h2 ON h1.service_name = h2.service_name AND h1.timestamp = h2.max_timestamp
+                        ORDER BY h1.timestamp DESC
+                    """)
+                    
+                    results = cursor.fetchall()
+                    heartbeats = []
+                    for result in results:
+                        heartbeats.append({
+                            'id': result['id'],
+                            'service_name': result['service_name'],
+                            'status': result['status'],
+                            'response_time_ms': result['response_time_ms'],
+                            'error_message': result['error_message'],
+                            'timestamp': result['timestamp'].isoformat() if result['timestamp'] else None
+                        })
+                    return {'heartbeats': heartbeats}
                 
-                result = self.cursor.fetchone()
-                if result:
-                    return {
-                        'id': result['id'],
-                        'service_name': result['service_name'],
-                        'status': result['status'],
-                        'response_time_ms': result['response_time_ms'],
-                        'error_message': result['error_message'],
-                        'timestamp': result['timestamp'].isoformat() if result['timestamp'] else None
-                    }
-            else:
-                # Retorna o último heartbeat de cada serviço
-                self.cursor.execute("""
-                    SELECT h1.id, h1.service_name, h1.status, h1.response_time_ms, h1.error_message, h1.timestamp
-                    FROM service_heartbeat h1
-                    INNER JOIN (
-                        SELECT service_name, MAX(timestamp) as max_timestamp
-                        FROM service_heartbeat
-                        GROUP BY service_name
-                    ) h2 ON h1.service_name = h2.service_name AND h1.timestamp = h2.max_timestamp
-                    ORDER BY h1.timestamp DESC
-                """)
+                return {}
                 
-                results = self.cursor.fetchall()
-                heartbeats = []
-                for result in results:
-                    heartbeats.append({
-                        'id': result['id'],
-                        'service_name': result['service_name'],
-                        'status': result['status'],
-                        'response_time_ms': result['response_time_ms'],
-                        'error_message': result['error_message'],
-                        'timestamp': result['timestamp'].isoformat() if result['timestamp'] else None
-                    })
-                return {'heartbeats': heartbeats}
-            
-            return {}
-            
         except pymysql.Error as err:
             print(f"Erro ao obter heartbeat: {err}")
             return {}
@@ -739,52 +1356,50 @@ class DatabaseManager:
     
     def get_service_health_summary(self) -> dict:
         """Obtém um resumo da saúde de todos os serviços baseado nos últimos heartbeats."""
-        if not self.ensure_connected():
-            return {}
-        
         try:
-            # Conta heartbeats por status nas últimas 24 horas
-            self.cursor.execute("""
-                SELECT 
-                    service_name,
-                    status,
-                    COUNT(*) as count,
-                    MAX(timestamp) as last_heartbeat,
-                    AVG(response_time_ms) as avg_response_time
-                FROM service_heartbeat 
-                WHERE timestamp >= DATE_SUB(NOW(), INTERVAL 24 HOUR)
-                GROUP BY service_name, status
-                ORDER BY service_name, status
-            """)
-            
-            results = self.cursor.fetchall()
-            
-            # Organiza os dados por serviço
-            services = {}
-            for result in results:
-                service_name = result['service_name']
-                if service_name not in services:
-                    services[service_name] = {
-                        'service_name': service_name,
-                        'status_counts': {},
-                        'last_heartbeat': None,
-                        'avg_response_time': None
-                    }
+            with self._cursor() as cursor:
+                # Conta heartbeats por status nas últimas 24 horas
+                cursor.execute("""
+                    SELECT 
+                        service_name,
+                        status,
+                        COUNT(*) as count,
+                        MAX(timestamp) as last_heartbeat,
+                        AVG(response_time_ms) as avg_response_time
+                    FROM service_heartbeat 
+                    WHERE timestamp >= DATE_SUB(NOW(), INTERVAL 24 HOUR)
+                    GROUP BY service_name, status
+                    ORDER BY service_name, status
+                """)
                 
-                services[service_name]['status_counts'][result['status']] = result['count']
+                results = cursor.fetchall()
+                
+                # Organiza os dados por serviço
+                services = {}
+                for result in results:
+                    service_name = result['service_name']
+                    if service_name not in services:
+                        services[service_name] = {
+                            'service_name': service_name,
+                            'status_counts': {},
+                            'last_heartbeat': None,
+                            'avg_response_time': None
+                        }
+                    
+                    services[service_name]['status_counts'][result['status']] = result['count']
+                    
+                    # Atualiza o último heartbeat se for mais recente
+                    if (services[service_name]['last_heartbeat'] is None or 
+                        result['last_heartbeat'] > services[service_name]['last_heartbeat']):
+                        services[service_name]['last_heartbeat'] = result['last_heartbeat'].isoformat() if result['last_heartbeat'] else None
+                        services[service_name]['avg_response_time'] = float(result['avg_response_time']) if result['avg_response_time'] else None
+                
+                return {
+                    'summary_period': '24_hours',
+                    'services': list(services.values()),
+                    'total_services': len(services)
+                }
                 
-                # Atualiza o último heartbeat se for mais recente
-                if (services[service_name]['last_heartbeat'] is None or 
-                    result['last_heartbeat'] > services[service_name]['last_heartbeat']):
-                    services[service_name]['last_heartbeat'] = result['last_heartbeat'].isoformat() if result['last_heartbeat'] else None
-                    services[service_name]['avg_response_time'] = float(result['avg_response_time']) if result['avg_response_time'] else None
-            
-            return {
-                'summary_period': '24_hours',
-                'services': list(services.values()),
-                'total_services': len(services)
-            }
-            
         except pymysql.Error as err:
             print(f"Erro ao obter resumo de saúde: {err}")
             return {}
@@ -792,6 +1407,99 @@ class DatabaseManager:
             print(f"Erro inesperado ao obter resumo de saúde: {err}")
             return {}
 
+
+class AsyncDatabaseManager:
+    """
+    Interface assíncrona (no estilo do aiomysql) sobre o DatabaseManager.
+    
+    Hits na camada em memória são respondidos diretamente no event loop; as consultas ao
+    banco rodam em um pool de threads do mesmo tamanho do pool de conexões, de modo que
+    process_ai_request pode aguardar o cache sem bloquear outras requisições.
+    """
+    
+    def __init__(self, db: DatabaseManager, max_workers: int = None):
+        """
+        Inicializa a interface assíncrona.
+        
+        Args:
+            db: Gerenciador síncrono com o pool de conexões.
+            max_workers: Threads para as consultas (padrão: tamanho do pool de conexões).
+        """
+        self.db = db
+        self.max_workers = max_workers or db.pool.size
+        self._executor = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='db')
+        return self._executor
+    
+    async def run(self, func, *args, **kwargs):
+        """Executa uma operação síncrona do banco de dados no pool de threads."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+    
+    def _schedule_usage_flush(self) -> None:
+        if self.db.usage_flush_due():
+            self._get_executor().submit(self.db.flush_usage_updates)
+    
+    async def get_translation(self, source_text: str, source_lang: str, target_lang: str) -> Optional[Dict[str, Any]]:
+        """Versão assíncrona de DatabaseManager.get_translation."""
+        text_hash = hashlib.sha256(source_text.encode('utf-8')).hexdigest()
+        cached = self.db._translation_from_memory((text_hash, source_lang, target_lang), flush=False)
+        if cached is not None:
+            self._schedule_usage_flush()
+            return cached
+        return await self.run(self.db.get_translation, source_text, source_lang, target_lang, use_memory=False)
+
+    async def get_translations_bulk(self, source_texts: List[str], source_lang: str,
+                                    target_lang: str) -> Dict[str, Dict[str, Any]]:
+        """Versão assíncrona de DatabaseManager.get_translations_bulk."""
+        found = {}
+        missing = []
+        for source_text in dict.fromkeys(source_texts):
+            text_hash = hashlib.sha256(source_text.encode('utf-8')).hexdigest()
+            cached = self.db._translation_from_memory((text_hash, source_lang, target_lang), flush=False)
+            if cached is not None:
+                found[source_text] = cached
+            else:
+                missing.append(source_text)
+        if missing:
+            found.update(await self.run(self.db.get_translations_bulk, missing, source_lang, target_lang,
+                                        use_memory=False, flush=False))
+        self._schedule_usage_flush()
+        return found
+
+    async def save_translations_bulk(self, *args, **kwargs) -> bool:
+        """Versão assíncrona de DatabaseManager.save_translations_bulk."""
+        return await self.run(self.db.save_translations_bulk, *args, **kwargs)
+
+    async def get_ocr_result(self, image_hash: str, source_lang: str, count_usage: bool = True) -> Optional[Dict[str, Any]]:
+        """Versão assíncrona de DatabaseManager.get_ocr_result."""
+        cached = self.db._ocr_result_from_memory((image_hash, source_lang), count_usage, flush=False)
+        if cached is not None:
+            self._schedule_usage_flush()
+            return cached
+        return await self.run(self.db.get_ocr_result, image_hash, source_lang, count_usage, use_memory=False)
+    
+    async def save_translation(self, *args, **kwargs) -> bool:
+        """Versão assíncrona de DatabaseManager.save_translation."""
+        return await self.run(self.db.save_translation, *args, **kwargs)
+    
+    async def save_ocr_result(self, *args, **kwargs) -> bool:
+        """Versão assíncrona de DatabaseManager.save_ocr_result."""
+        return await self.run(self.db.save_ocr_result, *args, **kwargs)
+    
+    async def record_request_processing(self, *args, **kwargs) -> None:
+        """Versão assíncrona de DatabaseManager.record_request_processing."""
+        return await self.run(self.db.record_request_processing, *args, **kwargs)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerra o pool de threads das consultas."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
 # Função para calcular o hash de uma imagem (bytes)
 def calculate_image_hash(image_bytes: bytes) -> str:
     """Calcula o hash SHA-256 de uma imagem em bytes."""
@@ -800,6 +1508,9 @@ def calculate_image_hash(image_bytes: bytes) -> str:
 # Instância global do gerenciador de banco de dados
 db_manager = DatabaseManager()
 
+# Interface assíncrona compartilhando o mesmo pool de conexões e a mesma camada em memória
+async_db_manager = AsyncDatabaseManager(db_manager)
+
 # Função para inicializar o banco de dados
 def initialize_database() -> bool:
     """Inicializa o banco de dados, estabelecendo conexão e criando tabelas."""
@@ -0,0 +1,250 @@
+# debug_capture.py
+
+"""
+Captura de imagens de debug fora do caminho crítico das requisições.
+
+Antes, cada requisição gravava temp_received_image.png e temp_corrected_image.png no
+módulo OCR, overlay_translation_debug.png em create_translation_image, mais três PNGs
+em save_debug_images e, no módulo OCR melhorado, um PNG por variante pré-processada.
+Esses encodes síncronos no diretório de trabalho custavam dezenas de milissegundos por
+requisição e requisições simultâneas sobrescreviam os arquivos umas das outras.
+
+Agora a captura é desligada por padrão e, quando ligada, amostra uma fração das
+requisições. As imagens de uma requisição amostrada são entregues a uma fila e uma
+thread de escrita faz o encode em segundo plano, em um diretório próprio da requisição
+(DEBUG_CAPTURE_DIR/<id da requisição>/). Os diretórios formam um buffer circular:
+quando o total em disco passa de DEBUG_CAPTURE_MAX_MB, os mais antigos são apagados.
+
+A requisição amostrada é identificada por uma ContextVar, de modo que as etapas
+(inclusive as que rodam no executor de inferência) só precisam chamar save_image.
+"""
+
+import os
+import queue
+import random
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+# Configurações via variáveis de ambiente
+DEBUG_CAPTURE_ENABLED = os.getenv('DEBUG_CAPTURE_ENABLED', 'false').lower() == 'true'
+# Fração das requisições capturadas quando a captura está ligada (0.0 a 1.0)
+DEBUG_CAPTURE_SAMPLE_RATE = float(os.getenv('DEBUG_CAPTURE_SAMPLE_RATE', '0.1'))
+DEBUG_CAPTURE_DIR = os.getenv('DEBUG_CAPTURE_DIR', 'debug_captures')
+# Espaço máximo em disco ocupado pelas capturas
+DEBUG_CAPTURE_MAX_MB = float(os.getenv('DEBUG_CAPTURE_MAX_MB', '200'))
+# Imagens aguardando escrita; com a fila cheia, as novas são descartadas
+DEBUG_CAPTURE_QUEUE_SIZE = int(os.getenv('DEBUG_CAPTURE_QUEUE_SIZE', '64'))
+
+# Identificador da requisição amostrada no contexto atual (None = não capturar)
+_current_request: ContextVar[Optional[str]] = ContextVar('debug_capture_request', default=None)
+
+
+def _encode_to_file(path: str, image) -> None:
+    """Grava bytes já codificados, um ndarray (OpenCV) ou uma imagem PIL em PNG."""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        with open(path, 'wb') as f:
+            f.write(image)
+    elif isinstance(image, np.ndarray):
+        if not cv2.imwrite(path, image):
+            raise IOError(f"cv2.imwrite falhou para {path}")
+    else:
+        image.save(path, format='PNG')
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class DebugCapture:
+    """
+    Amostragem das requisições e escrita assíncrona das imagens de debug.
+    """
+
+    def __init__(self, enabled: bool = DEBUG_CAPTURE_ENABLED, sample_rate: float = DEBUG_CAPTURE_SAMPLE_RATE,
+                 directory: str = DEBUG_CAPTURE_DIR, max_bytes: int = int(DEBUG_CAPTURE_MAX_MB * 1024 * 1024),
+                 queue_size: int = DEBUG_CAPTURE_QUEUE_SIZE):
+        """
+        Inicializa a captura de debug.
+
+        Args:
+            enabled: Liga ou desliga a captura.
+            sample_rate: Fração das requisições capturadas.
+            directory: Diretório raiz das capturas.
+            max_bytes: Tamanho máximo do buffer circular em disco.
+            queue_size: Capacidade da fila de escrita.
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Diretórios de requisição em ordem de criação -> bytes ocupados
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        self.stats = {'sampled_requests': 0, 'written_files': 0, 'dropped_files': 0,
+                      'evicted_requests': 0, 'errors': 0}
+
+    def begin(self, request_id: Optional[str] = None) -> Optional[str]:
+        """
+        Decide se a requisição atual será capturada e a associa ao contexto atual.
+
+        Cada requisição do FastAPI roda na sua própria tarefa asyncio, então a escolha
+        não vaza para as demais requisições.
+
+        Args:
+            request_id: Identificador da requisição (gerado se omitido).
+
+        Returns:
+            Identificador da requisição amostrada, ou None se ela não for capturada.
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            _current_request.set(None)
+            return None
+        request_id = request_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        _current_request.set(request_id)
+        with self._lock:
+            self.stats['sampled_requests'] += 1
+        print(f"Captura de Debug: Requisição {request_id} amostrada.")
+        return request_id
+
+    @property
+    def active(self) -> bool:
+        """True se a requisição do contexto atual foi amostrada."""
+        return _current_request.get() is not None
+
+    def save_image(self, name: str, image) -> bool:
+        """
+        Agenda a gravação de uma imagem da requisição atual, sem bloquear quem chama.
+
+        Args:
+            name: Nome do arquivo, sem extensão.
+            image: Bytes já codificados, ndarray do OpenCV, imagem PIL ou uma função sem
+                argumentos que produz um desses (executada na thread de escrita).
+
+        Returns:
+            True se a imagem entrou na fila.
+        """
+        request_id = _current_request.get()
+        if request_id is None:
+            return False
+
+        # A thread de escrita precisa ser dona do que vai codificar: arrays que ainda podem
+        # ser alterados e imagens PIL são copiados (os arrays do Frame são somente leitura)
+        if isinstance(image, np.ndarray) and image.flags.writeable:
+            image = image.copy()
+        elif hasattr(image, 'save') and hasattr(image, 'copy'):
+            image = image.copy()
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((request_id, name, image))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.stats['dropped_files'] += 1
+            return False
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._load_existing()
+            self._writer = threading.Thread(target=self._writer_loop, name='debug-capture-writer', daemon=True)
+            self._writer.start()
+
+    def _load_existing(self) -> None:
+        """Inclui no buffer circular as capturas deixadas por execuções anteriores."""
+        if not os.path.isdir(self.directory):
+            return
+        existing = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path):
+                existing.append((os.path.getmtime(path), name, _directory_size(path)))
+        for _, name, size in sorted(existing):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def _writer_loop(self) -> None:
+        while True:
+            request_id, name, image = self._queue.get()
+            try:
+                if callable(image):
+                    image = image()
+                request_dir = os.path.join(self.directory, request_id)
+                os.makedirs(request_dir, exist_ok=True)
+                path = os.path.join(request_dir, f"{name}.png")
+                _encode_to_file(path, image)
+                self._account(request_id, os.path.getsize(path))
+            except Exception as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                print(f"Captura de Debug: Erro ao gravar '{name}' da requisição {request_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _account(self, request_id: str, size: int) -> None:
+        """Soma o arquivo ao buffer circular e apaga as requisições mais antigas se passar do limite."""
+        evicted = []
+        with self._lock:
+            self.stats['written_files'] += 1
+            self._entries[request_id] = self._entries.get(request_id, 0) + size
+            self._total_bytes += size
+            # A requisição que está sendo gravada nunca é apagada
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                if oldest == request_id:
+                    break
+                self._total_bytes -= self._entries.pop(oldest)
+                self.stats['evicted_requests'] += 1
+                evicted.append(oldest)
+        for old_id in evicted:
+            shutil.rmtree(os.path.join(self.directory, old_id), ignore_errors=True)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Aguarda a gravação das imagens pendentes.
+
+        Returns:
+            True se a fila esvaziou dentro do prazo.
+        """
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna a configuração e os contadores da captura."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'sample_rate': self.sample_rate,
+                'directory': self.directory,
+                'stored_requests': len(self._entries),
+                'stored_mb': round(self._total_bytes / (1024 * 1024), 2),
+                'pending_files': self._queue.qsize(),
+                **self.stats
+            }
+
+
+# Instância global da captura de debug
+debug_capture = DebugCapture()
@@ -18,6 +18,8 @@ from deep_translator import (
     DeeplTranslator
 )
 
+from provider_health import provider_health
+
 # Configuração via variáveis de ambiente
 ENABLE_DEEP_TRANSLATOR = os.getenv('ENABLE_DEEP_TRANSLATOR', 'true').lower() == 'true'
 DEEP_TRANSLATOR_PRIORITY = os.getenv('DEEP_TRANSLATOR_PRIORITY', 'high').lower()  # high, low, mixed
@@ -176,6 +178,21 @@ def get_enhanced_translator_list() -> List[str]:
                 mixed_list.append(base_translators[i])
         return mixed_list
 
+def get_ranked_translator_list(translators: List[str] = None) -> List[str]:
+    """
+    Retorna a lista de tradutores ordenada pela saúde atual (latência e taxa de erro),
+    sem os tradutores com o circuito aberto.
+    
+    Args:
+        translators: Tradutores a ordenar (padrão: get_enhanced_translator_list())
+        
+    Returns:
+        Lista ordenada de tradutores disponíveis
+    """
+    if translators is None:
+        translators = get_enhanced_translator_list()
+    return provider_health.order(translators)
+
 def is_deep_translator(translator_name: str) -> bool:
     """
     Verifica se o tradutor é do deep-translator.
@@ -200,6 +217,7 @@ def get_translator_info() -> Dict[str, Any]:
         'deep_translator_priority': DEEP_TRANSLATOR_PRIORITY,
         'available_deep_translators': list(DEEP_TRANSLATOR_MAP.keys()),
         'enhanced_translator_list': get_enhanced_translator_list(),
+        'ranked_translator_list': get_ranked_translator_list(),
         'cache_size': len(_translator_cache)
     }
     
@@ -226,7 +244,8 @@ def get_translation_statistics() -> Dict[str, Any]:
         'deep_translator_enabled': ENABLE_DEEP_TRANSLATOR,
         'deep_translator_priority': DEEP_TRANSLATOR_PRIORITY,
         'available_translators': list(DEEP_TRANSLATOR_MAP.keys()),
-        'total_available': len(DEEP_TRANSLATOR_MAP)
+        'total_available': len(DEEP_TRANSLATOR_MAP),
+        'provider_health': provider_health.get_stats()
     }
 
 # Exemplo de uso e teste
@@ -0,0 +1,315 @@
+# detection_grouping.py
+
+"""
+Agrupamento vetorizado das detecções de texto próximas.
+
+O agrupamento antigo do ocr_module recalculava extremos e centros de cada caixa com
+expressões geradoras dentro dos laços e comparava cada detecção só com a última do grupo
+atual, de modo que o resultado dependia da ordem das detecções. Aqui:
+
+- as caixas são convertidas uma única vez em um array (N, 4, 2) e todos os extremos e
+  centros são calculados com NumPy;
+- as detecções são separadas em faixas horizontais e ordenadas por x dentro de cada faixa;
+  dentro de uma faixa da altura da distância vertical máxima a ligação "mesma linha" é só
+  horizontal e uma varredura em x liga cada caixa a uma única anterior; entre faixas
+  vizinhas, buscas binárias (searchsorted) em x limitam os pares candidatos às caixas cujos
+  intervalos horizontais se sobrepõem ou ficam a até a distância horizontal máxima;
+- os critérios de proximidade (mesma linha ou linhas consecutivas alinhadas) são avaliados
+  nos pares candidatos de uma vez, formando um grafo de proximidade (com poucas caixas,
+  todos os pares são avaliados direto);
+- os grupos são as componentes conexas do grafo, calculadas com union-find vetorizado.
+
+O custo é O(N log N) mais o número de pares candidatos entre faixas, e o resultado não
+depende da ordem de entrada.
+"""
+
+from itertools import chain
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Fator da distância vertical máxima para linhas consecutivas (uma abaixo da outra)
+CONSECUTIVE_LINE_FACTOR = 3
+# Sobreposição horizontal mínima, em proporção da caixa mais estreita, para linhas consecutivas
+MIN_ALIGNMENT_OVERLAP = 0.3
+# Até este número de caixas todos os pares são avaliados direto (a varredura não compensa)
+ALL_PAIRS_MAX_BOXES = 64
+
+
+def box_geometry(detections: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte as caixas das detecções em um array (N, 4, 2) e calcula extremos e centros.
+
+    Args:
+        detections: Lista de dicionários com 'bbox' (4 pontos).
+
+    Returns:
+        Tupla (extremos (N, 4) com x_min, y_min, x_max, y_max; centro vertical de cada caixa).
+    """
+    coordinates = chain.from_iterable(chain.from_iterable(d['bbox'] for d in detections))
+    boxes = np.fromiter(coordinates, dtype=np.float64, count=len(detections) * 8).reshape(len(detections), 4, 2)
+    extents = np.concatenate([boxes.min(axis=1), boxes.max(axis=1)], axis=1)
+    return extents, boxes[:, :, 1].mean(axis=1)
+
+
+def _expand_ranges(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expande os intervalos [starts[k], ends[k]) em pares (k, posição), sem laços em Python.
+    """
+    counts = np.maximum(ends - starts, 0)
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    owners = np.repeat(np.arange(len(starts)), counts)
+    # Deslocamento de cada par dentro do intervalo do seu dono
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, np.repeat(starts, counts) + offsets
+
+
+def _bands(centers_y: np.ndarray, band_height: float) -> np.ndarray:
+    """
+    Faixa horizontal de cada caixa: caixas na mesma faixa têm centros a menos de band_height
+    e caixas a até band_height ficam na mesma faixa ou em faixas vizinhas.
+    """
+    if band_height > 0:
+        return np.floor((centers_y - centers_y.min()) / band_height).astype(np.int64)
+    # Distância nula: só centros idênticos ficam na mesma faixa
+    return np.unique(centers_y, return_inverse=True)[1].reshape(-1).astype(np.int64)
+
+
+def _band_keys(bands: np.ndarray, x_min: np.ndarray, x_max: np.ndarray, reach: float) -> Tuple[np.ndarray, float, float]:
+    """
+    Chave única faixa + x: cada faixa ocupa um trecho de tamanho stride, sem invadir a vizinha
+    mesmo depois de deslocada por reach para os dois lados.
+
+    Returns:
+        Tupla (chave de cada caixa, origem do x, stride).
+    """
+    origin = float(x_min.min()) - reach
+    stride = float(x_max.max()) - origin + 2 * reach + 1
+    return bands * stride + (x_min - origin), origin, stride
+
+
+def candidate_pairs(centers_y: np.ndarray, x_min: np.ndarray, x_max: np.ndarray, band_height: float,
+                    margin: float, same_band: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Varredura por faixas: encontra os pares de caixas com centros a no máximo band_height na
+    vertical e intervalos horizontais que se sobrepõem depois de ampliados por margin.
+
+    As caixas são separadas em faixas horizontais de altura band_height e ordenadas por x_min
+    dentro de cada faixa; para cada caixa, duas buscas binárias (na própria faixa e na
+    seguinte) delimitam as vizinhas possíveis. Podem sobrar pares um pouco mais distantes
+    (até duas faixas), que os critérios de proximidade descartam.
+
+    Args:
+        centers_y: Centro vertical de cada caixa.
+        x_min: Borda esquerda de cada caixa.
+        x_max: Borda direita de cada caixa.
+        band_height: Distância vertical máxima entre os centros.
+        margin: Distância horizontal máxima entre as caixas (0: só sobreposição).
+        same_band: Se False, só os pares entre faixas vizinhas (os da mesma faixa vêm de band_links).
+
+    Returns:
+        Tupla (i, j) de arrays de índices das caixas, cada par uma única vez, com
+        x_min[j] <= x_max[i] + margin.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(centers_y) < 2:
+        return empty, empty
+    bands = _bands(centers_y, band_height)
+    reach = margin + float((x_max - x_min).max())
+    keys, origin, stride = _band_keys(bands, x_min, x_max, reach)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    first, second = [empty], [empty]
+    for band_offset in ((0, 1) if same_band else (1,)):
+        base = (bands + band_offset) * stride
+        # Vizinhas possíveis: x_min entre x_min - margin - largura máxima e x_max + margin
+        starts = np.searchsorted(sorted_keys, base + (x_min - origin) - reach, side='left')
+        ends = np.searchsorted(sorted_keys, base + (x_max - origin) + margin, side='right')
+        owners, positions = _expand_ranges(starts, ends)
+        neighbors = order[positions]
+        if band_offset == 0:
+            # Na própria faixa cada par aparece nos dois sentidos (e a caixa encontra a si mesma)
+            keep = owners < neighbors
+            owners, neighbors = owners[keep], neighbors[keep]
+        first.append(owners)
+        second.append(neighbors)
+    return np.concatenate(first), np.concatenate(second)
+
+
+def band_links(centers_y: np.ndarray, x_min: np.ndarray, x_max: np.ndarray, band_height: float,
+               margin: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ligações da mesma linha dentro de cada faixa de altura band_height, onde a condição
+    vertical sempre vale e a proximidade é só horizontal (intervalos a até margin).
+
+    Em uma dimensão as componentes são trechos contínuos da ordem por x_min: cada caixa se liga
+    à caixa anterior da faixa que vai mais à direita, se estiver a até margin dela. Basta uma
+    aresta por caixa (no máximo N - 1) em vez de todos os pares da faixa.
+
+    Returns:
+        Tupla (i, j) de arrays de índices das caixas ligadas.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(centers_y) < 2:
+        return empty, empty
+    bands = _bands(centers_y, band_height)
+    keys, origin, stride = _band_keys(bands, x_min, x_max, margin)
+    order = np.argsort(keys, kind='stable')
+    sorted_bands = bands[order]
+    # Maior x_max acumulado dentro da faixa (a chave da faixa seguinte é sempre maior)
+    right_edges = sorted_bands * stride + (x_max[order] - origin)
+    running_max = np.maximum.accumulate(right_edges)
+    positions = np.arange(len(order))
+    holders = np.maximum.accumulate(np.where(right_edges == running_max, positions, 0))
+    linked = ((sorted_bands[1:] == sorted_bands[:-1])
+              & (keys[order][1:] <= running_max[:-1] + margin))
+    return order[1:][linked], order[holders[:-1][linked]]
+
+
+def _near_on_line(i: np.ndarray, j: np.ndarray, x_min: np.ndarray, x_max: np.ndarray, centers_y: np.ndarray,
+                  max_horizontal_distance: float, max_vertical_distance: float) -> np.ndarray:
+    """Mesma linha: sobreposição horizontal ou distância horizontal pequena."""
+    return ((np.abs(centers_y[j] - centers_y[i]) <= max_vertical_distance)
+            & (x_min[j] <= x_max[i] + max_horizontal_distance)
+            & (x_min[i] <= x_max[j] + max_horizontal_distance))
+
+
+def _aligned(i: np.ndarray, j: np.ndarray, x_min: np.ndarray, x_max: np.ndarray, centers_y: np.ndarray,
+             max_vertical_distance: float) -> np.ndarray:
+    """Linhas consecutivas: alinhamento vertical com pelo menos 30% de sobreposição."""
+    vertical_distance = np.abs(centers_y[j] - centers_y[i])
+    x_min_i, x_max_i, x_min_j, x_max_j = x_min[i], x_max[i], x_min[j], x_max[j]
+    overlap_width = np.minimum(x_max_i, x_max_j) - np.maximum(x_min_i, x_min_j)
+    min_width = np.minimum(x_max_i - x_min_i, x_max_j - x_min_j)
+    return ((vertical_distance > max_vertical_distance)
+            & (vertical_distance <= max_vertical_distance * CONSECUTIVE_LINE_FACTOR)
+            & (overlap_width > 0) & (overlap_width >= min_width * MIN_ALIGNMENT_OVERLAP))
+
+
+def proximity_edges(extents: np.ndarray, centers_y: np.ndarray, max_horizontal_distance: float,
+                    max_vertical_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Arestas do grafo de proximidade: pares na mesma linha e próximos na horizontal, ou em
+    linhas consecutivas com sobreposição horizontal suficiente. As arestas bastam para formar
+    as mesmas componentes conexas, sem listar todos os pares ligados.
+
+    Returns:
+        Tupla (i, j) de arrays de índices das caixas ligadas.
+    """
+    x_min, x_max = extents[:, 0], extents[:, 2]
+    count = len(centers_y)
+    if count <= ALL_PAIRS_MAX_BOXES:
+        i, j = np.triu_indices(count, 1)
+        linked = (_near_on_line(i, j, x_min, x_max, centers_y, max_horizontal_distance, max_vertical_distance)
+                  | _aligned(i, j, x_min, x_max, centers_y, max_vertical_distance))
+        return i[linked], j[linked]
+
+    # Mesma linha: dentro de uma faixa de altura max_vertical_distance basta a varredura em x;
+    # entre faixas vizinhas, os pares candidatos passam pelo critério completo
+    band_i, band_j = band_links(centers_y, x_min, x_max, max_vertical_distance, max_horizontal_distance)
+    i, j = candidate_pairs(centers_y, x_min, x_max, max_vertical_distance, max_horizontal_distance, same_band=False)
+    near = _near_on_line(i, j, x_min, x_max, centers_y, max_horizontal_distance, max_vertical_distance)
+    line_i, line_j = i[near], j[near]
+
+    # Linhas consecutivas: até CONSECUTIVE_LINE_FACTOR vezes a distância vertical, com sobreposição
+    i, j = candidate_pairs(centers_y, x_min, x_max, max_vertical_distance * CONSECUTIVE_LINE_FACTOR, 0.0)
+    aligned = _aligned(i, j, x_min, x_max, centers_y, max_vertical_distance)
+
+    return np.concatenate([band_i, line_i, i[aligned]]), np.concatenate([band_j, line_j, j[aligned]])
+
+
+def connected_components(count: int, edges_i: np.ndarray, edges_j: np.ndarray) -> np.ndarray:
+    """
+    Rótulo da componente conexa de cada nó, por union-find vetorizado: a cada rodada as
+    raízes das pontas de todas as arestas são unidas de uma vez (a maior aponta para a menor)
+    e os caminhos são comprimidos por salto de ponteiros. As arestas cujas pontas já estão na
+    mesma árvore saem da lista, que encolhe a cada rodada.
+
+    Returns:
+        Array com o rótulo (menor índice da componente) de cada nó.
+    """
+    parent = np.arange(count)
+    while len(edges_i):
+        roots_i, roots_j = parent[edges_i], parent[edges_j]
+        pending = roots_i != roots_j
+        if not pending.any():
+            break
+        edges_i, edges_j = edges_i[pending], edges_j[pending]
+        roots_i, roots_j = roots_i[pending], roots_j[pending]
+        # União: cada raiz aponta para uma raiz menor, então não se formam ciclos
+        parent[np.maximum(roots_i, roots_j)] = np.minimum(roots_i, roots_j)
+        # Compressão de caminhos: cada nó passa a apontar direto para a raiz
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+    return parent
+
+
+def group_boxes(extents: np.ndarray, centers_y: np.ndarray, max_distance_ratio: float = 0.15,
+                max_vertical_distance_ratio: float = 0.1) -> Tuple[List[List[int]], float, float]:
+    """
+    Agrupa as caixas próximas.
+
+    Args:
+        extents: Extremos das caixas (ver box_geometry).
+        centers_y: Centros verticais das caixas (ver box_geometry).
+        max_distance_ratio: Distância horizontal máxima como proporção da largura ocupada pelas caixas.
+        max_vertical_distance_ratio: Distância vertical máxima como proporção da altura ocupada pelas caixas.
+
+    Returns:
+        Tupla (grupos de índices de cima para baixo, distância horizontal máxima, distância vertical máxima).
+    """
+    # Largura e altura aproximadas da imagem baseadas nas caixas
+    img_width = extents[:, 2].max() - extents[:, 0].min()
+    img_height = extents[:, 3].max() - extents[:, 1].min()
+    max_horizontal_distance = max_distance_ratio * img_width
+    max_vertical_distance = max_vertical_distance_ratio * img_height
+
+    edges_i, edges_j = proximity_edges(extents, centers_y, max_horizontal_distance, max_vertical_distance)
+    labels = connected_components(len(extents), edges_i, edges_j)
+
+    # Grupos ordenados pelo topo da caixa mais alta (de cima para baixo)
+    order = np.lexsort((np.arange(len(extents)), extents[:, 1]))
+    labels = labels.tolist()
+    groups: Dict[int, List[int]] = {}
+    for index in order.tolist():
+        groups.setdefault(labels[index], []).append(index)
+    return list(groups.values()), float(max_horizontal_distance), float(max_vertical_distance)
+
+
+def merge_group(detections: List[Dict[str, Any]], extents: np.ndarray, centers_y: np.ndarray,
+                members: List[int], max_vertical_distance: float) -> Dict[str, Any]:
+    """
+    Mescla um grupo de detecções em uma única, com uma linha de texto por linha visual.
+
+    Returns:
+        Dicionário com 'text', 'bbox', 'confidence', 'is_grouped' e 'group_size'.
+    """
+    # Ordena por posição horizontal (x) e separa as linhas pela distância vertical entre vizinhos
+    members = sorted(members, key=lambda index: (extents[index, 0], index))
+    line_groups = [[members[0]]]
+    for previous, current in zip(members, members[1:]):
+        if abs(centers_y[current] - centers_y[previous]) <= max_vertical_distance:
+            line_groups[-1].append(current)
+        else:
+            line_groups.append([current])
+
+    combined_text = '\n'.join(' '.join(detections[index]['text'] for index in line) for line in line_groups)
+    avg_confidence = sum(detections[index]['confidence'] for index in members) / len(members)
+    min_x, min_y = extents[members, 0].min(), extents[members, 1].min()
+    max_x, max_y = extents[members, 2].max(), extents[members, 3].max()
+
+    return {
+        'text': combined_text,
+        # Coordenadas em int padrão para evitar problemas de serialização com int32
+        'bbox': [[int(min_x), int(min_y)], [int(max_x), int(min_y)], [int(max_x), int(max_y)], [int(min_x), int(max_y)]],
+        'confidence': avg_confidence,
+        'is_grouped': True,
+        'group_size': len(members)
+    }
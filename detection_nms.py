@@ -0,0 +1,158 @@
+# detection_nms.py
+
+"""
+Supressão de detecções duplicadas entre variantes e passadas de OCR.
+
+O OCR melhorado junta as detecções de várias variantes de pré-processamento, e o mesmo
+texto aparece várias vezes em posições quase iguais. A remoção antiga comparava cada
+detecção com todas as já aceitas (O(N²)), calculando centros com math.sqrt a cada par.
+Aqui a supressão é um NMS (non-maximum suppression):
+
+- as detecções são processadas da maior para a menor confiança;
+- as caixas aceitas ficam em um índice espacial em grade, e cada detecção só é comparada
+  com as caixas das células que ela ocupa;
+- a geometria (IoU e distância entre centros) é calculada com NumPy para todos os
+  candidatos de uma vez;
+- uma detecção é duplicata de uma caixa aceita se as caixas se sobrepõem (IoU mínimo ou
+  centros próximos) e os textos normalizados são semelhantes.
+"""
+
+import os
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import chain
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Configurações via variáveis de ambiente
+# IoU mínimo para duas caixas serem consideradas a mesma região
+OCR_NMS_IOU_THRESHOLD = float(os.getenv('OCR_NMS_IOU_THRESHOLD', '0.5'))
+# Distância máxima (px) entre centros para duas caixas serem a mesma região, mesmo com IoU baixo
+OCR_NMS_CENTER_DISTANCE = float(os.getenv('OCR_NMS_CENTER_DISTANCE', '20'))
+# Semelhança mínima entre os textos normalizados (0 a 1)
+OCR_NMS_TEXT_SIMILARITY = float(os.getenv('OCR_NMS_TEXT_SIMILARITY', '0.8'))
+
+# Tamanho mínimo (px) das células da grade
+MIN_CELL_SIZE = 8
+
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Texto em minúsculas, sem espaços nem pontuação."""
+    return _NON_WORD.sub('', text.lower())
+
+
+def text_similarity(a: str, b: str) -> float:
+    """
+    Semelhança entre dois textos normalizados: 1.0 se um contém o outro, senão a razão do difflib.
+    """
+    if not a or not b:
+        return 0.0
+    if a in b or b in a:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _box_geometry(detections: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Extremos (N, 4) e centros (N, 2) das caixas das detecções."""
+    coordinates = chain.from_iterable(chain.from_iterable(d['bbox'] for d in detections))
+    boxes = np.fromiter(coordinates, dtype=np.float64, count=len(detections) * 8).reshape(len(detections), 4, 2)
+    extents = np.concatenate([boxes.min(axis=1), boxes.max(axis=1)], axis=1)
+    return extents, boxes.mean(axis=1)
+
+
+def box_iou(box: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """
+    IoU entre uma caixa e várias outras.
+
+    Args:
+        box: Extremos (4,) x_min, y_min, x_max, y_max.
+        others: Extremos (M, 4).
+
+    Returns:
+        Array (M,) com o IoU de cada par.
+    """
+    width = np.clip(np.minimum(box[2], others[:, 2]) - np.maximum(box[0], others[:, 0]), 0, None)
+    height = np.clip(np.minimum(box[3], others[:, 3]) - np.maximum(box[1], others[:, 1]), 0, None)
+    intersection = width * height
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    other_areas = (others[:, 2] - others[:, 0]) * (others[:, 3] - others[:, 1])
+    union = area + other_areas - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+class GridIndex:
+    """
+    Índice espacial em grade: cada caixa é registrada em todas as células que ocupa.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = max(float(cell_size), 1.0)
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+    def _cell_range(self, extent) -> Tuple[range, range]:
+        x1, y1, x2, y2 = (int(v // self.cell_size) for v in extent)
+        return range(x1, x2 + 1), range(y1, y2 + 1)
+
+    def insert(self, index: int, extent) -> None:
+        """Registra a caixa (x_min, y_min, x_max, y_max) com o índice informado."""
+        columns, rows = self._cell_range(extent)
+        for column in columns:
+            for row in rows:
+                self._cells[(column, row)].append(index)
+
+    def query(self, extent) -> List[int]:
+        """Índices das caixas registradas nas células que a caixa ocupa (sem repetição)."""
+        columns, rows = self._cell_range(extent)
+        found = set()
+        for column in columns:
+            for row in rows:
+                found.update(self._cells.get((column, row), ()))
+        return sorted(found)
+
+
+def suppress_duplicates(detections: List[Dict[str, Any]], iou_threshold: float = OCR_NMS_IOU_THRESHOLD,
+                        center_distance: float = OCR_NMS_CENTER_DISTANCE,
+                        similarity_threshold: float = OCR_NMS_TEXT_SIMILARITY) -> List[Dict[str, Any]]:
+    """
+    Remove as detecções duplicadas, mantendo a de maior confiança de cada região/texto.
+
+    Args:
+        detections: Lista de dicionários com 'text', 'bbox' e 'confidence' (demais chaves são preservadas).
+        iou_threshold: IoU mínimo para duas caixas serem a mesma região.
+        center_distance: Distância máxima entre centros para duas caixas serem a mesma região.
+        similarity_threshold: Semelhança mínima entre os textos normalizados.
+
+    Returns:
+        Detecções mantidas, na ordem original.
+    """
+    if len(detections) < 2:
+        return list(detections)
+
+    extents, centers = _box_geometry(detections)
+    texts = [normalize_text(d['text']) for d in detections]
+
+    # Células do tamanho típico das caixas; as caixas aceitas são registradas com a margem
+    # da distância entre centros, para que vizinhas próximas caiam em células em comum
+    sizes = np.maximum(extents[:, 2] - extents[:, 0], extents[:, 3] - extents[:, 1])
+    index = GridIndex(max(float(np.median(sizes)), MIN_CELL_SIZE))
+    margin = np.array([-center_distance, -center_distance, center_distance, center_distance]) / 2
+
+    order = sorted(range(len(detections)), key=lambda i: (-detections[i]['confidence'], i))
+    kept: List[int] = []
+    for i in order:
+        candidates = index.query(extents[i] + margin)
+        if candidates:
+            candidates = np.asarray(candidates)
+            same_region = (box_iou(extents[i], extents[candidates]) >= iou_threshold) | (
+                np.hypot(*(centers[candidates] - centers[i]).T) < center_distance)
+            if any(text_similarity(texts[i], texts[j]) >= similarity_threshold
+                   for j in candidates[same_region].tolist()):
+                continue
+        kept.append(i)
+        index.insert(i, extents[i] + margin)
+
+    return [detections[i] for i in sorted(kept)]
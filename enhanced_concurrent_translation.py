@@ -23,7 +23,8 @@ try:
     from concurrent_translation_module import (
         translate_text_concurrent,
         ConcurrentTranslationManager,
-        TranslationResult
+        TranslationResult,
+        hedged_stats
     )
     from concurrent_config import get_current_config, ConfigManager
     from enhanced_translation_module import (
@@ -373,10 +374,8 @@ class EnhancedConcurrentTranslator:
             try:
                 # Tentar tradução em lote com deep-translator
                 if translate_multiple_texts:
-                    loop = asyncio.get_event_loop()
-                    batch_results = await loop.run_in_executor(
-                        None, translate_multiple_texts, texts, source_lang, target_lang
-                    )
+                    # translate_multiple_texts é uma corrotina; as chamadas de rede já rodam fora do event loop
+                    batch_results = await translate_multiple_texts(texts, target_lang, source_lang)
                     
                     # Converter para EnhancedTranslationResult
                     results = []
@@ -429,6 +428,10 @@ class EnhancedConcurrentTranslator:
             'configuration': config_info,
             'enhanced_module': enhanced_stats,
             'deep_translator': deep_stats,
+            'hedging': {
+                'request_mode': config_info.get('request_mode'),
+                **hedged_stats.get_stats()
+            },
             'system_health': {
                 'total_errors': self.stats['error_count'],
                 'error_rate': self.stats['error_count'] / max(self.stats['total_translations'], 1),
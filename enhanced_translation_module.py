@@ -13,6 +13,7 @@ from deep_translator_integration import (
     translate_with_deep_translator,
     translate_batch_with_deep_translator,
     get_enhanced_translator_list,
+    get_ranked_translator_list,
     is_deep_translator,
     ENABLE_DEEP_TRANSLATOR
 )
@@ -23,8 +24,11 @@ from translation_module import (
     OCR_CORRECTIONS,
     correct_ocr_errors,
     translate_game_terms,
-    is_mostly_portuguese
+    language_identifier
 )
+from translation_stage import translation_stage
+from http_translators import http_translators
+from word_fallback import word_fallback
 
 async def enhanced_translate_text(text: str, target_lang: str = 'pt', source_lang: str = 'auto') -> str:
     """
@@ -74,9 +78,9 @@ async def enhanced_translate_text(text: str, target_lang: str = 'pt', source_lan
         if corrected_text != text:
             print(f"Módulo de Tradução Aprimorado: Texto após correção OCR: '{corrected_text}'")
         
-        # Etapa 2: Verificar se já está em português
-        if target_lang in ['pt', 'pt-br'] and is_mostly_portuguese(corrected_text):
-            print(f"Módulo de Tradução Aprimorado: Texto já parece estar em português, retornando sem traduzir.")
+        # Etapa 2: Verificar se já está no idioma de destino
+        if language_identifier.is_language(corrected_text, target_lang):
+            print(f"Módulo de Tradução Aprimorado: Texto já parece estar no idioma de destino ('{target_lang}'), retornando sem traduzir.")
             return corrected_text
         
         # Etapa 3: Traduzir termos específicos de jogos primeiro
@@ -85,7 +89,8 @@ async def enhanced_translate_text(text: str, target_lang: str = 'pt', source_lan
             print(f"Módulo de Tradução Aprimorado: Texto após tradução de termos de jogos: '{game_translated}'")
         
         # Etapa 4: Traduzir usando sistema aprimorado com deep-translator
-        translators_to_try = get_enhanced_translator_list()
+        # Tradutores ordenados pela saúde atual; os com circuito aberto ficam de fora
+        translators_to_try = get_ranked_translator_list()
         
         print(f"Módulo de Tradução Aprimorado: Tradutores disponíveis: {translators_to_try}")
         
@@ -97,22 +102,14 @@ async def enhanced_translate_text(text: str, target_lang: str = 'pt', source_lan
             try:
                 print(f"Módulo de Tradução Aprimorado: Tentando tradutor: {translator}")
                 
-                if is_deep_translator(translator):
-                    # Usar deep-translator
-                    final_translated = translate_with_deep_translator(
-                        game_translated, translator, source_lang, target_lang
-                    )
-                else:
-                    # Usar biblioteca translators original
-                    final_translated = ts.translate_text(
-                        game_translated,
-                        translator=translator,
-                        from_language=source_lang,
-                        to_language=target_lang
-                    )
+                # As chamadas de rede rodam fora do event loop, sob os limites da etapa de tradução
+                final_translated = await call_translator(game_translated, translator, source_lang, target_lang)
                 
                 if final_translated:
                     print(f"Módulo de Tradução Aprimorado: Tradução bem-sucedida com {translator}")
+                    # Textos de uma palavra alimentam a memória da tradução palavra por palavra
+                    if len(game_translated.split()) == 1:
+                        word_fallback.remember(game_translated.strip(), final_translated.strip(), source_lang, target_lang)
                     break  # Se a tradução for bem-sucedida, sair do loop
                     
             except Exception as e:
@@ -140,10 +137,44 @@ async def enhanced_translate_text(text: str, target_lang: str = 'pt', source_lan
         print(f"Erro no módulo de tradução aprimorado: {e}")
         return f"Erro ao traduzir: {e}"
 
+async def call_translator(text: str, translator: str, source_lang: str, target_lang: str) -> Optional[str]:
+    """
+    Chama um tradutor (adaptador HTTP assíncrono, deep-translator ou biblioteca translators)
+    sem bloquear o event loop, sob os limites e o registro de saúde da etapa de tradução.
+    
+    Args:
+        text: Texto para traduzir
+        translator: Nome do tradutor
+        source_lang: Idioma de origem
+        target_lang: Idioma de destino
+        
+    Returns:
+        Texto traduzido (None ou vazio em caso de falha)
+    """
+    # Provedores com adaptador HTTP assíncrono não ocupam threads do pool
+    if http_translators.supports(translator):
+        return await translation_stage.call_provider(
+            translator, http_translators.translate,
+            text, translator, source_lang, target_lang
+        )
+    if is_deep_translator(translator):
+        return await translation_stage.call_provider(
+            translator, translate_with_deep_translator,
+            text, translator, source_lang, target_lang
+        )
+    return await translation_stage.call_provider(
+        translator, ts.translate_text,
+        text,
+        translator=translator,
+        from_language=source_lang,
+        to_language=target_lang
+    )
+
 async def translate_word_by_word(text: str, translators_to_try: List[str], 
                                source_lang: str, target_lang: str) -> Optional[str]:
     """
-    Traduz texto palavra por palavra usando múltiplos tradutores.
+    Traduz texto palavra por palavra: resolve as palavras pelo dicionário de termos de jogos e
+    pela memória de palavras e envia as restantes em uma única requisição com prazo.
     
     Args:
         text: Texto para traduzir
@@ -154,43 +185,9 @@ async def translate_word_by_word(text: str, translators_to_try: List[str],
     Returns:
         Texto traduzido ou None se falhar
     """
-    words = text.split()
-    translated_words = []
-    
-    for word in words:
-        if len(word) <= 2:  # Palavras muito curtas
-            translated_words.append(word)
-            continue
-            
-        # Tentar cada tradutor para cada palavra
-        word_translated = None
-        for translator in translators_to_try:
-            try:
-                if is_deep_translator(translator):
-                    word_translated = translate_with_deep_translator(
-                        word, translator, source_lang, target_lang
-                    )
-                else:
-                    word_translated = ts.translate_text(
-                        word,
-                        translator=translator,
-                        from_language=source_lang,
-                        to_language=target_lang
-                    )
-                
-                if word_translated:
-                    break  # Se a tradução for bem-sucedida, sair do loop
-                    
-            except:
-                continue  # Tentar o próximo tradutor
-        
-        # Se todos os tradutores falharem para esta palavra, manter a palavra original
-        if word_translated:
-            translated_words.append(word_translated)
-        else:
-            translated_words.append(word)
-    
-    result = ' '.join(translated_words)
+    result = await word_fallback.translate(
+        text, get_ranked_translator_list(translators_to_try), source_lang, target_lang, call_translator
+    )
     print(f"Módulo de Tradução Aprimorado: Tradução palavra por palavra concluída")
     return result
 
@@ -214,7 +211,7 @@ async def translate_multiple_texts(texts: List[str], target_lang: str = 'pt',
     
     # Se deep-translator estiver habilitado, tentar tradução em lote primeiro
     if ENABLE_DEEP_TRANSLATOR:
-        translators_to_try = get_enhanced_translator_list()
+        translators_to_try = get_ranked_translator_list()
         
         for translator in translators_to_try:
             if is_deep_translator(translator):
@@ -227,11 +224,13 @@ async def translate_multiple_texts(texts: List[str], target_lang: str = 'pt',
                         processed_texts.append(game_translated)
                     
                     # Tentar tradução em lote
-                    results = translate_batch_with_deep_translator(
+                    results = await translation_stage.call_provider(
+                        translator, translate_batch_with_deep_translator,
                         processed_texts, translator, source_lang, target_lang
                     )
                     
-                    if results and len(results) == len(texts):
+                    # Em caso de erro a integração devolve a própria lista de entrada
+                    if results and results is not processed_texts and len(results) == len(texts):
                         print(f"Módulo de Tradução Aprimorado: Tradução em lote bem-sucedida com {translator}")
                         return results
                         
@@ -268,7 +267,8 @@ def get_translation_statistics() -> dict:
             'Deep-Translator Integration',
             'Batch Translation',
             'Word-by-Word Fallback'
-        ]
+        ],
+        'word_fallback': word_fallback.get_stats()
     }
     
     return stats
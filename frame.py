@@ -0,0 +1,120 @@
+# frame.py
+
+"""
+Quadro (captura de tela) decodificado uma única vez por requisição.
+
+A mesma captura era decodificada várias vezes ao longo do pipeline: em
+process_ai_request só para ler as dimensões, de novo em extract_text_with_positions e
+mais duas vezes com PIL em save_debug_images. O Frame guarda os bytes recebidos, o
+array BGR decodificado e as dimensões, e calcula sob demanda (uma vez) as visões
+derivadas usadas pelas etapas seguintes: escala de cinza, versões reduzidas, hash do
+conteúdo e hash perceptual.
+
+O array BGR é marcado como somente leitura para que as etapas possam compartilhá-lo
+sem cópias defensivas.
+"""
+
+import hashlib
+import threading
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+
+class Frame:
+    """
+    Captura decodificada e suas visões derivadas, compartilhadas entre as etapas do pipeline.
+    """
+
+    def __init__(self, image: np.ndarray, data: bytes = None):
+        """
+        Inicializa o quadro a partir de uma imagem já decodificada.
+
+        Args:
+            image: Imagem BGR.
+            data: Bytes codificados (PNG/JPEG) que originaram a imagem, se disponíveis.
+        """
+        if image.flags.writeable:
+            image.setflags(write=False)
+        self.bgr = image
+        self.data = data
+        self.height, self.width = image.shape[:2]
+        self._gray = None
+        self._content_hash = None
+        self._downscaled: Dict[int, np.ndarray] = {}
+        self._perceptual_hashes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional['Frame']:
+        """
+        Decodifica os bytes da imagem (np.frombuffer não copia os bytes).
+
+        Returns:
+            Frame, ou None se os bytes não forem uma imagem válida.
+        """
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        return cls(image, data)
+
+    @property
+    def size(self):
+        """Dimensões (largura, altura)."""
+        return self.width, self.height
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Versão em escala de cinza, calculada na primeira consulta."""
+        with self._lock:
+            if self._gray is None:
+                self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+                self._gray.setflags(write=False)
+            return self._gray
+
+    def downscaled_gray(self, max_side: int) -> np.ndarray:
+        """
+        Versão em escala de cinza reduzida para que o maior lado tenha no máximo max_side pixels.
+
+        Args:
+            max_side: Tamanho máximo do maior lado.
+
+        Returns:
+            Imagem reduzida (ou a própria escala de cinza, se já for menor).
+        """
+        gray = self.gray
+        with self._lock:
+            view = self._downscaled.get(max_side)
+            if view is None:
+                scale = max_side / float(max(self.width, self.height))
+                view = gray
+                if scale < 1.0:
+                    view = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                    view.setflags(write=False)
+                self._downscaled[max_side] = view
+            return view
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 dos bytes recebidos (ou do array, se o quadro não veio de bytes)."""
+        with self._lock:
+            if self._content_hash is None:
+                source = self.data if self.data is not None else self.bgr.tobytes()
+                self._content_hash = hashlib.sha256(source).hexdigest()
+            return self._content_hash
+
+    def perceptual_hash(self, method: str = None) -> int:
+        """
+        Hash perceptual do quadro, calculado sobre a escala de cinza compartilhada.
+
+        Args:
+            method: 'dhash' ou 'phash' (padrão: OCR_PHASH_METHOD).
+        """
+        # Importação tardia: perceptual_hash depende do gerenciador do banco de dados
+        from perceptual_hash import OCR_PHASH_METHOD, compute_image_phash
+
+        method = method or OCR_PHASH_METHOD
+        if method not in self._perceptual_hashes:
+            self._perceptual_hashes[method] = compute_image_phash(self.gray, method)
+        return self._perceptual_hashes[method]
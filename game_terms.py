@@ -0,0 +1,285 @@
+# game_terms.py
+
+"""
+Motor de tradução de termos de jogos compilado uma única vez.
+
+A versão antiga de translate_game_terms ordenava o dicionário inteiro a cada chamada e
+executava um re.sub por termo (cerca de 200 buscas por texto, em duas passadas). Aqui o
+dicionário é compilado na carga em duas expressões regulares de alternação (termos
+compostos e termos individuais), ordenadas do termo mais longo para o mais curto, e cada
+passada substitui todos os termos em uma única varredura, com uma tabela de tradução
+indexada pelo grupo que casou. As alternativas são agrupadas pelo primeiro caractere, de
+modo que em cada posição do texto só os termos que começam com a letra atual são testados.
+
+A saída é idêntica à da substituição termo a termo. Na compilação são identificados os
+poucos termos em que a ordem importa (um termo menos prioritário que se sobrepõe
+parcialmente ao início de um mais prioritário, ou uma tradução que pode formar outro
+termo da mesma passada); quando um deles aparece no texto junto com o termo com que
+conflita, a passada é feita termo a termo com os padrões pré-compilados.
+
+O dicionário pode ser estendido por um arquivo JSON externo (GAME_TERMS_FILE), recarregado
+sem reiniciar o servidor quando o arquivo muda.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configurações via variáveis de ambiente
+# Arquivo JSON com termos adicionais: {"en": {"TERMO": "Tradução"}} ou {"TERMO": "Tradução"}
+GAME_TERMS_FILE = os.getenv('GAME_TERMS_FILE', '')
+# Intervalo mínimo (segundos) entre verificações de alteração do arquivo
+GAME_TERMS_RELOAD_INTERVAL = float(os.getenv('GAME_TERMS_RELOAD_INTERVAL', '5'))
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def _is_boundary(text: str, position: int) -> bool:
+    """Indica se há fronteira de palavra (\\b) na posição do texto."""
+    before = position > 0 and bool(_WORD_CHAR.match(text[position - 1]))
+    after = position < len(text) and bool(_WORD_CHAR.match(text[position]))
+    return before != after
+
+
+class TermReplacer:
+    """
+    Substituição de termos inteiros (\\b...\\b, sem diferenciar maiúsculas) compilada em uma
+    única expressão, com o mesmo resultado de aplicar um re.sub por termo na ordem informada.
+    """
+
+    def __init__(self, items: List[Tuple[str, str]]):
+        """
+        Compila os termos.
+
+        Args:
+            items: Pares (termo, substituição) em ordem de prioridade.
+        """
+        self.items = list(items)
+        self.translations = [translation for _, translation in self.items]
+        self.patterns = [re.compile(r'\b' + re.escape(term) + r'\b', re.IGNORECASE) for term, _ in self.items]
+        # Grupo de captura da expressão -> índice do termo
+        self.group_terms: List[int] = []
+        self.regex = self._compile_alternation() if self.items else None
+        self.group_translations = [self.translations[index] for index in self.group_terms]
+        # termo -> termos que, presentes no mesmo texto, exigem a substituição termo a termo
+        self.conflicts: Dict[int, List[int]] = self._find_conflicts()
+
+    def _compile_alternation(self):
+        terms = [term for term, _ in self.items]
+        groups: Dict[str, List[int]] = {}
+        if all(term and term[0].isascii() for term in terms):
+            # Alternativas agrupadas pelo primeiro caractere, atrás de uma verificação antecipada:
+            # em cada posição só o grupo da letra atual é testado. Termos de grupos diferentes não
+            # casam na mesma posição, então a prioridade entre os que podem casar é preservada
+            for index, term in enumerate(terms):
+                groups.setdefault(term[0].lower(), []).append(index)
+        else:
+            groups[''] = list(range(len(terms)))
+
+        branches = []
+        for first, indices in groups.items():
+            self.group_terms.extend(indices)
+            alternation = '|'.join('(' + re.escape(terms[index]) + ')' for index in indices)
+            branches.append(('(?=' + re.escape(first) + ')' if first else '') + '(?:' + alternation + ')')
+        return re.compile(r'\b(?:' + '|'.join(branches) + r')\b', re.IGNORECASE)
+
+    def _find_conflicts(self) -> Dict[int, List[int]]:
+        lowered = [term.lower() for term, _ in self.items]
+        conflicts: Dict[int, set] = {}
+
+        # Um termo de menor prioridade (j) que começa antes de um de maior prioridade (i) e
+        # se sobrepõe ao início dele (ou o contém): a varredura única escolheria o mais à esquerda
+        prefixes: Dict[str, List[int]] = {}
+        for i, term in enumerate(lowered):
+            for k in range(1, len(term)):
+                prefixes.setdefault(term[:k], []).append(i)
+        for j, term in enumerate(lowered):
+            for k in range(1, len(term)):
+                # O termo de maior prioridade só pode começar numa fronteira de palavra
+                if not _is_boundary(term, k):
+                    continue
+                contained = (i for i in range(j) if term.startswith(lowered[i], k))
+                for i in chain(prefixes.get(term[k:], ()), contained):
+                    if i < j:
+                        conflicts.setdefault(j, set()).add(i)
+                        conflicts.setdefault(i, set()).add(j)
+
+        # Traduções que mudam a fronteira de palavra nas pontas (ou usam escapes de re.sub) alteram
+        # o que os outros termos encontram ao redor delas: sempre termo a termo
+        for i, ((term, _), translation) in enumerate(zip(self.items, self.translations)):
+            if '\\' in translation or not translation or \
+                    bool(_WORD_CHAR.match(term[0])) != bool(_WORD_CHAR.match(translation[0])) or \
+                    bool(_WORD_CHAR.match(term[-1])) != bool(_WORD_CHAR.match(translation[-1])):
+                conflicts.setdefault(i, set()).add(i)
+
+        # Uma tradução que forma (sozinha ou com o texto vizinho) um termo de menor prioridade
+        # da mesma passada seria traduzida de novo na substituição termo a termo, mesmo que esse
+        # termo não estivesse no texto original
+        for i, translation in enumerate(self.translations):
+            lowered_translation = translation.lower()
+            for j in range(i + 1, len(lowered)):
+                if self.patterns[j].search(translation) or \
+                        self._may_straddle(lowered[i], lowered_translation, lowered[j]):
+                    conflicts.setdefault(i, set()).add(i)
+                    break
+        return {i: sorted(partners) for i, partners in conflicts.items()}
+
+    @staticmethod
+    def _may_straddle(original: str, translation: str, term: str) -> bool:
+        """
+        O termo pode começar dentro da tradução e terminar depois dela (ou o contrário),
+        respeitando as fronteiras de palavra que o termo original exigia ao redor dele.
+        """
+        for k in range(1, len(term)):
+            head, tail = term[:k], term[k:]
+            if translation.endswith(head) and _is_boundary(translation, len(translation) - k) \
+                    and _is_boundary(original + tail, len(original)):
+                return True
+            if translation.startswith(tail) and _is_boundary(translation, len(tail)) \
+                    and _is_boundary(head + original, len(head)):
+                return True
+        return False
+
+    def apply(self, text: str) -> Tuple[str, bool]:
+        """
+        Substitui os termos no texto.
+
+        Returns:
+            Tupla (texto, True se foi preciso substituir termo a termo).
+        """
+        if self.regex is None:
+            return text, False
+        matches = list(self.regex.finditer(text))
+        if not matches:
+            return text, False
+
+        group_terms = self.group_terms
+        matched = {group_terms[match.lastindex - 1] for match in matches}
+        for index in matched:
+            if any(self.patterns[partner].search(text) for partner in self.conflicts.get(index, ())):
+                return self.apply_sequential(text), True
+
+        translations = self.group_translations
+        return self.regex.sub(lambda match: translations[match.lastindex - 1], text), False
+
+    def apply_sequential(self, text: str) -> str:
+        """Substituição termo a termo, na ordem de prioridade (comportamento antigo)."""
+        for pattern, translation in zip(self.patterns, self.translations):
+            text = pattern.sub(translation, text)
+        return text
+
+
+class GameTermEngine:
+    """
+    Traduz termos de jogos com as expressões compiladas do dicionário, recarregando o
+    arquivo externo de termos quando ele muda.
+    """
+
+    def __init__(self, terms: Dict[str, str], terms_file: str = GAME_TERMS_FILE,
+                 reload_interval: float = GAME_TERMS_RELOAD_INTERVAL, language: str = 'en'):
+        """
+        Inicializa o motor e compila o dicionário.
+
+        Args:
+            terms: Dicionário embutido termo -> tradução.
+            terms_file: Arquivo JSON com termos adicionais (vazio para nenhum).
+            reload_interval: Intervalo mínimo entre verificações de alteração do arquivo.
+            language: Idioma de origem dos termos no arquivo externo.
+        """
+        self.base_terms = terms
+        self.terms_file = terms_file
+        self.reload_interval = reload_interval
+        self.language = language
+        self._lock = threading.Lock()
+        self._file_mtime: Optional[float] = None
+        self._last_check = 0.0
+        self.stats = {'reloads': 0, 'reload_errors': 0, 'translations': 0, 'sequential_fallbacks': 0}
+        self._phases: Tuple[TermReplacer, TermReplacer] = self._compile(terms)
+        self.reload()
+
+    @staticmethod
+    def _compile(terms: Dict[str, str]) -> Tuple[TermReplacer, TermReplacer]:
+        # Mesma prioridade da versão termo a termo: mais longo primeiro, empates na ordem do dicionário
+        items = sorted(terms.items(), key=lambda item: len(item[0]), reverse=True)
+        compound = [(term, translation) for term, translation in items if len(term.split()) > 1]
+        single = [(term, translation) for term, translation in items if len(term.split()) == 1]
+        return TermReplacer(compound), TermReplacer(single)
+
+    def _load_file(self) -> Dict[str, str]:
+        with open(self.terms_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data.get(self.language), dict):
+            data = data[self.language]
+        return {str(term): str(translation) for term, translation in data.items()}
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Recompila o dicionário se o arquivo externo mudou (ou sempre, com force=True).
+
+        Returns:
+            True se o dicionário foi recompilado.
+        """
+        if not self.terms_file and not force:
+            return False
+        with self._lock:
+            terms = dict(self.base_terms)
+            mtime = None
+            if self.terms_file:
+                try:
+                    mtime = os.path.getmtime(self.terms_file)
+                    if mtime == self._file_mtime and not force:
+                        return False
+                    terms.update(self._load_file())
+                except (OSError, ValueError, AttributeError) as e:
+                    self.stats['reload_errors'] += 1
+                    print(f"Termos de Jogos: Não foi possível carregar '{self.terms_file}': {e}")
+                    if not force:
+                        return False
+            self._phases = self._compile(terms)
+            self._file_mtime = mtime
+            self.stats['reloads'] += 1
+        print(f"Termos de Jogos: Dicionário compilado com {len(terms)} termos.")
+        return True
+
+    def _maybe_reload(self) -> None:
+        if not self.terms_file:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+        self.reload()
+
+    def translate(self, text: str) -> str:
+        """
+        Traduz os termos de jogos do texto: primeiro os termos compostos, depois os individuais.
+
+        Args:
+            text: Texto em inglês.
+
+        Returns:
+            Texto com os termos do dicionário traduzidos.
+        """
+        self._maybe_reload()
+        compound, single = self._phases
+        translated, fallback_compound = compound.apply(text)
+        translated, fallback_single = single.apply(translated)
+        self.stats['translations'] += 1
+        if fallback_compound or fallback_single:
+            self.stats['sequential_fallbacks'] += 1
+        return translated
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna o tamanho do dicionário compilado e os contadores do motor."""
+        compound, single = self._phases
+        return {
+            'terms': len(compound.items) + len(single.items),
+            'compound_terms': len(compound.items),
+            'conflicting_terms': len(compound.conflicts) + len(single.conflicts),
+            'terms_file': self.terms_file or None,
+            **self.stats
+        }
@@ -0,0 +1,257 @@
+# http_translators.py
+
+"""
+Tradutores assíncronos sobre uma sessão aiohttp compartilhada.
+
+As bibliotecas deep_translator e translators fazem chamadas de rede bloqueantes, então cada
+tradução ocupava uma thread de um pool (no sistema concorrente, ThreadPoolExecutor com
+MAX_CONCURRENT_REQUESTS = 3 threads, o que limitava o servidor inteiro a 3 traduções em
+andamento). Aqui os provedores que têm endpoint HTTP público (Google e MyMemory) são chamados
+diretamente com aiohttp, sem threads: uma única sessão com conexões keep-alive reaproveitadas,
+limite total e por host de conexões e cache de DNS, criada sob demanda no event loop em uso.
+
+Os nomes já usados na configuração (google, deep_google, deep_mymemory) são encaminhados aos
+adaptadores quando ASYNC_HTTP_TRANSLATORS está ativo; os demais tradutores continuam nas
+bibliotecas originais. O aiohttp fala HTTP/1.1: o ganho vem do keep-alive e do pool de conexões.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+# Configurações via variáveis de ambiente
+# Encaminha os tradutores com endpoint HTTP público para os adaptadores assíncronos
+ASYNC_HTTP_TRANSLATORS = os.getenv('ASYNC_HTTP_TRANSLATORS', 'true').lower() == 'true'
+# Conexões simultâneas da sessão, somando todos os hosts
+HTTP_TRANSLATOR_MAX_CONNECTIONS = int(os.getenv('HTTP_TRANSLATOR_MAX_CONNECTIONS', '100'))
+# Conexões simultâneas por host
+HTTP_TRANSLATOR_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_TRANSLATOR_CONNECTIONS_PER_HOST', '10'))
+# Segundos que os endereços resolvidos ficam no cache de DNS
+HTTP_TRANSLATOR_DNS_TTL = int(os.getenv('HTTP_TRANSLATOR_DNS_TTL', '300'))
+# Segundos que uma conexão ociosa fica aberta para reaproveitamento
+HTTP_TRANSLATOR_KEEPALIVE = float(os.getenv('HTTP_TRANSLATOR_KEEPALIVE', '30'))
+# Prazo total (segundos) de cada requisição
+HTTP_TRANSLATOR_TIMEOUT = float(os.getenv('HTTP_TRANSLATOR_TIMEOUT', '8'))
+
+USER_AGENT = 'Mozilla/5.0 (RetroTranslatorPy)'
+
+
+class HttpTranslatorError(Exception):
+    """Resposta inválida ou com erro de um tradutor HTTP."""
+
+
+def _language(code: str) -> str:
+    """Normaliza o código de idioma (pt-br -> pt, zh-cn -> zh-CN)."""
+    code = (code or 'auto').strip()
+    lowered = code.lower()
+    if lowered in ('pt-br', 'pt_br'):
+        return 'pt'
+    if lowered in ('zh-cn', 'zh-tw'):
+        return 'zh-' + lowered[3:].upper()
+    return lowered
+
+
+class HttpTranslator:
+    """
+    Adaptador de um provedor: monta a requisição GET e extrai a tradução da resposta JSON.
+    """
+
+    name = ''
+    default_base_url = ''
+
+    def __init__(self, base_url: str = None):
+        """
+        Inicializa o adaptador.
+
+        Args:
+            base_url: URL do endpoint (padrão: endpoint público do provedor).
+        """
+        self.base_url = base_url or self.default_base_url
+
+    def build_params(self, text: str, source_lang: str, target_lang: str) -> Dict[str, str]:
+        """Parâmetros da query string da requisição."""
+        raise NotImplementedError
+
+    def parse(self, payload: Any) -> str:
+        """Extrai o texto traduzido da resposta JSON."""
+        raise NotImplementedError
+
+
+class GoogleHttpTranslator(HttpTranslator):
+    """Endpoint público do Google Tradutor (client=gtx)."""
+
+    name = 'google'
+    default_base_url = 'https://translate.googleapis.com/translate_a/single'
+
+    def build_params(self, text: str, source_lang: str, target_lang: str) -> Dict[str, str]:
+        return {'client': 'gtx', 'sl': _language(source_lang), 'tl': _language(target_lang), 'dt': 't', 'q': text}
+
+    def parse(self, payload: Any) -> str:
+        # [[["tradução", "original", ...], ...], ...]: um segmento por frase ou linha
+        try:
+            return ''.join(segment[0] for segment in payload[0] if segment and segment[0])
+        except (TypeError, IndexError, KeyError) as e:
+            raise HttpTranslatorError(f"Resposta inesperada do Google: {e}")
+
+
+class MyMemoryHttpTranslator(HttpTranslator):
+    """API pública do MyMemory."""
+
+    name = 'mymemory'
+    default_base_url = 'https://api.mymemory.translated.net/get'
+
+    def build_params(self, text: str, source_lang: str, target_lang: str) -> Dict[str, str]:
+        # O MyMemory não detecta o idioma de origem: os textos dos jogos são em inglês na maioria
+        source = _language(source_lang)
+        source = 'en' if source == 'auto' else source
+        return {'q': text, 'langpair': f"{source}|{_language(target_lang)}"}
+
+    def parse(self, payload: Any) -> str:
+        try:
+            if int(payload.get('responseStatus', 200)) != 200:
+                raise HttpTranslatorError(f"MyMemory: {payload.get('responseDetails')}")
+            return payload['responseData']['translatedText'] or ''
+        except (AttributeError, TypeError, KeyError, ValueError) as e:
+            raise HttpTranslatorError(f"Resposta inesperada do MyMemory: {e}")
+
+
+# Nomes de tradutores da configuração -> adaptador
+DEFAULT_ALIASES = {
+    'google': 'google',
+    'deep_google': 'google',
+    'mymemory': 'mymemory',
+    'deep_mymemory': 'mymemory',
+}
+
+
+class HttpTranslatorPool:
+    """
+    Sessão aiohttp compartilhada e adaptadores dos tradutores HTTP.
+    """
+
+    def __init__(self, adapters: Dict[str, HttpTranslator] = None, aliases: Dict[str, str] = None,
+                 enabled: bool = ASYNC_HTTP_TRANSLATORS, max_connections: int = HTTP_TRANSLATOR_MAX_CONNECTIONS,
+                 connections_per_host: int = HTTP_TRANSLATOR_CONNECTIONS_PER_HOST,
+                 dns_ttl: int = HTTP_TRANSLATOR_DNS_TTL, keepalive: float = HTTP_TRANSLATOR_KEEPALIVE,
+                 timeout: float = HTTP_TRANSLATOR_TIMEOUT):
+        """
+        Inicializa o pool.
+
+        Args:
+            adapters: Adaptadores por nome (padrão: Google e MyMemory nos endpoints públicos).
+            aliases: Nome do tradutor na configuração -> nome do adaptador.
+            enabled: Encaminha os tradutores aos adaptadores (False mantém as bibliotecas originais).
+            max_connections: Conexões simultâneas da sessão.
+            connections_per_host: Conexões simultâneas por host.
+            dns_ttl: Segundos no cache de DNS.
+            keepalive: Segundos que uma conexão ociosa fica aberta.
+            timeout: Prazo total de cada requisição.
+        """
+        if adapters is None:
+            adapters = {adapter.name: adapter for adapter in (GoogleHttpTranslator(), MyMemoryHttpTranslator())}
+        self.adapters = adapters
+        self.aliases = dict(DEFAULT_ALIASES if aliases is None else aliases)
+        self.enabled = enabled
+        self.max_connections = max_connections
+        self.connections_per_host = connections_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {'sessions_created': 0, 'requests': 0, 'errors': 0, 'in_flight': 0}
+
+    def resolve(self, translator: str) -> Optional[HttpTranslator]:
+        """
+        Adaptador HTTP do tradutor, ou None se ele deve usar as bibliotecas originais.
+        """
+        if not self.enabled:
+            return None
+        return self.adapters.get(self.aliases.get(translator, translator))
+
+    def supports(self, translator: str) -> bool:
+        """Indica se o tradutor é chamado pelos adaptadores assíncronos."""
+        return self.resolve(translator) is not None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Sessão compartilhada do event loop atual (criada na primeira chamada).
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.connections_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': USER_AGENT}
+            )
+            self._session_loop = loop
+            self.stats['sessions_created'] += 1
+        return self._session
+
+    async def translate(self, text: str, translator: str, source_lang: str = 'auto', target_lang: str = 'pt') -> str:
+        """
+        Traduz o texto com o adaptador do tradutor, sem ocupar threads.
+
+        Args:
+            text: Texto a traduzir.
+            translator: Nome do tradutor (ou alias da configuração).
+            source_lang: Idioma de origem.
+            target_lang: Idioma de destino.
+
+        Returns:
+            Texto traduzido.
+
+        Raises:
+            HttpTranslatorError: Tradutor sem adaptador, erro HTTP ou resposta inválida.
+            asyncio.TimeoutError: Prazo da requisição esgotado.
+        """
+        adapter = self.resolve(translator)
+        if adapter is None:
+            raise HttpTranslatorError(f"Tradutor sem adaptador HTTP: '{translator}'")
+        session = await self.get_session()
+        params = adapter.build_params(text, source_lang, target_lang)
+        self.stats['requests'] += 1
+        self.stats['in_flight'] += 1
+        try:
+            async with session.get(adapter.base_url, params=params) as response:
+                if response.status != 200:
+                    raise HttpTranslatorError(f"{adapter.name}: HTTP {response.status}")
+                payload = await response.json(content_type=None)
+            return adapter.parse(payload)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        finally:
+            self.stats['in_flight'] -= 1
+
+    async def close(self) -> None:
+        """Fecha a sessão compartilhada e as conexões abertas."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os adaptadores, os limites de conexão e os contadores do pool."""
+        return {
+            'enabled': self.enabled,
+            'adapters': sorted(self.adapters),
+            'routed_translators': sorted(name for name in self.aliases if self.supports(name)),
+            'max_connections': self.max_connections,
+            'connections_per_host': self.connections_per_host,
+            'dns_ttl': self.dns_ttl,
+            'session_open': self._session is not None and not self._session.closed,
+            **self.stats
+        }
+
+
+# Instância global: uma sessão compartilhada por todas as requisições
+http_translators = HttpTranslatorPool()
@@ -6,51 +6,50 @@ import numpy as np
 import os
 import time
 from typing import List, Dict, Any, Tuple
-import math
+from collections import OrderedDict
 
-# Cache para os modelos EasyOCR
-reader_cache = {}
+from batched_ocr import batched_ocr
+from debug_capture import debug_capture
+from detection_nms import suppress_duplicates
+from model_registry import model_registry
+from orientation import find_best_orientation
+from variant_scheduler import variant_scheduler
 
-def get_reader(lang_list):
+def reader_languages(lang_list):
     """
-    Obtém um leitor EasyOCR para os idiomas especificados, usando cache para evitar recarregar modelos.
+    Lista de idiomas do leitor EasyOCR, com inglês como fallback.
     
     Args:
         lang_list: Lista de códigos de idioma ou string única com código de idioma.
         
     Returns:
-        Um objeto Reader do EasyOCR.
+        Lista de códigos de idioma.
     """
     # Converte string única para lista
     if isinstance(lang_list, str):
         lang_list = [lang_list]
+    else:
+        lang_list = list(lang_list)
     
     # Adiciona inglês como fallback se não estiver na lista
     if 'en' not in lang_list:
         lang_list.append('en')
+    return lang_list
+
+def get_reader(lang_list):
+    """
+    Obtém um leitor EasyOCR para os idiomas especificados, usando cache para evitar recarregar modelos.
+    O leitor não fica referenciado: durante o uso, prefira model_registry.use(reader_languages(...)).
     
-    # Cria uma chave de cache baseada nos idiomas
-    cache_key = ",".join(sorted(lang_list))
-    
-    # Verifica se já temos este leitor em cache
-    if cache_key in reader_cache:
-        print(f"Usando leitor em cache para idiomas: {lang_list}")
-        return reader_cache[cache_key]
-    
-    # Cria um novo leitor
-    print(f"Criando novo leitor para idiomas: {lang_list}")
-    try:
-        # Tenta usar GPU se disponível
-        reader = easyocr.Reader(lang_list, gpu=True)
-        print("Leitor EasyOCR criado com suporte a GPU")
-    except Exception as e:
-        print(f"Erro ao criar leitor com GPU: {e}. Tentando sem GPU...")
-        reader = easyocr.Reader(lang_list, gpu=False)
-        print("Leitor EasyOCR criado sem suporte a GPU")
-    
-    # Armazena no cache
-    reader_cache[cache_key] = reader
-    return reader
+    Args:
+        lang_list: Lista de códigos de idioma ou string única com código de idioma.
+        
+    Returns:
+        Um objeto Reader do EasyOCR.
+    """
+    # O registro de modelos guarda o leitor pela lista de idiomas e já cai para a CPU
+    # se a GPU não estiver disponível
+    return model_registry.get_reader(reader_languages(lang_list))
 
 def group_text_detections(detections: List[Dict[str, Any]], horizontal_threshold: float = 50, vertical_threshold: float = 25) -> List[Dict[str, Any]]:
     """
@@ -312,6 +311,48 @@ def detect_and_correct_skew(image, delta=1, limit=5):
     
     return image
 
+# Variantes de pré-processamento, na ordem padrão, e como cada uma é gerada a partir das anteriores
+VARIANT_BUILDERS = OrderedDict([
+    ("original", lambda v: v.image),
+    ("gray", lambda v: cv2.cvtColor(v.image, cv2.COLOR_BGR2GRAY)),
+    ("blurred", lambda v: cv2.GaussianBlur(v.get("gray"), (3, 3), 0)),  # desfoque gaussiano para reduzir ruído
+    ("denoised", lambda v: denoise_image(v.get("gray"))),  # denoising bilateral
+    ("clahe", lambda v: apply_clahe(v.get("gray"))),  # CLAHE para melhorar contraste
+    ("sharpened", lambda v: sharpen_image(v.get("gray"))),
+    ("adaptive_thresh", lambda v: apply_adaptive_thresholding(v.get("blurred"))),
+    ("otsu_thresh", lambda v: apply_otsu_thresholding(v.get("blurred"))),
+    ("clahe_thresh", lambda v: apply_adaptive_thresholding(v.get("clahe"))),
+    ("sharp_thresh", lambda v: apply_adaptive_thresholding(v.get("sharpened"))),
+    ("deskewed", lambda v: detect_and_correct_skew(v.get("gray"))),  # corrige inclinação
+    ("deskewed_thresh", lambda v: apply_adaptive_thresholding(v.get("deskewed"))),
+])
+
+class LazyVariants:
+    """
+    Variantes pré-processadas geradas sob demanda: só as variantes pedidas (e as
+    intermediárias de que dependem) são calculadas, uma única vez cada.
+    """
+
+    def __init__(self, image):
+        self.image = image
+        self._cache = {}
+
+    def keys(self):
+        return list(VARIANT_BUILDERS.keys())
+
+    def get(self, name):
+        if name not in self._cache:
+            self._cache[name] = VARIANT_BUILDERS[name](self)
+        return self._cache[name]
+
+def variant_readtext_kwargs(variant_name):
+    """Parâmetros do readtext ajustados ao tipo de variante."""
+    if variant_name in ["original", "gray", "blurred", "denoised", "clahe", "sharpened", "deskewed"]:
+        # Para imagens em tons de cinza ou coloridas
+        return {'detail': 1}
+    # Para imagens binarizadas, ajusta parâmetros para melhor detecção
+    return {'detail': 1, 'contrast_ths': 0.1, 'adjust_contrast': 0.5}
+
 def create_preprocessed_variants(image):
     """
     Cria variantes pré-processadas da imagem para melhorar o OCR.
@@ -322,58 +363,10 @@ def create_preprocessed_variants(image):
     Returns:
         Lista de imagens pré-processadas.
     """
-    variants = []
-    
-    # Adiciona a imagem original
-    variants.append(("original", image))
-    
-    # Converte para escala de cinza
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    variants.append(("gray", gray))
-    
-    # Aplica desfoque gaussiano para reduzir ruído
-    blurred = cv2.GaussianBlur(gray, (3, 3), 0)
-    variants.append(("blurred", blurred))
-    
-    # Aplica denoising bilateral
-    denoised = denoise_image(gray)
-    variants.append(("denoised", denoised))
-    
-    # Aplica CLAHE para melhorar contraste
-    clahe = apply_clahe(gray)
-    variants.append(("clahe", clahe))
-    
-    # Aplica nitidez
-    sharpened = sharpen_image(gray)
-    variants.append(("sharpened", sharpened))
-    
-    # Aplica threshold adaptativo
-    adaptive_thresh = apply_adaptive_thresholding(blurred)
-    variants.append(("adaptive_thresh", adaptive_thresh))
-    
-    # Aplica threshold de Otsu
-    otsu_thresh = apply_otsu_thresholding(blurred)
-    variants.append(("otsu_thresh", otsu_thresh))
-    
-    # Combina CLAHE com threshold adaptativo
-    clahe_thresh = apply_adaptive_thresholding(clahe)
-    variants.append(("clahe_thresh", clahe_thresh))
-    
-    # Combina nitidez com threshold adaptativo
-    sharp_thresh = apply_adaptive_thresholding(sharpened)
-    variants.append(("sharp_thresh", sharp_thresh))
-    
-    # Detecta e corrige inclinação
-    deskewed = detect_and_correct_skew(gray)
-    variants.append(("deskewed", deskewed))
-    
-    # Aplica threshold adaptativo na imagem sem inclinação
-    deskewed_thresh = apply_adaptive_thresholding(deskewed)
-    variants.append(("deskewed_thresh", deskewed_thresh))
-    
-    return variants
+    variants = LazyVariants(image)
+    return [(name, variants.get(name)) for name in variants.keys()]
 
-async def extract_text_with_positions(image_bytes: bytes, lang_source: str) -> list:
+async def extract_text_with_positions(image_bytes: bytes, lang_source: str, session_key: str = None) -> list:
     """
     Recebe os bytes de uma imagem, realiza o OCR para um idioma específico e retorna
     uma lista de detecções com texto, coordenadas e confiança.
@@ -381,6 +374,7 @@ async def extract_text_with_positions(image_bytes: bytes, lang_source: str) -> l
     Args:
         image_bytes: A imagem como um objeto de bytes.
         lang_source: O código do idioma de origem (ex: 'en', 'ja') para o OCR.
+        session_key: Identificador do cliente/jogo, usado para memorizar a orientação.
 
     Returns:
         Uma lista de dicionários, cada um contendo 'text', 'bbox' e 'confidence'.
@@ -400,89 +394,58 @@ async def extract_text_with_positions(image_bytes: bytes, lang_source: str) -> l
         height, width, channels = img_cv.shape
         print(f"Módulo OCR Melhorado: Dimensões da imagem - Largura: {width}px, Altura: {height}px, Canais: {channels}")
         
-        # Salva a imagem original para análise visual
-        temp_image_path = "temp_received_image.png"
-        cv2.imwrite(temp_image_path, img_cv)
-        print(f"Módulo OCR Melhorado: Imagem original salva em: {os.path.abspath(temp_image_path)}")
+        # Captura a imagem original para análise visual (só em requisições amostradas)
+        debug_capture.save_image("received", image_bytes)
         
-        # Função para testar diferentes rotações e encontrar a melhor orientação
-        def test_rotation_and_get_best_image(image):
-            rotations = {
-                0: image,
-                90: cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE),
-                180: cv2.rotate(image, cv2.ROTATE_180),
-                270: cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
-            }
-            
-            best_rotation = 0
-            max_text_count = 0
-            best_image = image
+        # Obtém o leitor de OCR, referenciado no registro de modelos até o fim do processamento
+        with model_registry.use(reader_languages(lang_source)) as ocr_reader:
+            # Encontra a melhor rotação (estratégia configurável, memorizada por sessão)
+            img_corrected, best_angle = find_best_orientation(img_cv, ocr_reader, session_key)
             
-            print("Módulo OCR Melhorado: Testando diferentes rotações para encontrar a melhor orientação...")
+            # Captura a imagem corrigida
+            if best_angle:
+                debug_capture.save_image(f"corrected_{best_angle}", img_corrected)
             
-            # Obtém o leitor de OCR primeiro para usar na detecção de rotação
-            ocr_reader = get_reader(lang_source)
+            # Cria as variantes sob demanda: só as escolhidas pelo escalonador são geradas
+            variants = LazyVariants(img_corrected)
+            profile = variant_scheduler.profile_for(img_corrected, session_key)
             
-            for angle, rotated_img in rotations.items():
-                # Teste rápido de OCR para cada rotação
+            def run_variant(variant_name, variant_img):
+                print(f"Módulo OCR Melhorado: Processando variante '{variant_name}'...")
                 try:
-                    quick_result = ocr_reader.readtext(rotated_img, detail=1)
-                    text_count = len([r for r in quick_result if r[2] > 0.3])  # Conta textos com boa confiança
-                    total_chars = sum(len(r[1].strip()) for r in quick_result if r[2] > 0.3)
+                    text_list_detailed = ocr_reader.readtext(variant_img, **variant_readtext_kwargs(variant_name))
                     
-                    print(f"Módulo OCR Melhorado: Rotação {angle}° - {text_count} detecções, {total_chars} caracteres")
-                    
-                    # Prioriza rotações com mais caracteres detectados
-                    if total_chars > max_text_count:
-                        max_text_count = total_chars
-                        best_rotation = angle
-                        best_image = rotated_img
-                        
+                    print(f"Módulo OCR Melhorado: Variante '{variant_name}' - {len(text_list_detailed)} detecções")
+                    return text_list_detailed
                 except Exception as e:
-                    print(f"Módulo OCR Melhorado: Erro ao testar rotação {angle}°: {e}")
+                    print(f"Módulo OCR Melhorado: Erro ao processar variante '{variant_name}': {e}")
+                    return []
             
-            print(f"Módulo OCR Melhorado: Melhor orientação encontrada: {best_rotation}° ({max_text_count} caracteres)")
-            return best_image, best_rotation
-        
-        # Obtém o leitor de OCR
-        ocr_reader = get_reader(lang_source)
-        
-        # Encontra a melhor rotação
-        img_corrected, best_angle = test_rotation_and_get_best_image(img_cv)
-        
-        # Salva a imagem corrigida
-        corrected_image_path = "temp_corrected_image.png"
-        cv2.imwrite(corrected_image_path, img_corrected)
-        print(f"Módulo OCR Melhorado: Imagem corrigida (rotação {best_angle}°) salva em: {os.path.abspath(corrected_image_path)}")
-        
-        # Cria variantes pré-processadas da imagem
-        print("Módulo OCR Melhorado: Criando variantes pré-processadas da imagem...")
-        preprocessed_variants = create_preprocessed_variants(img_corrected)
-        
-        # Salva as variantes pré-processadas para análise visual
-        for variant_name, variant_img in preprocessed_variants:
-            variant_path = f"temp_{variant_name}_image.png"
-            cv2.imwrite(variant_path, variant_img)
-            print(f"Módulo OCR Melhorado: Variante '{variant_name}' salva em: {os.path.abspath(variant_path)}")
-        
-        # Lista para armazenar todos os resultados de OCR
-        all_detections = []
-        
-        # Executa OCR em cada variante pré-processada
-        print("Módulo OCR Melhorado: Executando OCR em todas as variantes...")
-        for variant_name, variant_img in preprocessed_variants:
-            print(f"Módulo OCR Melhorado: Processando variante '{variant_name}'...")
-            try:
-                # Ajusta parâmetros de OCR com base no tipo de variante
-                if variant_name in ["original", "gray", "blurred", "denoised", "clahe", "sharpened", "deskewed"]:
-                    # Para imagens em tons de cinza ou coloridas
-                    text_list_detailed = ocr_reader.readtext(variant_img, detail=1)
-                else:
-                    # Para imagens binarizadas, ajusta parâmetros para melhor detecção
-                    text_list_detailed = ocr_reader.readtext(variant_img, detail=1, contrast_ths=0.1, adjust_contrast=0.5)
-                
-                print(f"Módulo OCR Melhorado: Variante '{variant_name}' - {len(text_list_detailed)} detecções")
-                
+            def run_variant_batch(variant_names, variant_imgs):
+                # Variantes do mesmo quadro passam juntas pelo detector e pelo reconhecedor
+                print(f"Módulo OCR Melhorado: Processando variantes em lote: {', '.join(variant_names)}...")
+                batch_results = batched_ocr.readtext(ocr_reader, variant_imgs,
+                                                     [variant_readtext_kwargs(name) for name in variant_names])
+                for variant_name, text_list_detailed in zip(variant_names, batch_results):
+                    print(f"Módulo OCR Melhorado: Variante '{variant_name}' - {len(text_list_detailed)} detecções")
+                return batch_results
+            
+            # Executa o OCR nas variantes de maior rendimento para o jogo/paleta, até as detecções se estabilizarem
+            print(f"Módulo OCR Melhorado: Executando OCR nas variantes escolhidas (perfil '{profile}')...")
+            variant_results = variant_scheduler.run(variants, run_variant, profile, session_key,
+                                                    readtext_batch=run_variant_batch)
+            print(f"Módulo OCR Melhorado: {len(variant_results)} de {len(variants.keys())} variantes executadas: "
+                  f"{', '.join(name for name, _ in variant_results)}")
+            
+            # Captura as variantes executadas para análise visual (encode na thread de escrita)
+            if debug_capture.active:
+                for variant_name, _ in variant_results:
+                    debug_capture.save_image(f"variant_{variant_name}", variants.get(variant_name))
+            
+            # Lista para armazenar todos os resultados de OCR
+            all_detections = []
+            
+            for variant_name, text_list_detailed in variant_results:
                 # Adiciona as detecções à lista geral
                 for detection in text_list_detailed:
                     bbox, text, confidence = detection
@@ -494,61 +457,28 @@ async def extract_text_with_positions(image_bytes: bytes, lang_source: str) -> l
                             'confidence': confidence,
                             'variant': variant_name
                         })
-            except Exception as e:
-                print(f"Módulo OCR Melhorado: Erro ao processar variante '{variant_name}': {e}")
-        
-        # Filtra detecções por confiança mínima
-        filtered_detections = [d for d in all_detections if d['confidence'] > 0.3]
-        print(f"Módulo OCR Melhorado: Total de detecções após filtragem: {len(filtered_detections)}")
-        
-        # Remove duplicatas (mesmo texto em posições muito próximas)
-        unique_detections = []
-        for detection in filtered_detections:
-            # Verifica se já temos uma detecção similar
-            is_duplicate = False
-            for unique in unique_detections:
-                # Calcula sobreposição de bounding boxes
-                bbox1 = detection['bbox']
-                bbox2 = unique['bbox']
-                
-                # Calcula centros das bounding boxes
-                center1_x = sum(p[0] for p in bbox1) / 4
-                center1_y = sum(p[1] for p in bbox1) / 4
-                center2_x = sum(p[0] for p in bbox2) / 4
-                center2_y = sum(p[1] for p in bbox2) / 4
-                
-                # Calcula distância entre centros
-                distance = math.sqrt((center1_x - center2_x)**2 + (center1_y - center2_y)**2)
-                
-                # Se os textos são similares e estão próximos, considera duplicata
-                if distance < 20 and (detection['text'].lower() == unique['text'].lower() or 
-                                     detection['text'] in unique['text'] or 
-                                     unique['text'] in detection['text']):
-                    is_duplicate = True
-                    # Mantém a detecção com maior confiança
-                    if detection['confidence'] > unique['confidence']:
-                        unique['text'] = detection['text']
-                        unique['confidence'] = detection['confidence']
-                        unique['variant'] = detection['variant']
-                    break
             
-            if not is_duplicate:
-                unique_detections.append(detection)
-        
-        print(f"Módulo OCR Melhorado: Total de detecções únicas: {len(unique_detections)}")
-        
-        # Agrupa detecções próximas
-        grouped_detections = group_text_detections(unique_detections)
-        print(f"Módulo OCR Melhorado: Total de detecções após agrupamento: {len(grouped_detections)}")
-        
-        # Exibe as detecções agrupadas
-        for i, detection in enumerate(grouped_detections):
-            is_grouped = detection.get('is_grouped', False)
-            group_size = detection.get('group_size', 1)
-            group_info = f" (grupo de {group_size} textos)" if is_grouped else ""
-            print(f"Módulo OCR Melhorado: Detecção {i+1}{group_info}: '{detection['text']}' (confiança: {detection['confidence']:.2f})")
-        
-        return grouped_detections
+            # Filtra detecções por confiança mínima
+            filtered_detections = [d for d in all_detections if d['confidence'] > 0.3]
+            print(f"Módulo OCR Melhorado: Total de detecções após filtragem: {len(filtered_detections)}")
+            
+            # Remove duplicatas (textos semelhantes na mesma região), mantendo a de maior confiança
+            unique_detections = suppress_duplicates(filtered_detections)
+            
+            print(f"Módulo OCR Melhorado: Total de detecções únicas: {len(unique_detections)}")
+            
+            # Agrupa detecções próximas
+            grouped_detections = group_text_detections(unique_detections)
+            print(f"Módulo OCR Melhorado: Total de detecções após agrupamento: {len(grouped_detections)}")
+            
+            # Exibe as detecções agrupadas
+            for i, detection in enumerate(grouped_detections):
+                is_grouped = detection.get('is_grouped', False)
+                group_size = detection.get('group_size', 1)
+                group_info = f" (grupo de {group_size} textos)" if is_grouped else ""
+                print(f"Módulo OCR Melhorado: Detecção {i+1}{group_info}: '{detection['text']}' (confiança: {detection['confidence']:.2f})")
+            
+            return grouped_detections
         
     except Exception as e:
         print(f"Erro no módulo OCR Melhorado (com posições): {e}")
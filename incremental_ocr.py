@@ -0,0 +1,347 @@
+# incremental_ocr.py
+
+"""
+OCR incremental por regiões.
+
+No RetroArch a maior parte das requisições vem da mesma tela do jogo, mudando apenas a
+caixa de diálogo ou o placar. Este módulo guarda, por sessão (cliente + jogo), o quadro
+anterior e as suas detecções. O quadro novo é comparado com o anterior por uma máscara de
+diferença em blocos (NumPy); as detecções cujas regiões não mudaram são reaproveitadas e o
+readtext só é executado nos trechos alterados.
+
+Também mantém o overlay renderizado de cada sessão, para que as caixas traduzidas que não
+mudaram sejam copiadas do overlay anterior em vez de redesenhadas.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Configurações via variáveis de ambiente
+OCR_INCREMENTAL_ENABLED = os.getenv('OCR_INCREMENTAL_ENABLED', 'true').lower() == 'true'
+# Lado (em pixels) dos blocos comparados entre quadros
+OCR_INCREMENTAL_BLOCK_SIZE = int(os.getenv('OCR_INCREMENTAL_BLOCK_SIZE', '16'))
+# Diferença máxima de intensidade por pixel para um bloco ser considerado idêntico (0 = exato)
+OCR_INCREMENTAL_PIXEL_TOLERANCE = int(os.getenv('OCR_INCREMENTAL_PIXEL_TOLERANCE', '0'))
+# Acima desta fração de blocos alterados o quadro inteiro é processado novamente
+OCR_INCREMENTAL_MAX_CHANGED = float(os.getenv('OCR_INCREMENTAL_MAX_CHANGED', '0.5'))
+# Margem (em pixels) adicionada ao redor de cada trecho alterado antes do readtext
+OCR_INCREMENTAL_TILE_MARGIN = int(os.getenv('OCR_INCREMENTAL_TILE_MARGIN', '8'))
+OCR_INCREMENTAL_MAX_SESSIONS = int(os.getenv('OCR_INCREMENTAL_MAX_SESSIONS', '32'))
+OCR_INCREMENTAL_TTL = int(os.getenv('OCR_INCREMENTAL_TTL', '600'))
+
+
+def block_difference_mask(previous, current, block_size: int = OCR_INCREMENTAL_BLOCK_SIZE,
+                          tolerance: int = OCR_INCREMENTAL_PIXEL_TOLERANCE):
+    """
+    Calcula quais blocos mudaram entre dois quadros do mesmo tamanho.
+
+    Args:
+        previous: Quadro anterior (BGR ou escala de cinza).
+        current: Quadro atual, com as mesmas dimensões.
+        block_size: Lado dos blocos em pixels.
+        tolerance: Diferença máxima por pixel para o bloco ser considerado inalterado.
+
+    Returns:
+        Matriz booleana (linhas_de_blocos x colunas_de_blocos), True onde o bloco mudou.
+    """
+    diff = cv2.absdiff(previous, current)
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    height, width = diff.shape
+    rows = -(-height // block_size)
+    cols = -(-width // block_size)
+    # Completa com zeros para que a imagem seja um múltiplo exato do bloco
+    padded = np.zeros((rows * block_size, cols * block_size), dtype=diff.dtype)
+    padded[:height, :width] = diff
+    block_max = padded.reshape(rows, block_size, cols, block_size).max(axis=(1, 3))
+    return block_max > tolerance
+
+
+def _bbox_rect(bbox) -> Tuple[int, int, int, int]:
+    xs = [p[0] for p in bbox]
+    ys = [p[1] for p in bbox]
+    return int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys))
+
+
+def _rects_intersect(a, b) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _rect_contains(outer, inner) -> bool:
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+def changed_tiles(mask, block_size: int, width: int, height: int, margin: int = OCR_INCREMENTAL_TILE_MARGIN):
+    """
+    Converte a máscara de blocos alterados em retângulos (x1, y1, x2, y2) a serem reprocessados.
+
+    Args:
+        mask: Máscara retornada por block_difference_mask.
+        block_size: Lado dos blocos em pixels.
+        width: Largura do quadro.
+        height: Altura do quadro.
+        margin: Margem adicionada a cada retângulo.
+
+    Returns:
+        Lista de retângulos em coordenadas do quadro.
+    """
+    # Blocos alterados vizinhos formam um único trecho
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask.astype(np.uint8), connectivity=8)
+    tiles = []
+    for label in range(1, count):
+        col, row, cols, rows = stats[label][:4]
+        tiles.append((
+            max(col * block_size - margin, 0),
+            max(row * block_size - margin, 0),
+            min((col + cols) * block_size + margin, width),
+            min((row + rows) * block_size + margin, height)
+        ))
+    return tiles
+
+
+def _merge_rects(rects):
+    """Une retângulos que se sobrepõem até que nenhum par se intercepte."""
+    merged = list(rects)
+    changed = True
+    while changed:
+        changed = False
+        result = []
+        while merged:
+            current = merged.pop()
+            for i, other in enumerate(merged):
+                if _rects_intersect(current, other):
+                    merged.pop(i)
+                    merged.append((min(current[0], other[0]), min(current[1], other[1]),
+                                   max(current[2], other[2]), max(current[3], other[3])))
+                    changed = True
+                    break
+            else:
+                result.append(current)
+        merged = result
+    return merged
+
+
+class IncrementalOCRTracker:
+    """
+    Guarda o último quadro de cada sessão e reprocessa apenas as regiões alteradas.
+    """
+
+    def __init__(self, enabled: bool = OCR_INCREMENTAL_ENABLED, block_size: int = OCR_INCREMENTAL_BLOCK_SIZE,
+                 tolerance: int = OCR_INCREMENTAL_PIXEL_TOLERANCE, max_changed: float = OCR_INCREMENTAL_MAX_CHANGED,
+                 max_sessions: int = OCR_INCREMENTAL_MAX_SESSIONS, ttl: int = OCR_INCREMENTAL_TTL):
+        """
+        Inicializa o rastreador.
+
+        Args:
+            enabled: Liga ou desliga o modo incremental.
+            block_size: Lado dos blocos comparados entre quadros.
+            tolerance: Diferença máxima por pixel em um bloco inalterado.
+            max_changed: Fração de blocos alterados acima da qual o quadro é processado inteiro.
+            max_sessions: Número máximo de sessões mantidas em memória.
+            ttl: Tempo em segundos durante o qual o quadro anterior é reaproveitado.
+        """
+        self.enabled = enabled
+        self.block_size = block_size
+        self.tolerance = tolerance
+        self.max_changed = max_changed
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Tuple[Any, list, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'full_frames': 0, 'incremental_frames': 0, 'unchanged_frames': 0,
+                      'reused_detections': 0, 'tiles_recognized': 0}
+
+    def _get_previous(self, session_key: Optional[str]):
+        if not session_key:
+            return None
+        with self._lock:
+            entry = self._sessions.get(session_key)
+            if entry is None:
+                return None
+            if time.time() - entry[2] > self.ttl:
+                del self._sessions[session_key]
+                return None
+            self._sessions.move_to_end(session_key)
+            return entry
+
+    def _store(self, session_key: Optional[str], image, detections: list) -> None:
+        if not session_key:
+            return
+        with self._lock:
+            # O array somente leitura do Frame não pode ser alterado: dispensa a cópia defensiva
+            stored = image if not image.flags.writeable else image.copy()
+            self._sessions[session_key] = (stored, list(detections), time.time())
+            self._sessions.move_to_end(session_key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def _count(self, **increments: int) -> None:
+        # Os contadores são atualizados pelas threads do executor de inferência
+        with self._lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def forget(self, session_key: Optional[str] = None) -> None:
+        """Descarta o quadro memorizado de uma sessão (ou de todas)."""
+        with self._lock:
+            if session_key is None:
+                self._sessions.clear()
+            else:
+                self._sessions.pop(session_key, None)
+
+    def readtext(self, reader, image, session_key: Optional[str] = None, **kwargs) -> list:
+        """
+        Executa o readtext completo ou incremental, conforme o quadro anterior da sessão.
+
+        Args:
+            reader: Leitor EasyOCR.
+            image: Quadro atual (já com a orientação corrigida).
+            session_key: Identificador do estado reaproveitado; deve incluir tudo que muda o
+                resultado do OCR além da imagem (cliente/jogo, leitor de idiomas e rotação).
+            **kwargs: Parâmetros repassados para readtext.
+
+        Returns:
+            Detecções no formato do EasyOCR: [(bbox, texto, confiança), ...].
+        """
+        kwargs.setdefault('detail', 1)
+        previous = self._get_previous(session_key) if self.enabled else None
+
+        if previous is None or previous[0].shape != image.shape:
+            detections = reader.readtext(image, **kwargs)
+            self._count(full_frames=1)
+            self._store(session_key, image, detections)
+            return detections
+
+        previous_image, previous_detections, _ = previous
+        mask = block_difference_mask(previous_image, image, self.block_size, self.tolerance)
+        changed_fraction = float(mask.mean())
+
+        if changed_fraction == 0:
+            print("OCR Incremental: Quadro idêntico ao anterior. Reutilizando todas as detecções.")
+            self._count(unchanged_frames=1, reused_detections=len(previous_detections))
+            self._store(session_key, image, previous_detections)
+            return list(previous_detections)
+
+        if changed_fraction > self.max_changed:
+            print(f"OCR Incremental: {changed_fraction:.0%} dos blocos mudaram. Processando o quadro inteiro.")
+            detections = reader.readtext(image, **kwargs)
+            self._count(full_frames=1)
+            self._store(session_key, image, detections)
+            return detections
+
+        height, width = image.shape[:2]
+        tiles = changed_tiles(mask, self.block_size, width, height)
+
+        # Os trechos crescem até cobrir por inteiro as detecções antigas que tocam,
+        # para que nenhum texto seja lido pela metade
+        previous_rects = [_bbox_rect(d[0]) for d in previous_detections]
+        grew = True
+        while grew:
+            grew = False
+            expanded = []
+            for tile in _merge_rects(tiles):
+                for rect in previous_rects:
+                    if _rects_intersect(tile, rect) and not _rect_contains(tile, rect):
+                        tile = (min(tile[0], rect[0]), min(tile[1], rect[1]), max(tile[2], rect[2]), max(tile[3], rect[3]))
+                        grew = True
+                expanded.append(tile)
+            tiles = expanded
+        tiles = [(max(t[0], 0), max(t[1], 0), min(t[2], width), min(t[3], height)) for t in tiles]
+
+        # Só são reaproveitadas as detecções fora de todos os trechos reprocessados
+        reused = [
+            detection for detection, rect in zip(previous_detections, previous_rects)
+            if not any(_rects_intersect(rect, tile) for tile in tiles)
+        ]
+
+        recognized = []
+        for x1, y1, x2, y2 in tiles:
+            if x2 - x1 < 2 or y2 - y1 < 2:
+                continue
+            for bbox, text, confidence in reader.readtext(image[y1:y2, x1:x2], **kwargs):
+                offset_bbox = [[int(p[0]) + x1, int(p[1]) + y1] for p in bbox]
+                recognized.append((offset_bbox, text, confidence))
+
+        print(f"OCR Incremental: {changed_fraction:.0%} dos blocos mudaram - {len(reused)} detecções reaproveitadas, "
+              f"{len(tiles)} trechos reprocessados, {len(recognized)} novas detecções.")
+        self._count(incremental_frames=1, reused_detections=len(reused), tiles_recognized=len(tiles))
+
+        detections = reused + recognized
+        self._store(session_key, image, detections)
+        return detections
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do modo incremental."""
+        with self._lock:
+            sessions = len(self._sessions)
+            stats = dict(self.stats)
+        return {'enabled': self.enabled, 'sessions': sessions, **stats}
+
+
+def overlay_region_key(detection: Dict[str, Any]) -> tuple:
+    """Chave que identifica uma caixa traduzida desenhada no overlay."""
+    return (
+        detection['translation'],
+        tuple(tuple(int(v) for v in point) for point in detection['bbox']),
+        bool(detection.get('is_grouped', False)),
+        int(detection.get('group_size', 1))
+    )
+
+
+class OverlayRegionCache:
+    """
+    Guarda o último overlay de cada sessão e a área desenhada de cada caixa traduzida.
+    """
+
+    def __init__(self, max_sessions: int = OCR_INCREMENTAL_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._overlays: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'reused_overlays': 0, 'reused_regions': 0, 'drawn_regions': 0}
+
+    def get(self, session_key: Optional[str], size: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o overlay anterior da sessão, se tiver o mesmo tamanho.
+
+        Args:
+            session_key: Identificador do cliente/jogo.
+            size: Tupla (largura, altura) do overlay atual.
+
+        Returns:
+            Dicionário com 'image', 'regions', 'keys' e 'base64', ou None.
+        """
+        if not session_key or not OCR_INCREMENTAL_ENABLED:
+            return None
+        with self._lock:
+            entry = self._overlays.get(session_key)
+            if entry is None or entry['image'].size != size:
+                return None
+            self._overlays.move_to_end(session_key)
+            return entry
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Incrementa um contador do cache (chamado de várias threads)."""
+        with self._lock:
+            self.stats[name] += value
+
+    def store(self, session_key: Optional[str], image, regions: Dict[tuple, tuple], keys: List[tuple],
+              image_base64: str) -> None:
+        """Memoriza o overlay renderizado da sessão."""
+        if not session_key or not OCR_INCREMENTAL_ENABLED:
+            return
+        with self._lock:
+            self._overlays[session_key] = {'image': image, 'regions': regions, 'keys': keys, 'base64': image_base64}
+            self._overlays.move_to_end(session_key)
+            while len(self._overlays) > self.max_sessions:
+                self._overlays.popitem(last=False)
+
+
+# Instâncias globais do OCR incremental e do cache de overlays
+incremental_ocr = IncrementalOCRTracker()
+overlay_cache = OverlayRegionCache()
@@ -0,0 +1,203 @@
+# inference_executor.py
+
+"""
+Executor dedicado para inferência de OCR.
+
+O EasyOCR executa a inferência de forma síncrona e pode levar vários segundos por
+imagem. Este módulo isola essas chamadas em um pool de threads limitado, que usa os
+leitores do registro de modelos e devolve as detecções através de futures aguardáveis.
+Quando a fila de inferência está cheia, as novas submissões são rejeitadas com
+InferenceQueueFullError para que o endpoint responda com 503/429 em vez de
+acumular requisições indefinidamente.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from model_registry import model_registry
+
+# Configurações via variáveis de ambiente
+OCR_INFERENCE_WORKERS = int(os.getenv('OCR_INFERENCE_WORKERS', '1'))
+OCR_INFERENCE_QUEUE_DEPTH = int(os.getenv('OCR_INFERENCE_QUEUE_DEPTH', '8'))
+OCR_QUEUE_FULL_STATUS = int(os.getenv('OCR_QUEUE_FULL_STATUS', '503'))
+OCR_QUEUE_RETRY_AFTER = int(os.getenv('OCR_QUEUE_RETRY_AFTER', '1'))
+
+
+class InferenceQueueFullError(Exception):
+    """Levantada quando o executor de inferência não aceita mais trabalhos."""
+
+    def __init__(self, pending: int, capacity: int, status_code: int = OCR_QUEUE_FULL_STATUS,
+                 retry_after: int = OCR_QUEUE_RETRY_AFTER):
+        self.pending = pending
+        self.capacity = capacity
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(f"Fila de inferência de OCR cheia ({pending}/{capacity} trabalhos pendentes)")
+
+
+class OCRInferenceExecutor:
+    """
+    Pool de threads limitado que executa a inferência do EasyOCR fora do event loop.
+    """
+
+    def __init__(self, max_workers: int = OCR_INFERENCE_WORKERS, queue_depth: int = OCR_INFERENCE_QUEUE_DEPTH):
+        """
+        Inicializa o executor.
+
+        Args:
+            max_workers: Número de threads que executam inferência simultaneamente.
+            queue_depth: Número de trabalhos que podem aguardar na fila além dos que estão em execução.
+        """
+        self.max_workers = max(1, max_workers)
+        self.queue_depth = max(0, queue_depth)
+        self.readers: Dict[str, Any] = model_registry.readers
+        self._pending_lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._executor = None
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'total_queue_time': 0.0,
+            'total_inference_time': 0.0
+        }
+
+    @property
+    def capacity(self) -> int:
+        """Número máximo de trabalhos aceitos (em execução + na fila)."""
+        return self.max_workers + self.queue_depth
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ocr-inference')
+        return self._executor
+
+    def get_reader(self, lang_code: str):
+        """
+        Retorna uma instância do leitor EasyOCR para o idioma especificado.
+        Os leitores pertencem ao registro de modelos, que os carrega (ou pré-carrega) e descarta.
+        """
+        return model_registry.get_reader(lang_code)
+
+    def _reserve_slot(self) -> None:
+        with self._pending_lock:
+            if self._pending >= self.capacity:
+                self.stats['rejected'] += 1
+                raise InferenceQueueFullError(self._pending, self.capacity)
+            self._pending += 1
+            self.stats['submitted'] += 1
+
+    def _release_slot(self, future) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.stats['failed'] += 1
+            else:
+                self.stats['completed'] += 1
+
+    def _run_job(self, func: Callable, args: tuple, kwargs: dict, submitted_at: float):
+        started_at = time.time()
+        with self._pending_lock:
+            self._running += 1
+            self.stats['total_queue_time'] += started_at - submitted_at
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._pending_lock:
+                self._running -= 1
+                self.stats['total_inference_time'] += time.time() - started_at
+
+    async def submit(self, func: Callable, *args, **kwargs):
+        """
+        Agenda uma função síncrona de inferência no pool e aguarda o resultado.
+
+        Args:
+            func: Função síncrona a ser executada em uma thread de inferência.
+            *args, **kwargs: Argumentos repassados para a função.
+
+        Returns:
+            O valor retornado pela função.
+
+        Raises:
+            InferenceQueueFullError: Se a fila de inferência estiver cheia.
+        """
+        self._reserve_slot()
+        # Leva o contexto da requisição (ex: captura de debug) para a thread de inferência
+        context = contextvars.copy_context()
+        try:
+            future = self._get_executor().submit(context.run, self._run_job, func, args, kwargs, time.time())
+        except Exception:
+            with self._pending_lock:
+                self._pending -= 1
+            raise
+        # O slot só é liberado quando a thread termina, mesmo que o chamador seja cancelado,
+        # para que a contagem reflita o trabalho que realmente ocupa o pool.
+        future.add_done_callback(self._release_slot)
+        return await asyncio.wrap_future(future)
+
+    async def readtext(self, lang_code: str, image, **kwargs) -> list:
+        """
+        Executa reader.readtext no pool de inferência.
+
+        Args:
+            lang_code: Código do idioma do leitor.
+            image: Imagem decodificada (ndarray) a ser processada.
+            **kwargs: Parâmetros repassados para readtext.
+
+        Returns:
+            Lista de detecções no formato do EasyOCR.
+        """
+        def _readtext():
+            with model_registry.use(lang_code) as reader:
+                return reader.readtext(image, **kwargs)
+        return await self.submit(_readtext)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna o estado atual do executor para monitoramento.
+
+        Returns:
+            Dicionário com ocupação da fila e contadores acumulados.
+        """
+        with self._pending_lock:
+            pending = self._pending
+            running = self._running
+            stats = dict(self.stats)
+        finished = max(stats['completed'] + stats['failed'], 1)
+        return {
+            'workers': self.max_workers,
+            'queue_depth': self.queue_depth,
+            'capacity': self.capacity,
+            'running': running,
+            'queued': max(pending - running, 0),
+            'pending': pending,
+            'submitted': stats['submitted'],
+            'completed': stats['completed'],
+            'failed': stats['failed'],
+            'rejected': stats['rejected'],
+            'avg_queue_time_ms': round(stats['total_queue_time'] / finished * 1000, 2),
+            'avg_inference_time_ms': round(stats['total_inference_time'] / finished * 1000, 2),
+            'loaded_readers': sorted(self.readers.keys())
+        }
+
+    def is_saturated(self) -> bool:
+        """Indica se o executor está sem capacidade para novos trabalhos."""
+        with self._pending_lock:
+            return self._pending >= self.capacity
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerra o pool de threads de inferência."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Instância global do executor de inferência
+inference_executor = OCRInferenceExecutor()
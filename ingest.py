@@ -0,0 +1,109 @@
+# ingest.py
+
+"""
+Leitura do corpo das requisições do RetroArch sem conversões desnecessárias.
+
+O caminho antigo tentava body.decode('utf-8') em megabytes de PNG para descobrir se o
+corpo era JSON, convertia o binário para base64 só para preencher RetroArchRequest.image
+e, em seguida, process_ai_request decodificava o base64 de volta. Aqui o formato é
+identificado pelos primeiros bytes e o corpo binário segue como o próprio objeto bytes
+até o cv2.imdecode, que roda uma única vez por requisição.
+"""
+
+import base64
+import json
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from models import RetroArchRequest
+
+# Assinaturas dos formatos de imagem aceitos no corpo binário
+IMAGE_SIGNATURES = (
+    b'\x89PNG\r\n\x1a\n',  # PNG
+    b'\xff\xd8\xff',       # JPEG
+    b'BM',                 # BMP
+    b'GIF8',               # GIF
+    b'RIFF',               # WebP
+)
+
+
+def sniff_body_format(body: bytes) -> str:
+    """
+    Identifica o formato do corpo da requisição pelos primeiros bytes.
+
+    Args:
+        body: Corpo bruto da requisição.
+
+    Returns:
+        'binary' para uma imagem ou 'json' para um objeto JSON.
+    """
+    if body.startswith(IMAGE_SIGNATURES):
+        return 'binary'
+    # Só o início do corpo é inspecionado; o restante nunca é decodificado como texto
+    head = body[:64].lstrip()
+    return 'json' if head.startswith(b'{') else 'binary'
+
+
+def parse_request_body(body: bytes, source_lang: str, target_lang: str,
+                       client_id: Optional[str] = None) -> RetroArchRequest:
+    """
+    Cria a RetroArchRequest a partir do corpo bruto, sem converter imagens binárias para base64.
+
+    Args:
+        body: Corpo bruto da requisição.
+        source_lang: Idioma de origem da query string (padrão do JSON).
+        target_lang: Idioma de destino da query string (padrão do JSON).
+        client_id: Endereço do cliente, usado para identificar a sessão.
+
+    Returns:
+        Requisição com 'image' (base64, corpo JSON) ou 'image_bytes' (corpo binário).
+    """
+    if sniff_body_format(body) == 'json':
+        try:
+            # json.loads aceita bytes diretamente
+            json_data = json.loads(body)
+            print(f"Ingestão: JSON detectado: {json_data.keys() if isinstance(json_data, dict) else 'não é dict'}")
+            return RetroArchRequest(
+                image=json_data.get('image', ''),
+                format=json_data.get('format', 'png'),
+                lang_source=json_data.get('lang_source', source_lang),
+                lang_target=json_data.get('lang_target', target_lang),
+                label=json_data.get('label'),
+                client_id=client_id
+            )
+        except (UnicodeDecodeError, json.JSONDecodeError, AttributeError):
+            print("Ingestão: Corpo parecia JSON mas não pôde ser lido; tratando como dados binários.")
+
+    print(f"Ingestão: Dados binários detectados ({len(body)} bytes), sem conversão para base64.")
+    return RetroArchRequest(
+        image='',
+        image_bytes=body,
+        format='png',  # assume PNG por padrão
+        lang_source=source_lang,
+        lang_target=target_lang,
+        client_id=client_id
+    )
+
+
+def request_image_bytes(request: RetroArchRequest) -> bytes:
+    """
+    Retorna os bytes codificados (PNG/JPEG) da imagem da requisição.
+
+    Raises:
+        binascii.Error: Se o campo 'image' não for base64 válido.
+    """
+    if request.image_bytes is not None:
+        return request.image_bytes
+    return base64.b64decode(request.image)
+
+
+def decode_image(image_bytes: bytes) -> Optional[np.ndarray]:
+    """
+    Decodifica a imagem para um array BGR (np.frombuffer não copia os bytes).
+
+    Returns:
+        Imagem BGR ou None se os bytes não forem uma imagem válida.
+    """
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
@@ -0,0 +1,332 @@
+# language_id.py
+
+"""
+Identificação do idioma dos textos reconhecidos pelo OCR.
+
+A versão antiga de is_mostly_portuguese comparava cada palavra do texto com uma lista de
+cerca de 120 palavras em português usando busca de substring (O(palavras × vocabulário)),
+então palavras inglesas como "NUMBER" (contém "um") ou "EXTRA" contavam como português.
+Este módulo identifica o idioma para todos os idiomas de destino comuns do RetroArch:
+
+- idiomas de escrita latina (en, pt, es, fr, de, it): cada palavra é procurada em um
+  dicionário de vocabulário por idioma (busca exata, com e sem acentos); palavras desconhecidas são
+  classificadas por perfis de trigramas de caracteres, com as log-probabilidades de todos
+  os idiomas e de todas as palavras desconhecidas somadas de uma vez com NumPy. Os trigramas
+  só reforçam um idioma que já tem ao menos uma palavra do vocabulário no texto: sozinhos,
+  eles atribuíam palavras inglesas isoladas como "SPECIAL" ao português;
+- japonês, coreano e chinês: proporção de caracteres de cada escrita (kana, hangul, han).
+
+O resultado é memorizado por texto normalizado, então o mesmo texto de uma tela estática
+é analisado uma única vez. O pipeline usa is_language para não chamar os tradutores quando
+o texto já está no idioma de destino.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Configurações via variáveis de ambiente
+# Número máximo de textos normalizados no cache de identificação
+LANGUAGE_ID_CACHE_SIZE = int(os.getenv('LANGUAGE_ID_CACHE_SIZE', '4096'))
+# Proporção mínima das palavras no idioma para considerar o texto já traduzido
+LANGUAGE_ID_THRESHOLD = float(os.getenv('LANGUAGE_ID_THRESHOLD', '0.3'))
+# Probabilidade mínima do perfil de trigramas para atribuir uma palavra desconhecida a um idioma
+LANGUAGE_ID_MIN_CONFIDENCE = float(os.getenv('LANGUAGE_ID_MIN_CONFIDENCE', '0.8'))
+
+# Peso de uma palavra classificada pelos trigramas (uma palavra do vocabulário vale 1)
+TRIGRAM_WEIGHT = 0.5
+# Proporção mínima dos caracteres na escrita para japonês, coreano e chinês
+SCRIPT_THRESHOLD = 0.5
+
+# Vocabulário básico por idioma: palavras funcionais e termos de interface de jogos
+LANGUAGE_WORDS = {
+    'en': """
+        the a an and or of to in on at for with from by you your is are was be this that it not
+        no yes if do my me we they he she his her all out up down left right what where who can
+        will have has press start select game over player players insert coin coins credit credits
+        continue score high level stage round time life lives bonus power energy health attack
+        defense magic speed strength options sound music controls difficulty easy normal hard save
+        load exit quit back menu pause paused ready go fight win wins lose victory defeat perfect
+        mission complete clear congratulations warning danger error now push key button any one two
+        new loading saving world area zone boss enemy item items weapon armor shield sword gold door
+        shop buy sell next get got thank thanks welcome brave castle knight
+    """,
+    'pt': """
+        jogador jogadores crédito créditos entrar pressione iniciar continuar pontuação recorde nível
+        fase vidas tempo bônus fim jogo insira moeda livre qualquer botão sim não sair tentar novamente
+        reiniciar um dois melhor mundo rodada área zona missão vida restante temporizador extra poder
+        especial energia saúde experiência ataque defesa magia velocidade força agilidade inteligência
+        sabedoria sorte opções configurações configuração som música volume controles dificuldade
+        fácil normal difícil especialista idioma salvar carregar salvando carregando excluir cancelar
+        confirmar selecionar voltar retornar vitória derrota parabéns obrigado por pausa pausado pronto
+        vai lutar batalha perfeito ótimo bom ruim errou falhou concluído completa cumprida completo
+        aviso perigo erro depuração de da do das dos o a os as e em no na nos nas para com uma que
+        seu sua você está este esta isso mais muito agora aqui jogar tecla espaço moedas vence venceu
+        perdeu próximo próxima chefe inimigo tesouro ouro chave porta loja comprar vender item itens
+        arma armadura escudo espada morte morreu tela modo pontos ponto começar bem vindo
+    """,
+    'es': """
+        el la los las de del y o en un una que para con por no sí es su tu pulsa presiona pulse
+        iniciar comenzar juego jugador jugadores partida fin continuar puntuación puntos récord nivel
+        fase vidas vida tiempo inserte insertar moneda monedas crédito créditos opciones sonido música
+        controles dificultad fácil difícil guardar cargar salir volver pausa listo lucha victoria
+        derrota felicidades misión completa completada peligro aviso error ahora mundo jefe enemigo
+        arma espada escudo oro llave puerta tienda comprar vender siguiente bienvenido gracias jugar
+        pantalla modo ganó gana perdiste muerto
+    """,
+    'fr': """
+        le la les de des du et ou en un une que pour avec par pas ne est sont vous votre appuyez
+        appuyer sur commencer démarrer jeu joueur joueurs partie fin continuer score niveau vies vie
+        temps insérez insérer pièce pièces crédit crédits options son musique commandes difficulté
+        facile difficile sauvegarder charger quitter retour prêt combat victoire défaite félicitations
+        mission terminée danger attention erreur maintenant monde ennemi arme épée bouclier clé porte
+        boutique acheter vendre suivant bienvenue merci jouer écran mode gagne perdu touche meilleur
+        manche
+    """,
+    'de': """
+        der die das den dem des und oder in ein eine einen zu für mit von auf nicht ist sind sie ihr
+        drücken drücke taste starten start spiel spieler ende weiter fortsetzen punkte punktzahl rekord
+        stufe level leben zeit münze münzen einwerfen kredit optionen ton musik steuerung schwierigkeit
+        leicht schwer speichern laden beenden zurück pause bereit kampf sieg niederlage glückwunsch
+        herzlichen mission abgeschlossen gefahr warnung fehler jetzt welt gegner feind waffe schwert
+        schild gold schlüssel tür kaufen verkaufen nächste willkommen danke spielen bildschirm modus
+        gewinnt verloren runde
+    """,
+    'it': """
+        il lo la i gli le di del della e o in un una che per con non è sono tuo tua premi premere
+        tasto inizia iniziare gioco giocatore giocatori partita fine continua continuare punteggio
+        punti record livello vite vita tempo inserisci moneta monete crediti opzioni suono musica
+        comandi difficoltà facile difficile salva salvare carica caricare esci indietro pausa pronto
+        combatti vittoria sconfitta congratulazioni missione completata pericolo attenzione errore
+        adesso ora mondo nemico arma spada scudo oro chiave porta negozio compra vendi prossimo
+        benvenuto grazie giocare schermo modalità vince perso round
+    """,
+}
+
+# Intervalos Unicode das escritas usadas por japonês, coreano e chinês
+_KANA = re.compile('[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]')
+_HANGUL = re.compile('[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]')
+_HAN = re.compile('[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+
+_LETTERS = re.compile(r'[^\W\d_]+')
+
+
+def strip_accents(word: str) -> str:
+    """Remove os acentos da palavra (ex: 'pontuação' -> 'pontuacao')."""
+    return ''.join(char for char in unicodedata.normalize('NFKD', word) if not unicodedata.combining(char))
+
+
+def normalize_language(lang: str) -> str:
+    """Código base do idioma (ex: 'pt-BR' -> 'pt', 'zh_CN' -> 'zh')."""
+    return (lang or '').lower().replace('_', '-').split('-')[0]
+
+
+def _is_latin(word: str) -> bool:
+    return word.isascii() or all(char <= '\u024f' for char in word)
+
+
+class LanguageIdentifier:
+    """
+    Identifica o idioma dos textos por vocabulário e perfis de trigramas, com cache por texto normalizado.
+    """
+
+    def __init__(self, vocabularies: Optional[Dict[str, Iterable[str]]] = None,
+                 cache_size: int = LANGUAGE_ID_CACHE_SIZE, threshold: float = LANGUAGE_ID_THRESHOLD,
+                 min_confidence: float = LANGUAGE_ID_MIN_CONFIDENCE):
+        """
+        Inicializa o identificador e pré-calcula os vocabulários e perfis de trigramas.
+
+        Args:
+            vocabularies: Termos adicionais por idioma (palavras ou frases), somados ao vocabulário básico.
+            cache_size: Número máximo de textos no cache.
+            threshold: Proporção mínima das palavras no idioma para considerar o texto nele.
+            min_confidence: Probabilidade mínima dos trigramas para classificar uma palavra desconhecida.
+        """
+        self.cache_size = cache_size
+        self.threshold = threshold
+        self.min_confidence = min_confidence
+        self.latin_languages = tuple(LANGUAGE_WORDS)
+        self.script_languages = ('ja', 'ko', 'zh')
+
+        words: Dict[str, set] = {lang: set(text.split()) for lang, text in LANGUAGE_WORDS.items()}
+        for lang, terms in (vocabularies or {}).items():
+            lang = normalize_language(lang)
+            if lang in words:
+                words[lang].update(word.lower() for term in terms for word in _LETTERS.findall(term))
+
+        # Palavra -> posições dos idiomas em que ela existe (com e sem acentos)
+        word_languages: Dict[str, List[int]] = {}
+        for position, lang in enumerate(self.latin_languages):
+            for word in words[lang]:
+                for form in {word, strip_accents(word)}:
+                    word_languages.setdefault(form, []).append(position)
+        self._word_languages: Dict[str, Tuple[int, ...]] = {
+            word: tuple(positions) for word, positions in word_languages.items()}
+        self._trigram_rows, self._trigram_matrix = self._build_trigram_profiles(words)
+
+        self._cache: 'OrderedDict[str, Dict[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'cache_hits': 0, 'trigram_words': 0}
+
+    def _build_trigram_profiles(self, words: Dict[str, set]) -> Tuple[Dict[str, int], np.ndarray]:
+        """
+        Log-probabilidade de cada trigrama em cada idioma (suavização de Laplace).
+
+        Returns:
+            Tupla (trigrama -> linha da matriz, matriz (trigramas + 1, idiomas)); a última linha
+            é a log-probabilidade de um trigrama nunca visto.
+        """
+        trigram_rows: Dict[str, int] = {}
+        counts = []
+        for position, lang in enumerate(self.latin_languages):
+            for word in words[lang]:
+                for trigram in self._trigrams(word):
+                    if trigram not in trigram_rows:
+                        trigram_rows[trigram] = len(counts)
+                        counts.append(np.zeros(len(self.latin_languages)))
+                    counts[trigram_rows[trigram]][position] += 1
+        matrix = np.array(counts + [np.zeros(len(self.latin_languages))])
+        totals = matrix.sum(axis=0) + len(counts) + 1
+        return trigram_rows, np.log((matrix + 1) / totals)
+
+    @staticmethod
+    def _trigrams(word: str) -> List[str]:
+        padded = f' {word} '
+        return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    def _classify_unknown(self, words: List[str]) -> List[Optional[int]]:
+        """
+        Idioma mais provável de cada palavra desconhecida pelos trigramas, se a confiança for suficiente.
+
+        As log-probabilidades dos trigramas de todas as palavras são somadas de uma vez
+        (np.add.reduceat), uma linha por palavra.
+        """
+        unseen = len(self._trigram_rows)
+        rows, offsets = [], []
+        for word in words:
+            offsets.append(len(rows))
+            rows.extend(self._trigram_rows.get(trigram, unseen) for trigram in self._trigrams(word))
+        scores = np.add.reduceat(self._trigram_matrix[rows], offsets, axis=0)
+        probabilities = np.exp(scores - scores.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        confident = probabilities[np.arange(len(words)), best] >= self.min_confidence
+        return [int(index) if ok else None for index, ok in zip(best, confident)]
+
+    def _analyze(self, normalized: str) -> Dict[str, float]:
+        scores = {lang: 0.0 for lang in self.latin_languages + self.script_languages}
+        words = _LETTERS.findall(normalized)
+
+        # Escritas de japonês, coreano e chinês: proporção dos caracteres de letra
+        letter_count = sum(len(word) for word in words)
+        if letter_count and not normalized.isascii():
+            kana = len(_KANA.findall(normalized))
+            han = len(_HAN.findall(normalized))
+            scores['ko'] = len(_HANGUL.findall(normalized)) / letter_count
+            scores['ja'] = (kana + han) / letter_count if kana else 0.0
+            scores['zh'] = han / letter_count if not kana else 0.0
+
+        # Escrita latina: proporção das palavras atribuídas a cada idioma
+        latin_words = [word for word in words if _is_latin(word)]
+        if latin_words:
+            totals = [0.0] * len(self.latin_languages)
+            unknown = []
+            for word in latin_words:
+                positions = self._word_languages.get(word)
+                if positions is None:
+                    positions = self._word_languages.get(strip_accents(word))
+                if positions is not None:
+                    for position in positions:
+                        totals[position] += 1
+                elif len(word) >= 3:
+                    unknown.append(word)
+            if unknown:
+                self.stats['trigram_words'] += len(unknown)
+                for best in self._classify_unknown(unknown):
+                    # Sem nenhuma palavra do vocabulário, os trigramas não bastam para escolher o idioma
+                    if best is not None and totals[best] >= 1:
+                        totals[best] += TRIGRAM_WEIGHT
+            for lang, total in zip(self.latin_languages, totals):
+                scores[lang] = total / len(latin_words)
+        return scores
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """
+        Proporção do texto em cada idioma (memorizada por texto normalizado).
+
+        Args:
+            text: Texto a analisar.
+
+        Returns:
+            Dicionário idioma -> proporção das palavras (escrita latina) ou dos caracteres (ja, ko, zh).
+        """
+        normalized = ' '.join(text.lower().split())
+        with self._lock:
+            self.stats['lookups'] += 1
+            cached = self._cache.get(normalized)
+            if cached is not None:
+                self._cache.move_to_end(normalized)
+                self.stats['cache_hits'] += 1
+                return cached
+
+        result = self._analyze(normalized)
+        with self._lock:
+            self._cache[normalized] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def is_language(self, text: str, lang: str) -> bool:
+        """
+        Verifica se o texto já está majoritariamente no idioma informado.
+
+        Args:
+            text: Texto a verificar.
+            lang: Código do idioma (ex: 'pt', 'pt-br', 'ja').
+
+        Returns:
+            True se o texto parece estar no idioma; False também para idiomas não suportados.
+        """
+        lang = normalize_language(lang)
+        if not text or lang not in self.latin_languages + self.script_languages:
+            return False
+        scores = self.scores(text)
+        if lang in self.script_languages:
+            return scores[lang] >= SCRIPT_THRESHOLD
+        # Mais que o limiar das palavras, e mais que qualquer outro idioma latino (empates, como em
+        # textos mistos, continuam sendo traduzidos)
+        return scores[lang] > self.threshold and all(
+            scores[lang] > scores[other] for other in self.latin_languages if other != lang)
+
+    def detect(self, text: str) -> Optional[str]:
+        """
+        Idioma mais provável do texto.
+
+        Returns:
+            Código do idioma, ou None se nenhum idioma passar do limiar.
+        """
+        if not text:
+            return None
+        scores = self.scores(text)
+        script = max(self.script_languages, key=lambda lang: scores[lang])
+        if scores[script] >= SCRIPT_THRESHOLD:
+            return script
+        latin = max(self.latin_languages, key=lambda lang: scores[lang])
+        return latin if scores[latin] > self.threshold else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna a ocupação do cache e os contadores do identificador."""
+        with self._lock:
+            lookups = self.stats['lookups']
+            return {
+                'languages': list(self.latin_languages + self.script_languages),
+                'vocabulary_size': len(self._word_languages),
+                'cache_size': len(self._cache),
+                'cache_hit_rate': self.stats['cache_hits'] / lookups if lookups else 0.0,
+                **self.stats
+            }
@@ -16,7 +16,20 @@ from contextlib import asynccontextmanager
 # Importa a lógica de serviço e o modelo de dados
 from service_logic import process_ai_request
 from models import RetroArchRequest
-from database import db_manager, initialize_database
+from ingest import parse_request_body
+from database import db_manager, async_db_manager, initialize_database
+from inference_executor import inference_executor
+from model_registry import model_registry, parse_languages, OCR_PRELOAD_LANGUAGES
+from perceptual_hash import perceptual_ocr_cache
+from incremental_ocr import incremental_ocr, overlay_cache
+from translation_stage import translation_stage
+from debug_capture import debug_capture
+from batched_ocr import batched_ocr
+from micro_batcher import micro_batcher
+from translation_module import language_identifier
+from provider_health import provider_health
+from word_fallback import word_fallback
+from http_translators import http_translators
 
 def get_system_info():
     """Coleta informações detalhadas do sistema e processo"""
@@ -419,8 +432,27 @@ async def lifespan(app: FastAPI):
     else:
         print("Aviso: Falha ao inicializar o banco de dados. O serviço continuará sem cache.")
     
+    # Pré-carrega e aquece os modelos de OCR para que a primeira requisição de cada idioma
+    # não espere pelo carregamento (roda no pool de inferência, fora do event loop)
+    preload_languages = parse_languages(OCR_PRELOAD_LANGUAGES)
+    if preload_languages:
+        print(f"Pré-carregando modelos de OCR: {', '.join(preload_languages)}...")
+        try:
+            await inference_executor.submit(model_registry.preload, preload_languages)
+        except Exception as e:
+            print(f"Aviso: Falha ao pré-carregar os modelos de OCR: {e}")
+    
     yield
     
+    # Encerra o pool de inferência de OCR
+    print("Encerrando o executor de inferência de OCR...")
+    inference_executor.shutdown(wait=False)
+    async_db_manager.shutdown(wait=True)
+    # Fecha a sessão HTTP compartilhada dos tradutores
+    await http_translators.close()
+    # Grava as imagens de debug que ainda estão na fila
+    debug_capture.flush(timeout=5.0)
+    
     # Fecha a conexão com o banco de dados quando o servidor é encerrado
     print("Fechando conexão com o banco de dados...")
     db_manager.disconnect()
@@ -459,39 +491,11 @@ async def handle_ai_service_request(
         if not body:
             raise HTTPException(status_code=400, detail="Corpo da requisição está vazio. Nenhuma imagem recebida.")
         
-        # Tenta detectar se é JSON ou dados binários
-        retroarch_request = None
+        # Identifica o cliente para que o estado por sessão (ex: orientação) seja reaproveitado
+        client_id = request.client.host if request.client else None
         
-        try:
-            # Tenta decodificar como texto para ver se é JSON
-            body_text = body.decode('utf-8')
-            print(f"Primeiros 200 caracteres do corpo: {body_text[:200]}")
-            
-            # Se conseguiu decodificar, pode ser JSON
-            json_data = json.loads(body_text)
-            print(f"JSON detectado: {json_data.keys() if isinstance(json_data, dict) else 'não é dict'}")
-            
-            # Cria objeto RetroArchRequest a partir do JSON
-            retroarch_request = RetroArchRequest(
-                image=json_data.get('image', ''),
-                format=json_data.get('format', 'png'),
-                lang_source=json_data.get('lang_source', source_lang),
-                lang_target=json_data.get('lang_target', target_lang)
-            )
-            
-        except (UnicodeDecodeError, json.JSONDecodeError):
-            # Se não conseguiu decodificar como JSON, assume que são dados binários
-            print("Dados binários detectados - convertendo para base64")
-            image_b64 = base64.b64encode(body).decode('utf-8')
-            print(f"Imagem convertida para base64 - tamanho: {len(image_b64)} caracteres")
-            
-            # Cria objeto RetroArchRequest com dados binários convertidos
-            retroarch_request = RetroArchRequest(
-                image=image_b64,
-                format='png',  # assume PNG por padrão
-                lang_source=source_lang,
-                lang_target=target_lang
-            )
+        # Identifica JSON ou imagem binária pelos primeiros bytes (sem decodificar o corpo inteiro)
+        retroarch_request = parse_request_body(body, source_lang, target_lang, client_id)
         
         print(f"Processando requisição: {source_lang} -> {target_lang}")
         
@@ -548,7 +552,9 @@ async def health_check():
         db_time = (time.time() - db_start) * 1000
         health_status["components"]["database"] = {
             "status": db_health,
-            "response_time_ms": round(db_time, 2)
+            "response_time_ms": round(db_time, 2),
+            "pool": db_manager.pool.get_stats(),
+            "cache": db_manager.get_cache_stats()
         }
         
         # 2. Verificar módulos críticos
@@ -592,7 +598,88 @@ async def health_check():
             "memory_percent": memory.percent if 'memory' in locals() else None
         }
         
-        # 4. Verificar disponibilidade de GPU (se aplicável)
+        # 4. Verificar ocupação do executor de inferência de OCR
+        inference_stats = inference_executor.get_stats()
+        if inference_executor.is_saturated():
+            inference_status = "warning"
+            error_messages.append(f"Fila de inferência de OCR cheia ({inference_stats['pending']}/{inference_stats['capacity']})")
+        else:
+            inference_status = "healthy"
+        
+        health_status["components"]["ocr_inference"] = {
+            "status": inference_status,
+            **inference_stats
+        }
+        
+        # Estado do OCR incremental (regiões reaproveitadas entre quadros da mesma sessão)
+        health_status["components"]["ocr_incremental"] = {
+            "status": "healthy" if incremental_ocr.enabled else "disabled",
+            **incremental_ocr.get_stats(),
+            "overlay": dict(overlay_cache.stats)
+        }
+        
+        # Estado do cache perceptual de OCR (capturas quase idênticas)
+        health_status["components"]["ocr_perceptual_cache"] = {
+            "status": "healthy" if perceptual_ocr_cache.enabled else "disabled",
+            **perceptual_ocr_cache.get_stats()
+        }
+        
+        # Estado da etapa de tradução por quadro (limite global e limites por provedor)
+        health_status["components"]["translation_stage"] = {
+            "status": "healthy",
+            **translation_stage.get_stats()
+        }
+        
+        # Leitores de OCR carregados (dispositivo, tempo de carga, memória e uso)
+        health_status["components"]["ocr_models"] = {
+            "status": "healthy",
+            **model_registry.get_stats()
+        }
+        
+        # OCR em lote das variantes e rotações (lotes do detector e do reconhecedor)
+        health_status["components"]["batched_ocr"] = {
+            "status": "healthy" if batched_ocr.enabled else "disabled",
+            **batched_ocr.get_stats()
+        }
+        
+        # Micro-lotes de OCR entre requisições (preenchimento dos lotes e atraso na fila)
+        health_status["components"]["ocr_microbatch"] = {
+            "status": "healthy" if micro_batcher.enabled else "disabled",
+            **micro_batcher.get_stats()
+        }
+        
+        # Identificação de idioma (cache por texto normalizado)
+        health_status["components"]["language_id"] = {
+            "status": "healthy",
+            **language_identifier.get_stats()
+        }
+        
+        # Saúde dos tradutores (latência e taxa de erro EWMA e estado dos circuit breakers)
+        provider_health_stats = provider_health.get_stats()
+        health_status["components"]["translation_providers"] = {
+            "status": "degraded" if provider_health_stats["open_circuits"] else "healthy",
+            **provider_health_stats
+        }
+        
+        # Tradutores HTTP assíncronos (sessão compartilhada e limites de conexão)
+        health_status["components"]["http_translators"] = {
+            "status": "healthy" if http_translators.enabled else "disabled",
+            **http_translators.get_stats()
+        }
+        
+        # Tradução palavra por palavra (acertos locais, requisições em lote e prazos esgotados)
+        health_status["components"]["word_fallback"] = {
+            "status": "healthy",
+            **word_fallback.get_stats()
+        }
+        
+        # Captura de imagens de debug (amostragem e buffer circular em disco)
+        health_status["components"]["debug_capture"] = {
+            "status": "healthy" if debug_capture.enabled else "disabled",
+            **debug_capture.get_stats()
+        }
+        
+        # 5. Verificar disponibilidade de GPU (se aplicável)
         gpu_start = time.time()
         try:
             # Tenta detectar GPU usando o mesmo método do get_system_info
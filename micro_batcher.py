@@ -0,0 +1,239 @@
+# micro_batcher.py
+
+"""
+Micro-lotes de OCR entre requisições.
+
+Com vários clientes RetroArch no mesmo servidor, cada requisição executava o seu próprio
+readtext. Este módulo junta os quadros que chegam em uma janela curta (alguns ms) vindos
+de requisições diferentes e os processa como um único lote por leitor de idioma
+(detector e reconhecedor em lote, via batched_ocr), devolvendo a cada requisição as
+suas próprias detecções.
+
+Não há thread extra: a primeira thread de inferência que encontra a fila do idioma vazia
+vira a coletora do lote. Ela espera até OCR_MICROBATCH_MAX_WAIT_MS (ou até o lote encher),
+executa o lote e entrega os resultados às demais, que aguardam bloqueadas. Por isso o
+ganho depende de várias requisições em paralelo no executor: com OCR_INFERENCE_WORKERS = 1
+só uma requisição fica na janela de coleta, nenhum lote se forma e cada quadro apenas
+pagaria a espera máxima, então o agendador avisa e se desliga.
+"""
+
+import os
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from batched_ocr import RECOGNITION_KWARGS, batched_ocr
+from inference_executor import OCR_INFERENCE_WORKERS
+from model_registry import reader_key
+
+# Configurações via variáveis de ambiente
+OCR_MICROBATCH_ENABLED = os.getenv('OCR_MICROBATCH_ENABLED', 'false').lower() == 'true'
+# Número máximo de imagens por lote
+OCR_MICROBATCH_MAX_SIZE = int(os.getenv('OCR_MICROBATCH_MAX_SIZE', '8'))
+# Tempo máximo que a primeira imagem do lote espera por outras
+OCR_MICROBATCH_MAX_WAIT_MS = float(os.getenv('OCR_MICROBATCH_MAX_WAIT_MS', '5'))
+
+# Parâmetros do readtext suportados no lote; chamadas com outros parâmetros não entram em lotes
+BATCHABLE_KWARGS = ('detail',) + RECOGNITION_KWARGS
+
+
+class _PendingImage:
+    """Imagem aguardando um lote, com o resultado preenchido pela thread coletora."""
+
+    __slots__ = ('image', 'kwargs', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, image, kwargs: Dict[str, Any]):
+        self.image = image
+        self.kwargs = kwargs
+        self.enqueued_at = time.perf_counter()
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class _BatchingReader:
+    """
+    Leitor que encaminha o readtext para o micro-lote do idioma; os demais atributos
+    (detector, reconhecedor etc.) são os do leitor original.
+    """
+
+    def __init__(self, batcher: 'OCRMicroBatcher', reader, lang_key: str):
+        self._batcher = batcher
+        self._reader = reader
+        self._lang_key = lang_key
+
+    def readtext(self, image, **kwargs):
+        return self._batcher.readtext(self._reader, self._lang_key, image, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._reader, name)
+
+
+class OCRMicroBatcher:
+    """
+    Junta as chamadas de readtext de requisições simultâneas em lotes por idioma.
+    """
+
+    def __init__(self, enabled: bool = OCR_MICROBATCH_ENABLED, max_batch_size: int = OCR_MICROBATCH_MAX_SIZE,
+                 max_wait_ms: float = OCR_MICROBATCH_MAX_WAIT_MS, run_batch=None,
+                 workers: int = OCR_INFERENCE_WORKERS):
+        """
+        Inicializa o agendador de micro-lotes.
+
+        Args:
+            enabled: Se False, o readtext é chamado diretamente, sem lotes.
+            max_batch_size: Número máximo de imagens por lote.
+            max_wait_ms: Tempo máximo de espera da primeira imagem do lote.
+            run_batch: Função (leitor, imagens, parâmetros) -> detecções por imagem
+                (padrão: batched_ocr.readtext propagando os erros, para que cheguem às requisições).
+            workers: Threads de inferência que chamam o readtext; com menos de 2 os lotes são desligados.
+        """
+        self.workers = workers
+        self.enabled = enabled
+        if enabled and workers <= 1:
+            print(f"Micro-lotes de OCR: Desativados; com OCR_INFERENCE_WORKERS={workers} nenhum lote "
+                  f"entre requisições se forma (use 2 ou mais)")
+            self.enabled = False
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.run_batch = run_batch or partial(batched_ocr.readtext, raise_errors=True)
+        self._cond = threading.Condition()
+        # idioma -> imagens aguardando lote
+        self._queues: Dict[str, List[_PendingImage]] = {}
+        # idiomas com uma thread coletando o próximo lote
+        self._collecting = set()
+        self.stats = {'batches': 0, 'images': 0, 'bypassed': 0, 'failed_batches': 0,
+                      'total_queue_delay': 0.0, 'max_queue_delay': 0.0}
+        self._language_stats: Dict[str, Dict[str, int]] = {}
+
+    def reader(self, reader, lang_code):
+        """
+        Envolve um leitor do registro para que o seu readtext entre nos micro-lotes do idioma.
+
+        Args:
+            reader: Leitor EasyOCR (já referenciado no registro de modelos pelo chamador).
+            lang_code: Código do idioma (ou lista de códigos) do leitor.
+        """
+        if not self.enabled:
+            return reader
+        return _BatchingReader(self, reader, reader_key(lang_code))
+
+    def readtext(self, reader, lang_key: str, image, **kwargs) -> list:
+        """
+        Executa o readtext de uma imagem como parte de um lote do idioma.
+
+        Args:
+            reader: Leitor EasyOCR do idioma.
+            lang_key: Chave do idioma (fila do lote).
+            image: Imagem a ser processada.
+            **kwargs: Parâmetros do readtext.
+
+        Returns:
+            Detecções no formato do readtext(detail=1).
+        """
+        if not self.enabled or kwargs.get('detail', 1) != 1 or any(k not in BATCHABLE_KWARGS for k in kwargs):
+            with self._cond:
+                self.stats['bypassed'] += 1
+            return reader.readtext(image, **kwargs)
+
+        item = _PendingImage(image, kwargs)
+        with self._cond:
+            queue = self._queues.setdefault(lang_key, [])
+            queue.append(item)
+            self._cond.notify_all()
+            # Aguarda o resultado ou a vez de coletar o próximo lote do idioma
+            while not item.done:
+                if lang_key not in self._collecting and queue and queue[0] is item:
+                    batch = self._collect(lang_key, queue)
+                    break
+                self._cond.wait()
+            else:
+                batch = None
+
+        if batch is not None:
+            self._run(reader, lang_key, batch)
+
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _collect(self, lang_key: str, queue: List[_PendingImage]) -> List[_PendingImage]:
+        """Espera o lote encher ou o prazo da primeira imagem vencer (com o lock adquirido)."""
+        self._collecting.add(lang_key)
+        deadline = queue[0].enqueued_at + self.max_wait
+        while len(queue) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+        batch = queue[:self.max_batch_size]
+        del queue[:self.max_batch_size]
+        self._collecting.discard(lang_key)
+        # As imagens que sobraram elegem a próxima coletora
+        self._cond.notify_all()
+        return batch
+
+    def _run(self, reader, lang_key: str, batch: List[_PendingImage]) -> None:
+        started_at = time.perf_counter()
+        delays = [started_at - item.enqueued_at for item in batch]
+        try:
+            results = self.run_batch(reader, [item.image for item in batch], [item.kwargs for item in batch])
+            error = None
+        except Exception as e:
+            results = [None] * len(batch)
+            error = e
+
+        with self._cond:
+            for item, result in zip(batch, results):
+                item.result = result
+                item.error = error
+                item.done = True
+            self.stats['batches'] += 1
+            self.stats['images'] += len(batch)
+            self.stats['total_queue_delay'] += sum(delays)
+            self.stats['max_queue_delay'] = max(self.stats['max_queue_delay'], max(delays))
+            if error is not None:
+                self.stats['failed_batches'] += 1
+            language = self._language_stats.setdefault(lang_key, {'batches': 0, 'images': 0})
+            language['batches'] += 1
+            language['images'] += len(batch)
+            self._cond.notify_all()
+
+        if len(batch) > 1:
+            print(f"Micro-lotes de OCR: Lote '{lang_key}' com {len(batch)} imagens "
+                  f"(espera máxima {max(delays) * 1000:.1f} ms, {(time.perf_counter() - started_at) * 1000:.0f} ms de inferência)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna a configuração e as métricas dos micro-lotes.
+
+        Returns:
+            Dicionário com taxa de preenchimento dos lotes, atraso médio na fila e contadores por idioma.
+        """
+        with self._cond:
+            stats = dict(self.stats)
+            languages = {
+                lang: {**counts, 'queued': len(self._queues.get(lang, []))}
+                for lang, counts in self._language_stats.items()
+            }
+        batches = max(stats['batches'], 1)
+        return {
+            'enabled': self.enabled,
+            'workers': self.workers,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': stats['batches'],
+            'images': stats['images'],
+            'bypassed': stats['bypassed'],
+            'failed_batches': stats['failed_batches'],
+            'avg_batch_size': round(stats['images'] / batches, 2),
+            'fill_rate': round(stats['images'] / (batches * self.max_batch_size), 3),
+            'avg_queue_delay_ms': round(stats['total_queue_delay'] / max(stats['images'], 1) * 1000, 2),
+            'max_queue_delay_ms': round(stats['max_queue_delay'] * 1000, 2),
+            'languages': languages
+        }
+
+
+# Instância global do agendador de micro-lotes
+micro_batcher = OCRMicroBatcher()
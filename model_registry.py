@@ -0,0 +1,382 @@
+# model_registry.py
+
+"""
+Registro dos modelos de OCR (leitores EasyOCR) carregados pelo servidor.
+
+Antes, cada leitor era criado na primeira requisição do idioma, sempre com gpu=True:
+o primeiro jogador de japonês ou coreano esperava vários segundos pelo carregamento do
+modelo, e em máquinas sem GPU não havia um caminho explícito para a CPU. O registro:
+
+- pré-carrega os idiomas de OCR_PRELOAD_LANGUAGES no lifespan do FastAPI e executa uma
+  inferência de aquecimento em um quadro sintético;
+- decide o dispositivo uma única vez (OCR_GPU=auto usa CUDA se disponível) e, se a
+  criação na GPU falhar, recria o leitor na CPU;
+- registra o tempo de carregamento, o tempo de aquecimento e a memória de cada leitor;
+- conta as referências em uso e, quando a soma da memória passa de
+  OCR_READER_MEMORY_BUDGET_MB, descarta os leitores menos usados recentemente (LRU)
+  que não estão em uso;
+- compartilha a rede de detecção (CRAFT) entre os idiomas: o detector não depende do
+  idioma, então só o primeiro leitor o carrega e os demais carregam apenas o
+  reconhecedor do seu alfabeto (OCR_SHARE_DETECTOR).
+
+ocr_module e improved_ocr_module (que acrescenta 'en' à lista de idiomas) usam o mesmo
+registro, com chaves normalizadas pela lista ordenada de idiomas.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import cv2
+import numpy as np
+
+# Configurações via variáveis de ambiente
+# Idiomas carregados na inicialização, ex: "en,ja" (vazio = nenhum)
+OCR_PRELOAD_LANGUAGES = os.getenv('OCR_PRELOAD_LANGUAGES', 'en')
+# Executa uma inferência em um quadro sintético logo após carregar o modelo
+OCR_WARMUP_ENABLED = os.getenv('OCR_WARMUP_ENABLED', 'true').lower() == 'true'
+# 'auto' usa a GPU se o PyTorch encontrar CUDA; 'true' ou 'false' forçam a escolha
+OCR_GPU = os.getenv('OCR_GPU', 'auto').lower()
+# Memória máxima somada dos leitores carregados (0 = sem limite)
+OCR_READER_MEMORY_BUDGET_MB = float(os.getenv('OCR_READER_MEMORY_BUDGET_MB', '0'))
+# Compartilha o detector CRAFT entre os leitores de idiomas diferentes
+OCR_SHARE_DETECTOR = os.getenv('OCR_SHARE_DETECTOR', 'true').lower() == 'true'
+
+# Atributos do easyocr.Reader que compõem a etapa de detecção (iguais para todos os idiomas)
+DETECTOR_ATTRIBUTES = ('detector', 'get_textbox', 'get_detector', 'detect_network')
+
+
+def parse_languages(spec: str) -> List[str]:
+    """Converte "en,ja" em ['en', 'ja'], ignorando itens vazios."""
+    return [lang.strip() for lang in spec.split(',') if lang.strip()]
+
+
+def reader_key(languages: Union[str, List[str]]) -> str:
+    """
+    Normaliza o idioma (ou a lista de idiomas) de um leitor para a chave do registro.
+
+    O RetroArch usa 'Default' para inglês.
+    """
+    if isinstance(languages, str):
+        languages = [languages]
+    languages = ['en' if lang.lower() == 'default' else lang for lang in languages]
+    return ",".join(sorted(dict.fromkeys(languages)))
+
+
+def detect_gpu(setting: str = OCR_GPU) -> bool:
+    """
+    Decide se os leitores devem usar a GPU.
+
+    Args:
+        setting: 'auto', 'true' ou 'false'.
+
+    Returns:
+        True se a GPU deve ser usada.
+    """
+    if setting == 'false':
+        return False
+    try:
+        import torch
+        available = torch.cuda.is_available()
+    except Exception:
+        available = False
+    if setting == 'true' and not available:
+        print("Registro de Modelos: OCR_GPU=true, mas nenhuma GPU CUDA está disponível. Usando CPU.")
+    return available
+
+
+def estimate_module_memory(module) -> int:
+    """
+    Estima a memória ocupada pelos pesos de uma rede do PyTorch (detector ou reconhecedor), em bytes.
+    """
+    parameters = getattr(module, 'parameters', None)
+    if parameters is None:
+        return 0
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters())
+    except Exception:
+        return 0
+
+
+def create_warmup_frame(width: int = 320, height: int = 96) -> np.ndarray:
+    """Quadro sintético com texto, usado na inferência de aquecimento."""
+    frame = np.full((height, width, 3), 255, dtype=np.uint8)
+    cv2.putText(frame, "WARM UP 123", (10, height // 2 + 12), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    return frame
+
+
+def _load_easyocr_reader(languages: List[str], gpu: bool, detector: bool = True):
+    # Importado sob demanda para que o servidor não carregue o torch até o primeiro modelo
+    import easyocr
+    return easyocr.Reader(languages, gpu=gpu, detector=detector)
+
+
+class ModelRegistry:
+    """
+    Leitores EasyOCR carregados, com pré-carregamento, aquecimento, contagem de referências e LRU.
+    """
+
+    def __init__(self, loader: Callable[..., Any] = None,
+                 memory_budget_mb: float = OCR_READER_MEMORY_BUDGET_MB, gpu: Optional[bool] = None,
+                 memory_estimator: Callable[[Any], int] = estimate_module_memory,
+                 share_detector: bool = OCR_SHARE_DETECTOR):
+        """
+        Inicializa o registro.
+
+        Args:
+            loader: Função (idiomas, gpu, detector) -> leitor. Padrão: easyocr.Reader.
+            memory_budget_mb: Memória máxima somada dos leitores (0 = sem limite).
+            gpu: Força o uso (ou não) da GPU; None decide por OCR_GPU na primeira carga.
+            memory_estimator: Função que estima a memória de uma rede (detector ou reconhecedor) em bytes.
+            share_detector: Compartilha o detector entre os leitores.
+        """
+        self.loader = loader or _load_easyocr_reader
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.memory_estimator = memory_estimator
+        self.share_detector = share_detector
+        self._gpu = gpu
+        # Detector compartilhado: atributos do leitor que o carregou, dispositivo e memória
+        self._shared_detector: Optional[Dict[str, Any]] = None
+        # Leitores em ordem de uso (o mais antigo primeiro); o dicionário é exposto como 'readers'
+        self.readers: 'OrderedDict[str, Any]' = OrderedDict()
+        self._info: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.stats = {'loads': 0, 'cpu_fallbacks': 0, 'evictions': 0, 'hits': 0, 'shared_detector_loads': 0}
+
+    @property
+    def gpu(self) -> bool:
+        """Dispositivo usado nas novas cargas (decidido uma única vez)."""
+        if self._gpu is None:
+            self._gpu = detect_gpu()
+            print(f"Registro de Modelos: Leitores de OCR usarão {'GPU' if self._gpu else 'CPU'}.")
+        return self._gpu
+
+    def _build(self, languages: List[str], gpu: bool):
+        """Cria o leitor reaproveitando o detector compartilhado, quando houver um no mesmo dispositivo."""
+        shared = self._shared_detector
+        if shared is None or shared['gpu'] != gpu:
+            return self.loader(languages, gpu, detector=True), False
+        reader = self.loader(languages, gpu, detector=False)
+        for name, value in shared['attributes'].items():
+            setattr(reader, name, value)
+        return reader, True
+
+    def _load(self, key: str):
+        languages = key.split(',')
+        gpu = self.gpu
+        print(f"Registro de Modelos: Carregando modelo de OCR para '{key}' ({'GPU' if gpu else 'CPU'})...")
+        start = time.time()
+        try:
+            reader, shared = self._build(languages, gpu)
+        except Exception as e:
+            if not gpu:
+                raise
+            print(f"Registro de Modelos: Erro ao carregar '{key}' na GPU: {e}. Tentando na CPU...")
+            with self._lock:
+                self.stats['cpu_fallbacks'] += 1
+            gpu = False
+            reader, shared = self._build(languages, gpu)
+        load_time = time.time() - start
+
+        memory = self.memory_estimator(getattr(reader, 'recognizer', None))
+        detector_memory = self.memory_estimator(getattr(reader, 'detector', None))
+        if shared:
+            with self._lock:
+                self.stats['shared_detector_loads'] += 1
+            print(f"Registro de Modelos: '{key}' carregado em {load_time:.1f}s "
+                  f"(reconhecedor de {memory / (1024 * 1024):.0f} MB, detector compartilhado).")
+            return reader, self._new_info(gpu, load_time, memory, shared=True)
+
+        with self._lock:
+            # O primeiro detector carregado passa a ser o compartilhado; sua memória é contada uma vez só
+            donor = self.share_detector and self._shared_detector is None
+            if donor:
+                self._shared_detector = {
+                    'attributes': {name: getattr(reader, name) for name in DETECTOR_ATTRIBUTES if hasattr(reader, name)},
+                    'gpu': gpu,
+                    'memory': detector_memory
+                }
+        if donor:
+            print(f"Registro de Modelos: '{key}' carregado em {load_time:.1f}s "
+                  f"({memory / (1024 * 1024):.0f} MB + detector compartilhado de {detector_memory / (1024 * 1024):.0f} MB).")
+        else:
+            memory += detector_memory
+            print(f"Registro de Modelos: '{key}' carregado em {load_time:.1f}s ({memory / (1024 * 1024):.0f} MB).")
+        return reader, self._new_info(gpu, load_time, memory, shared=donor)
+
+    @staticmethod
+    def _new_info(gpu: bool, load_time: float, memory: int, shared: bool) -> Dict[str, Any]:
+        return {'gpu': gpu, 'load_time': load_time, 'memory': memory, 'warmup_time': None,
+                'shared_detector': shared, 'refs': 0, 'uses': 0, 'last_used': time.time()}
+
+    def acquire(self, languages: Union[str, List[str]]):
+        """
+        Retorna o leitor dos idiomas, carregando-o se necessário, e marca-o como em uso.
+        Cada acquire deve ser seguido de um release (ou use o gerenciador de contexto 'use').
+        """
+        key = reader_key(languages)
+        with self._lock:
+            if key in self.readers:
+                self._touch(key)
+                self.stats['hits'] += 1
+                return self.readers[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # A carga de um idioma não bloqueia o uso dos leitores já carregados
+        with load_lock:
+            with self._lock:
+                if key in self.readers:
+                    self._touch(key)
+                    return self.readers[key]
+            reader, info = self._load(key)
+            with self._lock:
+                self.readers[key] = reader
+                self._info[key] = info
+                self.stats['loads'] += 1
+                self._touch(key)
+                self._enforce_budget()
+            return reader
+
+    def _touch(self, key: str) -> None:
+        info = self._info[key]
+        info['refs'] += 1
+        info['uses'] += 1
+        info['last_used'] = time.time()
+        self.readers.move_to_end(key)
+
+    def release(self, languages: Union[str, List[str]]) -> None:
+        """Libera uma referência obtida com acquire."""
+        key = reader_key(languages)
+        with self._lock:
+            info = self._info.get(key)
+            if info and info['refs'] > 0:
+                info['refs'] -= 1
+            self._enforce_budget()
+
+    @contextmanager
+    def use(self, languages: Union[str, List[str]]):
+        """Gerenciador de contexto que mantém o leitor referenciado enquanto é usado."""
+        reader = self.acquire(languages)
+        try:
+            yield reader
+        finally:
+            self.release(languages)
+
+    def get_reader(self, languages: Union[str, List[str]]):
+        """
+        Retorna o leitor dos idiomas sem mantê-lo referenciado (compatível com o cache antigo).
+        """
+        reader = self.acquire(languages)
+        self.release(languages)
+        return reader
+
+    def _total_memory(self) -> int:
+        shared = self._shared_detector['memory'] if self._shared_detector else 0
+        return shared + sum(info['memory'] for info in self._info.values())
+
+    def _memory_saved(self) -> int:
+        """Memória que os leitores ocupariam a mais se cada um carregasse o seu próprio detector."""
+        if not self._shared_detector:
+            return 0
+        sharing = sum(1 for info in self._info.values() if info['shared_detector'])
+        return self._shared_detector['memory'] * max(sharing - 1, 0)
+
+    def _enforce_budget(self) -> None:
+        """Descarta os leitores menos usados recentemente, sem referências, até caber no orçamento."""
+        if self.memory_budget <= 0:
+            return
+        evicted_gpu = False
+        while self._total_memory() > self.memory_budget:
+            # O leitor mais recente nunca é descartado: ele acabou de ser pedido
+            candidates = [key for key in list(self.readers)[:-1] if self._info[key]['refs'] == 0]
+            if not candidates:
+                break
+            key = candidates[0]
+            del self.readers[key]
+            info = self._info.pop(key)
+            evicted_gpu = evicted_gpu or info['gpu']
+            self.stats['evictions'] += 1
+            print(f"Registro de Modelos: Leitor '{key}' descartado (LRU) para respeitar o orçamento de memória.")
+        if evicted_gpu:
+            try:
+                import torch
+                torch.cuda.empty_cache()
+            except Exception:
+                pass
+
+    def warm_up(self, languages: Union[str, List[str]]) -> float:
+        """
+        Executa uma inferência em um quadro sintético para inicializar kernels e alocações.
+
+        Returns:
+            Tempo do aquecimento em segundos.
+        """
+        key = reader_key(languages)
+        start = time.time()
+        with self.use(key) as reader:
+            reader.readtext(create_warmup_frame(), detail=1)
+        warmup_time = time.time() - start
+        with self._lock:
+            if key in self._info:
+                self._info[key]['warmup_time'] = warmup_time
+        print(f"Registro de Modelos: '{key}' aquecido em {warmup_time:.2f}s.")
+        return warmup_time
+
+    def preload(self, languages: List[str] = None, warm_up: bool = OCR_WARMUP_ENABLED) -> Dict[str, bool]:
+        """
+        Carrega (e opcionalmente aquece) os leitores dos idiomas informados.
+
+        Args:
+            languages: Idiomas a carregar (padrão: OCR_PRELOAD_LANGUAGES).
+            warm_up: Executa a inferência de aquecimento após carregar.
+
+        Returns:
+            Dicionário idioma -> True se o leitor ficou pronto.
+        """
+        if languages is None:
+            languages = parse_languages(OCR_PRELOAD_LANGUAGES)
+        results = {}
+        for lang in languages:
+            try:
+                if warm_up:
+                    self.warm_up(lang)
+                else:
+                    self.get_reader(lang)
+                results[lang] = True
+            except Exception as e:
+                print(f"Registro de Modelos: Falha ao pré-carregar '{lang}': {e}")
+                results[lang] = False
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os leitores carregados com tempo de carga, memória e uso."""
+        with self._lock:
+            readers = {
+                key: {
+                    'device': 'gpu' if info['gpu'] else 'cpu',
+                    'load_time_s': round(info['load_time'], 2),
+                    'warmup_time_s': round(info['warmup_time'], 2) if info['warmup_time'] is not None else None,
+                    'memory_mb': round(info['memory'] / (1024 * 1024), 1),
+                    'shared_detector': info['shared_detector'],
+                    'refs': info['refs'],
+                    'uses': info['uses']
+                }
+                for key, info in self._info.items()
+            }
+            return {
+                'device': None if self._gpu is None else ('gpu' if self._gpu else 'cpu'),
+                'memory_budget_mb': round(self.memory_budget / (1024 * 1024), 1),
+                'memory_mb': round(self._total_memory() / (1024 * 1024), 1),
+                'shared_detector_mb': round(self._shared_detector['memory'] / (1024 * 1024), 1) if self._shared_detector else 0,
+                'memory_saved_mb': round(self._memory_saved() / (1024 * 1024), 1),
+                'readers': readers,
+                **self.stats
+            }
+
+
+# Instância global do registro de modelos
+model_registry = ModelRegistry()
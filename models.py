@@ -9,4 +9,6 @@ class RetroArchRequest(BaseModel):
     coords: Optional[List[int]] = None
     viewport: Optional[List[int]] = None
     label: Optional[str] = None
-    state: Optional[str] = None  # Campo adicional que o RetroArch envia
\ No newline at end of file
+    state: Optional[str] = None  # Campo adicional que o RetroArch envia
+    client_id: Optional[str] = None  # Endereço do cliente, preenchido pelo servidor para identificar a sessão
+    image_bytes: Optional[bytes] = None  # Corpo binário da imagem, repassado sem conversão para base64
@@ -0,0 +1,164 @@
+# ocr_corrections.py
+
+"""
+Correção de erros comuns de OCR compilada uma única vez.
+
+A versão antiga de correct_ocr_errors executava um re.sub por entrada de OCR_CORRECTIONS
+(cerca de 90 buscas por texto) e até sete expressões de PUSH SPACE KEY compiladas a cada
+chamada. Aqui as correções são compiladas em uma única expressão de alternação (ver
+game_terms.TermReplacer), com a mesma prioridade da ordem do dicionário, e as expressões
+de PUSH SPACE KEY são pré-compiladas. O resultado é idêntico ao da versão antiga.
+
+Opcionalmente, palavras em maiúsculas que não estão no vocabulário dos termos de jogos são
+corrigidas por distância de edição: uma árvore BK com o vocabulário encontra as palavras
+mais próximas, e a correção só é aplicada quando há uma única candidata.
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from bk_tree import BKTree, edit_distance
+from game_terms import TermReplacer
+
+# Configurações via variáveis de ambiente
+# Correção aproximada (distância de edição) das palavras fora do vocabulário dos termos de jogos
+OCR_FUZZY_CORRECTION_ENABLED = os.getenv('OCR_FUZZY_CORRECTION_ENABLED', 'false').lower() == 'true'
+# Distância de edição máxima aceita na correção aproximada
+OCR_FUZZY_MAX_DISTANCE = int(os.getenv('OCR_FUZZY_MAX_DISTANCE', '1'))
+# Tamanho mínimo das palavras corrigidas (palavras curtas têm vizinhas demais)
+OCR_FUZZY_MIN_LENGTH = int(os.getenv('OCR_FUZZY_MIN_LENGTH', '5'))
+
+# Número máximo de palavras no cache da correção aproximada
+FUZZY_CACHE_SIZE = 4096
+
+# Texto formado apenas por variações de PUSH SPACE KEY
+_PUSH_SPACE_ONLY = re.compile(
+    r'^\s*(?:KEY\s+)?PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*(?:PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*)*$',
+    re.IGNORECASE)
+# Texto que contém alguma variação de PUSH SPACE KEY
+_PUSH_SPACE_ANY = re.compile(r'PUSH\s*SPACE\s*KEY|PUSH[G]?[E]?PAC[B]?KEY|KEY\s+PUSH\s+SPACE', re.IGNORECASE)
+# Normalizações aplicadas, nesta ordem, quando há alguma variação
+_PUSH_SPACE_NORMALIZATIONS = [
+    re.compile(r'PUSH[G]?[E]?PAC[B]?KEY', re.IGNORECASE),
+    re.compile(r'PUSH\s+SPACE\s+KEY', re.IGNORECASE),
+    re.compile(r'KEY\s+PUSH\s+SPACE', re.IGNORECASE),
+]
+
+_UPPERCASE_WORD = re.compile(r'\b[A-Z]+\b')
+_WORD = re.compile(r'[A-Za-z]+')
+
+
+class OCRCorrectionEngine:
+    """
+    Corrige erros comuns de OCR com as correções compiladas e, opcionalmente, por
+    distância de edição até o vocabulário dos termos de jogos.
+    """
+
+    def __init__(self, corrections: Dict[str, str], vocabulary: Iterable[str] = (),
+                 fuzzy_enabled: bool = OCR_FUZZY_CORRECTION_ENABLED,
+                 max_distance: int = OCR_FUZZY_MAX_DISTANCE, min_length: int = OCR_FUZZY_MIN_LENGTH):
+        """
+        Inicializa o motor e compila as correções.
+
+        Args:
+            corrections: Dicionário erro -> correção, em ordem de prioridade.
+            vocabulary: Termos conhecidos (palavras ou frases) usados na correção aproximada.
+            fuzzy_enabled: Ativa a correção aproximada.
+            max_distance: Distância de edição máxima da correção aproximada.
+            min_length: Tamanho mínimo das palavras corrigidas de forma aproximada.
+        """
+        self.replacer = TermReplacer(list(corrections.items()))
+        self.fuzzy_enabled = fuzzy_enabled
+        self.max_distance = max_distance
+        self.min_length = min_length
+        # Vocabulário: palavras dos termos conhecidos e das próprias correções
+        words = {word.upper() for term in vocabulary for word in _WORD.findall(term)}
+        words.update(word.upper() for correction in corrections.values() for word in _WORD.findall(correction))
+        self.vocabulary = frozenset(words)
+        self._tree: Optional[BKTree] = None
+        self._fuzzy_cache: Dict[str, Optional[str]] = {}
+        self.stats = {'corrections': 0, 'sequential_fallbacks': 0, 'fuzzy_corrections': 0, 'fuzzy_cache_hits': 0}
+
+    def _build_tree(self) -> BKTree:
+        tree = BKTree(edit_distance)
+        for word in sorted(self.vocabulary):
+            if len(word) >= self.min_length - self.max_distance:
+                tree.add(word, word)
+        return tree
+
+    def closest_word(self, word: str) -> Optional[str]:
+        """
+        Palavra do vocabulário mais próxima, se for a única na menor distância encontrada.
+
+        Args:
+            word: Palavra em maiúsculas fora do vocabulário.
+
+        Returns:
+            Palavra corrigida, ou None se não houver candidata única.
+        """
+        if word in self._fuzzy_cache:
+            self.stats['fuzzy_cache_hits'] += 1
+            return self._fuzzy_cache[word]
+        if self._tree is None:
+            self._tree = self._build_tree()
+
+        matches = self._tree.search(word, self.max_distance)
+        best = None
+        if matches and (len(matches) == 1 or matches[1][0] > matches[0][0]):
+            best = matches[0][1]
+
+        if len(self._fuzzy_cache) >= FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[word] = best
+        return best
+
+    def _fuzzy_replace(self, match: re.Match) -> str:
+        word = match.group(0)
+        if len(word) < self.min_length or word in self.vocabulary:
+            return word
+        corrected = self.closest_word(word)
+        if corrected is None:
+            return word
+        self.stats['fuzzy_corrections'] += 1
+        return corrected
+
+    def correct(self, text: str) -> str:
+        """
+        Corrige os erros de OCR do texto.
+
+        Args:
+            text: Texto reconhecido pelo OCR.
+
+        Returns:
+            Texto corrigido.
+        """
+        if not text:
+            return text
+
+        # Caso especial para texto que contém apenas variações de PUSH SPACE KEY
+        if _PUSH_SPACE_ONLY.match(text):
+            return 'PUSH SPACE KEY'
+        # Normaliza as variações de PUSH SPACE KEY para garantir tradução correta
+        if _PUSH_SPACE_ANY.search(text):
+            for pattern in _PUSH_SPACE_NORMALIZATIONS:
+                text = pattern.sub('PUSH SPACE KEY', text)
+
+        corrected, fallback = self.replacer.apply(text)
+        self.stats['corrections'] += 1
+        if fallback:
+            self.stats['sequential_fallbacks'] += 1
+        if self.fuzzy_enabled:
+            corrected = _UPPERCASE_WORD.sub(self._fuzzy_replace, corrected)
+        return corrected
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna o tamanho das correções e do vocabulário e os contadores do motor."""
+        return {
+            'corrections_compiled': len(self.replacer.items),
+            'conflicting_corrections': len(self.replacer.conflicts),
+            'fuzzy_enabled': self.fuzzy_enabled,
+            'vocabulary_size': len(self.vocabulary),
+            'fuzzy_cache_size': len(self._fuzzy_cache),
+            **self.stats
+        }
@@ -2,39 +2,44 @@
 
 # ocr_module.py
 
-import easyocr
+import os
+
 import cv2
 import numpy as np
 
+from inference_executor import inference_executor, InferenceQueueFullError
+from model_registry import model_registry, reader_key
+from batched_ocr import batched_ocr
+from debug_capture import debug_capture
+from detection_grouping import box_geometry, group_boxes, merge_group
+from detection_nms import suppress_duplicates
+from micro_batcher import micro_batcher
+from frame import Frame
+from orientation import find_best_orientation
+from incremental_ocr import incremental_ocr
+
+# Executa também uma passada na imagem binarizada e remove as duplicatas entre as passadas (NMS)
+OCR_MULTIPASS_ENABLED = os.getenv('OCR_MULTIPASS_ENABLED', 'false').lower() == 'true'
+
 # --- GERENCIAMENTO DO MODELO ---
-# Dicionário para armazenar instâncias do leitor de OCR para diferentes idiomas.
-# Isso evita recarregar modelos desnecessariamente, agindo como um cache.
-readers = {}
+# Os leitores pertencem ao registro de modelos, que os pré-carrega no lifespan do servidor
+# e os descarta por LRU. Mantemos o nome 'readers' para compatibilidade.
+readers = model_registry.readers
 
 def get_reader(lang_code: str):
     """
     Retorna uma instância do leitor EasyOCR para o idioma especificado.
     Se um leitor para o idioma ainda não existir, ele será criado e armazenado em cache.
     """
-    # Se o idioma padrão for solicitado, mapeia para o código correto que o EasyOCR espera.
-    if lang_code.lower() == 'default':
-        lang_code = 'en' # O RetroArch usa 'Default' para inglês.
-
-    if lang_code not in readers:
-        print(f"Modelo de OCR para o idioma '{lang_code}' não encontrado no cache. Carregando...")
-        # Cria uma nova instância do Reader para o idioma solicitado e a armazena.
-        # Usamos gpu=True para aproveitar a aceleração por hardware, se disponível.
-        readers[lang_code] = easyocr.Reader([lang_code], gpu=True)
-        print(f"Modelo de OCR para '{lang_code}' carregado e adicionado ao cache.")
-    else:
-        print(f"Usando modelo de OCR para '{lang_code}' do cache.")
-        
-    return readers[lang_code]
+    return model_registry.get_reader(lang_code)
 
 def group_text_detections(detections, max_distance_ratio=0.15, max_vertical_distance_ratio=0.1):
     """
     Agrupa detecções de texto que estão próximas espacialmente e provavelmente pertencem ao mesmo contexto.
     
+    Os grupos são as componentes conexas do grafo de proximidade entre as caixas (ver
+    detection_grouping), calculado com NumPy; o resultado não depende da ordem das detecções.
+    
     Args:
         detections: Lista de dicionários com 'text', 'bbox', 'confidence'
         max_distance_ratio: Distância horizontal máxima entre detecções como proporção da largura da imagem
@@ -46,155 +51,103 @@ def group_text_detections(detections, max_distance_ratio=0.15, max_vertical_dist
     if not detections:
         return []
     
-    # Ordena as detecções por posição vertical (y) para processar de cima para baixo
-    sorted_detections = sorted(detections, key=lambda d: min(point[1] for point in d['bbox']))
-    
-    # Inicializa grupos
-    groups = []
-    current_group = [sorted_detections[0]]
-    
-    # Calcula a altura e largura aproximada da imagem baseada nas bounding boxes
-    all_x_coords = [point[0] for d in detections for point in d['bbox']]
-    all_y_coords = [point[1] for d in detections for point in d['bbox']]
-    img_width = max(all_x_coords) - min(all_x_coords)
-    img_height = max(all_y_coords) - min(all_y_coords)
-    
-    # Calcula as distâncias máximas permitidas
-    max_horizontal_distance = max_distance_ratio * img_width
-    max_vertical_distance = max_vertical_distance_ratio * img_height
+    # Extremos e centros de todas as caixas, calculados uma única vez
+    extents, centers_y = box_geometry(detections)
+    groups, max_horizontal_distance, max_vertical_distance = group_boxes(
+        extents, centers_y, max_distance_ratio, max_vertical_distance_ratio)
     
     print(f"Módulo OCR: Agrupando textos (distância horizontal máx: {max_horizontal_distance:.1f}px, vertical máx: {max_vertical_distance:.1f}px)")
     
-    # Agrupa detecções próximas
-    for i in range(1, len(sorted_detections)):
-        current_detection = sorted_detections[i]
-        last_detection = current_group[-1]
-        
-        # Calcula centros das bounding boxes
-        current_y = sum(point[1] for point in current_detection['bbox']) / 4
-        last_y = sum(point[1] for point in last_detection['bbox']) / 4
-        
-        # Calcula distância vertical entre os centros
-        vertical_distance = abs(current_y - last_y)
-        
-        # Verifica se as detecções estão na mesma linha ou próximas verticalmente
-        if vertical_distance <= max_vertical_distance:
-            # Verifica se as detecções estão próximas horizontalmente ou alinhadas
-            current_x_min = min(point[0] for point in current_detection['bbox'])
-            current_x_max = max(point[0] for point in current_detection['bbox'])
-            last_x_min = min(point[0] for point in last_detection['bbox'])
-            last_x_max = max(point[0] for point in last_detection['bbox'])
-            
-            # Verifica sobreposição horizontal ou proximidade
-            horizontal_overlap = (current_x_min <= last_x_max and current_x_max >= last_x_min)
-            horizontal_distance = min(abs(current_x_min - last_x_max), abs(last_x_min - current_x_max))
-            
-            if horizontal_overlap or horizontal_distance <= max_horizontal_distance:
-                # Adiciona à linha atual se próximo o suficiente
-                current_group.append(current_detection)
-                continue
-        # Verifica se as detecções estão em linhas consecutivas de texto (uma abaixo da outra)
-        # e têm alguma sobreposição horizontal (alinhamento vertical)
-        elif vertical_distance <= max_vertical_distance * 3:  # Permitimos uma distância vertical maior para linhas consecutivas
-            current_x_min = min(point[0] for point in current_detection['bbox'])
-            current_x_max = max(point[0] for point in current_detection['bbox'])
-            last_x_min = min(point[0] for point in last_detection['bbox'])
-            last_x_max = max(point[0] for point in last_detection['bbox'])
-            
-            # Verifica se há sobreposição horizontal significativa (alinhamento vertical)
-            overlap_width = min(current_x_max, last_x_max) - max(current_x_min, last_x_min)
-            min_width = min(current_x_max - current_x_min, last_x_max - last_x_min)
-            
-            if overlap_width > 0 and overlap_width >= min_width * 0.3:  # Pelo menos 30% de sobreposição
-                current_group.append(current_detection)
-                continue
-        
-        # Se chegou aqui, começa um novo grupo
-        groups.append(current_group)
-        current_group = [current_detection]
-    
-    # Adiciona o último grupo
-    if current_group:
-        groups.append(current_group)
-    
     # Mescla os textos em cada grupo
     grouped_detections = []
-    for i, group in enumerate(groups):
-        if len(group) == 1:
+    for i, members in enumerate(groups):
+        if len(members) == 1:
             # Se o grupo tem apenas uma detecção, mantém como está
-            grouped_detections.append(group[0])
-        else:
-            # Mescla múltiplas detecções em uma única
-            # Ordena por posição horizontal (x) para manter a ordem correta de leitura
-            sorted_group = sorted(group, key=lambda d: min(point[0] for point in d['bbox']))
-            
-            # Combina os textos com espaços ou quebras de linha, dependendo do contexto
-            # Primeiro, identifica se os textos estão em linhas diferentes
-            y_centers = [sum(point[1] for point in d['bbox']) / 4 for d in sorted_group]
-            
-            # Agrupa por linhas (textos com coordenadas y próximas)
-            line_groups = []
-            current_line = [sorted_group[0]]
-            
-            for i in range(1, len(sorted_group)):
-                current_y = y_centers[i]
-                prev_y = y_centers[i-1]
-                
-                # Se a diferença vertical for pequena, está na mesma linha
-                if abs(current_y - prev_y) <= max_vertical_distance:
-                    current_line.append(sorted_group[i])
-                else:
-                    # Nova linha
-                    line_groups.append(current_line)
-                    current_line = [sorted_group[i]]
-            
-            # Adiciona a última linha
-            if current_line:
-                line_groups.append(current_line)
-            
-            # Para cada linha, combina os textos com espaços
-            line_texts = []
-            for line in line_groups:
-                # Ordena por posição x para manter a ordem correta de leitura
-                sorted_line = sorted(line, key=lambda d: min(point[0] for point in d['bbox']))
-                line_text = ' '.join(d['text'] for d in sorted_line)
-                line_texts.append(line_text)
-            
-            # Combina as linhas com quebras de linha
-            combined_text = '\n'.join(line_texts)
-            
-            # Calcula a confiança média
-            avg_confidence = sum(d['confidence'] for d in sorted_group) / len(sorted_group)
-            
-            # Calcula a bounding box combinada
-            all_points = [point for d in sorted_group for point in d['bbox']]
-            min_x = min(point[0] for point in all_points)
-            min_y = min(point[1] for point in all_points)
-            max_x = max(point[0] for point in all_points)
-            max_y = max(point[1] for point in all_points)
-            
-            # Converte coordenadas para int padrão para evitar problemas de serialização com int32
-            combined_bbox = [
-                [int(min_x), int(min_y)],  # top-left
-                [int(max_x), int(min_y)],  # top-right
-                [int(max_x), int(max_y)],  # bottom-right
-                [int(min_x), int(max_y)]   # bottom-left
-            ]
-            
-            grouped_detections.append({
-                'text': combined_text,
-                'bbox': combined_bbox,
-                'confidence': avg_confidence,
-                'is_grouped': True,
-                'group_size': len(sorted_group)
-            })
-            
-            print(f"Módulo OCR: Grupo {i+1} - Mesclou {len(sorted_group)} detecções: '{combined_text}' (confiança: {avg_confidence:.2f})")
+            grouped_detections.append(detections[members[0]])
+            continue
+        
+        merged = merge_group(detections, extents, centers_y, members, max_vertical_distance)
+        grouped_detections.append(merged)
+        print(f"Módulo OCR: Grupo {i+1} - Mesclou {merged['group_size']} detecções: '{merged['text']}' (confiança: {merged['confidence']:.2f})")
     
     print(f"Módulo OCR: Agrupamento concluído - {len(detections)} detecções originais -> {len(grouped_detections)} após agrupamento")
     return grouped_detections
 
-async def extract_text_with_positions(image_bytes: bytes, lang_source: str) -> list:
+def _run_ocr_with_positions(frame: Frame, lang_source: str, session_key: str = None):
+    """
+    Executa a detecção de rotação e o OCR com posições de forma síncrona.
+    Deve ser chamada a partir de uma thread do executor de inferência.
+    """
+    # Obtém o leitor de OCR primeiro para usar na detecção de rotação; ele fica referenciado
+    # no registro de modelos enquanto é usado, para não ser descartado pelo LRU
+    with model_registry.use(lang_source) as ocr_reader:
+        # Encontra a melhor rotação (estratégia configurável, memorizada por sessão)
+        img_corrected, best_angle = find_best_orientation(frame, ocr_reader, session_key)
+        
+        # Captura a imagem corrigida para debug (só em requisições amostradas; sem rotação ela é a própria recebida)
+        if best_angle:
+            debug_capture.save_image(f"corrected_{best_angle}", img_corrected)
+        
+        # Realiza OCR na imagem corrigida (só nas regiões que mudaram desde o quadro anterior da sessão),
+        # em lote com os quadros de outras requisições que chegarem na mesma janela. O estado
+        # reaproveitado depende também do leitor de idiomas e da rotação: trocar o idioma de origem
+        # ou a orientação numa tela parada não pode devolver as detecções do leitor anterior
+        tracker_key = f"{session_key}:{reader_key(lang_source)}:{best_angle}" if session_key else None
+        detections = incremental_ocr.readtext(micro_batcher.reader(ocr_reader, lang_source), img_corrected,
+                                              tracker_key, detail=1)
+        
+        if OCR_MULTIPASS_ENABLED:
+            # Segunda passada na imagem binarizada; as duplicatas são removidas em _process_detections
+            img_thresh = _threshold_image(img_corrected)
+            debug_capture.save_image("processed", img_thresh)
+            detections = list(detections) + ocr_reader.readtext(img_thresh, detail=1)
+    
+    return _process_detections(detections, deduplicate=OCR_MULTIPASS_ENABLED)
+
+def _threshold_image(img_bgr):
+    """
+    Versão binarizada da imagem (escala de cinza, desfoque gaussiano e threshold adaptativo).
+    """
+    img_gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    img_blur = cv2.GaussianBlur(img_gray, (3, 3), 0)
+    return cv2.adaptiveThreshold(img_blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+
+def _process_detections(detections, deduplicate: bool = False):
+    """
+    Filtra as detecções do EasyOCR por confiança, converte as coordenadas e agrupa as próximas.
+    Com deduplicate=True (várias passadas de OCR), remove antes as duplicatas entre as passadas.
+    """
+    # Processa as detecções e filtra por confiança
+    processed_detections = []
+    for detection in detections:
+        bbox, text, confidence = detection
+        if confidence > 0.3 and text.strip():  # Filtro de confiança
+            clean_text = text.strip().replace('\n', ' ').replace('\t', ' ')
+            if len(clean_text) > 0:
+                    # Converte coordenadas para int padrão para evitar problemas de serialização com int32
+                converted_bbox = [
+                    [int(point[0]), int(point[1])] for point in bbox
+                ]
+                processed_detections.append({
+                    'text': clean_text,
+                    'bbox': converted_bbox,
+                    'confidence': float(confidence)  # Garante que confidence seja float padrão
+                })
+                print(f"Módulo OCR: Detectado '{clean_text}' (confiança: {confidence:.2f})")
+    
+    print(f"Módulo OCR: Total de detecções válidas: {len(processed_detections)}")
+    
+    if deduplicate:
+        processed_detections = suppress_duplicates(processed_detections)
+        print(f"Módulo OCR: Total de detecções únicas entre as passadas: {len(processed_detections)}")
+    
+    # Agrupa detecções próximas para melhorar o contexto
+    grouped_detections = group_text_detections(processed_detections)
+    
+    return grouped_detections
+
+async def extract_text_with_positions(image_bytes: bytes, lang_source: str, session_key: str = None,
+                                      frame: Frame = None) -> list:
     """
     Recebe os bytes de uma imagem, realiza o OCR para um idioma específico e retorna
     uma lista de detecções com texto, coordenadas e confiança.
@@ -202,6 +155,8 @@ async def extract_text_with_positions(image_bytes: bytes, lang_source: str) -> l
     Args:
         image_bytes: A imagem como um objeto de bytes.
         lang_source: O código do idioma de origem (ex: 'en', 'ja') para o OCR.
+        session_key: Identificador do cliente/jogo, usado para memorizar a orientação.
+        frame: O quadro já decodificado na requisição, quando disponível; evita decodificar os bytes de novo.
 
     Returns:
         Lista de dicionários com 'text', 'bbox', 'confidence' para cada detecção.
@@ -210,180 +165,77 @@ async def extract_text_with_positions(image_bytes: bytes, lang_source: str) -> l
         print(f"Módulo OCR: Recebeu imagem para extração de texto com posições - idioma: {lang_source}")
         
         # Decodifica os bytes da imagem para um formato que o OpenCV/EasyOCR entenda.
-        np_arr = np.frombuffer(image_bytes, np.uint8)
-        img_cv = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        if frame is None:
+            frame = Frame.from_bytes(image_bytes)
 
-        if img_cv is None:
+        if frame is None:
             print("Módulo OCR: Erro ao decodificar a imagem. A imagem pode estar corrompida ou em um formato inválido.")
             return []
 
         # Log das dimensões da imagem para depuração
-        height, width, channels = img_cv.shape
+        height, width, channels = frame.bgr.shape
         print(f"Módulo OCR: Dimensões da imagem - Largura: {width}px, Altura: {height}px, Canais: {channels}")
         
-        # Salva a imagem temporariamente para análise visual (opcional)
-        import os
-        temp_image_path = "temp_received_image.png"
-        cv2.imwrite(temp_image_path, img_cv)
-        print(f"Módulo OCR: Imagem salva temporariamente em: {os.path.abspath(temp_image_path)}")
-        
-        # Função para testar diferentes rotações e encontrar a melhor orientação
-        def test_rotation_and_get_best_image(image):
-            rotations = {
-                0: image,
-                90: cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE),
-                180: cv2.rotate(image, cv2.ROTATE_180),
-                270: cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
-            }
-            
-            best_rotation = 0
-            max_text_count = 0
-            best_image = image
-            
-            print("Módulo OCR: Testando diferentes rotações para encontrar a melhor orientação...")
-            
-            for angle, rotated_img in rotations.items():
-                # Teste rápido de OCR para cada rotação
-                try:
-                    quick_result = ocr_reader.readtext(rotated_img, detail=1)
-                    text_count = len([r for r in quick_result if r[2] > 0.3])  # Conta textos com boa confiança
-                    total_chars = sum(len(r[1].strip()) for r in quick_result if r[2] > 0.3)
-                    
-                    print(f"Módulo OCR: Rotação {angle}° - {text_count} detecções, {total_chars} caracteres")
-                    
-                    # Prioriza rotações com mais caracteres detectados
-                    if total_chars > max_text_count:
-                        max_text_count = total_chars
-                        best_rotation = angle
-                        best_image = rotated_img
-                        
-                except Exception as e:
-                    print(f"Módulo OCR: Erro ao testar rotação {angle}°: {e}")
-            
-            print(f"Módulo OCR: Melhor orientação encontrada: {best_rotation}° ({max_text_count} caracteres)")
-            return best_image, best_rotation
-        
-        # Obtém o leitor de OCR primeiro para usar na detecção de rotação
-        ocr_reader = get_reader(lang_source)
-        
-        # Encontra a melhor rotação
-        img_corrected, best_angle = test_rotation_and_get_best_image(img_cv)
-        
-        # Salva a imagem corrigida
-        corrected_image_path = "temp_corrected_image.png"
-        cv2.imwrite(corrected_image_path, img_corrected)
-        print(f"Módulo OCR: Imagem corrigida (rotação {best_angle}°) salva em: {os.path.abspath(corrected_image_path)}")
-        
-        # Realiza OCR na imagem corrigida
-        detections = ocr_reader.readtext(img_corrected, detail=1)
-        
-        # Processa as detecções e filtra por confiança
-        processed_detections = []
-        for detection in detections:
-            bbox, text, confidence = detection
-            if confidence > 0.3 and text.strip():  # Filtro de confiança
-                clean_text = text.strip().replace('\n', ' ').replace('\t', ' ')
-                if len(clean_text) > 0:
-                        # Converte coordenadas para int padrão para evitar problemas de serialização com int32
-                    converted_bbox = [
-                        [int(point[0]), int(point[1])] for point in bbox
-                    ]
-                    processed_detections.append({
-                        'text': clean_text,
-                        'bbox': converted_bbox,
-                        'confidence': float(confidence)  # Garante que confidence seja float padrão
-                    })
-                    print(f"Módulo OCR: Detectado '{clean_text}' (confiança: {confidence:.2f})")
-        
-        print(f"Módulo OCR: Total de detecções válidas: {len(processed_detections)}")
-        
-        # Agrupa detecções próximas para melhorar o contexto
-        grouped_detections = group_text_detections(processed_detections)
-        
-        return grouped_detections
+        # A inferência roda no pool dedicado para não bloquear o event loop.
+        return await inference_executor.submit(_run_ocr_with_positions, frame, lang_source, session_key)
         
+    except InferenceQueueFullError:
+        # Propaga a saturação da fila para que o endpoint responda com backpressure.
+        raise
     except Exception as e:
         print(f"Erro no módulo OCR (com posições): {e}")
         return []
 
-async def extract_text_from_image(image_bytes: bytes, lang_source: str) -> str:
+def _run_ocr_batch(images, lang_source: str):
     """
-    Recebe os bytes de uma imagem, realiza o OCR para um idioma específico e retorna o texto.
+    Executa o OCR de várias imagens em lote de forma síncrona.
+    Deve ser chamada a partir de uma thread do executor de inferência.
+    """
+    with model_registry.use(lang_source) as ocr_reader:
+        results = batched_ocr.readtext(ocr_reader, images)
+    return [_process_detections(detections) for detections in results]
+
+async def extract_text_batch(images, lang_source: str) -> list:
+    """
+    Realiza o OCR com posições de várias imagens de uma vez (ex: variantes ou rotações do mesmo quadro).
+
+    As imagens de mesmo tamanho passam juntas pelo detector CRAFT e as linhas de texto de
+    todas elas passam juntas pelo reconhecedor. Não há detecção de rotação: as imagens
+    devem chegar na orientação desejada.
 
     Args:
-        image_bytes: A imagem como um objeto de bytes.
+        images: Lista de imagens (arrays BGR/escala de cinza ou objetos Frame).
         lang_source: O código do idioma de origem (ex: 'en', 'ja') para o OCR.
 
     Returns:
-        O texto encontrado na imagem, concatenado em uma única string.
+        Lista, na ordem das imagens, de listas de detecções no mesmo formato de extract_text_with_positions.
     """
+    images = [image.bgr if isinstance(image, Frame) else image for image in images]
+    if not images:
+        return []
     try:
-        print(f"Módulo OCR: Recebeu imagem para extração de texto com idioma de origem: {lang_source}")
-        
-        # Decodifica os bytes da imagem para um formato que o OpenCV/EasyOCR entenda.
-        np_arr = np.frombuffer(image_bytes, np.uint8)
-        img_cv = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-
-        if img_cv is None:
-            print("Módulo OCR: Erro ao decodificar a imagem. A imagem pode estar corrompida ou em um formato inválido.")
-            return ""
+        print(f"Módulo OCR: Recebeu {len(images)} imagens para extração de texto em lote - idioma: {lang_source}")
+        return await inference_executor.submit(_run_ocr_batch, images, lang_source)
+    except InferenceQueueFullError:
+        raise
+    except Exception as e:
+        print(f"Erro no módulo OCR (em lote): {e}")
+        return [[] for _ in images]
 
-        # Log das dimensões da imagem para depuração
-        height, width, channels = img_cv.shape
-        print(f"Módulo OCR: Dimensões da imagem - Largura: {width}px, Altura: {height}px, Canais: {channels}")
-        
-        # Salva a imagem temporariamente para análise visual (opcional)
-        import os
-        temp_image_path = "temp_received_image.png"
-        cv2.imwrite(temp_image_path, img_cv)
-        print(f"Módulo OCR: Imagem salva temporariamente em: {os.path.abspath(temp_image_path)}")
-        
-        # Função para testar diferentes rotações e encontrar a melhor orientação
-        def test_rotation_and_get_best_image(image):
-            rotations = {
-                0: image,
-                90: cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE),
-                180: cv2.rotate(image, cv2.ROTATE_180),
-                270: cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
-            }
-            
-            best_rotation = 0
-            max_text_count = 0
-            best_image = image
-            
-            print("Módulo OCR: Testando diferentes rotações para encontrar a melhor orientação...")
-            
-            for angle, rotated_img in rotations.items():
-                # Teste rápido de OCR para cada rotação
-                try:
-                    quick_result = ocr_reader.readtext(rotated_img, detail=1)
-                    text_count = len([r for r in quick_result if r[2] > 0.3])  # Conta textos com boa confiança
-                    total_chars = sum(len(r[1].strip()) for r in quick_result if r[2] > 0.3)
-                    
-                    print(f"Módulo OCR: Rotação {angle}° - {text_count} detecções, {total_chars} caracteres")
-                    
-                    # Prioriza rotações com mais caracteres detectados
-                    if total_chars > max_text_count:
-                        max_text_count = total_chars
-                        best_rotation = angle
-                        best_image = rotated_img
-                        
-                except Exception as e:
-                    print(f"Módulo OCR: Erro ao testar rotação {angle}°: {e}")
-            
-            print(f"Módulo OCR: Melhor orientação encontrada: {best_rotation}° ({max_text_count} caracteres)")
-            return best_image, best_rotation
-        
-        # Obtém o leitor de OCR primeiro para usar na detecção de rotação
-        ocr_reader = get_reader(lang_source)
-        
-        # Encontra a melhor rotação
-        img_corrected, best_angle = test_rotation_and_get_best_image(img_cv)
+def _run_ocr_text_only(img_cv, lang_source: str, session_key: str = None):
+    """
+    Executa a detecção de rotação e as tentativas de OCR de forma síncrona.
+    Deve ser chamada a partir de uma thread do executor de inferência.
+    """
+    # Obtém o leitor de OCR primeiro para usar na detecção de rotação; o leitor fica referenciado
+    # no registro de modelos até o fim das tentativas, para não ser descartado pelo orçamento de memória
+    with model_registry.use(lang_source) as ocr_reader:
+        # Encontra a melhor rotação (estratégia configurável, memorizada por sessão)
+        img_corrected, best_angle = find_best_orientation(img_cv, ocr_reader, session_key)
         
-        # Salva a imagem corrigida
-        corrected_image_path = "temp_corrected_image.png"
-        cv2.imwrite(corrected_image_path, img_corrected)
-        print(f"Módulo OCR: Imagem corrigida (rotação {best_angle}°) salva em: {os.path.abspath(corrected_image_path)}")
+        # Captura a imagem corrigida para debug (só em requisições amostradas; sem rotação ela é a própria recebida)
+        if best_angle:
+            debug_capture.save_image(f"corrected_{best_angle}", img_corrected)
         
         # Cria uma versão pré-processada da imagem corrigida para melhorar o OCR
         # Converte para escala de cinza
@@ -395,10 +247,8 @@ async def extract_text_from_image(image_bytes: bytes, lang_source: str) -> str:
         # Aplica threshold adaptativo para melhorar contraste
         img_thresh = cv2.adaptiveThreshold(img_blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
         
-        # Salva a imagem pré-processada para comparação
-        processed_image_path = "temp_processed_image.png"
-        cv2.imwrite(processed_image_path, img_thresh)
-        print(f"Módulo OCR: Imagem pré-processada salva em: {os.path.abspath(processed_image_path)}")
+        # Captura a imagem pré-processada para comparação
+        debug_capture.save_image("processed", img_thresh)
 
         # Lista para armazenar todos os resultados de OCR
         all_detections = []
@@ -458,7 +308,40 @@ async def extract_text_from_image(image_bytes: bytes, lang_source: str) -> str:
             print("Módulo OCR: Nenhum texto foi encontrado na imagem.")
 
         return extracted_text
+
+async def extract_text_from_image(image_bytes: bytes, lang_source: str, session_key: str = None) -> str:
+    """
+    Recebe os bytes de uma imagem, realiza o OCR para um idioma específico e retorna o texto.
+
+    Args:
+        image_bytes: A imagem como um objeto de bytes.
+        lang_source: O código do idioma de origem (ex: 'en', 'ja') para o OCR.
+        session_key: Identificador do cliente/jogo, usado para memorizar a orientação.
+
+    Returns:
+        O texto encontrado na imagem, concatenado em uma única string.
+    """
+    try:
+        print(f"Módulo OCR: Recebeu imagem para extração de texto com idioma de origem: {lang_source}")
+        
+        # Decodifica os bytes da imagem para um formato que o OpenCV/EasyOCR entenda.
+        np_arr = np.frombuffer(image_bytes, np.uint8)
+        img_cv = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+
+        if img_cv is None:
+            print("Módulo OCR: Erro ao decodificar a imagem. A imagem pode estar corrompida ou em um formato inválido.")
+            return ""
+
+        # Log das dimensões da imagem para depuração
+        height, width, channels = img_cv.shape
+        print(f"Módulo OCR: Dimensões da imagem - Largura: {width}px, Altura: {height}px, Canais: {channels}")
+        
+        # A inferência roda no pool dedicado para não bloquear o event loop.
+        return await inference_executor.submit(_run_ocr_text_only, img_cv, lang_source, session_key)
         
+    except InferenceQueueFullError:
+        # Propaga a saturação da fila para que o endpoint responda com backpressure.
+        raise
     except Exception as e:
         print(f"Erro no módulo OCR: {e}")
         return ""
\ No newline at end of file
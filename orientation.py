@@ -0,0 +1,342 @@
+# orientation.py
+
+"""
+Estágio de detecção de orientação das capturas de tela.
+
+Antes, cada quadro passava por quatro execuções completas de readtext (0°, 90°, 180° e 270°)
+só para escolher a rotação, e depois por uma quinta execução na imagem vencedora.
+Como as capturas de emuladores quase sempre estão na vertical correta, este módulo oferece
+estratégias mais baratas:
+
+- 'detector': usa apenas o detector CRAFT (sem reconhecimento) para decidir o eixo do texto
+  pela geometria das caixas, e reconhece só as maiores caixas para desempatar 0° e 180°.
+- 'projection': heurística de perfil de projeção com NumPy, sem usar o modelo quando o texto
+  está na horizontal.
+- 'full': comportamento antigo, com OCR completo em cada rotação (as quatro em um único lote;
+  útil para comparação).
+- 'off': não testa rotações; assume 0°.
+
+A orientação vencedora é lembrada por cliente/jogo, de modo que os quadros seguintes
+da mesma sessão não precisam repetir a sondagem. A memória é um LRU limitado a
+OCR_ORIENTATION_MAX_SESSIONS sessões; entradas vencidas são removidas ao serem consultadas.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from batched_ocr import batched_ocr
+from frame import Frame
+
+# Configurações via variáveis de ambiente
+OCR_ORIENTATION_MODE = os.getenv('OCR_ORIENTATION_MODE', 'detector').lower()
+OCR_ORIENTATION_MEMORY = os.getenv('OCR_ORIENTATION_MEMORY', 'true').lower() == 'true'
+OCR_ORIENTATION_MEMORY_TTL = int(os.getenv('OCR_ORIENTATION_MEMORY_TTL', '600'))
+# Número máximo de sessões com orientação memorizada (as menos usadas são descartadas)
+OCR_ORIENTATION_MAX_SESSIONS = int(os.getenv('OCR_ORIENTATION_MAX_SESSIONS', '256'))
+OCR_ORIENTATION_CHECK_FLIP = os.getenv('OCR_ORIENTATION_CHECK_FLIP', 'true').lower() == 'true'
+
+ORIENTATION_MODES = ('detector', 'projection', 'full', 'off')
+
+# Maior lado da imagem reduzida usada no perfil de projeção
+PROJECTION_MAX_SIDE = 256
+
+# Número de caixas usadas no desempate entre uma rotação e a sua inversa (180°)
+FLIP_CHECK_BOXES = 3
+
+# Rotações suportadas e o código correspondente do OpenCV
+ROTATION_CODES = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE
+}
+
+
+def rotate_image(image, angle: int):
+    """
+    Rotaciona a imagem no sentido horário pelo ângulo informado (0, 90, 180 ou 270).
+
+    Args:
+        image: Imagem em formato ndarray.
+        angle: Ângulo de rotação em graus.
+
+    Returns:
+        Imagem rotacionada (a própria imagem se o ângulo for 0).
+    """
+    angle = angle % 360
+    if angle == 0:
+        return image
+    return cv2.rotate(image, ROTATION_CODES[angle])
+
+
+def _to_gray(image):
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def projection_axis_scores(image) -> Tuple[float, float]:
+    """
+    Calcula a "estrutura de linhas" nos perfis de projeção horizontal e vertical.
+
+    Texto na horizontal produz um perfil por linhas com picos (linhas de texto) separados por
+    faixas vazias; o perfil por colunas é bem mais uniforme. O score de cada eixo é o
+    coeficiente de variação do respectivo perfil de tinta.
+
+    Args:
+        image: Imagem BGR ou em escala de cinza (já reduzida, se vier de Frame.downscaled_gray).
+
+    Returns:
+        Tupla (score_horizontal, score_vertical).
+    """
+    gray = _to_gray(image)
+    # Reduz a imagem para manter o custo constante independentemente da resolução
+    scale = float(PROJECTION_MAX_SIDE) / max(gray.shape[:2])
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    _, mask = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # O texto é a cor minoritária: inverte a máscara se o primeiro plano ocupar mais da metade
+    if mask.mean() > 0.5:
+        mask = 1 - mask
+
+    row_profile = mask.sum(axis=1).astype(np.float32)
+    col_profile = mask.sum(axis=0).astype(np.float32)
+
+    def coefficient_of_variation(profile):
+        mean = profile.mean()
+        return float(profile.std() / mean) if mean > 0 else 0.0
+
+    return coefficient_of_variation(row_profile), coefficient_of_variation(col_profile)
+
+
+def _detector_boxes(reader, image):
+    """Executa apenas o detector CRAFT e retorna as caixas horizontais [x_min, x_max, y_min, y_max]."""
+    horizontal_list, free_list = reader.detect(image)
+    boxes = list(horizontal_list[0]) if horizontal_list else []
+    # Caixas inclinadas são convertidas para o retângulo envolvente
+    for polygon in (free_list[0] if free_list else []):
+        xs = [p[0] for p in polygon]
+        ys = [p[1] for p in polygon]
+        boxes.append([min(xs), max(xs), min(ys), max(ys)])
+    return boxes
+
+
+def detector_axis_scores(boxes) -> Tuple[float, float]:
+    """
+    Soma a área das caixas largas (texto horizontal) e das caixas altas (texto vertical).
+
+    Args:
+        boxes: Lista de caixas [x_min, x_max, y_min, y_max] retornadas pelo detector.
+
+    Returns:
+        Tupla (area_horizontal, area_vertical).
+    """
+    horizontal_area = 0.0
+    vertical_area = 0.0
+    for x_min, x_max, y_min, y_max in boxes:
+        width = max(x_max - x_min, 1)
+        height = max(y_max - y_min, 1)
+        if width >= height:
+            horizontal_area += width * height
+        else:
+            vertical_area += width * height
+    return horizontal_area, vertical_area
+
+
+def _recognition_score(reader, image, boxes) -> float:
+    """Reconhece apenas as caixas informadas e retorna a soma de confiança × caracteres."""
+    if not boxes:
+        return 0.0
+    results = reader.recognize(_to_gray(image), horizontal_list=boxes, free_list=[], detail=1)
+    return sum(confidence * len(text.strip()) for _, text, confidence in results)
+
+
+def _flip_boxes(boxes, width: int, height: int):
+    """Converte caixas [x_min, x_max, y_min, y_max] para a imagem rotacionada em 180°."""
+    return [[width - x_max, width - x_min, height - y_max, height - y_min] for x_min, x_max, y_min, y_max in boxes]
+
+
+class OrientationDetector:
+    """
+    Detecta a orientação do texto em uma captura e memoriza o resultado por sessão.
+    """
+
+    def __init__(self, mode: str = OCR_ORIENTATION_MODE, remember: bool = OCR_ORIENTATION_MEMORY,
+                 memory_ttl: int = OCR_ORIENTATION_MEMORY_TTL, check_flip: bool = OCR_ORIENTATION_CHECK_FLIP,
+                 max_sessions: int = OCR_ORIENTATION_MAX_SESSIONS):
+        """
+        Inicializa o detector de orientação.
+
+        Args:
+            mode: Estratégia de detecção ('detector', 'projection', 'full' ou 'off').
+            remember: Se True, memoriza a orientação vencedora por sessão.
+            memory_ttl: Tempo em segundos durante o qual a orientação memorizada é reutilizada.
+            check_flip: Se True, desempata 0°/180° reconhecendo as maiores caixas.
+            max_sessions: Número máximo de sessões com orientação memorizada.
+        """
+        if mode not in ORIENTATION_MODES:
+            print(f"Orientação: Modo '{mode}' desconhecido. Usando 'detector'.")
+            mode = 'detector'
+        self.mode = mode
+        self.remember = remember
+        self.memory_ttl = memory_ttl
+        self.check_flip = check_flip
+        self.max_sessions = max(1, max_sessions)
+        self._memory: 'OrderedDict[str, Tuple[int, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'probes': 0, 'memory_hits': 0}
+
+    def _recall(self, session_key: Optional[str]) -> Optional[int]:
+        if not self.remember or not session_key:
+            return None
+        with self._lock:
+            entry = self._memory.get(session_key)
+            if entry is None:
+                return None
+            if time.time() - entry[1] >= self.memory_ttl:
+                del self._memory[session_key]
+                return None
+            self._memory.move_to_end(session_key)
+            self.stats['memory_hits'] += 1
+            return entry[0]
+
+    def _memorize(self, session_key: Optional[str], angle: int) -> None:
+        if self.remember and session_key:
+            with self._lock:
+                self._memory[session_key] = (angle, time.time())
+                self._memory.move_to_end(session_key)
+                while len(self._memory) > self.max_sessions:
+                    self._memory.popitem(last=False)
+
+    def forget(self, session_key: Optional[str] = None) -> None:
+        """Esquece a orientação de uma sessão (ou de todas, se nenhuma for informada)."""
+        with self._lock:
+            if session_key is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(session_key, None)
+
+    def _resolve_flip(self, reader, image, base_angle: int, boxes) -> int:
+        """Escolhe entre base_angle e base_angle + 180 reconhecendo as maiores caixas."""
+        if not self.check_flip or reader is None or not boxes:
+            return base_angle
+        largest = sorted(boxes, key=lambda b: (b[1] - b[0]) * (b[3] - b[2]), reverse=True)[:FLIP_CHECK_BOXES]
+        height, width = image.shape[:2]
+        upright_score = _recognition_score(reader, image, largest)
+        flipped_score = _recognition_score(reader, rotate_image(image, 180), _flip_boxes(largest, width, height))
+        print(f"Orientação: Desempate {base_angle}° = {upright_score:.1f}, {(base_angle + 180) % 360}° = {flipped_score:.1f}")
+        return (base_angle + 180) % 360 if flipped_score > upright_score else base_angle
+
+    def _detect_with_detector(self, image, reader) -> int:
+        boxes = _detector_boxes(reader, image)
+        if not boxes:
+            return 0
+        horizontal_area, vertical_area = detector_axis_scores(boxes)
+        print(f"Orientação: Detector - {len(boxes)} caixas, área horizontal {horizontal_area:.0f}, vertical {vertical_area:.0f}")
+        if horizontal_area >= vertical_area:
+            return self._resolve_flip(reader, image, 0, boxes)
+        rotated = rotate_image(image, 90)
+        return self._resolve_flip(reader, rotated, 90, _detector_boxes(reader, rotated))
+
+    def _detect_with_projection(self, image, reader, frame: Optional[Frame] = None) -> int:
+        # Com um Frame, reaproveita a escala de cinza reduzida compartilhada pelo quadro
+        preview = frame.downscaled_gray(PROJECTION_MAX_SIDE) if frame is not None else image
+        row_score, col_score = projection_axis_scores(preview)
+        print(f"Orientação: Perfil de projeção - linhas {row_score:.2f}, colunas {col_score:.2f}")
+        if row_score >= col_score:
+            return 0
+        # Texto na vertical é raro: só neste caso recorre ao detector para escolher 90° ou 270°
+        if reader is None:
+            return 90
+        rotated = rotate_image(image, 90)
+        return self._resolve_flip(reader, rotated, 90, _detector_boxes(reader, rotated))
+
+    def _detect_with_full_ocr(self, image, reader) -> int:
+        angles = (0, 90, 180, 270)
+        # As quatro rotações passam pelo detector e pelo reconhecedor em lote (0°/180° e 90°/270° têm o mesmo tamanho)
+        results = batched_ocr.readtext(reader, [rotate_image(image, angle) for angle in angles])
+        best_rotation = 0
+        max_text_count = 0
+        for angle, quick_result in zip(angles, results):
+            total_chars = sum(len(r[1].strip()) for r in quick_result if r[2] > 0.3)
+            print(f"Orientação: Rotação {angle}° - {total_chars} caracteres")
+            # Prioriza rotações com mais caracteres detectados
+            if total_chars > max_text_count:
+                max_text_count = total_chars
+                best_rotation = angle
+        return best_rotation
+
+    def detect(self, image, reader=None, session_key: Optional[str] = None) -> int:
+        """
+        Retorna o ângulo (0, 90, 180 ou 270) que deixa o texto da imagem na horizontal.
+
+        Args:
+            image: Imagem decodificada (ndarray) ou Frame da requisição.
+            reader: Leitor EasyOCR usado pelas estratégias baseadas em modelo.
+            session_key: Identificador do cliente/jogo para memorizar a orientação.
+
+        Returns:
+            Ângulo de rotação em graus.
+        """
+        frame = image if isinstance(image, Frame) else None
+        if frame is not None:
+            image = frame.bgr
+
+        if self.mode == 'off':
+            return 0
+
+        remembered = self._recall(session_key)
+        if remembered is not None:
+            print(f"Orientação: Usando orientação memorizada para a sessão: {remembered}°")
+            return remembered
+
+        with self._lock:
+            self.stats['probes'] += 1
+        try:
+            if self.mode == 'projection':
+                angle = self._detect_with_projection(image, reader, frame)
+            elif self.mode == 'full':
+                angle = self._detect_with_full_ocr(image, reader)
+            else:
+                angle = self._detect_with_detector(image, reader)
+        except Exception as e:
+            print(f"Orientação: Erro ao detectar orientação ({self.mode}): {e}. Assumindo 0°.")
+            return 0
+
+        self._memorize(session_key, angle)
+        return angle
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retorna contadores de sondagens e reaproveitamentos da memória."""
+        with self._lock:
+            return {'mode': self.mode, 'sessions': len(self._memory), 'max_sessions': self.max_sessions,
+                    **self.stats}
+
+
+# Instância global do detector de orientação
+orientation_detector = OrientationDetector()
+
+
+def find_best_orientation(image, reader=None, session_key: Optional[str] = None):
+    """
+    Encontra a melhor orientação da imagem e retorna a imagem corrigida.
+
+    Args:
+        image: Imagem decodificada (ndarray) ou Frame da requisição.
+        reader: Leitor EasyOCR usado pelas estratégias baseadas em modelo.
+        session_key: Identificador do cliente/jogo para memorizar a orientação.
+
+    Returns:
+        Tupla (imagem_rotacionada, angulo). Sem rotação, a própria imagem é retornada, sem cópia.
+    """
+    angle = orientation_detector.detect(image, reader, session_key)
+    print(f"Orientação: Melhor orientação encontrada: {angle}° (modo: {orientation_detector.mode})")
+    if isinstance(image, Frame):
+        image = image.bgr
+    return rotate_image(image, angle), angle
@@ -0,0 +1,238 @@
+# perceptual_hash.py
+
+"""
+Cache de OCR por hash perceptual.
+
+O cache de OCR original usa o SHA-256 dos bytes da imagem, então um PNG recodificado,
+um cursor piscando ou uma oscilação de paleta em um único pixel geram um hash novo e
+pagam o EasyOCR completo outra vez. Este módulo calcula um hash perceptual (dHash ou
+pHash) sobre a imagem reduzida em escala de cinza e mantém um índice por distância de
+Hamming (BK-tree) para encontrar capturas quase idênticas já processadas.
+
+Quando a distância encontrada é limítrofe, as regiões de texto do resultado em cache são
+comparadas com as mesmas regiões da nova captura antes de reutilizar as detecções.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+from bk_tree import BKTree
+from database import db_manager
+
+# Configurações via variáveis de ambiente
+OCR_PHASH_ENABLED = os.getenv('OCR_PHASH_ENABLED', 'true').lower() == 'true'
+OCR_PHASH_METHOD = os.getenv('OCR_PHASH_METHOD', 'dhash').lower()
+# Distância máxima (em bits, de 64) para considerar duas capturas a mesma tela
+OCR_PHASH_THRESHOLD = int(os.getenv('OCR_PHASH_THRESHOLD', '6'))
+# Acima desta distância (e até o limite acima) as regiões de texto são verificadas
+OCR_PHASH_BORDERLINE = int(os.getenv('OCR_PHASH_BORDERLINE', '2'))
+# Distância máxima do hash de cada região de texto na verificação limítrofe
+OCR_PHASH_REGION_THRESHOLD = int(os.getenv('OCR_PHASH_REGION_THRESHOLD', '8'))
+
+HASH_SIZE = 8
+
+
+def _to_gray(image):
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def compute_dhash(image, hash_size: int = HASH_SIZE) -> int:
+    """
+    Calcula o hash de diferença (dHash) da imagem.
+
+    Args:
+        image: Imagem BGR ou em escala de cinza.
+        hash_size: Lado da grade de comparação (gera hash_size² bits).
+
+    Returns:
+        Hash como inteiro sem sinal.
+    """
+    resized = cv2.resize(_to_gray(image), (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return _bits_to_int(resized[:, 1:] > resized[:, :-1])
+
+
+def compute_phash(image, hash_size: int = HASH_SIZE) -> int:
+    """
+    Calcula o hash perceptual (pHash) da imagem a partir das baixas frequências da DCT.
+
+    Args:
+        image: Imagem BGR ou em escala de cinza.
+        hash_size: Lado do bloco de baixas frequências (gera hash_size² bits).
+
+    Returns:
+        Hash como inteiro sem sinal.
+    """
+    size = hash_size * 4
+    resized = cv2.resize(_to_gray(image), (size, size), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(resized)[:hash_size, :hash_size]
+    # O termo DC é ignorado no cálculo da mediana para não dominar o limiar
+    median = np.median(low_freq.flatten()[1:])
+    return _bits_to_int(low_freq > median)
+
+
+def compute_image_phash(image, method: str = OCR_PHASH_METHOD) -> int:
+    """Calcula o hash perceptual da imagem usando o método configurado ('dhash' ou 'phash')."""
+    if method == 'phash':
+        return compute_phash(image)
+    return compute_dhash(image)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Retorna o número de bits diferentes entre dois hashes."""
+    return bin(a ^ b).count('1')
+
+
+def _region_hash(gray, bbox) -> Optional[int]:
+    xs = [int(p[0]) for p in bbox]
+    ys = [int(p[1]) for p in bbox]
+    x_min, x_max = max(min(xs), 0), min(max(xs), gray.shape[1])
+    y_min, y_max = max(min(ys), 0), min(max(ys), gray.shape[0])
+    if x_max - x_min < 2 or y_max - y_min < 2:
+        return None
+    return compute_dhash(gray[y_min:y_max, x_min:x_max])
+
+
+def regions_match(cached_image, image, detections, region_threshold: int = OCR_PHASH_REGION_THRESHOLD) -> bool:
+    """
+    Verifica se as regiões de texto das detecções em cache continuam iguais na nova captura.
+
+    Args:
+        cached_image: Imagem que originou as detecções em cache.
+        image: Nova captura.
+        detections: Detecções em cache (com 'bbox').
+        region_threshold: Distância máxima do dHash de cada região.
+
+    Returns:
+        True se todas as regiões forem equivalentes.
+    """
+    if cached_image is None or cached_image.shape[:2] != image.shape[:2]:
+        return False
+    cached_gray = _to_gray(cached_image)
+    gray = _to_gray(image)
+    for detection in detections:
+        bbox = detection.get('bbox')
+        if not bbox:
+            continue
+        cached_hash = _region_hash(cached_gray, bbox)
+        new_hash = _region_hash(gray, bbox)
+        if cached_hash is None or new_hash is None:
+            continue
+        if hamming_distance(cached_hash, new_hash) > region_threshold:
+            return False
+    return True
+
+
+class PerceptualOCRCache:
+    """
+    Índice de hashes perceptuais dos resultados de OCR salvos no banco de dados.
+    """
+
+    def __init__(self, db, threshold: int = OCR_PHASH_THRESHOLD, borderline: int = OCR_PHASH_BORDERLINE,
+                 region_threshold: int = OCR_PHASH_REGION_THRESHOLD, enabled: bool = OCR_PHASH_ENABLED):
+        """
+        Inicializa o cache perceptual.
+
+        Args:
+            db: Gerenciador de banco de dados (DatabaseManager).
+            threshold: Distância de Hamming máxima para reutilizar um resultado.
+            borderline: Distâncias acima deste valor exigem verificação das regiões de texto.
+            region_threshold: Distância máxima por região na verificação.
+            enabled: Liga ou desliga a busca perceptual.
+        """
+        self.db = db
+        self.threshold = threshold
+        self.borderline = borderline
+        self.region_threshold = region_threshold
+        self.enabled = enabled
+        self._indexes: Dict[str, BKTree] = {}
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'hits': 0, 'verified_hits': 0, 'rejected_by_verification': 0}
+
+    def _get_index(self, source_lang: str) -> BKTree:
+        with self._lock:
+            index = self._indexes.get(source_lang)
+            if index is not None:
+                return index
+            index = BKTree(hamming_distance)
+            # Carrega os hashes já persistidos na primeira consulta deste idioma
+            for entry in self.db.get_perceptual_hashes(source_lang):
+                index.add(int(entry['perceptual_hash']), entry['image_hash'])
+            self._indexes[source_lang] = index
+            print(f"Cache Perceptual: Índice '{source_lang}' carregado com {len(index)} hashes.")
+            return index
+
+    def add(self, source_lang: str, perceptual_hash: int, image_hash: str) -> None:
+        """Registra no índice um resultado de OCR recém-salvo."""
+        if not self.enabled:
+            return
+        index = self._get_index(source_lang)
+        with self._lock:
+            index.add(perceptual_hash, image_hash)
+
+    def lookup(self, image, perceptual_hash: int, source_lang: str) -> Optional[Dict[str, Any]]:
+        """
+        Procura um resultado de OCR de uma captura quase idêntica.
+
+        Args:
+            image: Captura atual decodificada (ndarray BGR ou em escala de cinza).
+            perceptual_hash: Hash perceptual da captura atual.
+            source_lang: Idioma de origem do OCR.
+
+        Returns:
+            Registro de ocr_results reutilizável ou None.
+        """
+        if not self.enabled:
+            return None
+        self.stats['lookups'] += 1
+        index = self._get_index(source_lang)
+        with self._lock:
+            candidates = index.search(perceptual_hash, self.threshold)
+
+        for distance, _, image_hash in candidates:
+            cached = self.db.get_ocr_result(image_hash, source_lang, count_usage=False)
+            if not cached:
+                continue
+            metadata = cached.get('image_metadata') or {}
+            if metadata.get('width') and (metadata.get('width'), metadata.get('height')) != (image.shape[1], image.shape[0]):
+                continue
+
+            if distance > self.borderline:
+                # Distância limítrofe: confere as regiões de texto antes de reutilizar
+                cached_image = None
+                if cached.get('original_image'):
+                    # A verificação compara só a escala de cinza: decodifica direto nesse formato
+                    cached_image = cv2.imdecode(np.frombuffer(cached['original_image'], np.uint8), cv2.IMREAD_GRAYSCALE)
+                if not regions_match(cached_image, image, cached['text_results'], self.region_threshold):
+                    self.stats['rejected_by_verification'] += 1
+                    print(f"Cache Perceptual: Candidato {image_hash[:10]}... (distância {distance}) rejeitado na verificação das regiões.")
+                    continue
+                self.stats['verified_hits'] += 1
+
+            self.stats['hits'] += 1
+            self.db.mark_ocr_result_used(cached['id'])
+            print(f"Cache Perceptual: Reutilizando OCR de {image_hash[:10]}... (distância {distance})")
+            return cached
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do cache perceptual."""
+        with self._lock:
+            indexed = {lang: len(index) for lang, index in self._indexes.items()}
+        return {'enabled': self.enabled, 'threshold': self.threshold, 'indexed': indexed, **self.stats}
+
+
+# Instância global do cache perceptual de OCR
+perceptual_ocr_cache = PerceptualOCRCache(db_manager)
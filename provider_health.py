@@ -0,0 +1,281 @@
+# provider_health.py
+
+"""
+Registro de saúde dos tradutores com circuit breakers.
+
+Antes, cada texto percorria a lista estática de tradutores na mesma ordem, e um tradutor
+fora do ar custava um timeout inteiro a cada texto (e a cada palavra, na tradução palavra
+por palavra). Aqui cada tradutor tem latência e taxa de erro em média móvel exponencial
+(EWMA), contagem de timeouts e um circuit breaker: depois de PROVIDER_CIRCUIT_FAILURE_THRESHOLD
+falhas seguidas o circuito abre e o tradutor deixa de ser chamado; passado o tempo de espera,
+uma única chamada de teste (half-open) decide se o circuito fecha ou volta a abrir, com o
+tempo de espera dobrando até PROVIDER_CIRCUIT_MAX_COOLDOWN.
+
+A ordem dos tradutores segue o custo esperado por tradução bem-sucedida (latência EWMA
+dividida pela taxa de sucesso); tradutores sem histórico usam PROVIDER_HEALTH_PRIOR_LATENCY
+e empates mantêm a ordem configurada. As latências das últimas chamadas bem-sucedidas também
+ficam guardadas (TRANSLATION_LATENCY_WINDOW) para os percentis usados no modo hedged.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Configurações via variáveis de ambiente
+# Falhas seguidas que abrem o circuito de um tradutor
+PROVIDER_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('PROVIDER_CIRCUIT_FAILURE_THRESHOLD', '3'))
+# Segundos com o circuito aberto antes da chamada de teste
+PROVIDER_CIRCUIT_COOLDOWN = float(os.getenv('PROVIDER_CIRCUIT_COOLDOWN', '30'))
+# Tempo de espera máximo (dobra a cada chamada de teste que falha)
+PROVIDER_CIRCUIT_MAX_COOLDOWN = float(os.getenv('PROVIDER_CIRCUIT_MAX_COOLDOWN', '300'))
+# Peso da chamada mais recente nas médias móveis
+PROVIDER_HEALTH_EWMA_ALPHA = float(os.getenv('PROVIDER_HEALTH_EWMA_ALPHA', '0.2'))
+# Latência (s) assumida para tradutores ainda sem histórico
+PROVIDER_HEALTH_PRIOR_LATENCY = float(os.getenv('PROVIDER_HEALTH_PRIOR_LATENCY', '1.0'))
+# Latências das chamadas bem-sucedidas mais recentes guardadas por tradutor (percentis)
+TRANSLATION_LATENCY_WINDOW = int(os.getenv('TRANSLATION_LATENCY_WINDOW', '50'))
+# Amostras mínimas para calcular um percentil da latência
+LATENCY_PERCENTILE_MIN_SAMPLES = 5
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Taxa de sucesso mínima usada no custo esperado (evita divisão por zero)
+MIN_SUCCESS_RATE = 0.05
+
+
+class ProviderUnavailableError(Exception):
+    """O circuito do tradutor está aberto e a chamada não foi feita."""
+
+    def __init__(self, provider: str):
+        super().__init__(f"Circuito aberto para o tradutor '{provider}'")
+        self.provider = provider
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """Indica se a exceção é um timeout (asyncio, socket ou requests)."""
+    return isinstance(error, TimeoutError) or 'timeout' in type(error).__name__.lower()
+
+
+class _ProviderState:
+    """Médias, contadores e estado do circuito de um tradutor."""
+
+    __slots__ = ('latency', 'latencies', 'error_rate', 'calls', 'errors', 'timeouts', 'consecutive_failures',
+                 'state', 'opened_at', 'cooldown', 'probe_started', 'times_opened', 'rejected')
+
+    def __init__(self, cooldown: float, latency_window: int):
+        self.latency: Optional[float] = None
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = cooldown
+        self.probe_started: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+
+
+class ProviderHealthRegistry:
+    """
+    Latência e taxa de erro por tradutor, com circuit breakers e ordenação pela saúde atual.
+    """
+
+    def __init__(self, failure_threshold: int = PROVIDER_CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown: float = PROVIDER_CIRCUIT_COOLDOWN, max_cooldown: float = PROVIDER_CIRCUIT_MAX_COOLDOWN,
+                 alpha: float = PROVIDER_HEALTH_EWMA_ALPHA, prior_latency: float = PROVIDER_HEALTH_PRIOR_LATENCY,
+                 latency_window: int = TRANSLATION_LATENCY_WINDOW,
+                 min_samples: int = LATENCY_PERCENTILE_MIN_SAMPLES, clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa o registro.
+
+        Args:
+            failure_threshold: Falhas seguidas que abrem o circuito.
+            cooldown: Segundos com o circuito aberto antes da chamada de teste.
+            max_cooldown: Tempo de espera máximo após chamadas de teste que falham.
+            alpha: Peso da chamada mais recente nas médias móveis.
+            prior_latency: Latência assumida para tradutores sem histórico.
+            latency_window: Latências bem-sucedidas guardadas por tradutor para os percentis.
+            min_samples: Amostras mínimas para calcular um percentil.
+            clock: Relógio monotônico (substituível nos testes).
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.alpha = alpha
+        self.prior_latency = prior_latency
+        self.latency_window = max(1, latency_window)
+        self.min_samples = max(1, min_samples)
+        self.clock = clock
+        self._providers: Dict[str, _ProviderState] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, provider: str) -> _ProviderState:
+        state = self._providers.get(provider)
+        if state is None:
+            state = self._providers[provider] = _ProviderState(self.cooldown, self.latency_window)
+        return state
+
+    def _available(self, state: _ProviderState, now: float) -> bool:
+        if state.state == CLOSED:
+            return True
+        if state.state == OPEN:
+            return now - state.opened_at >= state.cooldown
+        # Half-open: só uma chamada de teste por vez; uma chamada de teste cancelada libera a vaga
+        # depois do tempo de espera
+        return state.probe_started is None or now - state.probe_started >= state.cooldown
+
+    def allow(self, provider: str) -> bool:
+        """
+        Indica se o tradutor pode ser chamado agora. Com o circuito aberto e o tempo de espera
+        esgotado, reserva a chamada de teste (half-open) para quem chamou.
+
+        Args:
+            provider: Nome do tradutor.
+
+        Returns:
+            True se a chamada deve ser feita.
+        """
+        with self._lock:
+            state = self._get(provider)
+            now = self.clock()
+            if not self._available(state, now):
+                state.rejected += 1
+                return False
+            if state.state != CLOSED:
+                state.state = HALF_OPEN
+                state.probe_started = now
+            return True
+
+    def _update(self, state: _ProviderState, latency: float, failed: bool) -> None:
+        state.calls += 1
+        state.latency = latency if state.latency is None else \
+            self.alpha * latency + (1 - self.alpha) * state.latency
+        state.error_rate = self.alpha * float(failed) + (1 - self.alpha) * state.error_rate
+
+    def record_success(self, provider: str, latency: float) -> None:
+        """
+        Registra uma chamada bem-sucedida; fecha o circuito se era a chamada de teste.
+        """
+        with self._lock:
+            state = self._get(provider)
+            self._update(state, latency, False)
+            state.latencies.append(latency)
+            state.consecutive_failures = 0
+            if state.state != CLOSED:
+                print(f"Saúde dos Tradutores: Circuito de '{provider}' fechado.")
+            state.state = CLOSED
+            state.cooldown = self.cooldown
+            state.probe_started = None
+
+    def record_failure(self, provider: str, latency: float, timeout: bool = False) -> None:
+        """
+        Registra uma chamada que falhou (erro, timeout ou tradução vazia) e abre o circuito
+        após falhas seguidas ou quando a chamada de teste falha.
+        """
+        with self._lock:
+            state = self._get(provider)
+            self._update(state, latency, True)
+            state.errors += 1
+            state.timeouts += int(timeout)
+            state.consecutive_failures += 1
+            if state.state == HALF_OPEN:
+                state.cooldown = min(state.cooldown * 2, self.max_cooldown)
+            elif state.state == OPEN or state.consecutive_failures < self.failure_threshold:
+                return
+            state.state = OPEN
+            state.opened_at = self.clock()
+            state.probe_started = None
+            state.times_opened += 1
+        print(f"Saúde dos Tradutores: Circuito de '{provider}' aberto por {state.cooldown:.0f}s "
+              f"após {state.consecutive_failures} falhas seguidas.")
+
+    def score(self, provider: str) -> float:
+        """
+        Custo esperado (segundos) por tradução bem-sucedida: latência EWMA dividida pela taxa
+        de sucesso EWMA.
+        """
+        with self._lock:
+            state = self._providers.get(provider)
+            if state is None or state.latency is None:
+                return self.prior_latency
+            return state.latency / max(1.0 - state.error_rate, MIN_SUCCESS_RATE)
+
+    def percentile(self, provider: str, percentile: float) -> Optional[float]:
+        """
+        Percentil (segundos) da latência das chamadas bem-sucedidas recentes do tradutor, ou
+        None se ainda não há amostras suficientes.
+        """
+        with self._lock:
+            state = self._providers.get(provider)
+            samples = sorted(state.latencies) if state is not None else []
+        if len(samples) < self.min_samples:
+            return None
+        rank = max(1, math.ceil(percentile / 100.0 * len(samples)))
+        return samples[min(rank, len(samples)) - 1]
+
+    def order(self, providers: List[str]) -> List[str]:
+        """
+        Ordena os tradutores pela saúde atual, sem os que estão com o circuito aberto.
+
+        Args:
+            providers: Tradutores na ordem configurada.
+
+        Returns:
+            Tradutores disponíveis, do menor para o maior custo esperado.
+        """
+        now = self.clock()
+        with self._lock:
+            available = [provider for provider in dict.fromkeys(providers)
+                         if provider not in self._providers or self._available(self._providers[provider], now)]
+        scored = [(self.score(provider), index, provider) for index, provider in enumerate(available)]
+        return [provider for _, _, provider in sorted(scored)]
+
+    def state(self, provider: str) -> str:
+        """Estado do circuito do tradutor: closed, open ou half_open."""
+        with self._lock:
+            state = self._providers.get(provider)
+            return state.state if state else CLOSED
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna o estado do circuito, as médias e os contadores de cada tradutor."""
+        providers = {}
+        with self._lock:
+            names = list(self._providers)
+        for provider in names:
+            score = self.score(provider)
+            p50 = self.percentile(provider, 50)
+            p95 = self.percentile(provider, 95)
+            with self._lock:
+                state = self._providers[provider]
+                providers[provider] = {
+                    'state': state.state,
+                    'ewma_latency_ms': round(state.latency * 1000, 1) if state.latency is not None else None,
+                    'ewma_error_rate': round(state.error_rate, 3),
+                    'score': round(score, 3),
+                    'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                    'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+                    'calls': state.calls,
+                    'errors': state.errors,
+                    'timeouts': state.timeouts,
+                    'consecutive_failures': state.consecutive_failures,
+                    'times_opened': state.times_opened,
+                    'rejected_calls': state.rejected
+                }
+        return {
+            'failure_threshold': self.failure_threshold,
+            'cooldown': self.cooldown,
+            'open_circuits': sum(1 for stats in providers.values() if stats['state'] != CLOSED),
+            'providers': providers
+        }
+
+
+# Instância global compartilhada por todos os módulos de tradução
+provider_health = ProviderHealthRegistry()
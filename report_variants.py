@@ -0,0 +1,134 @@
+# report_variants.py
+
+"""
+Relatório de custo e rendimento marginal das variantes de pré-processamento do OCR melhorado.
+
+Uso:
+    python report_variants.py <diretório de quadros> [idioma] [máximo de quadros]
+
+Executa o readtext em todas as variantes de cada quadro salvo (PNG/JPEG, procurados
+recursivamente; os diretórios de DEBUG_CAPTURE_DIR servem como corpus) e imprime, para
+cada variante, o custo médio, o rendimento médio (confiança × caracteres) e o rendimento
+marginal: o que a variante acrescenta aos textos já encontrados pelas variantes melhor
+colocadas. A cobertura acumulada indica um bom valor para OCR_VARIANT_TOP_K.
+"""
+
+import os
+import sys
+import time
+
+import cv2
+
+from improved_ocr_module import LazyVariants, get_reader, variant_readtext_kwargs
+from variant_scheduler import detection_yield
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def find_frames(directory, limit=None):
+    """Lista os quadros salvos no diretório (recursivamente), em ordem de nome."""
+    frames = []
+    for root, _, files in os.walk(directory):
+        frames.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+    frames.sort()
+    return frames[:limit] if limit else frames
+
+
+def text_yields(detections):
+    """Rendimento de cada texto normalizado (o maior entre as detecções do mesmo texto)."""
+    yields = {}
+    for detection in detections:
+        text = detection[1].strip().lower()
+        value = detection_yield([detection])
+        if value > 0:
+            yields[text] = max(yields.get(text, 0.0), value)
+    return yields
+
+
+def measure_corpus(paths, reader):
+    """
+    Executa todas as variantes em todos os quadros.
+
+    Returns:
+        Tupla (custos: variante -> [segundos], resultados: [{variante: {texto: rendimento}}] por quadro).
+    """
+    costs = {}
+    frames = []
+    for index, path in enumerate(paths, 1):
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"Ignorando {path}: não é uma imagem válida.")
+            continue
+        print(f"[{index}/{len(paths)}] {path}")
+        variants = LazyVariants(image)
+        per_variant = {}
+        for name in variants.keys():
+            start = time.perf_counter()
+            detections = reader.readtext(variants.get(name), **variant_readtext_kwargs(name))
+            costs.setdefault(name, []).append(time.perf_counter() - start)
+            per_variant[name] = text_yields(detections)
+        frames.append(per_variant)
+    return costs, frames
+
+
+def print_report(costs, frames):
+    """Imprime a tabela de custo, rendimento e rendimento marginal por variante."""
+    names = list(costs.keys())
+    total_yield = {name: sum(sum(frame[name].values()) for frame in frames) for name in names}
+    union_yield = 0.0
+    for frame in frames:
+        best = {}
+        for texts in frame.values():
+            for text, value in texts.items():
+                best[text] = max(best.get(text, 0.0), value)
+        union_yield += sum(best.values())
+
+    # Ordem gulosa: a cada passo, a variante que mais acrescenta aos textos já cobertos
+    covered = [set() for _ in frames]
+    remaining = list(names)
+    rows = []
+    cumulative = 0.0
+    while remaining:
+        gains = {
+            name: sum(value for frame, seen in zip(frames, covered)
+                      for text, value in frame[name].items() if text not in seen)
+            for name in remaining
+        }
+        name = max(remaining, key=lambda n: (gains[n], total_yield[n]))
+        remaining.remove(name)
+        for frame, seen in zip(frames, covered):
+            seen.update(frame[name].keys())
+        cumulative += gains[name]
+        avg_cost = sum(costs[name]) / len(costs[name])
+        rows.append((name, avg_cost * 1000, total_yield[name] / len(frames), gains[name] / len(frames),
+                     gains[name] / max(sum(costs[name]), 1e-9), cumulative / union_yield * 100 if union_yield else 0.0))
+
+    print(f"\n===== VARIANTES DE PRÉ-PROCESSAMENTO ({len(frames)} quadros) =====\n")
+    print(f"{'#':>2}  {'variante':<16} {'custo (ms)':>10} {'rendimento':>11} {'marginal':>9} {'marginal/s':>11} {'cobertura':>10}")
+    for position, (name, cost_ms, avg_yield, marginal, per_second, coverage) in enumerate(rows, 1):
+        print(f"{position:>2}  {name:<16} {cost_ms:>10.1f} {avg_yield:>11.1f} {marginal:>9.1f} {per_second:>11.1f} {coverage:>9.1f}%")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    directory = sys.argv[1]
+    lang = sys.argv[2] if len(sys.argv) > 2 else 'en'
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    paths = find_frames(directory, limit)
+    if not paths:
+        print(f"Nenhum quadro encontrado em {directory}.")
+        sys.exit(1)
+
+    reader = get_reader(lang)
+    costs, frames = measure_corpus(paths, reader)
+    if not frames:
+        print("Nenhum quadro pôde ser lido.")
+        sys.exit(1)
+    print_report(costs, frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -252,6 +252,9 @@ class DatabaseManager:
                 result['image_metadata_parsed'] = json.loads(result['image_metadata'])
             if result['image_base64']:
                 result['image_data_decoded'] = base64.b64decode(result['image_base64'])
+            elif result.get('original_image'):
+                # O serviço grava apenas o BLOB por padrão (DB_STORE_IMAGE_BASE64=false)
+                result['image_data_decoded'] = result['original_image']
         
         return result
     
@@ -9,12 +9,32 @@ from datetime import datetime
 from fastapi import HTTPException
 from PIL import Image, ImageDraw, ImageFont
 import textwrap
+from typing import Optional
 
 # Importa as funções dos nossos módulos especializados
 from models import RetroArchRequest
+from ingest import request_image_bytes
+from frame import Frame
+from debug_capture import debug_capture
 from ocr_module import extract_text_from_image, extract_text_with_positions
-from translation_module import translate_text
-from database import db_manager, calculate_image_hash, initialize_database
+from inference_executor import InferenceQueueFullError
+from translation_stage import translation_stage
+from database import db_manager, async_db_manager, initialize_database
+from perceptual_hash import perceptual_ocr_cache
+from incremental_ocr import overlay_cache, overlay_region_key
+
+def get_session_key(request: RetroArchRequest) -> Optional[str]:
+    """
+    Monta o identificador da sessão (cliente + jogo) usado para reaproveitar estado entre quadros.
+
+    Args:
+        request: A requisição do RetroArch.
+
+    Returns:
+        String identificando a sessão, ou None se a requisição não tiver identificação.
+    """
+    parts = [part for part in (request.client_id, request.label) if part]
+    return ":".join(parts) if parts else None
 
 def create_translation_image(text: str, width: int = 800, height: int = 200) -> str:
     """
@@ -58,10 +78,8 @@ def create_translation_image(text: str, width: int = 800, height: int = 200) ->
         draw.text((10, y_offset), line, fill=(255, 255, 255, 255), font=font)  # Texto branco
         y_offset += 20
     
-    # Salva a imagem overlay no diretório para debug/comparação
-    overlay_filename = "overlay_translation_debug.png"
-    img.save(overlay_filename)
-    print(f"Overlay salvo como: {overlay_filename}")
+    # Captura o overlay para debug/comparação (só em requisições amostradas)
+    debug_capture.save_image("overlay_translation", img)
     
     # Converte para base64
     buffer = io.BytesIO()
@@ -70,38 +88,116 @@ def create_translation_image(text: str, width: int = 800, height: int = 200) ->
     
     return img_base64
 
-def save_debug_images(original_image_data: bytes, overlay_base64: str, original_width: int, original_height: int):
-    """Salva imagens para debug e comparação visual"""
-    try:
-        # Salva imagem original em um arquivo temporário para processamento
-        with open("temp_received_image.png", "wb") as f:
-            f.write(original_image_data)
-        
-        # Abre a imagem original para processamento
-        original_img = Image.open(io.BytesIO(original_image_data))
-        
-        # Salva a imagem corrigida (não a original) como debug_original.png
-        # Esta é a imagem que será usada como base para o overlay
-        corrected_img = original_img.copy()
-        corrected_img.save("temp_corrected_image.png")
-        corrected_img.save("debug_original.png")
-        
-        # Decodifica o overlay
-        overlay_data = base64.b64decode(overlay_base64)
-        overlay_img = Image.open(io.BytesIO(overlay_data))
-        
-        # Combina as imagens (corrigida + overlay)
-        combined = corrected_img.copy()
-        combined.paste(overlay_img, (0, 0), overlay_img)  # overlay_img como máscara de transparência
-        
-        # Salva versão combinada
-        combined.save("debug_combined_result.png")
-        print("Imagens de debug salvas: debug_original.png (corrigida), overlay_translation_debug.png, debug_combined_result.png")
+def _compose_debug_result(frame: Frame, overlay_base64: str) -> Image.Image:
+    """Combina a captura e o overlay (executada na thread de escrita da captura de debug)."""
+    original_img = Image.fromarray(cv2.cvtColor(frame.bgr, cv2.COLOR_BGR2RGB))
+    overlay_img = Image.open(io.BytesIO(base64.b64decode(overlay_base64)))
+    original_img.paste(overlay_img, (0, 0), overlay_img)  # overlay_img como máscara de transparência
+    return original_img
+
+def save_debug_images(frame: Frame, overlay_base64: str):
+    """
+    Agenda as imagens de debug da requisição para comparação visual.
+
+    Só faz algo quando a requisição foi amostrada pela captura de debug; a decodificação
+    do overlay, a composição e os encodes PNG rodam na thread de escrita.
+    """
+    if not debug_capture.active:
+        return
+    debug_capture.save_image("overlay", lambda: base64.b64decode(overlay_base64))
+    debug_capture.save_image("combined_result", lambda: _compose_debug_result(frame, overlay_base64))
+
+def _regions_intersect(a, b) -> bool:
+    """Indica se dois retângulos (x1, y1, x2, y2) se sobrepõem."""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+def _layout_translation_box(detection: dict, draw, fonts: tuple, original_width: int, original_height: int) -> dict:
+    """
+    Calcula a posição, a fonte e o fundo de uma caixa traduzida, sem desenhar.
+    
+    Args:
+        detection: Dicionário com 'translation', 'bbox' e, opcionalmente, 'is_grouped' e 'group_size'
+        draw: ImageDraw usado para medir o texto
+        fonts: Fontes (pequena, média, grande, extra grande); podem ser None
+        original_width: Largura do overlay
+        original_height: Altura do overlay
         
-    except Exception as e:
-        print(f"Erro ao salvar imagens de debug: {e}")
+    Returns:
+        Dicionário com 'translation', 'font', 'position', 'background', 'opacity' e 'region'
+    """
+    font_small, font_medium, font_large, font_xlarge = fonts
+    translation = detection['translation']
+    bbox = detection['bbox']
+    is_grouped = detection.get('is_grouped', False)
+    group_size = detection.get('group_size', 1)
+    
+    # Calcula o centro da bbox original
+    # bbox é uma lista de 4 pontos: [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
+    x_coords = [point[0] for point in bbox]
+    y_coords = [point[1] for point in bbox]
+    
+    # Calcula posição central e dimensões
+    min_x, max_x = min(x_coords), max(x_coords)
+    min_y, max_y = min(y_coords), max(y_coords)
+    center_x = (min_x + max_x) // 2
+    center_y = (min_y + max_y) // 2
+    bbox_height = max_y - min_y
+    
+    # Escolhe fonte baseada no tamanho do texto original e se é um grupo
+    if is_grouped and group_size > 2:
+        # Para grupos maiores, usa fonte maior para melhor legibilidade
+        font = font_xlarge
+    elif bbox_height > 25 or (is_grouped and group_size > 1):
+        font = font_large
+    elif bbox_height > 15:
+        font = font_medium
+    else:
+        font = font_small
+    
+    # Ajusta o texto para quebrar linhas se for muito longo
+    # Especialmente importante para textos agrupados
+    max_chars_per_line = 30 if is_grouped else 20
+    if len(translation) > max_chars_per_line:
+        # Quebra o texto em linhas para melhor legibilidade
+        translation = textwrap.fill(translation, width=max_chars_per_line)
+    
+    # Calcula dimensões do texto traduzido
+    if font:
+        text_bbox = draw.textbbox((0, 0), translation, font=font)
+        text_width = text_bbox[2] - text_bbox[0]
+        text_height = text_bbox[3] - text_bbox[1]
+    else:
+        text_width = len(translation) * 8  # Estimativa
+        text_height = 12 * (1 + translation.count('\n'))  # Ajusta para múltiplas linhas
+    
+    # Posiciona o texto traduzido
+    text_x = max(0, min(center_x - text_width // 2, original_width - text_width))
+    text_y = max(0, min(center_y - text_height // 2, original_height - text_height))
+    
+    # Fundo semi-transparente; aumenta o padding para textos agrupados
+    padding = 4 if is_grouped else 2
+    bg_x1 = text_x - padding
+    bg_y1 = text_y - padding
+    bg_x2 = text_x + text_width + padding
+    bg_y2 = text_y + text_height + padding
+    
+    # Ajusta a opacidade do fundo com base no tamanho do grupo
+    # Grupos maiores têm fundo mais opaco para melhor legibilidade
+    bg_opacity = min(200, 180 + (group_size * 5)) if is_grouped else 180
+    return {
+        'translation': translation,
+        'font': font,
+        'position': (text_x, text_y),
+        'background': [bg_x1, bg_y1, bg_x2, bg_y2],
+        'opacity': bg_opacity,
+        'region': (
+            max(int(bg_x1), 0), max(int(bg_y1), 0),
+            min(int(bg_x2) + 1, original_width), min(int(bg_y2) + 1, original_height)
+        )
+    }
 
-def create_positioned_translation_image(detections_with_translations: list, original_width: int = 800, original_height: int = 600) -> str:
+def create_positioned_translation_image(detections_with_translations: list, original_width: int = 800, original_height: int = 600,
+                                        session_key: str = None) -> str:
     """
     Cria uma imagem overlay com traduções posicionadas individualmente.
     
@@ -109,10 +205,20 @@ def create_positioned_translation_image(detections_with_translations: list, orig
         detections_with_translations: Lista de dicionários com 'text', 'translation', 'bbox', 'confidence'
         original_width: Largura da imagem original
         original_height: Altura da imagem original
+        session_key: Identificador do cliente/jogo; caixas inalteradas são copiadas do overlay anterior
         
     Returns:
         String base64 da imagem PNG overlay
     """
+    # Se nenhuma caixa traduzida mudou desde o quadro anterior, reutiliza o overlay inteiro
+    region_keys = [overlay_region_key(d) for d in detections_with_translations]
+    previous_overlay = overlay_cache.get(session_key, (original_width, original_height))
+    if previous_overlay and previous_overlay['keys'] == region_keys:
+        overlay_cache.count('reused_overlays')
+        print(f"Reutilizando overlay anterior da sessão ({len(region_keys)} traduções inalteradas)")
+        return previous_overlay['base64']
+    drawn_regions = {}
+    
     # Cria uma imagem transparente do tamanho original
     img = Image.new('RGBA', (original_width, original_height), (0, 0, 0, 0))  # Completamente transparente
     draw = ImageDraw.Draw(img)
@@ -135,84 +241,58 @@ def create_positioned_translation_image(detections_with_translations: list, orig
     
     print(f"Criando overlay com {len(detections_with_translations)} traduções posicionadas")
     
+    fonts = (font_small, font_medium, font_large, font_xlarge)
+    layouts = [_layout_translation_box(detection, draw, fonts, original_width, original_height)
+               for detection in detections_with_translations]
+    
+    # Uma caixa só é copiada do overlay anterior se a área dela não encosta em nenhuma outra caixa
+    # deste quadro nem em caixas do quadro anterior que mudaram ou sumiram: assim o recorte contém
+    # apenas os pixels dela e a ordem de desenho não importa
+    reusable = set()
+    if previous_overlay:
+        current_keys = set(region_keys)
+        stale_regions = [region for key, region in previous_overlay['regions'].items() if key not in current_keys]
+        for i, region_key in enumerate(region_keys):
+            region = previous_overlay['regions'].get(region_key)
+            if region is None or region != layouts[i]['region']:
+                continue
+            if any(_regions_intersect(region, stale) for stale in stale_regions):
+                continue
+            if any(_regions_intersect(region, layout['region']) for j, layout in enumerate(layouts) if j != i):
+                continue
+            reusable.add(i)
+    
     for i, detection in enumerate(detections_with_translations):
-        text = detection['text']
-        translation = detection['translation']
-        bbox = detection['bbox']
-        confidence = detection['confidence']
-        is_grouped = detection.get('is_grouped', False)
-        group_size = detection.get('group_size', 1)
-        
-        # Calcula o centro da bbox original
-        # bbox é uma lista de 4 pontos: [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-        x_coords = [point[0] for point in bbox]
-        y_coords = [point[1] for point in bbox]
-        
-        # Calcula posição central e dimensões
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
-        center_x = (min_x + max_x) // 2
-        center_y = (min_y + max_y) // 2
-        bbox_width = max_x - min_x
-        bbox_height = max_y - min_y
-        
-        # Escolhe fonte baseada no tamanho do texto original e se é um grupo
-        if is_grouped and group_size > 2:
-            # Para grupos maiores, usa fonte maior para melhor legibilidade
-            font = font_xlarge
-        elif bbox_height > 25 or (is_grouped and group_size > 1):
-            font = font_large
-        elif bbox_height > 15:
-            font = font_medium
-        else:
-            font = font_small
-        
-        # Ajusta o texto para quebrar linhas se for muito longo
-        # Especialmente importante para textos agrupados
-        max_chars_per_line = 30 if is_grouped else 20
-        if len(translation) > max_chars_per_line:
-            # Quebra o texto em linhas para melhor legibilidade
-            import textwrap
-            wrapped_text = textwrap.fill(translation, width=max_chars_per_line)
-            translation = wrapped_text
-        
-        # Calcula dimensões do texto traduzido
-        if font:
-            text_bbox = draw.textbbox((0, 0), translation, font=font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-        else:
-            text_width = len(translation) * 8  # Estimativa
-            text_height = 12 * (1 + translation.count('\n'))  # Ajusta para múltiplas linhas
-        
-        # Posiciona o texto traduzido
-        text_x = max(0, min(center_x - text_width // 2, original_width - text_width))
-        text_y = max(0, min(center_y - text_height // 2, original_height - text_height))
+        region_key = region_keys[i]
+        layout = layouts[i]
+        if i in reusable:
+            # Caixa inalterada e isolada: copia os pixels já desenhados no overlay anterior
+            region = layout['region']
+            img.paste(previous_overlay['image'].crop(region), region[:2])
+            drawn_regions[region_key] = region
+            overlay_cache.count('reused_regions')
+            continue
         
         # Desenha fundo semi-transparente para o texto
-        # Aumenta o padding para textos agrupados
-        padding = 4 if is_grouped else 2
-        bg_x1 = text_x - padding
-        bg_y1 = text_y - padding
-        bg_x2 = text_x + text_width + padding
-        bg_y2 = text_y + text_height + padding
-        
-        # Ajusta a opacidade do fundo com base no tamanho do grupo
-        # Grupos maiores têm fundo mais opaco para melhor legibilidade
-        bg_opacity = min(200, 180 + (group_size * 5)) if is_grouped else 180
-        draw.rectangle([bg_x1, bg_y1, bg_x2, bg_y2], fill=(0, 0, 0, bg_opacity))  # Fundo preto semi-transparente
+        draw.rectangle(layout['background'], fill=(0, 0, 0, layout['opacity']))  # Fundo preto semi-transparente
         
         # Desenha o texto traduzido
-        draw.text((text_x, text_y), translation, fill=(255, 255, 255, 255), font=font)  # Texto branco
+        translation = layout['translation']
+        text_x, text_y = layout['position']
+        draw.text((text_x, text_y), translation, fill=(255, 255, 255, 255), font=layout['font'])  # Texto branco
+        drawn_regions[region_key] = layout['region']
+        overlay_cache.count('drawn_regions')
         
-        group_info = f" (grupo de {group_size} textos)" if is_grouped else ""
-        print(f"Posicionado '{translation}'{group_info} em ({text_x}, {text_y}) - original: '{text}' (confiança: {confidence:.2f})")
+        is_grouped = detection.get('is_grouped', False)
+        group_info = f" (grupo de {detection.get('group_size', 1)} textos)" if is_grouped else ""
+        print(f"Posicionado '{translation}'{group_info} em ({text_x}, {text_y}) - original: '{detection['text']}' (confiança: {detection['confidence']:.2f})")
     
     # Converte para base64
     buffer = io.BytesIO()
     img.save(buffer, format='PNG')
     img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
     
+    overlay_cache.store(session_key, img, drawn_regions, region_keys, img_base64)
     return img_base64
 
 async def process_ai_request(request: RetroArchRequest) -> dict:
@@ -232,17 +312,18 @@ async def process_ai_request(request: RetroArchRequest) -> dict:
         
         # Garante que o banco de dados está inicializado
         if not db_manager.connected:
-            initialize_database()
+            await async_db_manager.run(initialize_database)
         
         print("Lógica de Serviço: Iniciando processamento da requisição.")
+        debug_capture.begin()
         
         # Flags para rastrear hits de cache
         ocr_cache_hit = False
         translation_cache_hits = 0
         
-        # 1. Decodificar a imagem de Base64 para bytes
+        # 1. Obter os bytes da imagem (o corpo binário chega sem base64; o JSON traz base64)
         try:
-            image_bytes = base64.b64decode(request.image)
+            image_bytes = request_image_bytes(request)
         except (base64.binascii.Error, TypeError) as e:
             print(f"Erro de decodificação Base64: {e}")
             raise HTTPException(status_code=400, detail="Imagem em Base64 inválida.")
@@ -250,22 +331,28 @@ async def process_ai_request(request: RetroArchRequest) -> dict:
         source_lang = request.lang_source
         target_lang = request.lang_target
 
-        print(f"Lógica de Serviço: Recebidos {len(image_bytes)} bytes de imagem após decodificação.")
+        print(f"Lógica de Serviço: Recebidos {len(image_bytes)} bytes de imagem.")
         
-        # Decodifica a imagem para obter dimensões originais
-        import cv2
-        import numpy as np
-        np_arr = np.frombuffer(image_bytes, np.uint8)
-        img_cv = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        original_height, original_width = img_cv.shape[:2]
+        # Decodifica a imagem uma única vez; o quadro é compartilhado por hashes, OCR, overlay e debug
+        frame = Frame.from_bytes(image_bytes)
+        if frame is None:
+            raise HTTPException(status_code=400, detail="Não foi possível decodificar a imagem.")
+        original_width, original_height = frame.size
         print(f"Lógica de Serviço: Dimensões da imagem original: {original_width}x{original_height}")
+        # Os bytes recebidos já estão codificados: a captura só grava o arquivo
+        debug_capture.save_image("received", image_bytes)
         
         # Calcula o hash da imagem para verificar no cache
-        image_hash = calculate_image_hash(image_bytes)
+        image_hash = frame.content_hash
         print(f"Lógica de Serviço: Hash da imagem calculado: {image_hash[:10]}...")
         
         # 2. Verificar se já temos resultados de OCR para esta imagem no cache
-        cached_ocr_result = db_manager.get_ocr_result(image_hash, source_lang)
+        cached_ocr_result = await async_db_manager.get_ocr_result(image_hash, source_lang)
+        
+        # Se o hash exato falhar, procura uma captura quase idêntica pelo hash perceptual
+        perceptual_hash = frame.perceptual_hash()
+        if not cached_ocr_result:
+            cached_ocr_result = await async_db_manager.run(perceptual_ocr_cache.lookup, frame.gray, perceptual_hash, source_lang)
         
         if cached_ocr_result:
             print(f"Lógica de Serviço: Resultados de OCR encontrados no cache!")
@@ -274,7 +361,12 @@ async def process_ai_request(request: RetroArchRequest) -> dict:
         else:
             # Extrair textos individuais com posições usando o módulo de OCR
             print("Lógica de Serviço: Extraindo textos com posições individuais...")
-            detections = await extract_text_with_positions(image_bytes, lang_source=source_lang)
+            detections = await extract_text_with_positions(
+                image_bytes,
+                lang_source=source_lang,
+                session_key=get_session_key(request),
+                frame=frame
+            )
             
             # Salva os resultados de OCR no cache, incluindo a imagem original e metadados
             if detections:
@@ -296,61 +388,56 @@ async def process_ai_request(request: RetroArchRequest) -> dict:
                 }
                 
                 # Salva os resultados de OCR, a imagem original e os metadados
-                db_manager.save_ocr_result(
+                if await async_db_manager.save_ocr_result(
                     image_hash, 
                     source_lang, 
                     detections, 
                     avg_confidence, 
-                    original_image=image_bytes, 
-                    image_metadata=image_metadata
-                )
+                    original_image=frame.data, 
+                    image_metadata=image_metadata,
+                    perceptual_hash=perceptual_hash
+                ):
+                    await async_db_manager.run(perceptual_ocr_cache.add, source_lang, perceptual_hash, image_hash)
         
         if not detections:
             print("Lógica de Serviço: Nenhum texto foi detectado. Retornando resposta vazia.")
             # Registra a requisição nas estatísticas
             processing_time = time.time() - start_time
-            db_manager.record_request_processing(ocr_hit=ocr_cache_hit, processing_time=processing_time)
+            await async_db_manager.record_request_processing(ocr_hit=ocr_cache_hit, processing_time=processing_time)
             return {"image": ""} # Retorna vazio se não houver texto
 
-        # 3. Traduzir cada texto individualmente
+        # 3. Traduzir os textos: uma consulta em lote ao cache e tradução concorrente apenas dos misses
         print(f"Lógica de Serviço: Traduzindo {len(detections)} textos de '{source_lang}' para '{target_lang}'.")
-        detections_with_translations = []
+        source_texts = [detection['text'] for detection in detections]
+        cached_translations = await async_db_manager.get_translations_bulk(source_texts, source_lang, target_lang)
+        translations = {text: cached['translated_text'] for text, cached in cached_translations.items()}
+        translation_cache_hits = sum(1 for text in source_texts if text in cached_translations)
+        
+        # Textos repetidos na mesma captura são traduzidos uma única vez
+        missing_texts = [text for text in dict.fromkeys(source_texts) if text not in translations]
+        if missing_texts:
+            print(f"Lógica de Serviço: {len(missing_texts)} textos não encontrados no cache; traduzindo em paralelo.")
+            translated_texts = await translation_stage.translate_frame(missing_texts, source_lang, target_lang)
+            translations.update(zip(missing_texts, translated_texts))
+            
+            # Salva as novas traduções no cache em um único INSERT
+            # Estima a confiança como a confiança do OCR
+            confidences = {detection['text']: detection.get('confidence', 0.8) for detection in detections}
+            await async_db_manager.save_translations_bulk(
+                [{'source_text': text, 'translated_text': translations[text], 'confidence': confidences[text]}
+                 for text in missing_texts],
+                source_lang,
+                target_lang,
+                translator_used="multiple"
+            )
         
-        for i, detection in enumerate(detections):
+        detections_with_translations = []
+        for detection in detections:
             original_text = detection['text']
+            translated_text = translations[original_text]
             is_grouped = detection.get('is_grouped', False)
             group_size = detection.get('group_size', 1)
             
-            group_info = f" (grupo de {group_size} textos)" if is_grouped else ""
-            print(f"Lógica de Serviço: Traduzindo texto {i+1}/{len(detections)}{group_info}: '{original_text}'")
-            
-            # Verifica se já temos esta tradução no cache
-            cached_translation = db_manager.get_translation(original_text, source_lang, target_lang)
-            
-            if cached_translation:
-                print(f"Lógica de Serviço: Tradução encontrada no cache!")
-                translated_text = cached_translation['translated_text']
-                translation_cache_hits += 1
-            else:
-                # Traduz o texto usando o módulo de tradução
-                translated_text = await translate_text(
-                    text=original_text,
-                    source_lang=source_lang,
-                    target_lang=target_lang
-                )
-                
-                # Salva a tradução no cache
-                # Estima a confiança como a confiança do OCR
-                confidence = detection.get('confidence', 0.8)
-                db_manager.save_translation(
-                    original_text, 
-                    source_lang, 
-                    target_lang, 
-                    translated_text, 
-                    translator_used="multiple", 
-                    confidence=confidence
-                )
-            
             # Garante que todos os valores sejam tipos Python padrão para evitar problemas de serialização JSON
             detections_with_translations.append({
                 'text': original_text,
@@ -361,9 +448,8 @@ async def process_ai_request(request: RetroArchRequest) -> dict:
                 'group_size': int(group_size)
             })
             
-            print(f"Lógica de Serviço: '{original_text}' -> '{translated_text}'")
-            if is_grouped:
-                print(f"Lógica de Serviço: Texto agrupado traduzido com sucesso (grupo de {group_size} textos).")
+            group_info = f" (grupo de {group_size} textos)" if is_grouped else ""
+            print(f"Lógica de Serviço: '{original_text}' -> '{translated_text}'{group_info}")
 
         # 4. Criar imagem overlay com traduções posicionadas
         print(f"Lógica de Serviço: Criando overlay com traduções posicionadas.")
@@ -371,17 +457,18 @@ async def process_ai_request(request: RetroArchRequest) -> dict:
         translation_image_b64 = create_positioned_translation_image(
             detections_with_translations, 
             original_width, 
-            original_height
+            original_height,
+            session_key=get_session_key(request)
         )
         
         # Salva imagens de debug para comparação
-        save_debug_images(image_bytes, translation_image_b64, original_width, original_height)
+        save_debug_images(frame, translation_image_b64)
         
         # Calcula o tempo total de processamento
         processing_time = time.time() - start_time
         
         # Registra a requisição nas estatísticas
-        db_manager.record_request_processing(
+        await async_db_manager.record_request_processing(
             ocr_hit=ocr_cache_hit, 
             translation_hit=(translation_cache_hits > 0), 
             processing_time=processing_time
@@ -400,6 +487,17 @@ async def process_ai_request(request: RetroArchRequest) -> dict:
         print(f"Lógica de Serviço: Processamento concluído. Overlay de tradução criado com {len(translation_image_b64)} caracteres base64.")
         return response_data
 
+    except InferenceQueueFullError as e:
+        # O executor de OCR está saturado: sinaliza backpressure ao cliente em vez de enfileirar indefinidamente.
+        print(f"Lógica de Serviço: {e}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Serviço de OCR ocupado: {e}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except HTTPException:
+        # Erros HTTP já formatados (ex: Base64 inválido) são repassados sem alteração.
+        raise
     except Exception as e:
         print(f"Erro na lógica de serviço: {e}")
         # Lança uma exceção que será capturada pelo main.py para retornar um erro 500.
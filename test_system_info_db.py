@@ -113,8 +113,9 @@ def test_system_info_count():
         print("\n📈 CONTAGEM DE REGISTROS:")
         for table_name, description in tables:
             try:
-                db_manager.cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                count = db_manager.cursor.fetchone()[0]
+                with db_manager._cursor() as cursor:
+                    cursor.execute(f"SELECT COUNT(*) AS total FROM {table_name}")
+                    count = cursor.fetchone()['total']
                 print(f"   • {description}: {count} registro(s)")
             except Exception as e:
                 print(f"   • {description}: Erro ao contar - {e}")
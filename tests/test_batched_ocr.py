@@ -0,0 +1,117 @@
+# test_batched_ocr.py
+
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from batched_ocr import BatchedOCR, _batched_easyocr, group_by_shape, width_buckets
+from variant_scheduler import VariantScheduler
+
+try:
+    import easyocr
+except ImportError:
+    easyocr = None
+
+class FakeReader:
+    """
+    Leitor falso sem as etapas internas do EasyOCR: o OCR em lote cai no readtext por imagem.
+    """
+    def __init__(self):
+        self.calls = []
+
+    def readtext(self, image, **kwargs):
+        self.calls.append(kwargs)
+        if image is None:
+            raise ValueError("imagem inválida")
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], f"TEXTO {int(image[0, 0])}", 0.9)]
+
+def test_width_buckets_and_shape_groups():
+    """
+    Testa o agrupamento das linhas por largura e das imagens por tamanho.
+    """
+    print("\n===== TESTE DO OCR EM LOTE =====\n")
+
+    buckets = width_buckets([100, 400, 120, 140, 410, 90], max_ratio=1.5, max_size=32)
+    assert buckets == [[5, 0, 2], [3], [1, 4]]
+    # O tamanho máximo do lote também separa os grupos
+    assert width_buckets([100] * 5, max_size=2) == [[0, 1], [2, 3], [4]]
+    assert width_buckets([]) == []
+
+    images = [np.zeros((40, 60)), np.zeros((60, 40, 3)), np.zeros((40, 60, 3))]
+    assert group_by_shape(images) == {(40, 60): [0, 2], (60, 40): [1]}
+
+def test_fallback_matches_sequential_readtext():
+    """
+    Testa se, sem os internos do EasyOCR, o lote devolve o mesmo que o readtext imagem por imagem.
+    """
+    images = [np.full((20, 20), value, dtype=np.uint8) for value in (1, 2, 3)]
+    reader = FakeReader()
+    ocr = BatchedOCR(enabled=True)
+    results = ocr.readtext(reader, images, [{}, {'contrast_ths': 0.1}, {}])
+    assert [detections[0][1] for detections in results] == ['TEXTO 1', 'TEXTO 2', 'TEXTO 3']
+    assert reader.calls[1] == {'contrast_ths': 0.1, 'detail': 1}
+
+    # Um erro em uma imagem não derruba as demais
+    results = ocr.readtext(reader, [images[0], None])
+    assert results[1] == [] and results[0][0][1] == 'TEXTO 1'
+
+    stats = ocr.get_stats()
+    assert stats['batches'] == 2 and stats['images'] == 5 and stats['fallbacks'] == 2
+
+def test_scheduler_runs_variants_in_batches():
+    """
+    Testa se o escalonador executa as variantes em lotes e verifica a parada antecipada a cada lote.
+    """
+    names = ['original', 'gray', 'clahe', 'otsu_thresh', 'deskewed']
+    variants = {name: None for name in names}
+    texts = {'original': 'START', 'gray': 'OPTIONS', 'clahe': 'START', 'otsu_thresh': 'options'}
+    batches = []
+
+    def readtext_batch(batch_names, images):
+        batches.append(list(batch_names))
+        return [[([[0, 0], [10, 0], [10, 10], [0, 10]], texts[name], 0.9)] if name in texts else []
+                for name in batch_names]
+
+    scheduler = VariantScheduler(top_k=5, explore_rate=0.0, batch_size=2)
+    # Com top_k igual ao número de variantes não há parada antecipada: todos os lotes são executados
+    ran = scheduler.run(variants, None, 'paleta', readtext_batch=readtext_batch)
+    assert batches == [['original', 'gray'], ['clahe', 'otsu_thresh'], ['deskewed']]
+    assert [name for name, _ in ran] == names
+
+    batches.clear()
+    scheduler = VariantScheduler(top_k=4, explore_rate=0.0, batch_size=2)
+    ran = scheduler.run(variants, None, 'paleta', readtext_batch=readtext_batch)
+    # O segundo lote não acrescentou texto novo; com top_k=4 ele já era o último
+    assert batches == [['original', 'gray'], ['clahe', 'otsu_thresh']]
+    assert scheduler.get_stats()['variants_skipped'] == 1
+
+@pytest.mark.skipif(easyocr is None, reason="easyocr não instalado")
+def test_batched_easyocr_matches_reader_readtext():
+    """
+    Testa se o detector e o reconhecedor em lote do EasyOCR devolvem as mesmas caixas e textos
+    que o readtext do leitor para uma imagem.
+    """
+    image = np.full((120, 480, 3), 255, dtype=np.uint8)
+    cv2.putText(image, "GAME OVER", (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    cv2.putText(image, "PRESS START", (20, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+
+    reader = easyocr.Reader(['en'], gpu=False, verbose=False)
+    stats = {'detector_batches': 0, 'recognizer_batches': 0, 'text_lines': 0}
+    batched = _batched_easyocr(reader, [image], [{}], stats, threading.Lock())[0]
+    sequential = reader.readtext(image, detail=1)
+    print(f"Lote: {[text for _, text, _ in batched]} / readtext: {[text for _, text, _ in sequential]}")
+
+    assert [text for _, text, _ in batched] == [text for _, text, _ in sequential]
+    assert [np.asarray(box).tolist() for box, _, _ in batched] == [np.asarray(box).tolist() for box, _, _ in sequential]
+    for (_, _, batched_confidence), (_, _, confidence) in zip(batched, sequential):
+        assert abs(batched_confidence - confidence) < 1e-3
+    assert stats['detector_batches'] == 1 and stats['text_lines'] == len(sequential)
+
+if __name__ == "__main__":
+    test_width_buckets_and_shape_groups()
+    test_fallback_matches_sequential_readtext()
+    test_scheduler_runs_variants_in_batches()
+    if easyocr is not None:
+        test_batched_easyocr_matches_reader_readtext()
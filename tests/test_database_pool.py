@@ -0,0 +1,261 @@
+# test_database_pool.py
+
+import asyncio
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+
+import pymysql
+
+from concurrent_config import ConcurrentTranslationConfig
+from database import AsyncDatabaseManager, ConnectionPool, DatabaseManager, DatabaseUnavailableError
+
+def to_sqlite(query):
+    """
+    Converte o upsert do MySQL (ON DUPLICATE KEY UPDATE ... VALUES(coluna)) para o do SQLite.
+    """
+    if 'ON DUPLICATE KEY UPDATE' not in query:
+        return query
+    query = query.replace('ON DUPLICATE KEY UPDATE',
+                          'ON CONFLICT (source_text_hash, source_lang, target_lang) DO UPDATE SET')
+    return re.sub(r'VALUES\((\w+)\)', r'excluded.\1', query)
+
+class SQLiteCursor:
+    """
+    Cursor SQLite com a interface do DictCursor do pymysql.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, query, params=()):
+        self._connection.queries.append(query)
+        try:
+            self._cursor.execute(to_sqlite(query).replace('%s', '?'), params)
+        except sqlite3.Error as e:
+            raise pymysql.err.ProgrammingError(str(e))
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return dict(row) if row is not None else None
+
+    def fetchall(self):
+        return [dict(row) for row in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteStandIn:
+    """
+    Conexão SQLite que substitui o MariaDB nos testes e detecta uso simultâneo por duas threads.
+    """
+
+    def __init__(self, path):
+        self.raw = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self.raw.row_factory = sqlite3.Row
+        self.in_use = threading.Lock()
+        self.ping_ok = True
+        self.pings = 0
+        self.queries = []
+
+    def cursor(self, cursor_class=None):
+        # Se outra thread estiver usando esta conexão, o pool falhou em isolá-la
+        if not self.in_use.acquire(blocking=False):
+            raise AssertionError("Conexão compartilhada entre duas operações simultâneas")
+        return SQLiteCursor(self)
+
+    def commit(self):
+        self.raw.commit()
+        self._release()
+
+    def rollback(self):
+        self.raw.rollback()
+        self._release()
+
+    def _release(self):
+        if self.in_use.locked():
+            self.in_use.release()
+
+    def ping(self, reconnect=True):
+        self.pings += 1
+        if not self.ping_ok:
+            raise pymysql.err.OperationalError(2006, "MySQL server has gone away")
+
+    def close(self):
+        self.raw.close()
+
+def create_manager(pool_size=3):
+    """
+    Cria um DatabaseManager sobre um arquivo SQLite temporário com a tabela de traduções.
+    """
+    path = os.path.join(tempfile.mkdtemp(), "translations.db")
+    setup = sqlite3.connect(path)
+    setup.execute("""
+        CREATE TABLE translations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_text TEXT NOT NULL,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            translated_text TEXT NOT NULL,
+            translator_used TEXT,
+            confidence REAL,
+            last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            used_count INTEGER DEFAULT 1,
+            source_text_hash TEXT NOT NULL,
+            UNIQUE (source_text_hash, source_lang, target_lang)
+        )
+    """)
+    setup.commit()
+    setup.close()
+
+    connections = []
+
+    def factory():
+        connection = SQLiteStandIn(path)
+        connections.append(connection)
+        return connection
+
+    manager = DatabaseManager(pool_size=pool_size, connection_factory=factory)
+    # Sem a camada em memória, todas as leituras passam pelo pool
+    manager.configure_memory_cache(ConcurrentTranslationConfig(enable_caching=False))
+    return manager, connections
+
+def test_concurrent_operations_use_separate_connections():
+    """
+    Testa leituras e escritas simultâneas de várias threads sobre um pool limitado.
+    """
+    print("\n===== TESTE DO POOL DE CONEXÕES =====\n")
+
+    manager, connections = create_manager(pool_size=3)
+    assert manager.connect()
+    errors = []
+
+    def worker(worker_id):
+        try:
+            for i in range(15):
+                text = f"texto {worker_id}-{i}"
+                assert manager.save_translation(text, 'en', 'pt', f"tradução {worker_id}-{i}", 'teste')
+                result = manager.get_translation(text, 'en', 'pt')
+                assert result['translated_text'] == f"tradução {worker_id}-{i}"
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = manager.pool.get_stats()
+    print(f"Estatísticas do pool: {stats}")
+    assert not errors, errors
+    assert len(connections) <= 3
+    assert stats['in_use'] == 0
+    assert stats['checkouts'] >= 8 * 15 * 2
+
+def test_stale_connection_is_health_checked_and_replaced():
+    """
+    Testa se uma conexão ociosa que falha no ping é descartada e substituída.
+    """
+    manager, connections = create_manager(pool_size=1)
+    manager.pool.health_check_interval = 0
+    assert manager.save_translation("GAME OVER", 'en', 'pt', "FIM DE JOGO")
+
+    connections[0].ping_ok = False
+    result = manager.get_translation("GAME OVER", 'en', 'pt')
+    assert result['translated_text'] == "FIM DE JOGO"
+    assert len(connections) == 2
+    assert manager.pool.get_stats()['discarded'] == 1
+
+def test_unavailable_database_backs_off():
+    """
+    Testa se, após uma falha de conexão, novas tentativas respeitam o intervalo de espera.
+    """
+    attempts = []
+
+    def failing_factory():
+        attempts.append(1)
+        raise pymysql.err.OperationalError(2003, "Can't connect")
+
+    pool = ConnectionPool(failing_factory, size=2, reconnect_backoff=60)
+    for _ in range(3):
+        try:
+            pool.acquire()
+        except pymysql.err.OperationalError:
+            pass
+    assert len(attempts) == 1
+
+    manager = DatabaseManager(connection_factory=failing_factory)
+    manager.pool.reconnect_backoff = 60
+    assert manager.get_translation("START", 'en', 'pt') is None
+    assert not manager.connected
+
+    try:
+        pool.acquire()
+        raised = False
+    except DatabaseUnavailableError:
+        raised = True
+    assert raised
+
+def test_bulk_lookup_uses_single_query():
+    """
+    Testa se as traduções de todos os textos de uma captura são buscadas em uma única consulta.
+    """
+    manager, connections = create_manager(pool_size=1)
+    texts = [f"MENU ITEM {i}" for i in range(15)]
+    for text in texts:
+        assert manager.save_translation(text, 'en', 'pt', text.replace("MENU ITEM", "ITEM DO MENU"))
+    connections[0].queries.clear()
+
+    found = manager.get_translations_bulk(texts + ["NEW GAME", texts[0]], 'en', 'pt')
+    print(f"Consultas executadas: {len(connections[0].queries)}")
+    assert len(connections[0].queries) == 1
+    assert set(found) == set(texts)
+    assert found["MENU ITEM 3"]['translated_text'] == "ITEM DO MENU 3"
+    assert manager.db_tier_stats['translations'] == {'hits': 15, 'misses': 1}
+
+    # Salvar o mesmo texto de novo atualiza a linha existente em vez de duplicá-la
+    assert manager.save_translation("MENU ITEM 3", 'en', 'pt', "OPÇÃO 3")
+    found = manager.get_translations_bulk(["MENU ITEM 3"], 'en', 'pt')
+    assert found["MENU ITEM 3"]['translated_text'] == "OPÇÃO 3"
+    with manager._cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS total FROM translations")
+        assert cursor.fetchone()['total'] == 15
+
+def test_async_manager_does_not_block_event_loop():
+    """
+    Testa a variante assíncrona: consultas no pool de threads e hits de memória no próprio loop.
+    """
+    manager, _ = create_manager(pool_size=2)
+    manager.configure_memory_cache(ConcurrentTranslationConfig(enable_caching=True, cache_ttl=300))
+    async_manager = AsyncDatabaseManager(manager)
+
+    async def run():
+        assert await async_manager.save_translation("PRESS START", 'en', 'pt', "APERTE START")
+        manager.translation_cache.clear()
+        from_database = await async_manager.get_translation("PRESS START", 'en', 'pt')
+        from_memory = await async_manager.get_translation("PRESS START", 'en', 'pt')
+        return from_database, from_memory
+
+    from_database, from_memory = asyncio.run(run())
+    async_manager.shutdown()
+
+    stats = manager.get_cache_stats()
+    print(f"Estatísticas por camada: {stats}")
+    assert from_database['translated_text'] == from_memory['translated_text'] == "APERTE START"
+    assert stats['database']['translations']['hits'] == 1
+    assert stats['memory']['translations']['hits'] == 1
+
+if __name__ == "__main__":
+    test_concurrent_operations_use_separate_connections()
+    test_stale_connection_is_health_checked_and_replaced()
+    test_unavailable_database_backs_off()
+    test_bulk_lookup_uses_single_query()
+    test_async_manager_does_not_block_event_loop()
@@ -0,0 +1,76 @@
+# test_debug_capture.py
+
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from debug_capture import DebugCapture
+
+def create_image(value=0):
+    """
+    Cria uma imagem de ruído (PNG com tamanho previsível).
+    """
+    rng = np.random.default_rng(value)
+    return rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)
+
+def test_disabled_capture_writes_nothing():
+    """
+    Testa se a captura desligada (ou não amostrada) não grava nenhum arquivo.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for capture in (DebugCapture(enabled=False, sample_rate=1.0, directory=directory),
+                        DebugCapture(enabled=True, sample_rate=0.0, directory=directory)):
+            assert capture.begin() is None
+            assert not capture.active
+            assert capture.save_image('received', create_image()) is False
+            assert capture.flush()
+        assert os.listdir(directory) == []
+
+def test_sampled_request_is_written_in_background():
+    """
+    Testa se as imagens da requisição amostrada são gravadas no diretório da requisição.
+    """
+    print("\n===== TESTE DA CAPTURA DE DEBUG =====\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        capture = DebugCapture(enabled=True, sample_rate=1.0, directory=directory)
+        request_id = capture.begin('req-1')
+        assert request_id == 'req-1' and capture.active
+
+        image = create_image()
+        assert capture.save_image('received', image)
+        # Alterar o array depois de agendar não afeta o arquivo gravado
+        image[:] = 0
+        writer_threads = []
+        assert capture.save_image('deferred', lambda: writer_threads.append(threading.current_thread().name) or b'png')
+        assert capture.flush()
+
+        files = sorted(os.listdir(os.path.join(directory, 'req-1')))
+        assert files == ['deferred.png', 'received.png']
+        assert writer_threads == ['debug-capture-writer']
+        stats = capture.get_stats()
+        assert stats['written_files'] == 2 and stats['stored_requests'] == 1
+
+def test_ring_buffer_evicts_oldest_requests():
+    """
+    Testa se o buffer circular apaga os diretórios mais antigos ao passar do limite.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        capture = DebugCapture(enabled=True, sample_rate=1.0, directory=directory, max_bytes=30000)
+        for i in range(5):
+            capture.begin(f'req-{i}')
+            capture.save_image('received', create_image(i))  # ~12 KB por imagem
+            assert capture.flush()
+
+        remaining = sorted(os.listdir(directory))
+        assert remaining == ['req-3', 'req-4'], remaining
+        stats = capture.get_stats()
+        assert stats['evicted_requests'] == 3
+        assert stats['stored_mb'] * 1024 * 1024 <= 30000
+
+if __name__ == "__main__":
+    test_disabled_capture_writes_nothing()
+    test_sampled_request_is_written_in_background()
+    test_ring_buffer_evicts_oldest_requests()
@@ -0,0 +1,110 @@
+# test_detection_grouping.py
+
+import random
+
+import numpy as np
+
+import detection_grouping
+from detection_grouping import band_links, box_geometry, candidate_pairs, group_boxes
+from ocr_module import group_text_detections
+
+def detection(text, x1, y1, x2, y2, confidence=0.9):
+    """
+    Cria uma detecção com caixa retangular.
+    """
+    return {'text': text, 'bbox': [[x1, y1], [x2, y1], [x2, y2], [x1, y2]], 'confidence': confidence}
+
+def test_groups_lines_and_keeps_output_format():
+    """
+    Testa o agrupamento por linha e o formato das detecções agrupadas.
+    """
+    print("\n===== TESTE DO AGRUPAMENTO VETORIZADO =====\n")
+
+    detections = [
+        detection('Hello', 10, 10, 50, 30, 0.9),
+        detection('World', 60, 10, 100, 30, 0.8),
+        detection('This is', 10, 50, 50, 70, 0.7),
+        detection('a test', 60, 50, 100, 70, 0.6),
+        detection('of grouping', 110, 50, 180, 70, 0.5),
+    ]
+    grouped = group_text_detections(detections)
+
+    assert [d['text'] for d in grouped] == ['Hello World', 'This is a test of grouping']
+    assert grouped[0]['bbox'] == [[10, 10], [100, 10], [100, 30], [10, 30]]
+    assert grouped[0]['is_grouped'] and grouped[1]['group_size'] == 3
+    assert abs(grouped[1]['confidence'] - 0.6) < 1e-9
+    assert all(isinstance(v, int) for point in grouped[1]['bbox'] for v in point)
+
+    # Detecção isolada é devolvida sem alterações
+    single = [detection('START', 0, 0, 40, 10)]
+    assert group_text_detections(single) == single
+
+def test_grouping_is_order_independent():
+    """
+    Testa se a ordem das detecções não muda os grupos (o agrupamento antigo comparava só com a última caixa).
+    """
+    # 'B' fica entre 'A' e 'C' na vertical, mas longe na horizontal: antes ela quebrava o grupo de 'A' e 'C'
+    detections = [
+        detection('A', 0, 0, 40, 20),
+        detection('B', 300, 2, 340, 22),
+        detection('C', 50, 4, 90, 24),
+        detection('D', 0, 200, 40, 220),
+    ]
+    expected = sorted(d['text'] for d in group_text_detections(detections))
+    assert expected == ['A C', 'B', 'D']
+    for _ in range(10):
+        shuffled = detections[:]
+        random.shuffle(shuffled)
+        assert sorted(d['text'] for d in group_text_detections(shuffled)) == expected
+
+    # Com muitas caixas, a varredura por faixas forma os mesmos grupos que todos os pares
+    rng = random.Random(7)
+    many = []
+    for left, top in ((0, 0), (1200, 0), (0, 800), (1200, 800)):
+        for _ in range(25):
+            x, y = left + rng.randrange(0, 500), top + rng.randrange(0, 150)
+            many.append(detection(f"w{len(many)}", x, y, x + rng.randint(10, 60), y + 18))
+    extents, centers = box_geometry(many)
+    swept, _, _ = group_boxes(extents, centers)
+    limit = detection_grouping.ALL_PAIRS_MAX_BOXES
+    detection_grouping.ALL_PAIRS_MAX_BOXES = len(many)
+    try:
+        all_pairs, _, _ = group_boxes(extents, centers)
+    finally:
+        detection_grouping.ALL_PAIRS_MAX_BOXES = limit
+    assert swept == all_pairs and 1 < len(swept) < len(many)
+
+def test_consecutive_aligned_lines_and_sweep_pairs():
+    """
+    Testa a fusão de linhas consecutivas alinhadas e os pares candidatos da varredura por faixas.
+    """
+    detections = [
+        detection('NEW', 0, 0, 60, 20),
+        detection('GAME', 10, 30, 70, 50),
+        detection('FOOTER', 0, 100, 60, 120),
+    ]
+    grouped = group_text_detections(detections)
+    assert [d['text'] for d in grouped] == ['NEW\nGAME', 'FOOTER']
+
+    extents, centers = box_geometry(detections)
+    assert centers.tolist() == [10.0, 40.0, 110.0]
+    i, j = candidate_pairs(centers, extents[:, 0], extents[:, 2], 40, 0.0)
+    assert list(zip(i.tolist(), j.tolist())) == [(0, 1)]
+    groups, _, max_vertical = group_boxes(extents, centers)
+    assert groups == [[0, 1], [2]] and max_vertical == 12.0
+    assert candidate_pairs(np.array([5.0]), np.array([0.0]), np.array([10.0]), 10, 0.0)[0].size == 0
+
+    # Mesma faixa: só caixas a até a margem horizontal, uma ligação por caixa
+    centers = np.array([10.0, 11.0, 12.0, 13.0])
+    x_min, x_max = np.array([0.0, 30.0, 45.0, 200.0]), np.array([20.0, 40.0, 60.0, 220.0])
+    i, j = band_links(centers, x_min, x_max, 5, 10)
+    assert sorted(zip(i.tolist(), j.tolist())) == [(1, 0), (2, 1)]
+    # Entre faixas: o candidato distante na horizontal fica de fora
+    i, j = candidate_pairs(np.array([0.0, 6.0, 6.0]), np.array([0.0, 25.0, 300.0]),
+                           np.array([20.0, 40.0, 320.0]), 5, 10, same_band=False)
+    assert list(zip(i.tolist(), j.tolist())) == [(0, 1)]
+
+if __name__ == "__main__":
+    test_groups_lines_and_keeps_output_format()
+    test_grouping_is_order_independent()
+    test_consecutive_aligned_lines_and_sweep_pairs()
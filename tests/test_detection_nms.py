@@ -0,0 +1,95 @@
+# test_detection_nms.py
+
+import random
+
+import numpy as np
+
+from detection_nms import GridIndex, box_iou, normalize_text, suppress_duplicates, text_similarity
+
+def detection(text, x1, y1, x2, y2, confidence=0.9, variant='original'):
+    """
+    Cria uma detecção com caixa retangular.
+    """
+    return {'text': text, 'bbox': [[x1, y1], [x2, y1], [x2, y2], [x1, y2]], 'confidence': confidence,
+            'variant': variant}
+
+def test_keeps_highest_confidence_duplicate():
+    """
+    Testa se as duplicatas entre variantes são suprimidas, mantendo a de maior confiança.
+    """
+    print("\n===== TESTE DA SUPRESSÃO DE DUPLICATAS =====\n")
+
+    detections = [
+        detection('START GAME', 100, 100, 220, 120, 0.6, 'original'),
+        detection('Start Game!', 102, 101, 221, 121, 0.9, 'clahe'),
+        detection('START GAM', 99, 100, 210, 120, 0.7, 'otsu_thresh'),
+        detection('OPTIONS', 100, 140, 190, 160, 0.8, 'gray'),
+        # Mesmo texto em outra região da tela não é duplicata
+        detection('START GAME', 400, 300, 520, 320, 0.5, 'gray'),
+    ]
+    unique = suppress_duplicates(detections)
+    assert [(d['text'], d['variant']) for d in unique] == [
+        ('Start Game!', 'clahe'), ('OPTIONS', 'gray'), ('START GAME', 'gray')]
+
+    # Textos diferentes na mesma região são mantidos
+    overlapping = [detection('HP', 10, 10, 40, 20, 0.9), detection('MP', 12, 10, 42, 20, 0.8)]
+    assert len(suppress_duplicates(overlapping)) == 2
+
+def test_geometry_and_text_helpers():
+    """
+    Testa o IoU vetorizado, a normalização/semelhança dos textos e o índice em grade.
+    """
+    box = np.array([0.0, 0.0, 10.0, 10.0])
+    others = np.array([[0.0, 0.0, 10.0, 10.0], [5.0, 0.0, 15.0, 10.0], [20.0, 20.0, 30.0, 30.0], [3.0, 3.0, 3.0, 3.0]])
+    assert np.allclose(box_iou(box, others), [1.0, 50 / 150, 0.0, 0.0])
+
+    assert normalize_text(' Start, Game! ') == 'startgame'
+    assert text_similarity('startgame', 'start') == 1.0
+    assert text_similarity('options', 'opti0ns') > 0.8
+    assert text_similarity('', 'x') == 0.0
+
+    index = GridIndex(cell_size=10)
+    index.insert(0, (0, 0, 15, 5))
+    index.insert(1, (50, 50, 60, 60))
+    assert index.query((12, 0, 14, 4)) == [0]
+    assert index.query((0, 0, 100, 100)) == [0, 1]
+    assert index.query((30, 30, 35, 35)) == []
+
+def test_matches_brute_force_on_many_boxes():
+    """
+    Testa se o NMS com índice em grade dá o mesmo resultado da comparação de todos os pares.
+    """
+    rng = random.Random(7)
+    words = ['HP', 'MP', 'START', 'OPTIONS', 'ITEM', 'MAGIC', 'SAVE', 'LOAD']
+    detections = []
+    for _ in range(150):
+        x, y = rng.randrange(0, 600), rng.randrange(0, 400)
+        detections.append(detection(rng.choice(words), x, y, x + rng.randint(20, 80), y + rng.randint(10, 25),
+                                    round(rng.random(), 3)))
+
+    def brute_force(items, iou_threshold=0.5, center_distance=20, similarity_threshold=0.8):
+        kept = []
+        for i in sorted(range(len(items)), key=lambda i: (-items[i]['confidence'], i)):
+            a = np.array(items[i]['bbox'], dtype=float)
+            duplicate = False
+            for j in kept:
+                b = np.array(items[j]['bbox'], dtype=float)
+                extent_a = np.concatenate([a.min(axis=0), a.max(axis=0)])
+                extent_b = np.concatenate([b.min(axis=0), b.max(axis=0)])
+                close = np.hypot(*(a.mean(axis=0) - b.mean(axis=0))) < center_distance
+                if (box_iou(extent_a, extent_b[None])[0] >= iou_threshold or close) and text_similarity(
+                        normalize_text(items[i]['text']), normalize_text(items[j]['text'])) >= similarity_threshold:
+                    duplicate = True
+                    break
+            if not duplicate:
+                kept.append(i)
+        return [items[i] for i in sorted(kept)]
+
+    unique = suppress_duplicates(detections)
+    assert unique == brute_force(detections)
+    assert len(unique) < len(detections)
+
+if __name__ == "__main__":
+    test_keeps_highest_confidence_duplicate()
+    test_geometry_and_text_helpers()
+    test_matches_brute_force_on_many_boxes()
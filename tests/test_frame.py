@@ -0,0 +1,73 @@
+# test_frame.py
+
+import cv2
+import numpy as np
+
+from frame import Frame
+from database import calculate_image_hash
+from orientation import OrientationDetector, find_best_orientation
+from perceptual_hash import compute_image_phash
+
+def create_png(width=640, height=360):
+    """
+    Cria uma captura PNG com algumas linhas de "texto" horizontais.
+    """
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for y in range(40, height - 40, 60):
+        cv2.rectangle(image, (30, y), (width - 30, y + 18), (0, 0, 0), -1)
+    _, encoded = cv2.imencode('.png', image)
+    return image, encoded.tobytes()
+
+def test_frame_decodes_once_and_caches_views():
+    """
+    Testa se o quadro decodifica uma vez e calcula cada visão derivada uma única vez.
+    """
+    print("\n===== TESTE DO QUADRO COMPARTILHADO =====\n")
+
+    image, png = create_png()
+    frame = Frame.from_bytes(png)
+    assert frame is not None
+    assert frame.size == (640, 360)
+    assert np.array_equal(frame.bgr, image)
+
+    assert frame.gray is frame.gray
+    small = frame.downscaled_gray(256)
+    assert max(small.shape) == 256
+    assert frame.downscaled_gray(256) is small
+    # Uma visão maior que a imagem é a própria escala de cinza
+    assert frame.downscaled_gray(4096) is frame.gray
+
+    assert frame.content_hash == calculate_image_hash(png)
+    assert frame.perceptual_hash() == compute_image_phash(image)
+
+    assert Frame.from_bytes(b'not an image') is None
+
+def test_frame_arrays_are_read_only():
+    """
+    Testa se o array compartilhado não pode ser alterado pelas etapas do pipeline.
+    """
+    _, png = create_png()
+    frame = Frame.from_bytes(png)
+    for array in (frame.bgr, frame.gray, frame.downscaled_gray(128)):
+        try:
+            array[0, 0] = 0
+            assert False, "O array do quadro deveria ser somente leitura"
+        except ValueError:
+            pass
+
+def test_orientation_accepts_frame_without_copy():
+    """
+    Testa se a orientação aceita o Frame e devolve o próprio array quando não há rotação.
+    """
+    _, png = create_png()
+    frame = Frame.from_bytes(png)
+    detector = OrientationDetector(mode='projection', remember=False)
+    assert detector.detect(frame) == 0
+
+    corrected, angle = find_best_orientation(frame)
+    assert angle == 0 and corrected is frame.bgr
+
+if __name__ == "__main__":
+    test_frame_decodes_once_and_caches_views()
+    test_frame_arrays_are_read_only()
+    test_orientation_accepts_frame_without_copy()
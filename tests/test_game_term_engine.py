@@ -0,0 +1,96 @@
+# test_game_term_engine.py
+
+import json
+import os
+import random
+import re
+import tempfile
+
+from game_terms import GameTermEngine
+
+TERMS = {
+    'GAME OVER': 'Fim de Jogo',
+    'GAME': 'Jogo',
+    'OVER': 'Acabou',
+    'PRESS START': 'Pressione Iniciar',
+    'START': 'Iniciar',
+    'PLAYER 1': 'Jogador 1',
+    'PLAYER': 'Jogador',
+    'HIGH SCORE': 'Recorde',
+    'SCORE': 'Pontuação',
+    'THE': 'O',
+    'OK': 'OK',
+    'HP': 'PV',
+}
+
+def legacy_translate(text, terms):
+    """
+    Tradução termo a termo da versão antiga (referência para comparação).
+    """
+    sorted_terms = sorted(terms.items(), key=lambda x: len(x[0]), reverse=True)
+    for compound in (True, False):
+        for term, translation in sorted_terms:
+            if (len(term.split()) > 1) == compound:
+                text = re.sub(r'\b' + re.escape(term) + r'\b', translation, text, flags=re.IGNORECASE)
+    return text
+
+def test_matches_term_by_term_translation():
+    """
+    Testa se o motor compilado produz o mesmo texto que a substituição termo a termo.
+    """
+    print("\n===== TESTE DO MOTOR DE TERMOS DE JOGOS =====\n")
+
+    engine = GameTermEngine(TERMS, terms_file='')
+    phrases = ["GAME OVER", "press start", "PLAYER 1 HIGH SCORE: 100", "THE GAME IS OVER",
+               "HP: 50 OK", "GAMEOVER", "START!", ""]
+    for phrase in phrases:
+        print(f"{phrase!r} -> {engine.translate(phrase)!r}")
+        assert engine.translate(phrase) == legacy_translate(phrase, TERMS)
+
+    rng = random.Random(0)
+    words = list(TERMS) + ['x', '1', 'the', 'Iniciar', 'O', 'K']
+    for _ in range(2000):
+        text = ''.join(rng.choice(words) + rng.choice([' ', '', ':', '\n']) for _ in range(rng.randint(1, 5)))
+        assert engine.translate(text) == legacy_translate(text, TERMS), text
+
+def test_conflicting_terms_fall_back_to_term_by_term():
+    """
+    Testa se termos cuja ordem importa são traduzidos termo a termo quando aparecem juntos.
+    """
+    # 'B C D' tem prioridade sobre 'A B', mas a varredura única encontraria 'A B' primeiro
+    terms = {'B C D': 'x', 'A B': 'y', 'GO': 'GO UP', 'UP': 'cima'}
+    engine = GameTermEngine(terms, terms_file='')
+    for text in ["A B C D", "A B", "GO", "UP GO"]:
+        assert engine.translate(text) == legacy_translate(text, terms)
+    assert engine.get_stats()['sequential_fallbacks'] >= 2
+    assert engine.get_stats()['conflicting_terms'] == 3
+
+def test_reloads_terms_file_when_it_changes():
+    """
+    Testa se os termos do arquivo externo são carregados e recarregados quando o arquivo muda.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'terms.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'en': {'BOSS': 'Chefão'}}, f)
+
+        engine = GameTermEngine(TERMS, terms_file=path, reload_interval=0)
+        assert engine.translate("BOSS GAME") == "Chefão Jogo"
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'BOSS': 'Chefe', 'GAME': 'Partida'}, f)
+        os.utime(path, (1, 1))
+        assert engine.translate("BOSS GAME") == "Chefe Partida"
+        assert engine.get_stats()['reloads'] == 2
+
+        # Arquivo inválido mantém o dicionário anterior
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{inválido')
+        os.utime(path, (2, 2))
+        assert engine.translate("BOSS GAME") == "Chefe Partida"
+        assert engine.get_stats()['reload_errors'] == 1
+
+if __name__ == "__main__":
+    test_matches_term_by_term_translation()
+    test_conflicting_terms_fall_back_to_term_by_term()
+    test_reloads_terms_file_when_it_changes()
@@ -0,0 +1,134 @@
+# test_hedged_translation.py
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault('translators_default_region', 'EN')
+
+from concurrent_config import ConcurrentTranslationConfig
+from concurrent_translation_module import (
+    ConcurrentTranslationManager,
+    HedgedRequestStats,
+    TranslationResult
+)
+from provider_health import ProviderHealthRegistry
+
+class FakeManager(ConcurrentTranslationManager):
+    """
+    Gerenciador com tradutores simulados: cada tradutor responde após um atraso fixo
+    com a confiança configurada.
+    """
+
+    def __init__(self, delays, confidences=None, default_delay=0.05):
+        super().__init__(ConcurrentTranslationConfig(request_mode='hedged', hedge_default_delay=default_delay))
+        self.hedge_stats = HedgedRequestStats()
+        self.health = ProviderHealthRegistry(min_samples=3)
+        self.delays = delays
+        self.confidences = confidences or {}
+        self.started = []
+        self.cancelled = []
+
+    async def translate_with_single_translator(self, text, translator_name, source_lang='auto', target_lang='pt'):
+        self.started.append(translator_name)
+        start = time.time()
+        try:
+            await asyncio.sleep(self.delays[translator_name])
+        except asyncio.CancelledError:
+            self.cancelled.append(translator_name)
+            raise
+        execution_time = time.time() - start
+        self.health.record_success(translator_name, execution_time)
+        return TranslationResult(
+            translator=translator_name,
+            original_text=text,
+            translated_text=f"{text} ({translator_name})",
+            confidence_score=self.confidences.get(translator_name, 0.9),
+            execution_time=execution_time
+        )
+
+async def run_hedged(manager, translators):
+    results = await manager.translate_concurrent("GAME OVER", 'en', 'pt', translators)
+    # Dá tempo para as tarefas canceladas processarem o cancelamento
+    await asyncio.sleep(0)
+    return results
+
+def test_fast_primary_returns_without_backups():
+    """
+    Testa se uma resposta rápida e confiável do tradutor principal encerra a requisição
+    sem acionar os tradutores reserva.
+    """
+    print("\n===== TESTE DO MODO HEDGED DE TRADUÇÃO =====\n")
+
+    manager = FakeManager({'google': 0.01, 'bing': 0.01}, default_delay=0.2)
+    results = asyncio.run(run_hedged(manager, ['google', 'bing']))
+    print(f"Tradutores acionados: {manager.started}")
+    assert [result.translator for result in results] == ['google']
+    assert manager.started == ['google']
+    stats = manager.hedge_stats.get_stats()
+    assert stats['hedged_requests'] == 1
+    assert stats['backups_launched'] == 0
+    assert stats['wins'] == {'google': 1}
+
+def test_slow_primary_launches_backup_and_cancels_loser():
+    """
+    Testa se o tradutor reserva é acionado após o atraso e se o principal lento é cancelado
+    quando o reserva responde primeiro.
+    """
+    manager = FakeManager({'google': 1.0, 'bing': 0.02}, default_delay=0.05)
+    start = time.perf_counter()
+    results = asyncio.run(run_hedged(manager, ['google', 'bing']))
+    elapsed = time.perf_counter() - start
+    print(f"Tempo: {elapsed * 1000:.0f} ms, vencedor: {results[0].translator}")
+    assert [result.translator for result in results] == ['bing']
+    assert elapsed < 0.5
+    assert manager.cancelled == ['google']
+    stats = manager.hedge_stats.get_stats()
+    assert stats['backups_launched'] == 1
+    assert stats['early_returns'] == 1
+    assert stats['cancelled'] == 1
+    assert stats['cancelled_by_provider'] == {'google': 1}
+    # O tempo parcial do tradutor cancelado não vira amostra de latência
+    assert 'google' not in manager.health.get_stats()['providers']
+
+    # Resposta com confiança baixa aciona o reserva imediatamente
+    manager = FakeManager({'google': 0.01, 'bing': 0.01}, confidences={'google': 0.1}, default_delay=1.0)
+    start = time.perf_counter()
+    results = asyncio.run(run_hedged(manager, ['google', 'bing']))
+    assert time.perf_counter() - start < 0.5
+    assert [result.translator for result in results] == ['bing', 'google']
+
+def test_fastest_provider_goes_first():
+    """
+    Testa se a saúde dos tradutores coloca o tradutor mais rápido como principal e se o
+    atraso dos reservas vem do percentil da latência registrada lá.
+    """
+    health = ProviderHealthRegistry(min_samples=3)
+    for latency in (0.30, 0.35, 0.40):
+        health.record_success('google', latency)
+    for latency in (0.10, 0.12, 0.50):
+        health.record_success('bing', latency)
+    assert health.order(['google', 'mymemory', 'bing']) == ['bing', 'google', 'mymemory']
+    assert health.percentile('bing', 95) == 0.50
+    assert health.percentile('bing', 50) == 0.12
+    assert health.percentile('mymemory', 95) is None
+    assert health.get_stats()['providers']['bing']['p50_ms'] == 120.0
+
+    manager = FakeManager({'google': 0.01, 'bing': 0.01})
+    manager.health = health
+    asyncio.run(run_hedged(manager, ['google', 'bing']))
+    assert manager.started == ['bing']
+
+    # A ordem recebida é mantida e o atraso do reserva é o p95 do principal (0,5 s)
+    manager = FakeManager({'google': 1.0, 'bing': 0.01}, default_delay=0.01)
+    manager.health = health
+    start = time.perf_counter()
+    results = asyncio.run(manager.translate_hedged("GAME OVER", 'en', 'pt', ['google', 'bing']))
+    assert manager.started == ['google', 'bing']
+    assert [result.translator for result in results] == ['bing']
+    assert 0.4 < time.perf_counter() - start < 0.9
+
+if __name__ == "__main__":
+    test_fast_primary_returns_without_backups()
+    test_slow_primary_launches_backup_and_cancels_loser()
+    test_fastest_provider_goes_first()
@@ -0,0 +1,168 @@
+# test_http_translators.py
+
+import asyncio
+import os
+import threading
+import time
+
+from aiohttp import web
+
+os.environ.setdefault('translators_default_region', 'EN')
+
+from concurrent_config import ConcurrentTranslationConfig
+from concurrent_translation_module import ConcurrentTranslationManager
+from http_translators import GoogleHttpTranslator, HttpTranslatorError, HttpTranslatorPool, MyMemoryHttpTranslator
+from provider_health import ProviderHealthRegistry
+from translation_stage import ProviderRateLimiter, TranslationStage
+
+WORDS = {'start': 'iniciar', 'game': 'jogo', 'over': 'acabou', 'hello': 'olá'}
+
+def translate_words(text):
+    return ' '.join(WORDS.get(word.lower(), word) for word in text.split(' '))
+
+class StubTranslationServer:
+    """
+    Servidor HTTP local que imita os endpoints do Google (client=gtx) e do MyMemory.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self.peers = set()
+        self.runner = None
+        self.url = None
+
+    async def google(self, request):
+        self.requests.append(('google', dict(request.query)))
+        self.peers.add(request.transport.get_extra_info('peername'))
+        await asyncio.sleep(self.delay)
+        text = request.query['q']
+        if text == 'FAIL':
+            return web.Response(status=500)
+        segments = [[translate_words(line), line, None, None] for line in text.split('\n')]
+        for segment in segments[:-1]:
+            segment[0] += '\n'
+        return web.json_response([segments, None, request.query['sl']])
+
+    async def mymemory(self, request):
+        self.requests.append(('mymemory', dict(request.query)))
+        await asyncio.sleep(self.delay)
+        return web.json_response({'responseData': {'translatedText': translate_words(request.query['q'])},
+                                  'responseStatus': 200})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/translate_a/single', self.google)
+        app.router.add_get('/get', self.mymemory)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def pool(self, **kwargs):
+        adapters = {
+            'google': GoogleHttpTranslator(self.url + '/translate_a/single'),
+            'mymemory': MyMemoryHttpTranslator(self.url + '/get'),
+        }
+        return HttpTranslatorPool(adapters=adapters, enabled=True, **kwargs)
+
+def test_adapters_share_a_keep_alive_session():
+    """
+    Testa se os adaptadores traduzem pelo servidor local, reaproveitando a mesma sessão e a
+    mesma conexão, e se as linhas de um texto em lote são preservadas.
+    """
+    print("\n===== TESTE DOS TRADUTORES HTTP ASSÍNCRONOS =====\n")
+
+    async def run():
+        server = await StubTranslationServer().start()
+        pool = server.pool()
+        try:
+            results = [
+                await pool.translate("GAME OVER", 'deep_google', 'en', 'pt-br'),
+                await pool.translate("start\ngame", 'google', 'auto', 'pt'),
+                await pool.translate("hello", 'deep_mymemory', 'auto', 'pt'),
+            ]
+            try:
+                await pool.translate("FAIL", 'google', 'en', 'pt')
+                raise AssertionError("HTTP 500 deveria falhar")
+            except HttpTranslatorError:
+                pass
+        finally:
+            await pool.close()
+            await server.stop()
+        return results, pool, server
+
+    results, pool, server = asyncio.run(run())
+    print(f"Traduções: {results}")
+    assert results == ["jogo acabou", "iniciar\njogo", "olá"]
+    assert server.requests[0][1]['tl'] == 'pt'
+    assert server.requests[2][1]['langpair'] == 'en|pt'
+    assert len(server.peers) == 1
+    stats = pool.get_stats()
+    assert stats['sessions_created'] == 1
+    assert stats['errors'] == 1
+    assert not pool.supports('bing')
+
+def test_calls_do_not_consume_threads():
+    """
+    Testa se muitas traduções simultâneas pelo adaptador terminam juntas, sem criar threads,
+    e respeitando o limite de conexões por host.
+    """
+    async def run():
+        server = await StubTranslationServer(delay=0.2).start()
+        pool = server.pool(connections_per_host=50)
+        threads = threading.active_count()
+        start = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(pool.translate("game", 'google', 'en', 'pt') for _ in range(40)))
+        finally:
+            await pool.close()
+            await server.stop()
+        return results, time.perf_counter() - start, threading.active_count() - threads
+
+    results, elapsed, new_threads = asyncio.run(run())
+    print(f"40 traduções em {elapsed * 1000:.0f} ms, threads novas: {new_threads}")
+    assert results == ["jogo"] * 40
+    # Com 3 threads seriam 14 rodadas de 0,2s
+    assert elapsed < 1.0
+    assert new_threads == 0
+
+def test_stage_and_manager_use_async_adapters():
+    """
+    Testa se a etapa de tradução e o gerenciador concorrente usam o adaptador assíncrono,
+    registrando o resultado na saúde dos tradutores.
+    """
+    async def run():
+        server = await StubTranslationServer().start()
+        pool = server.pool()
+        health = ProviderHealthRegistry()
+        stage = TranslationStage(rate_limiter=ProviderRateLimiter(), health=health)
+        try:
+            stage_result = await stage.call_provider('deep_google', pool.translate, "start", 'deep_google', 'en', 'pt')
+            manager = ConcurrentTranslationManager(ConcurrentTranslationConfig(request_mode='all'))
+            manager.http_translators = pool
+            manager.health = health
+            async with manager:
+                assert manager.session is await pool.get_session()
+                results = await manager.translate_concurrent("GAME OVER", 'en', 'pt', ['deep_google', 'deep_mymemory'])
+        finally:
+            await pool.close()
+            await server.stop()
+        return stage_result, results, stage, health
+
+    stage_result, results, stage, health = asyncio.run(run())
+    assert stage_result == "iniciar"
+    assert sorted(result.translated_text for result in results) == ["jogo acabou", "jogo acabou"]
+    assert stage.get_stats()['in_flight'] == 0
+    assert health.get_stats()['providers']['deep_google']['calls'] == 2
+
+if __name__ == "__main__":
+    test_adapters_share_a_keep_alive_session()
+    test_calls_do_not_consume_threads()
+    test_stage_and_manager_use_async_adapters()
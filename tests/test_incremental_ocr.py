@@ -0,0 +1,102 @@
+# test_incremental_ocr.py
+
+import cv2
+import numpy as np
+
+from incremental_ocr import IncrementalOCRTracker, block_difference_mask
+
+class RecordingReader:
+    """
+    Leitor de teste que devolve uma detecção por linha de texto desenhada e registra as chamadas.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def readtext(self, image, **kwargs):
+        self.calls.append(image.shape[:2])
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        dilated = cv2.dilate((gray > 0).astype(np.uint8), np.ones((5, 25), np.uint8))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(dilated)
+        detections = []
+        for label in range(1, count):
+            x, y, w, h = stats[label][:4]
+            bbox = [[x, y], [x + w, y], [x + w, y + h], [x, y + h]]
+            detections.append((bbox, f"texto@{x},{y}", 0.9))
+        return detections
+
+def create_frame(dialogue="HELLO THERE"):
+    """
+    Cria um quadro com um placar fixo e uma caixa de diálogo.
+    """
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    cv2.putText(frame, "SCORE 100", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    cv2.putText(frame, dialogue, (20, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    return frame
+
+def test_block_difference_mask():
+    """
+    Testa se apenas os blocos com pixels alterados são marcados.
+    """
+    frame = create_frame()
+    assert not block_difference_mask(frame, frame.copy(), 16).any()
+
+    changed = frame.copy()
+    changed[100, 100] = (0, 0, 1)
+    mask = block_difference_mask(frame, changed, 16)
+    assert mask.sum() == 1 and mask[100 // 16, 100 // 16]
+
+def test_incremental_readtext_reuses_unchanged_regions():
+    """
+    Testa o reaproveitamento das detecções e o OCR apenas nos trechos alterados.
+    """
+    print("\n===== TESTE DO OCR INCREMENTAL =====\n")
+
+    tracker = IncrementalOCRTracker(enabled=True, block_size=16, tolerance=0, max_changed=0.5)
+    reader = RecordingReader()
+
+    first = tracker.readtext(reader, create_frame(), "cliente:jogo")
+    assert len(reader.calls) == 1 and len(first) == 2
+
+    # Quadro idêntico: nenhuma chamada ao leitor
+    assert tracker.readtext(reader, create_frame(), "cliente:jogo") == first
+    assert len(reader.calls) == 1
+
+    # Só o diálogo mudou: o placar é reaproveitado e o leitor recebe um trecho menor que o quadro
+    third = tracker.readtext(reader, create_frame("GOOD BYE"), "cliente:jogo")
+    assert len(reader.calls) == 2
+    assert reader.calls[1][0] < 240
+    score = [d for d in third if d[0][0][1] < 60]
+    dialogue = [d for d in third if d[0][0][1] > 150]
+    assert score == [d for d in first if d[0][0][1] < 60]
+    assert len(dialogue) == 1
+    # As coordenadas do trecho são convertidas para o quadro inteiro
+    full = RecordingReader().readtext(create_frame("GOOD BYE"))
+    assert dialogue[0][0] == [d for d in full if d[0][0][1] > 150][0][0]
+
+    stats = tracker.get_stats()
+    print(f"Estatísticas: {stats}")
+    assert stats['full_frames'] == 1
+    assert stats['unchanged_frames'] == 1
+    assert stats['incremental_frames'] == 1
+
+def test_without_session_runs_full_ocr():
+    """
+    Testa se requisições sem sessão sempre executam o OCR completo.
+    """
+    tracker = IncrementalOCRTracker(enabled=True)
+    reader = RecordingReader()
+    tracker.readtext(reader, create_frame(), None)
+    tracker.readtext(reader, create_frame(), None)
+    assert len(reader.calls) == 2
+
+    # Chaves diferentes (outro leitor ou outra rotação) não compartilham o quadro memorizado
+    tracker.readtext(reader, create_frame(), "cliente:jogo:en:0")
+    tracker.readtext(reader, create_frame(), "cliente:jogo:ja:0")
+    assert len(reader.calls) == 4
+    assert tracker.get_stats()['full_frames'] == 4
+
+if __name__ == "__main__":
+    test_block_difference_mask()
+    test_incremental_readtext_reuses_unchanged_regions()
+    test_without_session_runs_full_ocr()
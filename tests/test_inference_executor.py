@@ -0,0 +1,78 @@
+# test_inference_executor.py
+
+import asyncio
+import threading
+import time
+
+from inference_executor import OCRInferenceExecutor, InferenceQueueFullError
+
+def test_backpressure_when_queue_is_full():
+    """
+    Testa se o executor rejeita novos trabalhos quando workers + fila estão ocupados.
+    """
+    print("\n===== TESTE DE BACKPRESSURE DO EXECUTOR DE INFERÊNCIA =====\n")
+
+    executor = OCRInferenceExecutor(max_workers=1, queue_depth=1)
+    release = threading.Event()
+
+    def blocking_job(value):
+        release.wait(timeout=5)
+        return value
+
+    async def run():
+        first = asyncio.ensure_future(executor.submit(blocking_job, 1))
+        second = asyncio.ensure_future(executor.submit(blocking_job, 2))
+        await asyncio.sleep(0.05)
+
+        try:
+            await executor.submit(blocking_job, 3)
+            rejected = False
+        except InferenceQueueFullError as e:
+            print(f"Rejeitado como esperado: {e}")
+            rejected = True
+
+        release.set()
+        results = await asyncio.gather(first, second)
+        return rejected, results
+
+    rejected, results = asyncio.run(run())
+    stats = executor.get_stats()
+    print(f"Estatísticas: {stats}")
+    executor.shutdown()
+
+    assert rejected
+    assert results == [1, 2]
+    assert stats['rejected'] == 1
+    assert stats['completed'] == 2
+    assert stats['pending'] == 0
+
+def test_event_loop_stays_responsive():
+    """
+    Testa se o event loop continua processando outras tarefas durante a inferência.
+    """
+    print("\n===== TESTE DE RESPONSIVIDADE DO EVENT LOOP =====\n")
+
+    executor = OCRInferenceExecutor(max_workers=1, queue_depth=2)
+
+    def slow_inference():
+        time.sleep(0.3)
+        return "ok"
+
+    async def run():
+        ticks = 0
+        job = asyncio.ensure_future(executor.submit(slow_inference))
+        while not job.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return ticks, job.result()
+
+    ticks, result = asyncio.run(run())
+    executor.shutdown()
+    print(f"Ticks do event loop durante a inferência: {ticks}")
+
+    assert result == "ok"
+    assert ticks > 5
+
+if __name__ == "__main__":
+    test_backpressure_when_queue_is_full()
+    test_event_loop_stays_responsive()
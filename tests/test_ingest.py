@@ -0,0 +1,62 @@
+# test_ingest.py
+
+import base64
+import json
+
+import cv2
+import numpy as np
+
+from ingest import decode_image, parse_request_body, request_image_bytes, sniff_body_format
+
+def create_png():
+    """
+    Cria uma captura PNG pequena.
+    """
+    image = np.zeros((60, 80, 3), dtype=np.uint8)
+    cv2.rectangle(image, (10, 10), (50, 40), (0, 200, 0), -1)
+    _, encoded = cv2.imencode('.png', image)
+    return image, encoded.tobytes()
+
+def test_sniff_body_format():
+    """
+    Testa a identificação do formato pelos primeiros bytes.
+    """
+    _, png = create_png()
+    assert sniff_body_format(png) == 'binary'
+    assert sniff_body_format(b'\xff\xd8\xff\xe0' + b'\x00' * 10) == 'binary'
+    assert sniff_body_format(b'  \n{"image": ""}') == 'json'
+    assert sniff_body_format(b'\x00\x01\x02') == 'binary'
+
+def test_binary_body_is_passed_through_without_base64():
+    """
+    Testa se o corpo binário chega ao decodificador como o mesmo objeto, sem cópias.
+    """
+    print("\n===== TESTE DE INGESTÃO BINÁRIA =====\n")
+
+    image, png = create_png()
+    request = parse_request_body(png, 'ja', 'pt', client_id='127.0.0.1')
+    assert request.image == ''
+    assert request_image_bytes(request) is png
+    assert (request.lang_source, request.lang_target, request.client_id) == ('ja', 'pt', '127.0.0.1')
+    assert np.array_equal(decode_image(png), image)
+
+def test_json_body_and_invalid_json_fallback():
+    """
+    Testa o corpo JSON com imagem em base64 e o corpo que parece JSON mas é inválido.
+    """
+    image, png = create_png()
+    body = json.dumps({'image': base64.b64encode(png).decode('ascii'), 'lang_source': 'en', 'label': 'jogo'}).encode()
+    request = parse_request_body(body, 'ja', 'pt')
+    assert request.image_bytes is None
+    assert request.label == 'jogo' and request.lang_source == 'en'
+    assert request_image_bytes(request) == png
+
+    broken = b'{not json'
+    request = parse_request_body(broken, 'en', 'pt')
+    assert request.image_bytes is broken
+    assert decode_image(request_image_bytes(request)) is None
+
+if __name__ == "__main__":
+    test_sniff_body_format()
+    test_binary_body_is_passed_through_without_base64()
+    test_json_body_and_invalid_json_fallback()
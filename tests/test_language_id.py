@@ -0,0 +1,70 @@
+# test_language_id.py
+
+from language_id import LanguageIdentifier, normalize_language, strip_accents
+
+identifier = LanguageIdentifier({'en': ['GAME OVER', 'HIGH SCORE'], 'pt': ['Fim de Jogo', 'Recorde']})
+
+def test_detects_target_languages():
+    """
+    Testa a identificação dos idiomas latinos e das escritas de japonês, coreano e chinês.
+    """
+    print("\n===== TESTE DA IDENTIFICAÇÃO DE IDIOMA =====\n")
+
+    expected = {
+        "Pressione Iniciar para Continuar": 'pt',
+        "GAME OVER": 'en',
+        "Pulsa cualquier botón para jugar": 'es',
+        "Appuyez sur une touche": 'fr',
+        "Drücke eine Taste": 'de',
+        "Premi un tasto per iniziare": 'it',
+        "ゲームオーバー": 'ja',
+        "게임 오버": 'ko',
+        "游戏结束": 'zh',
+    }
+    for text, lang in expected.items():
+        print(f"'{text}' -> {identifier.detect(text)}")
+        assert identifier.detect(text) == lang
+        assert identifier.is_language(text, lang)
+
+    assert identifier.detect("12345 !!") is None
+    assert normalize_language('pt-BR') == 'pt' and normalize_language('zh_CN') == 'zh'
+    assert strip_accents('pontuação') == 'pontuacao'
+
+def test_english_words_are_not_portuguese():
+    """
+    Testa os falsos positivos da busca por substring antiga e os textos mistos.
+    """
+    # "NUMBER" contém "um" e "EXTRA"/"NORMAL" existem nos dois idiomas: não são português
+    for text in ["NUMBER OF PLAYERS", "EXTRA LIFE", "NORMAL MODE", "HIGH SCORE"]:
+        assert not identifier.is_language(text, 'pt'), text
+    # Palavras inglesas isoladas fora do vocabulário: os trigramas sozinhos não bastam
+    for text in ["SPECIAL", "OPTIONS", "CHARACTER", "INVENTORY"]:
+        assert not identifier.is_language(text, 'pt'), text
+    # Português com e sem acentos
+    assert identifier.is_language("Fim de Jogo", 'pt-br')
+    assert identifier.is_language("PONTUACAO RECORDE", 'pt')
+    # Texto misto empatado continua sendo traduzido
+    assert not identifier.is_language("PRESS START para Continuar", 'pt')
+    # Idioma não suportado nunca evita a tradução
+    assert not identifier.is_language("GAME OVER", 'ru')
+
+def test_results_are_memoized_per_normalized_text():
+    """
+    Testa o cache por texto normalizado (maiúsculas e espaços) e o limite do cache.
+    """
+    cached = LanguageIdentifier(cache_size=2)
+    assert cached.is_language("GAME  OVER", 'en')
+    assert cached.is_language("game over", 'en')
+    assert cached.get_stats()['cache_hits'] == 1
+
+    cached.detect("Fim de Jogo")
+    cached.detect("Drücke eine Taste")
+    stats = cached.get_stats()
+    print(f"Estatísticas: {stats}")
+    assert stats['cache_size'] == 2
+    assert stats['lookups'] == 4
+
+if __name__ == "__main__":
+    test_detects_target_languages()
+    test_english_words_are_not_portuguese()
+    test_results_are_memoized_per_normalized_text()
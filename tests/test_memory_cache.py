@@ -0,0 +1,88 @@
+# test_memory_cache.py
+
+import hashlib
+import threading
+import time
+
+from concurrent_config import ConcurrentTranslationConfig
+from database import DatabaseManager, LRUTTLCache
+
+def test_lru_eviction_and_ttl():
+    """
+    Testa o descarte da entrada menos usada e a expiração por TTL.
+    """
+    print("\n===== TESTE DO CACHE LRU/TTL =====\n")
+
+    cache = LRUTTLCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'a' passa a ser a mais recente
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    expiring = LRUTTLCache(max_size=10, ttl=0.05)
+    expiring.set('x', 'valor')
+    time.sleep(0.1)
+    assert expiring.get('x') is None
+
+    stats = cache.get_stats()
+    print(f"Estatísticas: {stats}")
+    assert stats['hits'] == 3 and stats['misses'] == 1 and stats['size'] == 2
+
+def test_memory_tier_serves_translation_and_buffers_usage():
+    """
+    Testa se um hit na memória não consulta o banco e acumula a atualização de uso.
+    """
+    manager = DatabaseManager()
+    manager.configure_memory_cache(ConcurrentTranslationConfig(enable_caching=True, cache_ttl=300))
+    manager._last_usage_flush = time.time()
+
+    text_hash = hashlib.sha256("GAME OVER".encode('utf-8')).hexdigest()
+    manager.translation_cache.set((text_hash, 'en', 'pt'), {
+        'id': 7, 'translated_text': 'FIM DE JOGO', 'used_count': 1
+    })
+
+    first = manager.get_translation("GAME OVER", 'en', 'pt')
+    second = manager.get_translation("GAME OVER", 'en', 'pt')
+    assert first['translated_text'] == 'FIM DE JOGO'
+    assert (first['used_count'], second['used_count']) == (1, 2)
+    assert manager.pool.get_stats()['checkouts'] == 0  # nenhuma ida ao banco
+
+    stats = manager.get_cache_stats()
+    print(f"Estatísticas por camada: {stats}")
+    assert stats['memory']['translations']['hits'] == 2
+    assert stats['pending_usage_updates'] == 1
+    assert manager._pending_usage['translations'] == {7: 2}
+
+    # Os registros devolvidos são cópias: alterá-los não muda o cache
+    first['translated_text'] = 'ALTERADO'
+    third = manager.get_translation("GAME OVER", 'en', 'pt')
+    assert third['translated_text'] == 'FIM DE JOGO' and second['used_count'] == 2
+
+    # Hits simultâneos de várias threads contam todos os usos
+    def hit():
+        for _ in range(200):
+            manager.get_translation("GAME OVER", 'en', 'pt')
+
+    threads = [threading.Thread(target=hit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert manager.get_translation("GAME OVER", 'en', 'pt')['used_count'] == 4 + 800
+
+def test_enable_caching_false_disables_memory_tier():
+    """
+    Testa se enable_caching=False da configuração desliga a camada em memória.
+    """
+    manager = DatabaseManager()
+    manager.configure_memory_cache(ConcurrentTranslationConfig(enable_caching=False))
+    manager.translation_cache.set(('h', 'en', 'pt'), {'id': 1})
+    assert manager.translation_cache.get(('h', 'en', 'pt')) is None
+    assert not manager.get_cache_stats()['memory']['translations']['enabled']
+
+if __name__ == "__main__":
+    test_lru_eviction_and_ttl()
+    test_memory_tier_serves_translation_and_buffers_usage()
+    test_enable_caching_false_disables_memory_tier()
@@ -0,0 +1,116 @@
+# test_micro_batcher.py
+
+import threading
+
+from micro_batcher import OCRMicroBatcher
+
+class FakeReader:
+    """
+    Leitor falso: o texto de cada imagem é a própria imagem (uma string).
+    """
+    def __init__(self):
+        self.calls = []
+
+    def readtext(self, image, **kwargs):
+        self.calls.append(image)
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], image, 0.9)]
+
+def create_batcher(max_batch_size=4, max_wait_ms=200, fail=False):
+    """
+    Cria um agendador cujo lote registra as imagens recebidas em cada chamada.
+    """
+    batches = []
+
+    def run_batch(reader, images, kwargs_list):
+        batches.append(list(images))
+        if fail:
+            raise RuntimeError("falha no lote")
+        return [reader.readtext(image) for image in images]
+
+    return OCRMicroBatcher(enabled=True, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                           run_batch=run_batch, workers=4), batches
+
+def run_concurrently(batcher, reader, images):
+    """
+    Executa o readtext de cada imagem em uma thread (como requisições simultâneas).
+    """
+    results = {}
+    errors = {}
+
+    def worker(image):
+        try:
+            results[image] = batcher.reader(reader, 'en').readtext(image, detail=1)
+        except Exception as e:
+            errors[image] = e
+
+    threads = [threading.Thread(target=worker, args=(image,)) for image in images]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results, errors
+
+def test_concurrent_requests_share_batches():
+    """
+    Testa se requisições simultâneas formam lotes e recebem as próprias detecções.
+    """
+    print("\n===== TESTE DOS MICRO-LOTES DE OCR =====\n")
+
+    batcher, batches = create_batcher(max_batch_size=4)
+    images = [f"QUADRO {i}" for i in range(6)]
+    results, errors = run_concurrently(batcher, FakeReader(), images)
+
+    assert not errors
+    assert all(results[image][0][1] == image for image in images)
+    # Seis quadros com lotes de até quatro: dois lotes
+    assert sorted(len(batch) for batch in batches) == [2, 4]
+
+    stats = batcher.get_stats()
+    print(f"Estatísticas: {stats}")
+    assert stats['batches'] == 2 and stats['images'] == 6
+    assert stats['fill_rate'] == 0.75
+    assert stats['languages']['en'] == {'batches': 2, 'images': 6, 'queued': 0}
+
+def test_single_request_waits_at_most_max_wait():
+    """
+    Testa se uma requisição sozinha é processada depois da espera máxima, em lote unitário.
+    """
+    batcher, batches = create_batcher(max_wait_ms=10)
+    reader = FakeReader()
+    assert batcher.reader(reader, 'Default').readtext('SOZINHO')[0][1] == 'SOZINHO'
+    assert batches == [['SOZINHO']]
+    assert batcher.get_stats()['max_queue_delay_ms'] < 1000
+
+    # Parâmetros fora do lote e agendador desligado chamam o readtext diretamente
+    assert batcher.reader(reader, 'en').readtext('LARGO', width_ths=0.5)[0][1] == 'LARGO'
+    assert batcher.get_stats()['bypassed'] == 1
+    assert OCRMicroBatcher(enabled=False).reader(reader, 'en') is reader
+    # Com uma única thread de inferência nenhum lote se forma: o agendador se desliga
+    single_worker = OCRMicroBatcher(enabled=True, workers=1)
+    assert not single_worker.enabled and single_worker.reader(reader, 'en') is reader
+
+def test_batch_failure_reaches_every_request():
+    """
+    Testa se a falha de um lote é propagada para todas as requisições dele.
+    """
+    batcher, _ = create_batcher(max_batch_size=3, fail=True)
+    results, errors = run_concurrently(batcher, FakeReader(), ['A', 'B', 'C'])
+    assert not results
+    assert sorted(errors) == ['A', 'B', 'C']
+    assert all(isinstance(error, RuntimeError) for error in errors.values())
+    assert batcher.get_stats()['failed_batches'] >= 1
+
+    # Lote padrão (batched_ocr): o erro do readtext também chega à requisição
+    class BrokenReader(FakeReader):
+        def readtext(self, image, **kwargs):
+            raise RuntimeError("leitor quebrado")
+
+    batcher = OCRMicroBatcher(enabled=True, max_batch_size=1, max_wait_ms=0, workers=2)
+    results, errors = run_concurrently(batcher, BrokenReader(), ['D'])
+    assert not results and isinstance(errors['D'], RuntimeError)
+    assert batcher.get_stats()['failed_batches'] == 1
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_batches()
+    test_single_request_waits_at_most_max_wait()
+    test_batch_failure_reaches_every_request()
@@ -0,0 +1,108 @@
+# test_model_registry.py
+
+from model_registry import ModelRegistry, reader_key
+
+MB = 1024 * 1024
+
+class FakeNetwork:
+    """
+    Rede falsa com tamanho conhecido.
+    """
+    def __init__(self, size_mb):
+        self.size = size_mb * MB
+
+class FakeReader:
+    """
+    Leitor falso (detector de 80 MB, reconhecedor de 20 MB) que registra as chamadas de readtext.
+    """
+    def __init__(self, languages, gpu, detector=True):
+        self.languages = languages
+        self.gpu = gpu
+        self.calls = 0
+        self.recognizer = FakeNetwork(20)
+        if detector:
+            self.detector = FakeNetwork(80)
+
+    def readtext(self, image, **kwargs):
+        self.calls += 1
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], 'WARM UP 123', 0.9)]
+
+def create_registry(memory_budget_mb=0, gpu=False, fail_on_gpu=False):
+    """
+    Cria um registro com leitores falsos que compartilham o detector.
+    """
+    loads = []
+
+    def loader(languages, use_gpu, detector=True):
+        loads.append((tuple(languages), use_gpu))
+        if use_gpu and fail_on_gpu:
+            raise RuntimeError("CUDA não disponível")
+        return FakeReader(languages, use_gpu, detector)
+
+    registry = ModelRegistry(loader=loader, memory_budget_mb=memory_budget_mb, gpu=gpu,
+                             memory_estimator=lambda network: network.size if network else 0,
+                             share_detector=True)
+    return registry, loads
+
+def test_preload_and_warm_up():
+    """
+    Testa o pré-carregamento com aquecimento e o reaproveitamento do leitor carregado.
+    """
+    print("\n===== TESTE DO REGISTRO DE MODELOS =====\n")
+
+    registry, loads = create_registry()
+    assert registry.preload(['en', 'ja']) == {'en': True, 'ja': True}
+    assert reader_key('Default') == 'en' and reader_key(['ja', 'en']) == 'en,ja'
+
+    reader = registry.get_reader('Default')
+    assert reader.calls == 1  # inferência de aquecimento
+    assert len(loads) == 2
+    # O leitor japonês carregou só o reconhecedor e usa o detector do leitor inglês
+    assert registry.get_reader('ja').detector is reader.detector
+
+    stats = registry.get_stats()
+    print(f"Estatísticas: {stats}")
+    assert stats['readers']['en']['warmup_time_s'] is not None
+    assert stats['readers']['ja']['memory_mb'] == 20
+    assert stats['readers']['en']['refs'] == 0
+    assert stats['loads'] == 2 and stats['device'] == 'cpu'
+    assert stats['shared_detector_mb'] == 80 and stats['memory_mb'] == 120
+    assert stats['memory_saved_mb'] == 80
+
+def test_gpu_failure_falls_back_to_cpu():
+    """
+    Testa se um leitor que falha na GPU é recriado na CPU.
+    """
+    registry, loads = create_registry(gpu=True, fail_on_gpu=True)
+    reader = registry.get_reader('ko')
+    assert reader.gpu is False
+    assert loads == [(('ko',), True), (('ko',), False)]
+    stats = registry.get_stats()
+    assert stats['cpu_fallbacks'] == 1
+    assert stats['readers']['ko']['device'] == 'cpu'
+
+def test_lru_eviction_respects_references():
+    """
+    Testa se o orçamento de memória descarta o leitor menos usado que não está em uso.
+    """
+    registry, loads = create_registry(memory_budget_mb=130)
+    registry.get_reader('en')
+    registry.get_reader('ja')
+    with registry.use('en'):
+        # 'ja' é o menos usado recentemente e não tem referências
+        registry.get_reader('ko')
+        assert sorted(registry.readers) == ['en', 'ko']
+
+        # Com 'en' em uso, carregar 'zh' só pode descartar 'ko'
+        registry.get_reader('zh')
+        assert sorted(registry.readers) == ['en', 'zh']
+
+    assert registry.get_stats()['evictions'] == 2
+    # Um leitor descartado é carregado de novo quando volta a ser pedido
+    registry.get_reader('ja')
+    assert loads.count((('ja',), False)) == 2
+
+if __name__ == "__main__":
+    test_preload_and_warm_up()
+    test_gpu_failure_falls_back_to_cpu()
+    test_lru_eviction_respects_references()
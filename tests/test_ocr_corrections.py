@@ -0,0 +1,90 @@
+# test_ocr_corrections.py
+
+import re
+
+from bk_tree import BKTree, edit_distance
+from ocr_corrections import OCRCorrectionEngine
+
+CORRECTIONS = {
+    'CRED IT': 'CREDIT',
+    'CRED ITS': 'CREDITS',
+    'PIJSH': 'PUSH',
+    'STAKT': 'START',
+    'GANE': 'GAME',
+    'PUSHGPACE KEY': 'PUSH SPACE KEY',
+    'PUSh SPACE': 'PUSH SPACE',
+}
+
+def legacy_correct(text, corrections):
+    """
+    Correção da versão antiga (referência para comparação).
+    """
+    if not text:
+        return text
+    if re.match(r'^\s*(?:KEY\s+)?PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*(?:PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*)*$', text, re.IGNORECASE):
+        return 'PUSH SPACE KEY'
+    if re.search(r'PUSH\s*SPACE\s*KEY', text, re.IGNORECASE) or \
+       re.search(r'PUSH[G]?[E]?PAC[B]?KEY', text, re.IGNORECASE) or \
+       re.search(r'KEY\s+PUSH\s+SPACE', text, re.IGNORECASE):
+        text = re.sub(r'PUSH[G]?[E]?PAC[B]?KEY', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
+        text = re.sub(r'PUSH\s+SPACE\s+KEY', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
+        text = re.sub(r'KEY\s+PUSH\s+SPACE', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
+    for error, correction in corrections.items():
+        text = re.sub(r'\b' + re.escape(error) + r'\b', correction, text, flags=re.IGNORECASE)
+    return text
+
+def test_matches_legacy_corrections():
+    """
+    Testa se as correções compiladas produzem o mesmo texto que a versão antiga.
+    """
+    print("\n===== TESTE DO MOTOR DE CORREÇÕES DE OCR =====\n")
+
+    engine = OCRCorrectionEngine(CORRECTIONS, fuzzy_enabled=False)
+    texts = ["PIJSH STAKT", "CRED ITS 2", "cred it", "GANE OVER", "PUSHGPACBKEY",
+             "KEY PUSH SPACE", "1P PUSHGPACE KEY", "push space now", "PUSh SPACE KEY TO GANE", ""]
+    for text in texts:
+        print(f"{text!r} -> {engine.correct(text)!r}")
+        assert engine.correct(text) == legacy_correct(text, CORRECTIONS)
+
+def test_fuzzy_correction_uses_vocabulary():
+    """
+    Testa a correção aproximada das palavras fora do vocabulário.
+    """
+    engine = OCRCorrectionEngine(CORRECTIONS, vocabulary=['PLAYER SELECT', 'CONTINUE', 'LEVEL', 'LEVER'],
+                                 fuzzy_enabled=True, max_distance=1, min_length=5)
+    # Uma letra trocada: corrige; palavra conhecida, curta ou em minúsculas: mantém
+    assert engine.correct("PLAYFR SELECT") == "PLAYER SELECT"
+    assert engine.correct("CONTINUF? PLAYER") == "CONTINUE? PLAYER"
+    assert engine.correct("GAMF") == "GAMF"
+    assert engine.correct("playfr") == "playfr"
+    # Duas candidatas na mesma distância (LEVEL e LEVER): ambígua, mantém
+    assert engine.correct("LEVEX") == "LEVEX"
+    # Distância maior que a máxima: mantém
+    assert engine.correct("PLAXFR") == "PLAXFR"
+
+    engine.correct("PLAYFR SELECT")
+    stats = engine.get_stats()
+    print(f"Estatísticas: {stats}")
+    assert stats['fuzzy_corrections'] == 3
+    assert stats['fuzzy_cache_hits'] >= 1
+
+def test_bk_tree_with_edit_distance():
+    """
+    Testa a distância de edição e a busca da árvore BK contra a busca exaustiva.
+    """
+    assert edit_distance("KITTEN", "SITTING") == 3
+    assert edit_distance("", "ABC") == 3
+    assert edit_distance("GAME", "GAME") == 0
+
+    words = ["GAME", "GAMES", "NAME", "FRAME", "START", "STARS", "SCORE", "STORE", "LEVEL", "LEVER"]
+    tree = BKTree(edit_distance)
+    for word in words:
+        tree.add(word, word)
+    for query in ["GAMF", "STAR", "SCOPE", "LEVEX", "XYZ"]:
+        found = sorted(key for _, key, _ in tree.search(query, 1))
+        assert found == sorted(word for word in words if edit_distance(query, word) <= 1)
+
+if __name__ == "__main__":
+    test_matches_legacy_corrections()
+    test_fuzzy_correction_uses_vocabulary()
+    test_bk_tree_with_edit_distance()
@@ -0,0 +1,84 @@
+# test_orientation.py
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from orientation import OrientationDetector, projection_axis_scores, rotate_image, detector_axis_scores
+
+def create_text_image(width=400, height=300):
+    """
+    Cria uma imagem sintética com várias linhas de texto horizontais.
+    """
+    image = Image.new('RGB', (width, height), color='black')
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+    for i, line in enumerate(["GAME OVER", "PRESS START BUTTON", "TO CONTINUE PLAYING", "HIGH SCORE 12345"]):
+        draw.text((20, 30 + i * 60), line * 2, fill=(255, 255, 255), font=font)
+    return np.array(image)[:, :, ::-1].copy()
+
+def test_projection_detects_text_axis():
+    """
+    Testa se o perfil de projeção identifica o eixo do texto.
+    """
+    print("\n===== TESTE DO PERFIL DE PROJEÇÃO =====\n")
+
+    upright = create_text_image()
+    row_score, col_score = projection_axis_scores(upright)
+    print(f"Vertical: linhas {row_score:.2f}, colunas {col_score:.2f}")
+    assert row_score > col_score
+
+    rotated = rotate_image(upright, 90)
+    row_score, col_score = projection_axis_scores(rotated)
+    print(f"Rotacionada: linhas {row_score:.2f}, colunas {col_score:.2f}")
+    assert col_score > row_score
+
+    detector = OrientationDetector(mode='projection', remember=False)
+    assert detector.detect(upright) == 0
+    assert detector.detect(rotated) in (90, 270)
+
+def test_detector_axis_scores():
+    """
+    Testa a classificação das caixas do detector em horizontais e verticais.
+    """
+    horizontal_area, vertical_area = detector_axis_scores([[0, 100, 0, 20], [0, 10, 0, 50]])
+    assert horizontal_area == 2000
+    assert vertical_area == 500
+
+def test_off_mode_and_session_memory():
+    """
+    Testa o modo 'off' e a reutilização da orientação memorizada por sessão.
+    """
+    print("\n===== TESTE DA MEMÓRIA DE ORIENTAÇÃO =====\n")
+
+    upright = create_text_image()
+    assert OrientationDetector(mode='off').detect(rotate_image(upright, 90)) == 0
+
+    detector = OrientationDetector(mode='projection', remember=True, memory_ttl=60)
+    assert detector.detect(upright, session_key="127.0.0.1:jogo") == 0
+    # O quadro seguinte da mesma sessão reaproveita a orientação sem sondar de novo
+    assert detector.detect(rotate_image(upright, 90), session_key="127.0.0.1:jogo") == 0
+    stats = detector.get_stats()
+    print(f"Estatísticas: {stats}")
+    assert stats['probes'] == 1
+    assert stats['memory_hits'] == 1
+
+    detector.forget("127.0.0.1:jogo")
+    assert detector.detect(rotate_image(upright, 90), session_key="127.0.0.1:jogo") in (90, 270)
+
+    # A memória é um LRU limitado: a sessão menos usada é descartada
+    detector = OrientationDetector(mode='projection', remember=True, memory_ttl=60, max_sessions=2)
+    for client in ("a:jogo", "b:jogo", "a:jogo", "c:jogo"):
+        detector.detect(upright, session_key=client)
+    assert list(detector._memory) == ["a:jogo", "c:jogo"]
+    assert detector.get_stats()['sessions'] == 2
+
+    # Entradas vencidas são removidas ao serem consultadas
+    detector = OrientationDetector(mode='projection', remember=True, memory_ttl=0)
+    detector.detect(upright, session_key="d:jogo")
+    detector.detect(upright, session_key="d:jogo")
+    assert detector.get_stats()['probes'] == 2
+
+if __name__ == "__main__":
+    test_projection_detects_text_axis()
+    test_detector_axis_scores()
+    test_off_mode_and_session_memory()
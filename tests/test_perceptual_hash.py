@@ -0,0 +1,124 @@
+# test_perceptual_hash.py
+
+import random
+
+import cv2
+import numpy as np
+
+from perceptual_hash import (BKTree, PerceptualOCRCache, compute_dhash, compute_phash,
+                             hamming_distance, regions_match)
+
+def create_game_screen(text="PRESS START"):
+    """
+    Cria uma captura sintética com texto e um bloco colorido.
+    """
+    img = np.zeros((240, 320, 3), dtype=np.uint8)
+    cv2.rectangle(img, (10, 10), (120, 60), (0, 0, 200), -1)
+    cv2.putText(img, text, (40, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return img
+
+class InMemoryOCRStore:
+    """
+    Armazenamento em memória com a mesma interface usada pelo cache perceptual.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.used = []
+
+    def save(self, image_hash, image, detections, perceptual_hash):
+        _, encoded = cv2.imencode('.png', image)
+        self.rows[image_hash] = {
+            'id': len(self.rows) + 1,
+            'image_hash': image_hash,
+            'perceptual_hash': perceptual_hash,
+            'text_results': detections,
+            'original_image': encoded.tobytes(),
+            'image_metadata': {'width': image.shape[1], 'height': image.shape[0]}
+        }
+
+    def get_perceptual_hashes(self, source_lang):
+        return [{'image_hash': r['image_hash'], 'perceptual_hash': r['perceptual_hash']} for r in self.rows.values()]
+
+    def get_ocr_result(self, image_hash, source_lang, count_usage=True):
+        return self.rows.get(image_hash)
+
+    def mark_ocr_result_used(self, result_id):
+        self.used.append(result_id)
+
+def test_hash_survives_frame_noise():
+    """
+    Testa se recodificação, ruído leve e um cursor piscando mantêm o hash próximo.
+    """
+    print("\n===== TESTE DE ROBUSTEZ DO HASH PERCEPTUAL =====\n")
+
+    screen = create_game_screen()
+    _, jpeg = cv2.imencode('.jpg', screen, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    reencoded = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+    with_cursor = screen.copy()
+    cv2.rectangle(with_cursor, (300, 220), (306, 230), (255, 255, 255), -1)
+    shimmer = screen.copy()
+    shimmer[5, 5] = (17, 200, 3)
+
+    for name, variant in (('recodificada', reencoded), ('cursor', with_cursor), ('pixel', shimmer)):
+        d_distance = hamming_distance(compute_dhash(screen), compute_dhash(variant))
+        p_distance = hamming_distance(compute_phash(screen), compute_phash(variant))
+        print(f"{name}: dHash {d_distance} bits, pHash {p_distance} bits")
+        assert d_distance <= 6
+        assert p_distance <= 6
+
+    other = create_game_screen("GAME OVER")
+    other[:, :160] = 255 - other[:, :160]
+    assert hamming_distance(compute_dhash(screen), compute_dhash(other)) > 6
+
+def test_bktree_matches_bruteforce():
+    """
+    Testa se a busca na BK-tree retorna exatamente os mesmos vizinhos da busca linear.
+    """
+    rng = random.Random(42)
+    hashes = [rng.getrandbits(64) for _ in range(500)]
+    tree = BKTree(hamming_distance)
+    for i, value in enumerate(hashes):
+        tree.add(value, i)
+
+    for _ in range(20):
+        query = hashes[rng.randrange(len(hashes))] ^ (1 << rng.randrange(64))
+        expected = sorted(i for i, h in enumerate(hashes) if hamming_distance(query, h) <= 12)
+        found = sorted(item for _, _, item in tree.search(query, 12))
+        assert found == expected
+
+def test_cache_reuses_near_duplicate_and_verifies_borderline():
+    """
+    Testa a reutilização de capturas quase idênticas e a verificação das regiões de texto.
+    """
+    print("\n===== TESTE DO CACHE PERCEPTUAL DE OCR =====\n")
+
+    store = InMemoryOCRStore()
+    cache = PerceptualOCRCache(store, threshold=6, borderline=0, region_threshold=4, enabled=True)
+    screen = create_game_screen()
+    detections = [{'text': 'PRESS START', 'confidence': 0.9, 'bbox': [[35, 155], [200, 155], [200, 190], [35, 190]]}]
+    screen_hash = compute_dhash(screen)
+    store.save('abc123', screen, detections, screen_hash)
+
+    # Cursor piscando fora das regiões de texto: reutiliza após a verificação
+    with_cursor = screen.copy()
+    cv2.rectangle(with_cursor, (300, 220), (306, 230), (255, 255, 255), -1)
+    result = cache.lookup(with_cursor, compute_dhash(with_cursor), 'en')
+    assert result is not None and result['text_results'] == detections
+    assert store.used == [1]
+
+    # Texto diferente na mesma região: a verificação impede a reutilização
+    changed = create_game_screen("PRESS SELECT")
+    changed_hash = screen_hash ^ 0b11  # força uma distância limítrofe
+    assert not regions_match(screen, changed, detections, 4)
+    assert cache.lookup(changed, changed_hash, 'en') is None
+
+    stats = cache.get_stats()
+    print(f"Estatísticas: {stats}")
+    assert stats['hits'] == 1
+    assert stats['rejected_by_verification'] == 1
+
+if __name__ == "__main__":
+    test_hash_survives_frame_noise()
+    test_bktree_matches_bruteforce()
+    test_cache_reuses_near_duplicate_and_verifies_borderline()
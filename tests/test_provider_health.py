@@ -0,0 +1,110 @@
+# test_provider_health.py
+
+import asyncio
+
+from provider_health import CLOSED, HALF_OPEN, OPEN, ProviderHealthRegistry, ProviderUnavailableError
+from translation_stage import ProviderRateLimiter, TranslationStage
+
+class FakeClock:
+    """Relógio manual para simular a passagem do tempo de espera dos circuitos."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_circuit_opens_and_recovers_with_half_open_probe():
+    """
+    Testa se o circuito abre após falhas seguidas, se só uma chamada de teste passa depois do
+    tempo de espera e se o resultado dela fecha ou reabre o circuito.
+    """
+    print("\n===== TESTE DA SAÚDE DOS TRADUTORES =====\n")
+
+    clock = FakeClock()
+    health = ProviderHealthRegistry(failure_threshold=3, cooldown=10, max_cooldown=30, clock=clock)
+    for _ in range(2):
+        health.record_failure('bing', 1.0)
+    assert health.state('bing') == CLOSED and health.allow('bing')
+    health.record_failure('bing', 8.0, timeout=True)
+    assert health.state('bing') == OPEN
+    assert not health.allow('bing')
+
+    # Passado o tempo de espera, só uma chamada de teste por vez
+    clock.now = 10
+    assert health.allow('bing')
+    assert health.state('bing') == HALF_OPEN
+    assert not health.allow('bing')
+
+    # Chamada de teste que falha reabre o circuito com o dobro do tempo de espera
+    health.record_failure('bing', 1.0)
+    assert health.state('bing') == OPEN
+    clock.now = 25
+    assert not health.allow('bing')
+    clock.now = 30
+    assert health.allow('bing')
+    health.record_success('bing', 0.2)
+    assert health.state('bing') == CLOSED
+
+    stats = health.get_stats()['providers']['bing']
+    print(f"Estatísticas: {stats}")
+    assert stats['times_opened'] == 2
+    assert stats['timeouts'] == 1
+    assert stats['rejected_calls'] == 3
+
+def test_order_follows_live_scores():
+    """
+    Testa se a ordem segue o custo esperado (latência / taxa de sucesso), mantendo a ordem
+    configurada nos empates e deixando de fora os tradutores com circuito aberto.
+    """
+    clock = FakeClock()
+    health = ProviderHealthRegistry(failure_threshold=2, prior_latency=1.0, clock=clock)
+    providers = ['deep_google', 'google', 'bing', 'deepl', 'baidu']
+    assert health.order(providers) == providers
+
+    health.record_success('bing', 0.2)
+    health.record_success('google', 0.5)
+    health.record_failure('google', 0.5)
+    health.record_success('deep_google', 3.0)
+    health.record_failure('deepl', 8.0)
+    health.record_failure('deepl', 8.0)
+    # google: 0.5 / 0.8 = 0.625; sem histórico: 1.0; deep_google: 3.0; deepl: circuito aberto
+    assert health.order(providers) == ['bing', 'google', 'baidu', 'deep_google']
+
+def test_translation_stage_skips_open_circuits():
+    """
+    Testa se a etapa de tradução registra o resultado das chamadas e deixa de chamar um
+    provedor com o circuito aberto.
+    """
+    health = ProviderHealthRegistry(failure_threshold=2, cooldown=60)
+    stage = TranslationStage(max_concurrent=2, rate_limiter=ProviderRateLimiter(), health=health)
+    calls = []
+
+    def broken_provider(text):
+        calls.append(text)
+        raise TimeoutError("sem resposta")
+
+    async def call(text):
+        try:
+            return await stage.call_provider('broken', broken_provider, text)
+        except ProviderUnavailableError:
+            return 'rejeitada'
+        except TimeoutError:
+            return 'falhou'
+
+    async def run():
+        return [await call(text) for text in ["A", "B", "C", "D"]]
+
+    assert asyncio.run(run()) == ['falhou', 'falhou', 'rejeitada', 'rejeitada']
+    assert calls == ["A", "B"]
+    assert health.get_stats()['providers']['broken']['timeouts'] == 2
+    assert stage.get_stats()['rejected_calls'] == 2
+
+    # Retorno vazio também conta como falha
+    asyncio.run(stage.call_provider('empty', lambda text: '', "A"))
+    assert health.get_stats()['providers']['empty']['errors'] == 1
+
+if __name__ == "__main__":
+    test_circuit_opens_and_recovers_with_half_open_probe()
+    test_order_follows_live_scores()
+    test_translation_stage_skips_open_circuits()
@@ -0,0 +1,105 @@
+# test_translation_stage.py
+
+import asyncio
+import threading
+import time
+
+from translation_stage import ProviderRateLimiter, TranslationStage, parse_rate_limits
+
+def test_frame_is_translated_concurrently_in_order():
+    """
+    Testa se os textos do quadro são traduzidos em paralelo, sem repetição e na ordem original.
+    """
+    print("\n===== TESTE DA ETAPA DE TRADUÇÃO POR QUADRO =====\n")
+
+    stage = TranslationStage(max_concurrent=4, rate_limiter=ProviderRateLimiter())
+    calls = []
+
+    def slow_provider(text):
+        time.sleep(0.2)
+        return text.lower()
+
+    async def fake_translate(text, source_lang, target_lang):
+        calls.append(text)
+        return await stage.call_provider('fake', slow_provider, text)
+
+    texts = ["START", "OPTIONS", "START", "EXIT", "CONTINUE"]
+    start = time.time()
+    result = asyncio.run(stage.translate_frame(texts, 'en', 'pt', translate_func=fake_translate))
+    elapsed = time.time() - start
+
+    print(f"Traduções: {result} em {elapsed:.2f}s")
+    assert result == ["start", "options", "start", "exit", "continue"]
+    assert sorted(calls) == ["CONTINUE", "EXIT", "OPTIONS", "START"]
+    # Quatro chamadas de 0,2s em paralelo levam bem menos que 0,8s
+    assert elapsed < 0.6
+    assert stage.get_stats()['unique_texts'] == 4
+
+def test_global_limit_is_shared_between_requests():
+    """
+    Testa se o limite global de chamadas vale para quadros de requisições simultâneas.
+    """
+    stage = TranslationStage(max_concurrent=2, rate_limiter=ProviderRateLimiter())
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def provider(text):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return text
+
+    async def fake_translate(text, source_lang, target_lang):
+        return await stage.call_provider('fake', provider, text)
+
+    async def run():
+        return await asyncio.gather(*(
+            stage.translate_frame([f"A{n}", f"B{n}", f"C{n}"], 'en', 'pt', translate_func=fake_translate)
+            for n in range(3)
+        ))
+
+    results = asyncio.run(run())
+    assert results[1] == ["A1", "B1", "C1"]
+    assert active[1] == 2
+
+    # Corrotinas (adaptadores HTTP assíncronos) também respeitam o limite global
+    active[:] = [0, 0]
+
+    async def async_provider(text):
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        await asyncio.sleep(0.05)
+        active[0] -= 1
+        return text
+
+    async def run_async():
+        return await asyncio.gather(*(stage.call_provider('fake', async_provider, f"T{n}") for n in range(10)))
+
+    results = asyncio.run(run_async())
+    print(f"Chamadas simultâneas (corrotinas): {active[1]}")
+    assert results == [f"T{n}" for n in range(10)]
+    assert active[1] == stage.max_concurrent
+    assert stage.get_stats()['in_flight'] == 0
+
+def test_provider_rate_limit_spaces_calls():
+    """
+    Testa o espaçamento das chamadas de um provedor limitado.
+    """
+    assert parse_rate_limits("deep_google:10, google:2,invalido") == {'deep_google': 10.0, 'google': 2.0}
+
+    limiter = ProviderRateLimiter({'google': 10})
+    delays = [limiter.reserve('google') for _ in range(3)]
+    assert delays[0] == 0
+    assert 0.09 < delays[1] <= 0.1
+    assert 0.19 < delays[2] <= 0.2
+    # Provedores sem limite não esperam
+    assert limiter.reserve('deep_google') == 0
+    assert limiter.stats['delayed_calls'] == 2
+
+if __name__ == "__main__":
+    test_frame_is_translated_concurrently_in_order()
+    test_global_limit_is_shared_between_requests()
+    test_provider_rate_limit_spaces_calls()
@@ -0,0 +1,105 @@
+# test_variant_scheduler.py
+
+import numpy as np
+
+from variant_scheduler import VariantScheduler, detection_yield, palette_key
+
+NAMES = ['original', 'gray', 'clahe', 'otsu_thresh', 'deskewed']
+
+def detection(text, confidence=0.9):
+    """
+    Cria uma detecção no formato do EasyOCR.
+    """
+    return ([[0, 0], [10, 0], [10, 10], [0, 10]], text, confidence)
+
+def create_readtext(results, calls):
+    """
+    Cria uma função readtext falsa com o resultado de cada variante.
+    """
+    def readtext(name, image):
+        calls.append(name)
+        return results.get(name, [])
+    return readtext
+
+def test_plan_orders_by_yield_and_session_best():
+    """
+    Testa se as variantes são ordenadas pelo rendimento do perfil e pela melhor da sessão.
+    """
+    print("\n===== TESTE DO ESCALONADOR DE VARIANTES =====\n")
+
+    scheduler = VariantScheduler(top_k=3, explore_rate=0.0)
+    scheduler.record('paleta', 'clahe', [detection('HP 100'), detection('MP 20')], 0.1)
+    scheduler.record('paleta', 'gray', [detection('HP')], 0.1)
+    assert detection_yield([detection('HP', 0.5), detection('x', 0.1)]) == 1.0
+
+    ordered, limit = scheduler.plan(NAMES, 'paleta')
+    assert ordered[:2] == ['clahe', 'gray'] and limit == 3
+    # Variantes sem observações mantêm a ordem padrão
+    assert ordered[2:] == ['original', 'otsu_thresh', 'deskewed']
+
+    scheduler.finish('jogo', {'deskewed': 5.0, 'clahe': 1.0}, skipped=0, early_stop=False)
+    ordered, _ = scheduler.plan(NAMES, 'paleta', session_key='jogo')
+    assert ordered[0] == 'deskewed'
+
+    # O perfil da sessão sai junto com a sessão menos recente
+    scheduler = VariantScheduler(max_sessions=2)
+    for session in ('a', 'b', 'c'):
+        ran = scheduler.run({'gray': None}, lambda name, image: [detection('HP')],
+                            VariantScheduler.profile_for(None, session), session_key=session)
+        assert ran
+    stats = scheduler.get_stats()
+    assert stats['sessions'] == 2 and stats['profiles'] == 2
+    assert scheduler.get_profile('sessao:a') == {}
+
+def test_run_stops_when_detections_stabilize():
+    """
+    Testa a parada antecipada e o limite de top-k variantes por quadro.
+    """
+    variants = {name: None for name in NAMES}
+    results = {
+        'original': [detection('START')],
+        'gray': [detection('START'), detection('OPTIONS')],
+        'clahe': [detection('start')],
+        'otsu_thresh': [detection('NEW GAME')],
+    }
+
+    calls = []
+    scheduler = VariantScheduler(top_k=4, explore_rate=0.0)
+    ran = scheduler.run(variants, create_readtext(results, calls), 'paleta', session_key='jogo')
+    # 'clahe' não acrescentou nenhum texto: a execução para antes de 'otsu_thresh'
+    assert calls == ['original', 'gray', 'clahe']
+    assert [name for name, _ in ran] == calls
+    stats = scheduler.get_stats()
+    assert stats['early_stops'] == 1 and stats['variants_skipped'] == 2
+    # A variante de maior rendimento passa a abrir os próximos quadros da sessão
+    assert scheduler.plan(NAMES, 'paleta', 'jogo')[0][0] == 'gray'
+
+    calls = []
+    scheduler = VariantScheduler(top_k=2, explore_rate=0.0)
+    scheduler.run(variants, create_readtext(results, calls), 'outra')
+    assert calls == ['original', 'gray']
+
+    calls = []
+    scheduler = VariantScheduler(enabled=False)
+    scheduler.run(variants, create_readtext(results, calls), 'paleta')
+    assert calls == NAMES
+
+def test_palette_key_groups_frames_by_palette():
+    """
+    Testa se quadros com a mesma paleta compartilham o perfil.
+    """
+    blue = np.zeros((120, 160, 3), dtype=np.uint8)
+    blue[:, :] = (200, 40, 40)
+    blue_with_text = blue.copy()
+    blue_with_text[50:60, 20:140] = (255, 255, 255)
+    green = np.zeros((120, 160, 3), dtype=np.uint8)
+    green[:, :] = (40, 200, 40)
+
+    assert palette_key(blue) == palette_key(blue_with_text)
+    assert palette_key(blue) != palette_key(green)
+    assert VariantScheduler.profile_for(blue, 'jogo') == 'sessao:jogo'
+
+if __name__ == "__main__":
+    test_plan_orders_by_yield_and_session_best()
+    test_run_stops_when_detections_stabilize()
+    test_palette_key_groups_frames_by_palette()
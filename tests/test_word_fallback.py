@@ -0,0 +1,98 @@
+# test_word_fallback.py
+
+import asyncio
+import time
+
+from provider_health import ProviderHealthRegistry
+from translation_stage import ProviderRateLimiter, TranslationStage
+from word_fallback import WordFallback
+
+GAME_TERMS = {'ENEMY': 'Inimigo', 'GAME OVER': 'Fim de Jogo', 'SAVE': 'Salvar'}
+WORDS = {'attacks': 'ataca', 'flees': 'foge', 'castle': 'castelo', 'dark': 'escuro'}
+
+def make_fallback(**kwargs):
+    stage = TranslationStage(rate_limiter=ProviderRateLimiter(), health=ProviderHealthRegistry())
+    return WordFallback(GAME_TERMS, stage=stage, **kwargs)
+
+def make_translator(calls, delays=None, broken=()):
+    """Tradutor simulado que traduz uma palavra por linha."""
+    async def call_translator(text, translator, source_lang, target_lang):
+        calls.append((translator, text))
+        await asyncio.sleep((delays or {}).get(translator, 0))
+        if translator in broken:
+            return text.replace('\n', ' ')
+        return '\n'.join(WORDS.get(word.lower(), word) for word in text.split('\n'))
+    return call_translator
+
+def test_unknown_words_go_in_a_single_request():
+    """
+    Testa se as palavras do dicionário e as já traduzidas são resolvidas localmente e se as
+    restantes vão aos tradutores em uma única chamada, sem repetição.
+    """
+    print("\n===== TESTE DA TRADUÇÃO PALAVRA POR PALAVRA =====\n")
+
+    fallback = make_fallback()
+    calls = []
+    text = "ENEMY attacks! The dark castle, ENEMY flees. Salvar 100"
+    result = asyncio.run(fallback.translate(text, ['google', 'bing'], 'en', 'pt', make_translator(calls)))
+    print(f"{text!r} -> {result!r}")
+    assert result == "Inimigo ataca! The escuro castelo, Inimigo foge. Salvar 100"
+    assert calls == [('google', "attacks\nThe\ndark\ncastle\nflees")]
+
+    # Segunda vez: tudo vem da memória de palavras
+    calls.clear()
+    result = asyncio.run(fallback.translate("castle flees", ['google'], 'en', 'pt', make_translator(calls)))
+    assert result == "castelo foge"
+    assert calls == []
+    stats = fallback.get_stats()
+    assert stats['memory_hits'] == 2
+    assert stats['batch_requests'] == 1
+
+def test_mismatched_batch_tries_next_translator():
+    """
+    Testa se uma resposta com número de linhas diferente é descartada e o próximo tradutor é
+    tentado com a mesma requisição em lote.
+    """
+    fallback = make_fallback()
+    calls = []
+    translator = make_translator(calls, broken={'google'})
+    result = asyncio.run(fallback.translate("dark castle", ['google', 'bing'], 'en', 'pt', translator))
+    assert result == "escuro castelo"
+    assert [name for name, _ in calls] == ['google', 'bing']
+    assert fallback.get_stats()['batch_mismatches'] == 1
+
+def test_requests_respect_timeout_and_frame_budget():
+    """
+    Testa se a requisição lenta é abandonada no prazo (registrando o timeout na saúde do
+    tradutor) e se nenhuma chamada é feita depois que o prazo do quadro acabou.
+    """
+    fallback = make_fallback(timeout=0.1)
+    calls = []
+    translator = make_translator(calls, delays={'google': 1.0})
+    start = time.perf_counter()
+    result = asyncio.run(fallback.translate("dark castle", ['google', 'bing'], 'en', 'pt', translator))
+    elapsed = time.perf_counter() - start
+    print(f"Tempo com tradutor lento: {elapsed * 1000:.0f} ms")
+    assert result == "dark castle"
+    assert elapsed < 0.5
+    assert fallback.get_stats()['timeouts'] == 1
+    assert fallback.stage.health.get_stats()['providers']['google']['timeouts'] == 1
+
+    # Prazo do quadro esgotado: só os recursos locais são usados
+    stage = TranslationStage(rate_limiter=ProviderRateLimiter(), frame_budget=0.05)
+    fallback = make_fallback()
+    calls.clear()
+
+    async def translate_func(text, source_lang, target_lang):
+        await asyncio.sleep(0.1)
+        return await fallback.translate(text, ['google'], source_lang, target_lang, make_translator(calls))
+
+    result = asyncio.run(stage.translate_frame(["ENEMY flees", "dark castle"], 'en', 'pt', translate_func=translate_func))
+    assert result == ["Inimigo flees", "dark castle"]
+    assert calls == []
+    assert fallback.get_stats()['budget_exhausted'] == 2
+
+if __name__ == "__main__":
+    test_unknown_words_go_in_a_single_request()
+    test_mismatched_batch_tries_next_translator()
+    test_requests_respect_timeout_and_frame_budget()
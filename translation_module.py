@@ -2,6 +2,11 @@
 
 import translators as ts
 import re
+from typing import Tuple
+
+from game_terms import GameTermEngine
+from language_id import LanguageIdentifier
+from ocr_corrections import OCRCorrectionEngine
 
 # Dicionário de termos comuns de jogos arcade/retro
 GAME_TERMS_DICT = {
@@ -287,109 +292,53 @@ OCR_CORRECTIONS = {
     'DANGFR': 'DANGER'
 }
 
+# Dicionário compilado uma única vez (e recarregado de GAME_TERMS_FILE quando o arquivo muda)
+game_term_engine = GameTermEngine(GAME_TERMS_DICT.get('en', {}))
+
+# Correções compiladas uma única vez; o vocabulário dos termos de jogos alimenta a correção aproximada
+ocr_correction_engine = OCRCorrectionEngine(OCR_CORRECTIONS, vocabulary=GAME_TERMS_DICT.get('en', {}))
+
+# Identificação de idioma: os termos de jogos (inglês) e suas traduções (português) ampliam o vocabulário
+language_identifier = LanguageIdentifier({
+    'en': GAME_TERMS_DICT.get('en', {}).keys(),
+    'pt': GAME_TERMS_DICT.get('en', {}).values()
+})
+
 def correct_ocr_errors(text: str) -> str:
     """Corrige erros comuns de OCR"""
-    if not text:
-        return text
-        
-    # Verifica padrões específicos para PUSH SPACE KEY com regex
-    # Caso especial para texto que contém apenas variações de PUSH SPACE KEY
-    if re.match(r'^\s*(?:KEY\s+)?PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*(?:PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*)*$', text, re.IGNORECASE):
-        return 'PUSH SPACE KEY'
-    
-    # Primeiro verifica se o texto contém variações de PUSH SPACE KEY
-    if re.search(r'PUSH\s*SPACE\s*KEY', text, re.IGNORECASE) or \
-       re.search(r'PUSH[G]?[E]?PAC[B]?KEY', text, re.IGNORECASE) or \
-       re.search(r'KEY\s+PUSH\s+SPACE', text, re.IGNORECASE):
-        # Normaliza para PUSH SPACE KEY para garantir tradução correta
-        text = re.sub(r'PUSH[G]?[E]?PAC[B]?KEY', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
-        text = re.sub(r'PUSH\s+SPACE\s+KEY', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
-        text = re.sub(r'KEY\s+PUSH\s+SPACE', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
-    
-    corrected = text
-    for error, correction in OCR_CORRECTIONS.items():
-        corrected = re.sub(r'\b' + re.escape(error) + r'\b', correction, corrected, flags=re.IGNORECASE)
-    return corrected
+    # Correções compiladas em uma única varredura (e, se ativada, correção aproximada pelo vocabulário)
+    return ocr_correction_engine.correct(text)
 
 def translate_game_terms(text: str, target_lang: str) -> str:
     """Traduz termos específicos de jogos usando dicionário"""
     if target_lang not in ['pt', 'pt-br']:
         return text
-        
-    translated = text
-    game_terms = GAME_TERMS_DICT.get('en', {})
-    
-    # Primeiro traduzir frases completas e termos compostos (mais longos)
-    sorted_terms = sorted(game_terms.items(), key=lambda x: len(x[0]), reverse=True)
     
-    # Primeiro passo: traduzir frases completas e termos compostos
-    for term, translation in sorted_terms:
-        if len(term.split()) > 1:  # Apenas termos compostos/frases
-            pattern = r'\b' + re.escape(term) + r'\b'
-            translated = re.sub(pattern, translation, translated, flags=re.IGNORECASE)
-    
-    # Segundo passo: traduzir termos individuais que não foram traduzidos como parte de frases
-    for term, translation in sorted_terms:
-        if len(term.split()) == 1:  # Apenas termos individuais
-            pattern = r'\b' + re.escape(term) + r'\b'
-            translated = re.sub(pattern, translation, translated, flags=re.IGNORECASE)
-    
-    return translated
+    # Termos compostos primeiro, depois os individuais, cada passada em uma única varredura
+    return game_term_engine.translate(text)
 
 def is_mostly_portuguese(text: str) -> bool:
     """Verifica se o texto já está majoritariamente em português"""
-    portuguese_words = [
-        # Termos básicos de interface
-        'jogador', 'jogadores', 'crédito', 'créditos', 'entrar', 'pressione', 
-        'iniciar', 'continuar', 'pontuação', 'recorde', 'nível', 'fase', 
-        'vidas', 'tempo', 'bônus', 'fim', 'jogo', 'insira', 'moeda', 'livre',
-        'qualquer', 'botão', 'sim', 'não', 'sair', 'tentar', 'novamente', 'reiniciar',
-        
-        # Jogabilidade
-        'um', 'dois', 'melhor', 'mundo', 'rodada', 'área', 'zona', 'missão',
-        'vida', 'restante', 'temporizador', 'extra', 'poder', 'especial', 'energia',
-        'saúde', 'experiência', 'ataque', 'defesa', 'magia', 'velocidade', 'força',
-        'agilidade', 'inteligência', 'sabedoria', 'sorte',
-        
-        # Menus e configurações
-        'opções', 'configurações', 'configuração', 'som', 'música', 'volume',
-        'controles', 'botão', 'dificuldade', 'fácil', 'normal', 'difícil',
-        'especialista', 'idioma', 'salvar', 'carregar', 'salvando', 'carregando',
-        'excluir', 'cancelar', 'confirmar', 'selecionar', 'voltar', 'retornar',
-        
-        # Status e mensagens
-        'vitória', 'derrota', 'parabéns', 'obrigado', 'por', 'pausa', 'pausado',
-        'pronto', 'vai', 'lutar', 'batalha', 'perfeito', 'ótimo', 'bom', 'ruim',
-        'errou', 'falhou', 'concluído', 'completa', 'cumprida', 'completo',
-        'aviso', 'perigo', 'erro', 'depuração'
-    ]
-    
-    words = text.lower().split()
-    portuguese_count = sum(1 for word in words if any(pt_word in word for pt_word in portuguese_words))
-    
-    return portuguese_count > len(words) * 0.3  # Se mais de 30% das palavras parecem portuguesas
+    return language_identifier.is_language(text, 'pt')
 
 # O sistema de tradução concorrente será importado dinamicamente quando necessário
 enhanced_translate_text = None
 
 import asyncio
 
-async def translate_text(text: str, target_lang: str = 'en', source_lang: str = 'auto') -> str:
+def prepare_text_for_translation(text: str, target_lang: str) -> Tuple[str, bool]:
     """
-    Traduz um texto de um idioma de origem para um idioma de destino usando o sistema concorrente.
-    Inclui correções de OCR e dicionário de termos de jogos.
+    Aplica as etapas locais da tradução: casos especiais, correções de OCR, detecção de
+    texto já em português e dicionário de termos de jogos.
 
     Args:
         text: O texto a ser traduzido.
-        target_lang: O código do idioma de destino (ex: 'pt' para português).
-        source_lang: O código do idioma de origem (ex: 'en' para inglês). 'auto' para detecção automática.
+        target_lang: O código do idioma de destino.
 
     Returns:
-        O texto traduzido.
+        Tupla (texto, concluído). Se concluído for True, o texto já é a tradução final e
+        nenhum tradutor externo precisa ser chamado.
     """
-    if not text:
-        return ""
-        
     # Tratamento especial para PUSH SPACE KEY e variações
     if target_lang in ['pt', 'pt-br']:
         # Caso especial para texto que contém apenas variações de PUSH SPACE KEY
@@ -398,7 +347,7 @@ async def translate_text(text: str, target_lang: str = 'en', source_lang: str =
         # Se o texto contém principalmente variações de PUSH SPACE KEY
         if 'PUSHGPACE' in text.upper() or 'PUSHGPACBKEY' in text.upper() or 'PUSHEPACBKEY' in text.upper():
             # Simplifica para uma única instrução
-            return 'Pressione a Tecla Espaço'
+            return 'Pressione a Tecla Espaço', True
         
         # Padrões para detectar variações de PUSH SPACE KEY
         push_space_patterns = [
@@ -413,29 +362,51 @@ async def translate_text(text: str, target_lang: str = 'en', source_lang: str =
                 # Substitui todas as ocorrências pelo texto traduzido
                 for p in push_space_patterns:
                     text = re.sub(p, 'Pressione a Tecla Espaço', text, flags=re.IGNORECASE)
-                return text
+                return text, True
                 
         # Caso mais simples
         if 'PUSH SPACE' in text.upper():
-            return text.upper().replace('PUSH SPACE', 'Pressione Espaço')
+            return text.upper().replace('PUSH SPACE', 'Pressione Espaço'), True
+    
+    # Etapa 1: Corrigir erros comuns de OCR
+    corrected_text = correct_ocr_errors(text)
+    if corrected_text != text:
+        print(f"Módulo de Tradução: Texto após correção OCR: '{corrected_text}'")
+    
+    # Etapa 2: Verificar se já está no idioma de destino
+    if language_identifier.is_language(corrected_text, target_lang):
+        print(f"Módulo de Tradução: Texto já parece estar no idioma de destino ('{target_lang}'), retornando sem traduzir.")
+        return corrected_text, True
+    
+    # Etapa 3: Traduzir termos específicos de jogos primeiro
+    game_translated = translate_game_terms(corrected_text, target_lang)
+    if game_translated != corrected_text:
+        print(f"Módulo de Tradução: Texto após tradução de termos de jogos: '{game_translated}'")
+    return game_translated, False
+
+async def translate_text(text: str, target_lang: str = 'en', source_lang: str = 'auto') -> str:
+    """
+    Traduz um texto de um idioma de origem para um idioma de destino usando o sistema concorrente.
+    Inclui correções de OCR e dicionário de termos de jogos.
+
+    Args:
+        text: O texto a ser traduzido.
+        target_lang: O código do idioma de destino (ex: 'pt' para português).
+        source_lang: O código do idioma de origem (ex: 'en' para inglês). 'auto' para detecção automática.
+
+    Returns:
+        O texto traduzido.
+    """
+    if not text:
+        return ""
         
     try:
         print(f"Módulo de Tradução: Recebeu texto '{text}' para traduzir para '{target_lang}'.")
         
-        # Etapa 1: Corrigir erros comuns de OCR
-        corrected_text = correct_ocr_errors(text)
-        if corrected_text != text:
-            print(f"Módulo de Tradução: Texto após correção OCR: '{corrected_text}'")
-        
-        # Etapa 2: Verificar se já está em português
-        if target_lang in ['pt', 'pt-br'] and is_mostly_portuguese(corrected_text):
-            print(f"Módulo de Tradução: Texto já parece estar em português, retornando sem traduzir.")
-            return corrected_text
-        
-        # Etapa 3: Traduzir termos específicos de jogos primeiro
-        game_translated = translate_game_terms(corrected_text, target_lang)
-        if game_translated != corrected_text:
-            print(f"Módulo de Tradução: Texto após tradução de termos de jogos: '{game_translated}'")
+        # Etapas 1 a 3: casos especiais, correções de OCR, português e termos de jogos
+        game_translated, done = prepare_text_for_translation(text, target_lang)
+        if done:
+            return game_translated
         
         # Etapa 4: Usar o sistema de tradução concorrente aprimorado
         # Importar dinamicamente para evitar importação circular
@@ -3,6 +3,8 @@
 import translators as ts
 import re
 
+from ocr_corrections import OCRCorrectionEngine
+
 # Dicionário de termos comuns de jogos arcade/retro
 GAME_TERMS_DICT = {
     'en': {
@@ -287,29 +289,12 @@ OCR_CORRECTIONS = {
     'DANGFR': 'DANGER'
 }
 
+# Correções compiladas uma única vez (mesmo motor do translation_module)
+ocr_correction_engine = OCRCorrectionEngine(OCR_CORRECTIONS, vocabulary=GAME_TERMS_DICT.get('en', {}))
+
 def correct_ocr_errors(text: str) -> str:
     """Corrige erros comuns de OCR"""
-    if not text:
-        return text
-        
-    # Verifica padrões específicos para PUSH SPACE KEY com regex
-    # Caso especial para texto que contém apenas variações de PUSH SPACE KEY
-    if re.match(r'^\s*(?:KEY\s+)?PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*(?:PUSH\s*(?:G|E)?(?:SPACE|PAC[B]?)\s*KEY\s*)*$', text, re.IGNORECASE):
-        return 'PUSH SPACE KEY'
-    
-    # Primeiro verifica se o texto contém variações de PUSH SPACE KEY
-    if re.search(r'PUSH\s*SPACE\s*KEY', text, re.IGNORECASE) or \
-       re.search(r'PUSH[G]?[E]?PAC[B]?KEY', text, re.IGNORECASE) or \
-       re.search(r'KEY\s+PUSH\s+SPACE', text, re.IGNORECASE):
-        # Normaliza para PUSH SPACE KEY para garantir tradução correta
-        text = re.sub(r'PUSH[G]?[E]?PAC[B]?KEY', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
-        text = re.sub(r'PUSH\s+SPACE\s+KEY', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
-        text = re.sub(r'KEY\s+PUSH\s+SPACE', 'PUSH SPACE KEY', text, flags=re.IGNORECASE)
-    
-    corrected = text
-    for error, correction in OCR_CORRECTIONS.items():
-        corrected = re.sub(r'\b' + re.escape(error) + r'\b', correction, corrected, flags=re.IGNORECASE)
-    return corrected
+    return ocr_correction_engine.correct(text)
 
 def translate_game_terms(text: str, target_lang: str) -> str:
     """Traduz termos específicos de jogos usando dicionário"""
@@ -0,0 +1,330 @@
+# translation_stage.py
+
+"""
+Etapa de tradução por quadro.
+
+Antes, process_ai_request aguardava translate_text uma detecção após a outra, e cada
+tradutor era chamado de forma síncrona dentro do event loop, então uma tela com 10
+caixas de texto pagava 10 vezes a latência de rede do tradutor. Esta etapa remove os
+textos repetidos do quadro, traduz os restantes em paralelo com asyncio.gather e
+devolve as traduções na ordem original das detecções.
+
+As chamadas aos tradutores passam por um limitador global de concorrência compartilhado
+por todas as requisições (TRANSLATION_MAX_CONCURRENT), tanto as funções síncronas, que
+rodam em um pool de threads do mesmo tamanho, quanto as corrotinas dos adaptadores HTTP
+assíncronos, e respeitam um limite de requisições
+por segundo configurável para cada provedor. O resultado de cada chamada alimenta o
+registro de saúde dos tradutores (provider_health), e provedores com o circuito aberto
+não são chamados. Quando TRANSLATION_BATCH_PROVIDER está
+definido, os textos do quadro são enviados em uma única chamada em lote ao provedor.
+
+Cada quadro tem um prazo (TRANSLATION_FRAME_BUDGET) herdado pelas tarefas de tradução;
+a tradução palavra por palavra (word_fallback) não faz chamadas de rede depois dele.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from provider_health import ProviderHealthRegistry, ProviderUnavailableError, is_timeout_error, provider_health
+from translation_module import prepare_text_for_translation, translate_text
+
+# Configurações via variáveis de ambiente
+# Chamadas simultâneas aos tradutores, somando todas as requisições
+TRANSLATION_MAX_CONCURRENT = int(os.getenv('TRANSLATION_MAX_CONCURRENT', '8'))
+# Limites por provedor em requisições por segundo, ex: "deep_google:10,deep_mymemory:2"
+TRANSLATION_PROVIDER_RATE_LIMITS = os.getenv('TRANSLATION_PROVIDER_RATE_LIMITS', '')
+# Limite dos provedores não listados acima (0 = sem limite)
+TRANSLATION_DEFAULT_RATE_LIMIT = float(os.getenv('TRANSLATION_DEFAULT_RATE_LIMIT', '0'))
+# Provedor do deep-translator usado para traduzir os textos do quadro em lote (vazio = desativado)
+TRANSLATION_BATCH_PROVIDER = os.getenv('TRANSLATION_BATCH_PROVIDER', '').strip()
+# Prazo (segundos) das traduções de reserva de um quadro, somando todos os textos (0 = sem prazo)
+TRANSLATION_FRAME_BUDGET = float(os.getenv('TRANSLATION_FRAME_BUDGET', '4'))
+
+# Prazo (time.monotonic) do quadro em tradução, herdado pelas tarefas criadas em translate_frame
+_frame_deadline: contextvars.ContextVar = contextvars.ContextVar('translation_frame_deadline', default=None)
+
+
+def frame_time_remaining() -> Optional[float]:
+    """
+    Segundos restantes do prazo do quadro em tradução.
+
+    Returns:
+        Tempo restante (pode ser negativo), ou None fora de um quadro ou sem prazo.
+    """
+    deadline = _frame_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """
+    Converte a especificação "provedor:rps,provedor:rps" em um dicionário.
+
+    Args:
+        spec: Texto da variável de ambiente.
+
+    Returns:
+        Dicionário provedor -> requisições por segundo.
+    """
+    limits = {}
+    for item in spec.split(','):
+        if ':' not in item:
+            continue
+        name, rate = item.split(':', 1)
+        try:
+            limits[name.strip()] = float(rate)
+        except ValueError:
+            print(f"Etapa de Tradução: Limite inválido ignorado: '{item}'")
+    return limits
+
+
+class ProviderRateLimiter:
+    """
+    Espaça as chamadas a cada provedor para respeitar um limite de requisições por segundo.
+
+    Cada chamada reserva o próximo horário livre do provedor sob um lock de thread e depois
+    aguarda até esse horário com asyncio.sleep, sem bloquear o event loop.
+    """
+
+    def __init__(self, limits: Dict[str, float] = None, default_rate: float = TRANSLATION_DEFAULT_RATE_LIMIT):
+        """
+        Inicializa o limitador.
+
+        Args:
+            limits: Requisições por segundo de cada provedor.
+            default_rate: Limite dos provedores não listados (0 = sem limite).
+        """
+        self.limits = dict(limits or {})
+        self.default_rate = default_rate
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = {'delayed_calls': 0, 'total_delay': 0.0}
+
+    def reserve(self, provider: str) -> float:
+        """
+        Reserva um horário para a próxima chamada ao provedor.
+
+        Returns:
+            Segundos que a chamada deve aguardar antes de ser feita.
+        """
+        rate = self.limits.get(provider, self.default_rate)
+        if rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(provider, now))
+            self._next_slot[provider] = slot + 1.0 / rate
+            delay = slot - now
+            if delay > 0:
+                self.stats['delayed_calls'] += 1
+                self.stats['total_delay'] += delay
+            return delay
+
+    async def wait(self, provider: str) -> None:
+        """Aguarda o horário reservado para a próxima chamada ao provedor."""
+        delay = self.reserve(provider)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class TranslationStage:
+    """
+    Traduz todos os textos de um quadro em paralelo, com limites globais e por provedor.
+    """
+
+    def __init__(self, max_concurrent: int = TRANSLATION_MAX_CONCURRENT,
+                 rate_limiter: ProviderRateLimiter = None, batch_provider: str = TRANSLATION_BATCH_PROVIDER,
+                 health: ProviderHealthRegistry = None, frame_budget: float = TRANSLATION_FRAME_BUDGET):
+        """
+        Inicializa a etapa de tradução.
+
+        Args:
+            max_concurrent: Chamadas simultâneas aos tradutores (compartilhadas entre requisições).
+            rate_limiter: Limitador de requisições por provedor.
+            batch_provider: Provedor do deep-translator para a tradução em lote ('' desativa).
+            health: Registro de saúde dos tradutores (padrão: registro global).
+            frame_budget: Prazo (segundos) das traduções de reserva de cada quadro (0 = sem prazo).
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.rate_limiter = rate_limiter or ProviderRateLimiter(parse_rate_limits(TRANSLATION_PROVIDER_RATE_LIMITS))
+        self.batch_provider = batch_provider
+        self.health = health or provider_health
+        self.frame_budget = frame_budget
+        self._executor = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._calls_lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = {
+            'frames': 0,
+            'texts': 0,
+            'unique_texts': 0,
+            'provider_calls': 0,
+            'rejected_calls': 0,
+            'batch_calls': 0,
+            'batch_failures': 0
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='translation')
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Um semáforo por event loop: o asyncio.Semaphore fica preso ao loop em que foi usado
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _run_counted(self, func: Callable, *args, **kwargs):
+        with self._calls_lock:
+            self._in_flight += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._calls_lock:
+                self._in_flight -= 1
+
+    async def _await_counted(self, func: Callable, *args, **kwargs):
+        with self._calls_lock:
+            self._in_flight += 1
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            with self._calls_lock:
+                self._in_flight -= 1
+
+    async def call_provider(self, provider: str, func: Callable, *args, **kwargs):
+        """
+        Executa uma chamada a um tradutor sem bloquear o event loop: funções síncronas rodam
+        no pool de threads e corrotinas (adaptadores HTTP assíncronos) são aguardadas
+        diretamente, sem ocupar threads. Nos dois casos a chamada ocupa uma vaga do limite
+        global de chamadas simultâneas (max_concurrent).
+
+        Exceções e retornos vazios contam como falha no registro de saúde do provedor.
+
+        Args:
+            provider: Nome do provedor (usado no limite de requisições e no registro de saúde).
+            func: Função síncrona ou corrotina que faz a chamada de rede.
+
+        Returns:
+            O retorno de func.
+
+        Raises:
+            ProviderUnavailableError: Se o circuito do provedor está aberto.
+        """
+        if not self.health.allow(provider):
+            self.stats['rejected_calls'] += 1
+            raise ProviderUnavailableError(provider)
+        await self.rate_limiter.wait(provider)
+        self.stats['provider_calls'] += 1
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore():
+            # A latência registrada não inclui a espera por uma vaga do limite global
+            start = time.monotonic()
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    result = await self._await_counted(func, *args, **kwargs)
+                else:
+                    result = await loop.run_in_executor(self._get_executor(),
+                                                        functools.partial(self._run_counted, func, *args, **kwargs))
+            except Exception as e:
+                self.health.record_failure(provider, time.monotonic() - start, timeout=is_timeout_error(e))
+                raise
+        if result:
+            self.health.record_success(provider, time.monotonic() - start)
+        else:
+            self.health.record_failure(provider, time.monotonic() - start)
+        return result
+
+    async def _translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> Optional[List[str]]:
+        # Importação tardia: o deep-translator só é necessário quando o lote está ativado
+        from deep_translator_integration import translate_batch_with_deep_translator
+
+        results: List[Optional[str]] = []
+        pending_indexes, pending_texts = [], []
+        for text in texts:
+            prepared, done = prepare_text_for_translation(text, target_lang)
+            results.append(prepared if done else None)
+            if not done:
+                pending_indexes.append(len(results) - 1)
+                pending_texts.append(prepared)
+        if not pending_texts:
+            return results
+
+        self.stats['batch_calls'] += 1
+        try:
+            translated = await self.call_provider(self.batch_provider, translate_batch_with_deep_translator,
+                                                  pending_texts, self.batch_provider, source_lang, target_lang)
+        except ProviderUnavailableError:
+            translated = None
+        # Em caso de erro a integração devolve a própria lista de entrada
+        if translated is pending_texts or not translated or len(translated) != len(pending_texts):
+            self.stats['batch_failures'] += 1
+            print(f"Etapa de Tradução: Lote com {self.batch_provider} falhou; traduzindo individualmente.")
+            return None
+        for index, prepared, result in zip(pending_indexes, pending_texts, translated):
+            results[index] = result or prepared
+        return results
+
+    async def translate_frame(self, texts: List[str], source_lang: str, target_lang: str,
+                              translate_func: Callable = None) -> List[str]:
+        """
+        Traduz os textos de um quadro, mantendo a ordem das detecções.
+
+        Args:
+            texts: Textos na ordem das detecções (podem se repetir).
+            source_lang: Idioma de origem.
+            target_lang: Idioma de destino.
+            translate_func: Corrotina que traduz um texto (padrão: translation_module.translate_text).
+
+        Returns:
+            Traduções na mesma ordem de texts.
+        """
+        translate_func = translate_func or translate_text
+        unique_texts = list(dict.fromkeys(texts))
+        self.stats['frames'] += 1
+        self.stats['texts'] += len(texts)
+        self.stats['unique_texts'] += len(unique_texts)
+
+        token = _frame_deadline.set(time.monotonic() + self.frame_budget) if self.frame_budget > 0 else None
+        try:
+            translated = None
+            if self.batch_provider and len(unique_texts) > 1:
+                translated = await self._translate_batch(unique_texts, source_lang, target_lang)
+            if translated is None:
+                translated = await asyncio.gather(*(
+                    translate_func(text=text, source_lang=source_lang, target_lang=target_lang)
+                    for text in unique_texts
+                ))
+        finally:
+            if token is not None:
+                _frame_deadline.reset(token)
+
+        translations = dict(zip(unique_texts, translated))
+        return [translations[text] for text in texts]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores e a ocupação da etapa de tradução."""
+        with self._calls_lock:
+            in_flight = self._in_flight
+        return {
+            'max_concurrent': self.max_concurrent,
+            'in_flight': in_flight,
+            'batch_provider': self.batch_provider or None,
+            'frame_budget': self.frame_budget,
+            'rate_limits': self.rate_limiter.limits,
+            **self.stats,
+            **self.rate_limiter.stats
+        }
+
+
+# Instância global compartilhada por todas as requisições
+translation_stage = TranslationStage()
@@ -0,0 +1,279 @@
+# variant_scheduler.py
+
+"""
+Escalonamento adaptativo das variantes de pré-processamento do OCR melhorado.
+
+improved_ocr_module gera 12 variantes de cada quadro (cinza, CLAHE, Otsu, correção de
+inclinação etc.) e executava o readtext completo em todas: 12 inferências por quadro.
+O escalonador aprende, por jogo (sessão) ou por paleta de cores do console, o rendimento
+de cada variante (confiança × caracteres das detecções) e define a ordem de execução:
+
+- a melhor variante da sessão do cliente vai primeiro;
+- as demais seguem pelo rendimento médio observado naquele perfil;
+- a execução para quando uma variante não acrescenta nenhum texto novo (as detecções
+  se estabilizaram) ou quando OCR_VARIANT_TOP_K variantes já foram executadas.
+
+Uma fração OCR_VARIANT_EXPLORE_RATE dos quadros executa todas as variantes para manter
+as estatísticas das variantes que ficam fora do top-k atualizadas.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Configurações via variáveis de ambiente
+OCR_VARIANT_SCHEDULER_ENABLED = os.getenv('OCR_VARIANT_SCHEDULER_ENABLED', 'true').lower() == 'true'
+# Número máximo de variantes executadas por quadro
+OCR_VARIANT_TOP_K = int(os.getenv('OCR_VARIANT_TOP_K', '3'))
+# Fração dos quadros que executa todas as variantes (exploração)
+OCR_VARIANT_EXPLORE_RATE = float(os.getenv('OCR_VARIANT_EXPLORE_RATE', '0.05'))
+# Peso das novas observações na média móvel de rendimento e custo
+OCR_VARIANT_EMA_ALPHA = float(os.getenv('OCR_VARIANT_EMA_ALPHA', '0.2'))
+OCR_VARIANT_MAX_SESSIONS = int(os.getenv('OCR_VARIANT_MAX_SESSIONS', '256'))
+# Variantes executadas por lote do detector/reconhecedor (a parada antecipada é verificada a cada lote)
+OCR_VARIANT_BATCH_SIZE = int(os.getenv('OCR_VARIANT_BATCH_SIZE', '2'))
+
+# Confiança mínima para uma detecção contar no rendimento
+YIELD_MIN_CONFIDENCE = 0.3
+
+
+def detection_yield(detections: Iterable) -> float:
+    """
+    Rendimento de um conjunto de detecções: soma de confiança × número de caracteres.
+
+    Args:
+        detections: Detecções no formato do EasyOCR [(bbox, texto, confiança), ...].
+    """
+    return sum(confidence * len(text.strip()) for _, text, confidence in detections
+               if confidence > YIELD_MIN_CONFIDENCE and text.strip())
+
+
+def detection_texts(detections: Iterable) -> set:
+    """Textos normalizados das detecções acima da confiança mínima."""
+    return {text.strip().lower() for _, text, confidence in detections
+            if confidence > YIELD_MIN_CONFIDENCE and text.strip()}
+
+
+def palette_key(image) -> str:
+    """
+    Assinatura da paleta de cores do quadro, usada como perfil quando não há sessão.
+
+    Quadros do mesmo console/jogo tendem a compartilhar poucas cores dominantes: a imagem é
+    reduzida, quantizada em 4 níveis por canal e a assinatura combina a cor mais frequente
+    com a quantidade de cores presentes.
+    """
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA)
+    if small.ndim == 2:
+        small = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
+    quantized = (small // 64).reshape(-1, 3).astype(np.int32)
+    codes = quantized[:, 0] * 16 + quantized[:, 1] * 4 + quantized[:, 2]
+    counts = np.bincount(codes, minlength=64)
+    dominant = int(counts.argmax())
+    colors = int((counts > 0).sum())
+    return f"paleta-{dominant:02d}-{min(colors // 8, 7)}"
+
+
+class VariantScheduler:
+    """
+    Ordena as variantes de pré-processamento pelo rendimento observado e decide quando parar.
+    """
+
+    def __init__(self, enabled: bool = OCR_VARIANT_SCHEDULER_ENABLED, top_k: int = OCR_VARIANT_TOP_K,
+                 explore_rate: float = OCR_VARIANT_EXPLORE_RATE, alpha: float = OCR_VARIANT_EMA_ALPHA,
+                 max_sessions: int = OCR_VARIANT_MAX_SESSIONS, batch_size: int = OCR_VARIANT_BATCH_SIZE):
+        """
+        Inicializa o escalonador.
+
+        Args:
+            enabled: Se False, todas as variantes são executadas (comportamento antigo).
+            top_k: Número máximo de variantes executadas por quadro.
+            explore_rate: Fração dos quadros que executa todas as variantes.
+            alpha: Peso das novas observações nas médias móveis.
+            max_sessions: Número máximo de sessões com melhor variante e perfil memorizados.
+            batch_size: Variantes por lote quando o readtext em lote está disponível.
+        """
+        self.enabled = enabled
+        self.top_k = max(1, top_k)
+        self.explore_rate = explore_rate
+        self.alpha = alpha
+        self.max_sessions = max_sessions
+        self.batch_size = max(1, batch_size)
+        # perfil -> variante -> {'runs', 'yield', 'cost'}
+        self._profiles: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._session_best: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'frames': 0, 'explored_frames': 0, 'variants_run': 0, 'variants_skipped': 0,
+                      'early_stops': 0}
+
+    @staticmethod
+    def session_profile(session_key: str) -> str:
+        """Perfil das estatísticas de uma sessão (jogo) do cliente."""
+        return f"sessao:{session_key}"
+
+    @classmethod
+    def profile_for(cls, image, session_key: Optional[str] = None) -> str:
+        """Perfil usado nas estatísticas: a sessão (jogo) do cliente ou a paleta do quadro."""
+        return cls.session_profile(session_key) if session_key else palette_key(image)
+
+    def plan(self, names: List[str], profile: str, session_key: Optional[str] = None) -> Tuple[List[str], int]:
+        """
+        Define a ordem de execução das variantes e quantas podem ser executadas.
+
+        Args:
+            names: Variantes disponíveis, na ordem padrão.
+            profile: Perfil do quadro (sessão ou paleta).
+            session_key: Identificador do cliente/jogo.
+
+        Returns:
+            Tupla (variantes ordenadas, número máximo de variantes a executar).
+        """
+        if not self.enabled:
+            return list(names), len(names)
+
+        with self._lock:
+            observed = self._profiles.get(profile, {})
+            best = self._session_best.get(session_key) if session_key else None
+            self.stats['frames'] += 1
+            explore = random.random() < self.explore_rate
+            if explore:
+                self.stats['explored_frames'] += 1
+
+        default_order = {name: index for index, name in enumerate(names)}
+        # Variantes nunca observadas mantêm a ordem padrão, depois das já medidas com rendimento
+        ordered = sorted(names, key=lambda name: (
+            name != best,
+            -observed[name]['yield'] if name in observed else 0.0,
+            default_order[name]
+        ))
+        return ordered, (len(names) if explore else min(self.top_k, len(names)))
+
+    def record(self, profile: str, name: str, detections: list, cost: float) -> None:
+        """
+        Atualiza o rendimento e o custo médios de uma variante no perfil.
+
+        Args:
+            profile: Perfil do quadro.
+            name: Nome da variante.
+            detections: Detecções da variante no formato do EasyOCR.
+            cost: Tempo do readtext em segundos.
+        """
+        observed_yield = detection_yield(detections)
+        with self._lock:
+            self.stats['variants_run'] += 1
+            entry = self._profiles.setdefault(profile, {}).get(name)
+            if entry is None:
+                self._profiles[profile][name] = {'runs': 1, 'yield': observed_yield, 'cost': cost}
+                return
+            entry['runs'] += 1
+            entry['yield'] += self.alpha * (observed_yield - entry['yield'])
+            entry['cost'] += self.alpha * (cost - entry['cost'])
+
+    def finish(self, session_key: Optional[str], run_yields: Dict[str, float], skipped: int, early_stop: bool) -> None:
+        """
+        Encerra o quadro: memoriza a melhor variante da sessão e atualiza os contadores.
+
+        Args:
+            session_key: Identificador do cliente/jogo.
+            run_yields: Rendimento de cada variante executada neste quadro.
+            skipped: Número de variantes não executadas.
+            early_stop: True se a execução parou porque as detecções se estabilizaram.
+        """
+        with self._lock:
+            self.stats['variants_skipped'] += skipped
+            if early_stop:
+                self.stats['early_stops'] += 1
+            if session_key and run_yields:
+                self._session_best[session_key] = max(run_yields, key=run_yields.get)
+                self._session_best.move_to_end(session_key)
+                # As estatísticas do perfil da sessão saem junto com a sessão menos recente
+                while len(self._session_best) > self.max_sessions:
+                    evicted, _ = self._session_best.popitem(last=False)
+                    self._profiles.pop(self.session_profile(evicted), None)
+
+    def run(self, variants: Dict[str, Any], readtext, profile: str, session_key: Optional[str] = None,
+            readtext_batch=None, batch_size: Optional[int] = None) -> List[Tuple[str, list]]:
+        """
+        Executa o readtext nas variantes escolhidas, parando quando as detecções se estabilizam.
+
+        Args:
+            variants: Variante -> imagem, ou objeto com keys() e get(nome) que gera a imagem sob demanda.
+            readtext: Função (nome, imagem) -> detecções no formato do EasyOCR.
+            profile: Perfil do quadro (ver profile_for).
+            session_key: Identificador do cliente/jogo.
+            readtext_batch: Função ([nomes], [imagens]) -> [detecções] que executa várias variantes em lote.
+            batch_size: Variantes por lote quando readtext_batch é informada (padrão: self.batch_size);
+                a parada antecipada é verificada ao fim de cada lote.
+
+        Returns:
+            Lista de (nome da variante, detecções) na ordem em que foram executadas.
+        """
+        names = list(variants.keys())
+        ordered, limit = self.plan(names, profile, session_key)
+        batch_size = self.batch_size if batch_size is None else batch_size
+        if readtext_batch is None or batch_size < 2:
+            def readtext_batch(batch_names, images):
+                return [readtext(name, image) for name, image in zip(batch_names, images)]
+            batch_size = 1
+
+        planned = ordered[:limit]
+        results = []
+        seen_texts = set()
+        run_yields = {}
+        early_stop = False
+        for offset in range(0, len(planned), batch_size):
+            batch_names = planned[offset:offset + batch_size]
+            start = time.perf_counter()
+            batch_detections = readtext_batch(batch_names, [variants.get(name) for name in batch_names])
+            # O custo do lote é dividido igualmente entre as variantes
+            cost = (time.perf_counter() - start) / len(batch_names)
+
+            new_texts = set()
+            for name, detections in zip(batch_names, batch_detections):
+                self.record(profile, name, detections, cost)
+                results.append((name, detections))
+                run_yields[name] = detection_yield(detections)
+                new_texts |= detection_texts(detections) - seen_texts
+            seen_texts |= new_texts
+            # Detecções estáveis: o lote não acrescentou nenhum texto aos das variantes anteriores
+            if self.enabled and len(results) > len(batch_names) and not new_texts and limit < len(names):
+                early_stop = True
+                break
+        self.finish(session_key, run_yields, len(names) - len(results), early_stop)
+        return results
+
+    def forget(self, session_key: Optional[str] = None) -> None:
+        """Descarta a melhor variante e o perfil de uma sessão (ou todas as estatísticas)."""
+        with self._lock:
+            if session_key is None:
+                self._profiles.clear()
+                self._session_best.clear()
+            else:
+                self._session_best.pop(session_key, None)
+                self._profiles.pop(self.session_profile(session_key), None)
+
+    def get_profile(self, profile: str) -> Dict[str, Dict[str, float]]:
+        """Retorna uma cópia das estatísticas das variantes de um perfil."""
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._profiles.get(profile, {}).items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna a configuração e os contadores do escalonador."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'top_k': self.top_k,
+                'batch_size': self.batch_size,
+                'profiles': len(self._profiles),
+                'sessions': len(self._session_best),
+                **self.stats
+            }
+
+
+# Instância global do escalonador de variantes
+variant_scheduler = VariantScheduler()
@@ -3,13 +3,25 @@ import matplotlib.pyplot as plt
 import numpy as np
 import os
 
+def latest_capture_dir():
+    """Retorna o diretório da captura de debug mais recente (DEBUG_CAPTURE_ENABLED=true)."""
+    root = os.getenv('DEBUG_CAPTURE_DIR', 'debug_captures')
+    if not os.path.isdir(root):
+        return root
+    captures = [os.path.join(root, name) for name in os.listdir(root)]
+    captures = [path for path in captures if os.path.isdir(path)]
+    return max(captures, key=os.path.getmtime) if captures else root
+
 def show_images():
     """Mostra as imagens de resultado e debug lado a lado"""
+    # As imagens de debug ficam no diretório da requisição capturada mais recente
+    capture_dir = latest_capture_dir()
+    
     # Lista de imagens para mostrar
     image_paths = [
         'test_fragmented_text.png',  # Imagem original
-        'debug_original.png',        # Imagem corrigida
-        'debug_combined_result.png', # Resultado combinado
+        os.path.join(capture_dir, 'received.png'),         # Imagem recebida
+        os.path.join(capture_dir, 'combined_result.png'),  # Resultado combinado
         'test_fragmented_result.png' # Resultado final
     ]
     
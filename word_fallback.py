@@ -0,0 +1,224 @@
+# word_fallback.py
+
+"""
+Tradução palavra por palavra com recursos locais e uma única requisição em lote.
+
+Quando todos os tradutores falhavam para o texto completo, a versão antiga chamava cada
+tradutor para cada palavra (até palavras x tradutores chamadas de rede), sem prazo. Aqui as
+palavras são resolvidas primeiro localmente: termos de jogos de uma palavra, palavras que já
+estão no idioma de destino (traduções do dicionário) e uma memória de traduções de palavras
+(LRU) alimentada pelas traduções anteriores. Só as palavras restantes, sem repetição, vão aos
+tradutores, todas juntas em uma única chamada (uma palavra por linha), limitada por
+WORD_FALLBACK_TIMEOUT e pelo prazo do quadro em tradução (translation_stage). Se o prazo
+acabou, nenhuma chamada de rede é feita e as palavras desconhecidas ficam como estão.
+"""
+
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from provider_health import ProviderUnavailableError
+from translation_module import GAME_TERMS_DICT
+from translation_stage import frame_time_remaining, translation_stage
+
+# Configurações via variáveis de ambiente
+# Prazo (segundos) da requisição em lote das palavras desconhecidas de um texto
+WORD_FALLBACK_TIMEOUT = float(os.getenv('WORD_FALLBACK_TIMEOUT', '2'))
+# Número máximo de palavras na memória de traduções
+WORD_MEMORY_SIZE = int(os.getenv('WORD_MEMORY_SIZE', '10000'))
+
+# Pontuação ao redor da palavra, preservada na tradução
+_TOKEN = re.compile(r'^(\W*)(.*?)(\W*)$', re.DOTALL)
+_LETTER = re.compile(r'[^\W\d_]')
+
+# Idiomas de destino das traduções do dicionário de termos de jogos
+GAME_TERMS_TARGETS = ('pt', 'pt-br')
+
+TranslatorCall = Callable[[str, str, str, str], Awaitable[Optional[str]]]
+
+
+class WordFallback:
+    """
+    Traduz um texto palavra por palavra, resolvendo localmente o que for possível e enviando
+    as palavras restantes em uma única requisição com prazo.
+    """
+
+    def __init__(self, game_terms: Dict[str, str] = None, memory_size: int = WORD_MEMORY_SIZE,
+                 timeout: float = WORD_FALLBACK_TIMEOUT, stage=None):
+        """
+        Inicializa a tradução palavra por palavra.
+
+        Args:
+            game_terms: Dicionário de termos de jogos (inglês -> português); só os termos de uma
+                palavra são usados.
+            memory_size: Número máximo de palavras na memória de traduções.
+            timeout: Prazo da requisição em lote de cada texto.
+            stage: Etapa de tradução cujo registro de saúde recebe os timeouts (padrão: global).
+        """
+        game_terms = game_terms or {}
+        self.game_terms = {term.lower(): translation for term, translation in game_terms.items()
+                           if len(term.split()) == 1}
+        # Palavras das traduções do dicionário: já estão no idioma de destino
+        self.target_words = {word.lower() for translation in game_terms.values() for word in translation.split()}
+        self.memory_size = memory_size
+        self.timeout = timeout
+        self.stage = stage or translation_stage
+        self._memory: 'OrderedDict[Tuple[str, str, str], str]' = OrderedDict()
+        self.stats = {
+            'texts': 0,
+            'words': 0,
+            'dictionary_hits': 0,
+            'memory_hits': 0,
+            'network_words': 0,
+            'batch_requests': 0,
+            'batch_mismatches': 0,
+            'timeouts': 0,
+            'budget_exhausted': 0,
+            'untranslated_words': 0
+        }
+
+    def remember(self, word: str, translation: str, source_lang: str, target_lang: str) -> None:
+        """
+        Guarda a tradução de uma palavra na memória.
+
+        Args:
+            word: Palavra no idioma de origem.
+            translation: Tradução da palavra.
+            source_lang: Idioma de origem.
+            target_lang: Idioma de destino.
+        """
+        if not word or not translation:
+            return
+        key = (word.lower(), source_lang, target_lang)
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def lookup(self, word: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """
+        Tradução local da palavra: dicionário de termos de jogos, palavra já no idioma de
+        destino ou memória de traduções.
+
+        Returns:
+            Tradução, ou None se a palavra precisa ir aos tradutores.
+        """
+        lowered = word.lower()
+        if target_lang in GAME_TERMS_TARGETS:
+            if lowered in self.game_terms:
+                self.stats['dictionary_hits'] += 1
+                return self.game_terms[lowered]
+            if lowered in self.target_words:
+                self.stats['dictionary_hits'] += 1
+                return word
+        key = (lowered, source_lang, target_lang)
+        translation = self._memory.get(key)
+        if translation is not None:
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+        return translation
+
+    def _deadline(self) -> float:
+        remaining = frame_time_remaining()
+        budget = self.timeout if remaining is None else min(self.timeout, remaining)
+        return time.monotonic() + budget
+
+    async def _translate_remote(self, words: List[str], translators: List[str], source_lang: str,
+                                target_lang: str, call_translator: TranslatorCall) -> Dict[str, str]:
+        deadline = self._deadline()
+        if deadline <= time.monotonic():
+            self.stats['budget_exhausted'] += 1
+            return {}
+
+        # Uma palavra por linha: uma única chamada para todas as palavras desconhecidas
+        joined = '\n'.join(words)
+        for translator in translators:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.stats['budget_exhausted'] += 1
+                break
+            start = time.monotonic()
+            self.stats['batch_requests'] += 1
+            try:
+                result = await asyncio.wait_for(call_translator(joined, translator, source_lang, target_lang), remaining)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                self.stage.health.record_failure(translator, time.monotonic() - start, timeout=True)
+                print(f"Tradução Palavra por Palavra: {translator} excedeu o prazo de {remaining:.1f}s")
+                continue
+            except ProviderUnavailableError:
+                continue
+            except Exception as e:
+                print(f"Tradução Palavra por Palavra: Erro com tradutor {translator}: {e}")
+                continue
+
+            lines = [line.strip() for line in (result or '').split('\n')]
+            if len(lines) == len(words) and all(lines):
+                return dict(zip(words, lines))
+            self.stats['batch_mismatches'] += 1
+        return {}
+
+    async def translate(self, text: str, translators: List[str], source_lang: str, target_lang: str,
+                        call_translator: TranslatorCall) -> str:
+        """
+        Traduz o texto palavra por palavra.
+
+        Args:
+            text: Texto a traduzir.
+            translators: Tradutores a tentar, em ordem.
+            source_lang: Idioma de origem.
+            target_lang: Idioma de destino.
+            call_translator: Corrotina (texto, tradutor, origem, destino) que chama um tradutor.
+
+        Returns:
+            Texto com as palavras traduzidas (as não resolvidas ficam como estão).
+        """
+        self.stats['texts'] += 1
+        tokens = []
+        unknown: Dict[str, None] = {}
+        for token in text.split():
+            prefix, word, suffix = _TOKEN.match(token).groups()
+            # Palavras muito curtas e tokens sem letras não são traduzidos
+            if len(token) <= 2 or not _LETTER.search(word):
+                tokens.append((token, None, None, None))
+                continue
+            self.stats['words'] += 1
+            translation = self.lookup(word, source_lang, target_lang)
+            if translation is None:
+                unknown[word] = None
+            tokens.append((token, prefix, word, suffix) if translation is None else (prefix + translation + suffix, None, None, None))
+
+        resolved: Dict[str, str] = {}
+        if unknown:
+            words = list(unknown)
+            self.stats['network_words'] += len(words)
+            resolved = await self._translate_remote(words, translators, source_lang, target_lang, call_translator)
+            for word, translation in resolved.items():
+                self.remember(word, translation, source_lang, target_lang)
+            self.stats['untranslated_words'] += len(words) - len(resolved)
+
+        output = []
+        for token, prefix, word, suffix in tokens:
+            if word is None:
+                output.append(token)
+            elif word in resolved:
+                output.append(prefix + resolved[word] + suffix)
+            else:
+                output.append(token)
+        return ' '.join(output)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna o tamanho da memória de palavras e os contadores da tradução palavra por palavra."""
+        return {
+            'memory_size': len(self._memory),
+            'memory_capacity': self.memory_size,
+            'timeout': self.timeout,
+            **self.stats
+        }
+
+
+# Instância global: a memória de palavras é compartilhada por todas as requisições
+word_fallback = WordFallback(GAME_TERMS_DICT['en'])